@@ -1,9 +1,12 @@
 """Admin API routes -- dashboard, ranking, user management."""
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.infrastructure.auth.dependencies import get_current_user
 from app.infrastructure.auth.admin_utils import configured_admin_emails, is_admin_email, is_admin_username
+from app.infrastructure.database import instrumentation
+from app.infrastructure.database.challenge_stats import collect as collect_challenge_stats, stats_entry
+from app.infrastructure.repositories.keyset import decode_cursor, make_page
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -14,15 +17,18 @@ _player_repo = None
 _leaderboard_repo = None
 _challenge_repo = None
 _pending_repo = None
+_admin_repo = None  # PgAdminRepository: SQL-side aggregates (None in JSON mode)
 
 
-def init_admin_routes(user_repo, player_repo, leaderboard_repo, challenge_repo, pending_repo=None):
-    global _user_repo, _player_repo, _leaderboard_repo, _challenge_repo, _pending_repo
+def init_admin_routes(user_repo, player_repo, leaderboard_repo, challenge_repo, pending_repo=None,
+                      admin_repo=None):
+    global _user_repo, _player_repo, _leaderboard_repo, _challenge_repo, _pending_repo, _admin_repo
     _user_repo = user_repo
     _player_repo = player_repo
     _leaderboard_repo = leaderboard_repo
     _challenge_repo = challenge_repo
     _pending_repo = pending_repo
+    _admin_repo = admin_repo
 
 
 # Admin e-mail helpers are now shared via admin_utils to avoid drift.
@@ -50,6 +56,51 @@ def _assert_admin(current_user: dict):
     raise HTTPException(status_code=403, detail="Access denied. Admin only.")
 
 
+# ---------------------------------------------------------------------------
+# Pagination
+#
+# Listings accept ?limit=&cursor= and then answer with
+# {"items", "next_cursor", "total_estimate"}; without ?limit they keep
+# returning the whole list.  PostgreSQL repos paginate by keyset; the JSON
+# fallback below pages the in-memory list by offset behind the same cursor.
+# ---------------------------------------------------------------------------
+
+_PAGE_LIMIT = Query(None, ge=1, le=200)
+
+
+def _invalid_cursor():
+    return HTTPException(status_code=400, detail="Cursor invalido.")
+
+
+def _page_call(fn, *args, **kwargs):
+    """Call a repo ``*_page`` method, mapping a bad cursor to 400."""
+    try:
+        return fn(*args, **kwargs)
+    except ValueError:
+        raise _invalid_cursor()
+
+
+def _paginate_list(rows: list, limit, cursor):
+    """Offset-paginate an already filtered/sorted list (JSON repos)."""
+    if limit is None:
+        return rows
+    try:
+        after = decode_cursor(cursor)
+        start = int(after["offset"]) if after else 0
+    except (KeyError, TypeError, ValueError):
+        raise _invalid_cursor()
+    return make_page(
+        rows[start:start + limit + 1], limit,
+        lambda _row: {"offset": start + limit},
+        None if cursor else len(rows),
+    )
+
+
+def _matches(row: dict, q: str, fields) -> bool:
+    q = q.strip().lower()
+    return not q or any(q in str(row.get(f) or "").lower() for f in fields)
+
+
 # ---------------------------------------------------------------------------
 # Dashboard overview
 # ---------------------------------------------------------------------------
@@ -59,27 +110,35 @@ def api_admin_dashboard(current_user: dict = Depends(get_current_user)):
     """Return aggregate dashboard data for the admin panel."""
     _assert_admin(current_user)
 
-    users = _user_repo.get_all() if hasattr(_user_repo, "get_all") else []
-    sessions = _player_repo.get_all() if hasattr(_player_repo, "get_all") else []
     challenges = _challenge_repo.get_all() if hasattr(_challenge_repo, "get_all") else []
-
-    total_users = len(users)
-    total_sessions = len(sessions)
     total_challenges = len(challenges)
 
-    # Count completed games (status == "completed" or stage == "Distinguished")
-    completed_count = 0
-    active_count = 0
-    game_over_count = 0
-    for s in sessions:
-        status = s.status.value if hasattr(s.status, "value") else s.status
-        stage = s.stage.value if hasattr(s.stage, "value") else s.stage
-        if status == "completed" or stage == "Distinguished":
-            completed_count += 1
-        elif status == "game_over":
-            game_over_count += 1
-        else:
-            active_count += 1
+    if _admin_repo is not None:
+        counts = _admin_repo.dashboard_counts()
+        total_users = counts["total_users"]
+        total_sessions = counts["total_sessions"]
+        completed_count = counts["completed_games"]
+        active_count = counts["active_games"]
+        game_over_count = counts["game_over_sessions"]
+    else:
+        users = _user_repo.get_all() if hasattr(_user_repo, "get_all") else []
+        sessions = _player_repo.get_all() if hasattr(_player_repo, "get_all") else []
+        total_users = len(users)
+        total_sessions = len(sessions)
+
+        # Count completed games (status == "completed" or stage == "Distinguished")
+        completed_count = 0
+        active_count = 0
+        game_over_count = 0
+        for s in sessions:
+            status = s.status.value if hasattr(s.status, "value") else s.status
+            stage = s.stage.value if hasattr(s.stage, "value") else s.stage
+            if status == "completed" or stage == "Distinguished":
+                completed_count += 1
+            elif status == "game_over":
+                game_over_count += 1
+            else:
+                active_count += 1
 
     # Online now: sessions with activity in the last 5 minutes
     online_now = 0
@@ -176,9 +235,27 @@ def api_admin_online(current_user: dict = Depends(get_current_user)):
 # ---------------------------------------------------------------------------
 
 @router.get("/users")
-def api_admin_users(current_user: dict = Depends(get_current_user)):
-    """Return list of all registered users with their session summaries."""
+def api_admin_users(
+    q: str = "",
+    subscription: str | None = None,
+    limit: int | None = _PAGE_LIMIT,
+    cursor: str | None = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """Return list of all registered users with their session summaries.
+
+    ?q=            — name / username / email / profession (case-insensitive)
+    ?subscription= — active | expired | none | ...
+    ?limit=&cursor= — page through the list (newest first)
+    """
     _assert_admin(current_user)
+    q = q.strip()
+
+    if _admin_repo is not None:
+        if limit is not None:
+            return _page_call(_admin_repo.users_page, limit, cursor,
+                              search=q, subscription=subscription)
+        return _admin_repo.users_overview(search=q, subscription=subscription)
 
     users = _user_repo.get_all() if hasattr(_user_repo, "get_all") else []
     all_sessions = _player_repo.get_all_dict() if hasattr(_player_repo, "get_all_dict") else []
@@ -215,9 +292,13 @@ def api_admin_users(current_user: dict = Depends(get_current_user)):
                 ud["subscription_status"] = None
                 ud["subscription_plan"] = None
                 ud["subscription_expires_at"] = None
+        if not _matches(ud, q, ("full_name", "username", "email", "profession")):
+            continue
+        if subscription and ud.get("subscription_status") != subscription:
+            continue
         result.append(ud)
 
-    return result
+    return _paginate_list(result, limit, cursor)
 
 
 # ---------------------------------------------------------------------------
@@ -225,9 +306,26 @@ def api_admin_users(current_user: dict = Depends(get_current_user)):
 # ---------------------------------------------------------------------------
 
 @router.get("/sessions")
-def api_admin_sessions(current_user: dict = Depends(get_current_user)):
-    """Return all game sessions with detailed info."""
+def api_admin_sessions(
+    q: str = "",
+    stage: str | None = None,
+    status: str | None = None,
+    limit: int | None = _PAGE_LIMIT,
+    cursor: str | None = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """Return all game sessions with detailed info.
+
+    ?q= (player / user name / e-mail), ?stage=, ?status=, ?limit=&cursor=
+    """
     _assert_admin(current_user)
+    q = q.strip()
+
+    if _admin_repo is not None:
+        if limit is not None:
+            return _page_call(_admin_repo.sessions_page, limit, cursor,
+                              search=q, stage=stage, status=status)
+        return _admin_repo.sessions_overview(search=q, stage=stage, status=status)
 
     all_sessions = _player_repo.get_all_dict() if hasattr(_player_repo, "get_all_dict") else []
     users = _user_repo.get_all() if hasattr(_user_repo, "get_all") else []
@@ -265,9 +363,13 @@ def api_admin_sessions(current_user: dict = Depends(get_current_user)):
                 entry["duration_seconds"] = 0
         else:  # pragma: no cover
             entry["duration_seconds"] = 0
+        if not _matches(entry, q, ("player_name", "user_name", "user_email")):
+            continue
+        if (stage and entry["stage"] != stage) or (status and entry["status"] != status):
+            continue
         result.append(entry)
 
-    return result
+    return _paginate_list(result, limit, cursor)
 
 
 # ---------------------------------------------------------------------------
@@ -275,13 +377,26 @@ def api_admin_sessions(current_user: dict = Depends(get_current_user)):
 # ---------------------------------------------------------------------------
 
 @router.get("/ranking")
-def api_admin_ranking(current_user: dict = Depends(get_current_user)):
+def api_admin_ranking(
+    q: str = "",
+    stage: str | None = None,
+    limit: int | None = _PAGE_LIMIT,
+    cursor: str | None = None,
+    current_user: dict = Depends(get_current_user),
+):
     """
     Global ranking of all game completions.
     Sorted by: fastest completion time (ascending).
     If never completed, sorted by highest stage reached, then score.
+    ?q= / ?stage= filter the listing without renumbering ranks.
     """
     _assert_admin(current_user)
+    q = q.strip()
+
+    if _admin_repo is not None:
+        if limit is not None:
+            return _page_call(_admin_repo.ranking_page, limit, cursor, search=q, stage=stage)
+        return _admin_repo.ranking(search=q, stage=stage)
 
     all_sessions = _player_repo.get_all_dict() if hasattr(_player_repo, "get_all_dict") else []
     users = _user_repo.get_all() if hasattr(_user_repo, "get_all") else []
@@ -367,7 +482,69 @@ def api_admin_ranking(current_user: dict = Depends(get_current_user)):
     for i, e in enumerate(ranked):
         e["rank"] = i + 1
 
-    return ranked
+    ranked = [
+        e for e in ranked
+        if _matches(e, q, ("player_name", "user_name", "user_email"))
+        and (not stage or e["stage"] == stage)
+    ]
+    return _paginate_list(ranked, limit, cursor)
+
+
+# ---------------------------------------------------------------------------
+# Challenge difficulty (per-challenge attempt statistics)
+# ---------------------------------------------------------------------------
+
+@router.get("/challenges/stats")
+def api_admin_challenge_stats(current_user: dict = Depends(get_current_user)):
+    """Per-challenge stats with option histogram, hardest (lowest first-try rate) first.
+
+    Challenges nobody attempted yet are listed last.
+    """
+    _assert_admin(current_user)
+
+    stats = {s["challenge_id"]: s for s in collect_challenge_stats(_challenge_repo, _player_repo)}
+    challenges = _challenge_repo.get_all() if hasattr(_challenge_repo, "get_all") else []
+    result = []
+    for c in challenges:
+        entry = dict(stats.get(c.id) or stats_entry(c.id, 0, 0, 0, 0, 0, 0))
+        picks = entry.pop("option_picks")
+        entry.update({
+            "title": c.title,
+            "stage": c.required_stage.value,
+            "region": c.region.value,
+            "category": c.category.value,
+            "options": [
+                {"index": i, "text": o.text, "is_correct": o.is_correct, "picks": picks.get(str(i), 0)}
+                for i, o in enumerate(c.options)
+            ],
+        })
+        result.append(entry)
+
+    result.sort(key=lambda e: (e["first_try_rate"] is None, e["first_try_rate"] or 0.0))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Database pool / query instrumentation (this worker process)
+# ---------------------------------------------------------------------------
+
+@router.get("/db/metrics")
+def api_admin_db_metrics(
+    reset: bool = Query(False, description="Zero the counters after reading them"),
+    current_user: dict = Depends(get_current_user),
+):
+    """Pool occupancy and checkout latency, connection age, per-route query
+    counts/latency and the most recent slow statements (params redacted).
+
+    Counters are per worker: with several uvicorn workers each request is
+    answered by one of them (see ``pid``).
+    """
+    _assert_admin(current_user)
+
+    metrics = instrumentation.snapshot()
+    if reset:
+        instrumentation.reset()
+    return metrics
 
 
 # ---------------------------------------------------------------------------
@@ -382,6 +559,12 @@ def api_admin_user_detail(
     """Return all database data for a specific user: profile + all sessions."""
     _assert_admin(current_user)
 
+    if _admin_repo is not None:
+        detail = _admin_repo.user_detail(user_id)
+        if detail is None:
+            raise HTTPException(status_code=404, detail="Usuario nao encontrado.")
+        return detail
+
     users = _user_repo.get_all() if hasattr(_user_repo, "get_all") else []
     user = next((u for u in users if str(u.id) == user_id), None)
     if not user:
@@ -764,17 +947,24 @@ def api_admin_impersonate(
 def api_admin_pending(
     q: str = "",
     include_expired: bool = True,
+    limit: int | None = _PAGE_LIMIT,
+    cursor: str | None = None,
     current_user: dict = Depends(get_current_user),
 ):
     """Return pending registrations awaiting email OTP verification.
 
     ?q=      — optional text filter (name / username / email, case-insensitive)
     ?include_expired=false — show only still-valid records (default: all)
+    ?limit=&cursor= — page through the list (newest first)
     """
     _assert_admin(current_user)
     if _pending_repo is None:
-        return []
-    return _pending_repo.search(q=q.strip(), include_expired=include_expired)
+        return _paginate_list([], limit, cursor)
+    if limit is not None and hasattr(_pending_repo, "search_page"):
+        return _page_call(_pending_repo.search_page, limit, cursor,
+                          q=q.strip(), include_expired=include_expired)
+    rows = _pending_repo.search(q=q.strip(), include_expired=include_expired)
+    return _paginate_list(rows, limit, cursor)
 
 
 @router.delete("/pending/{pending_id}")
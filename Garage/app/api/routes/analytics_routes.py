@@ -2,13 +2,17 @@
 
 Public endpoints (no auth — called by the landing page):
   POST /api/analytics/landing          → record an event
+  POST /api/analytics/landing/batch    → record up to 50 buffered events
+
+Both only queue the events; the repository's flusher bulk-writes them.
 
 Admin endpoints (JWT required):
   GET  /api/analytics/landing/summary  → aggregate metrics for admin panel
   GET  /api/analytics/landing/events   → recent raw events (last 100)
 """
+import ipaddress
 import logging
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
@@ -45,6 +49,10 @@ class LandingEventIn(BaseModel):
     user_agent: Optional[str] = Field(None, max_length=200)
 
 
+class LandingBatchIn(BaseModel):
+    events: List[LandingEventIn] = Field(..., min_length=1, max_length=50)
+
+
 # ---------------------------------------------------------------------------
 # POST /api/analytics/landing   (public — CORS open for landing page domain)
 # ---------------------------------------------------------------------------
@@ -59,27 +67,16 @@ async def record_event(body: LandingEventIn, request: Request):
     if _repo is None:
         # No-op when running without PostgreSQL (JSON fallback dev mode)
         return {"ok": True, "note": "analytics_disabled"}
+    _enqueue([body], request)
+    return {"ok": True}
 
-    # Best-effort IP from X-Forwarded-For (Render/Cloudflare sets this)
-    forwarded = request.headers.get("x-forwarded-for", "")
-    ip = forwarded.split(",")[0].strip() if forwarded else str(request.client.host) if request.client else None
 
-    try:
-        _repo.record(
-            visitor_id=body.visitor_id,
-            event_type=body.event_type,
-            element=body.element,
-            section=body.section,
-            scroll_pct=body.scroll_pct,
-            plan=body.plan,
-            referrer=body.referrer,
-            user_agent=body.user_agent,
-            ip_address=ip,
-        )
-    except Exception as exc:
-        log.error("analytics record failed: %s", exc)
-        # Never let tracking errors break the user flow
-    return {"ok": True}
+@router.post("/landing/batch", status_code=201)
+async def record_events(body: LandingBatchIn, request: Request):
+    """Receive several tracking events buffered by the landing page."""
+    if _repo is None:
+        return {"ok": True, "note": "analytics_disabled"}
+    return {"ok": True, "accepted": _enqueue(body.events, request)}
 
 
 # ---------------------------------------------------------------------------
@@ -117,6 +114,31 @@ def landing_events(current_user: dict = Depends(get_current_user)):
 # Helpers
 # ---------------------------------------------------------------------------
 
+def _client_ip(request: Request) -> Optional[str]:
+    # Best-effort IP from X-Forwarded-For (Render/Cloudflare sets this).
+    # The header is client-controlled: anything that is not an IP address
+    # falls back to the peer address instead of reaching ip_address VARCHAR(45).
+    forwarded = request.headers.get("x-forwarded-for", "")
+    if forwarded:
+        try:
+            return str(ipaddress.ip_address(forwarded.split(",")[0].strip()))
+        except ValueError:
+            pass
+    return str(request.client.host)[:45] if request.client else None
+
+
+def _enqueue(events: List[LandingEventIn], request: Request) -> int:
+    ip = _client_ip(request)
+    try:
+        return _repo.enqueue(
+            _repo.event(ip_address=ip, **e.model_dump()) for e in events
+        )
+    except Exception as exc:
+        log.error("analytics enqueue failed: %s", exc)
+        # Never let tracking errors break the user flow
+        return 0
+
+
 def _assert_admin(current_user: dict) -> None:
     if current_user.get("role") == "admin":
         return
@@ -1,7 +1,8 @@
 """Game API routes -- start, submit, challenges, leaderboard, metrics."""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 
 from app.application.start_game import start_game
 from app.application.submit_answer import submit_answer
@@ -9,9 +10,18 @@ from app.application.progress_stage import recover_from_game_over, get_progress
 from app.domain.enums import CareerStage
 from app.infrastructure.auth.dependencies import get_current_user, get_optional_user
 from app.infrastructure.auth.jwt_handler import verify_token
+from app.infrastructure.database.challenge_stats import collect as collect_challenge_stats, stats_entry
+from app.infrastructure.database.unit_of_work import request_unit_of_work
+from app.infrastructure.repositories.async_pg_repositories import ThreadedRepository
+from app.infrastructure.repositories.challenge_catalog import MAP_BODY, ChallengeCatalog, PreparedBody
 
 
-router = APIRouter(prefix="/api", tags=["game"])
+# Every game request runs in one unit of work: one pooled connection, one
+# commit before the response is sent (rolled back if the endpoint raised).
+router = APIRouter(
+    prefix="/api", tags=["game"],
+    dependencies=[Depends(request_unit_of_work, scope="function")],
+)
 
 
 class StartGameRequest(BaseModel):
@@ -26,6 +36,7 @@ class SubmitAnswerRequest(BaseModel):
     session_id: str
     challenge_id: str
     selected_index: int = Field(..., ge=0)
+    answer_ms: Optional[int] = None  # time from challenge shown to answer (client clock)
 
 
 class RecoverRequest(BaseModel):
@@ -54,6 +65,9 @@ _user_repo = None  # injected for DEMO subscription check
 _metrics = None
 _events = None
 
+# Public subset of the challenge stats (no option histogram).
+_DIFFICULTY_FIELDS = ("attempts", "correct_rate", "first_try_rate", "avg_answer_ms")
+
 
 def init_routes(player_repo, challenge_repo, leaderboard_repo,
                metrics_service=None, event_service=None, user_repo=None):
@@ -62,6 +76,18 @@ def init_routes(player_repo, challenge_repo, leaderboard_repo,
     _challenge_repo = challenge_repo
     _leaderboard_repo = leaderboard_repo
     _user_repo = user_repo
+    _metrics = metrics_service
+    _events = event_service
+
+
+def _aio(repo) -> ThreadedRepository:
+    """Awaitable view of ``repo`` for the async routes.
+
+    The native async twin wired by main.py (``repo.aio``) when the async
+    engine is enabled; otherwise every call runs in the threadpool.
+    """
+    view = getattr(repo, "aio", None)
+    return view if isinstance(view, ThreadedRepository) else ThreadedRepository(repo)
 
 # ---------------------------------------------------------------------------
 # Helper: ownership check
@@ -69,10 +95,58 @@ def init_routes(player_repo, challenge_repo, leaderboard_repo,
 
 def _assert_owner(player, current_user: dict):
     """Raise 403 if the authenticated user does not own the session."""
-    if player.user_id and current_user and str(player.user_id).lower() != str(current_user.get("sub", "")).lower():
+    _assert_owner_id(player.user_id, current_user)
+
+
+def _assert_owner_id(owner_id: Optional[str], current_user: dict):
+    """Ownership check when only the session's user_id is known."""
+    if owner_id and current_user and str(owner_id).lower() != str(current_user.get("sub", "")).lower():
         raise HTTPException(status_code=403, detail="Access denied.")
 
 
+# ---------------------------------------------------------------------------
+# Helper: world-state saves
+# ---------------------------------------------------------------------------
+
+async def _save_world_state(req: SaveWorldStateRequest, current_user: dict) -> None:
+    """Apply a world-state save for an authenticated owner.
+
+    Repositories with a write-behind buffer (PostgreSQL) only need the session
+    owner; the patch is merged in memory and flushed in batches.  Others load
+    the aggregate and save it.
+    """
+    if hasattr(_player_repo, "buffer_world_state"):
+        repo = _aio(_player_repo)
+        owner_id = await repo.get_owner(req.session_id)
+        if owner_id is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        _assert_owner_id(owner_id, current_user)
+        patch = {"current_region": req.current_region}
+        if req.collected_books is not None:
+            patch["collected_books"] = list(req.collected_books)
+        if req.completed_regions is not None:
+            patch["completed_regions"] = list(req.completed_regions)
+        if req.player_world_x is not None:
+            patch["player_world_x"] = req.player_world_x
+        await repo.buffer_world_state(req.session_id, patch)
+        return
+
+    repo = _aio(_player_repo)
+    player = await repo.get(req.session_id, with_attempts=False)
+    if not player:
+        raise HTTPException(status_code=404, detail="Session not found")
+    _assert_owner(player, current_user)
+
+    # Batch update world state
+    player.update_world_state(
+        collected_books=req.collected_books,
+        completed_regions=req.completed_regions,
+        current_region=req.current_region,
+        player_world_x=req.player_world_x,
+    )
+    await repo.save(player)
+
+
 # ---------------------------------------------------------------------------
 # DEMO gate — Xerox PARC is free (Act I intro). Every other region/company
 # requires an active subscription.
@@ -85,8 +159,8 @@ def _assert_owner(player, current_user: dict):
 DEMO_FREE_REGIONS = {"Xerox PARC"}
 
 
-def _check_subscription(current_user: Optional[dict]) -> bool:
-    """Return True when the user has an active subscription or is admin."""
+def _subscription_shortcut(current_user: Optional[dict]) -> Optional[bool]:
+    """The answer when no subscription lookup is needed, else None."""
     if not current_user:
         return False
     if current_user.get("role") == "admin":
@@ -94,6 +168,14 @@ def _check_subscription(current_user: Optional[dict]) -> bool:
     if not _user_repo or not hasattr(_user_repo, "get_subscription_status"):
         # No subscription system configured (dev / JSON mode) — allow everything
         return True
+    return None
+
+
+def _check_subscription(current_user: Optional[dict]) -> bool:
+    """Return True when the user has an active subscription or is admin."""
+    shortcut = _subscription_shortcut(current_user)
+    if shortcut is not None:
+        return shortcut
     try:
         sub = _user_repo.get_subscription_status(current_user.get("sub", ""))
         return sub.get("status") in ("active",)
@@ -101,6 +183,18 @@ def _check_subscription(current_user: Optional[dict]) -> bool:
         return True  # fail-open: never block on transient DB error
 
 
+async def _check_subscription_async(current_user: Optional[dict]) -> bool:
+    """``_check_subscription`` for the async routes."""
+    shortcut = _subscription_shortcut(current_user)
+    if shortcut is not None:
+        return shortcut
+    try:
+        sub = await _aio(_user_repo).get_subscription_status(current_user.get("sub", ""))
+        return sub.get("status") in ("active",)
+    except Exception:
+        return True  # fail-open: never block on transient DB error
+
+
 def _demo_paywall_response(region: str = ""):
     """Build the standard 402 DEMO paywall JSON response."""
     from fastapi.responses import JSONResponse as _JR
@@ -118,6 +212,79 @@ def _demo_paywall_response(region: str = ""):
     })
 
 
+# ---------------------------------------------------------------------------
+# Pre-serialized public responses (challenge catalog + map)
+# ---------------------------------------------------------------------------
+
+def _catalog() -> ChallengeCatalog | None:
+    """Return the repo's in-memory catalog, or None for repos without one.
+
+    The first access loads it from the database; a failed load is a 503.
+    """
+    try:
+        catalog = getattr(_challenge_repo, "catalog", None)
+    except Exception as exc:
+        raise _challenges_unavailable("catalog load", exc)
+    return catalog if isinstance(catalog, ChallengeCatalog) else None
+
+
+def _challenges_unavailable(what: str, exc: Exception) -> HTTPException:
+    print(f"[GARAGE][ERROR] Challenge {what} failed: {type(exc).__name__}: {exc}")
+    return HTTPException(
+        status_code=503,
+        detail=f"Challenge repository unavailable: {type(exc).__name__}",
+    )
+
+
+def _etag_matches(if_none_match: str, body: PreparedBody) -> bool:
+    """Weak comparison per RFC 9110 13.1.2 (If-None-Match)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in (body.etag, body.gzip_etag):
+            return True
+    return False
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """True when Accept-Encoding lists gzip (or *) with a non-zero q-value."""
+    for part in accept_encoding.lower().split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if coding not in ("gzip", "*"):
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _prepared_response(request: Request, body: PreparedBody) -> Response:
+    """Serve cached bytes: 304 on ETag match, gzip when accepted, identity otherwise."""
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    use_gzip = (
+        _accepts_gzip(request.headers.get("accept-encoding", ""))
+        and len(body.gzipped) < len(body.raw)
+    )
+    headers["ETag"] = body.gzip_etag if use_gzip else body.etag
+    if _etag_matches(request.headers.get("if-none-match", ""), body):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        # Content-Encoding makes GZipMiddleware pass the bytes through untouched.
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=body.gzipped, media_type="application/json", headers=headers)
+    return Response(content=body.raw, media_type="application/json", headers=headers)
+
+
 # ---------------------------------------------------------------------------
 # Game lifecycle
 # ---------------------------------------------------------------------------
@@ -153,9 +320,10 @@ def api_start_game(req: StartGameRequest, current_user: dict = Depends(get_curre
 
 
 @router.get("/session/{session_id}")
-def api_get_session(session_id: str, current_user: dict = Depends(get_current_user)):
+async def api_get_session(session_id: str, current_user: dict = Depends(get_current_user)):
     """Get current game session state (owner only)."""
-    player = _player_repo.get(session_id)
+    repo = _aio(_player_repo)
+    player = await repo.get(session_id, with_attempts=False)
     if not player:
         raise HTTPException(status_code=404, detail="Session not found")
     _assert_owner(player, current_user)
@@ -164,21 +332,32 @@ def api_get_session(session_id: str, current_user: dict = Depends(get_current_us
     if (player.stage.value == "Distinguished"
             and player.status.value != "completed"):
         player.mark_completed()
-        _player_repo.save(player)
+        await repo.save(player)
 
     return player.to_dict()
 
 
 @router.get("/challenges")
-def api_get_challenges(stage: Optional[str] = None):
-    """Get available challenges, optionally filtered by stage. Public."""
+def api_get_challenges(request: Request, stage: Optional[str] = None):
+    """Get available challenges, optionally filtered by stage. Public.
+
+    Served from pre-serialized catalog bytes with a content-hash ETag.
+    """
     try:
+        career_stage = None
         if stage:
             try:
                 career_stage = CareerStage(stage)
-                challenges = _challenge_repo.get_by_stage(career_stage)
             except ValueError:
                 raise HTTPException(status_code=400, detail=f"Invalid stage: {stage}")
+
+        catalog = _catalog()
+        if catalog is not None:
+            body = catalog.body_for_stage(career_stage) if career_stage else catalog.body_all()
+            return _prepared_response(request, body)
+
+        if career_stage:
+            challenges = _challenge_repo.get_by_stage(career_stage)
         else:
             challenges = _challenge_repo.get_all()
         return [c.to_dict_for_player() for c in challenges]
@@ -194,10 +373,38 @@ def api_get_challenges(stage: Optional[str] = None):
         )
 
 
+@router.get("/challenges/difficulty")
+def api_get_challenge_difficulty():
+    """Per-challenge difficulty (attempts, correct / first-try rates, mean answer time). Public.
+
+    Read from counters kept up to date as attempts are inserted; option
+    histograms are admin-only since they would reveal the answers.
+    """
+    stats = {s["challenge_id"]: s for s in collect_challenge_stats(_challenge_repo, _player_repo)}
+    empty = stats_entry("", 0, 0, 0, 0, 0, 0)
+    return [
+        {
+            "challenge_id": c.id,
+            **{k: stats.get(c.id, empty)[k] for k in _DIFFICULTY_FIELDS},
+        }
+        for c in _challenge_repo.get_all()
+    ]
+
+
 @router.get("/challenges/{challenge_id}")
-def api_get_challenge(challenge_id: str):
+def api_get_challenge(challenge_id: str, request: Request):
     """Get a specific challenge (without correct answer). Public."""
-    challenge = _challenge_repo.get_by_id(challenge_id)
+    catalog = _catalog()
+    if catalog is not None:
+        body = catalog.body_for_id(challenge_id)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Challenge not found")
+        return _prepared_response(request, body)
+
+    try:
+        challenge = _challenge_repo.get_by_id(challenge_id)
+    except Exception as exc:
+        raise _challenges_unavailable("lookup", exc)
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
     return challenge.to_dict_for_player()
@@ -220,7 +427,7 @@ def api_region_enter(req: RegionEnterRequest, current_user: dict = Depends(get_c
     Free users can only access DEMO_FREE_REGIONS.
     Subscribed users and admins can access all regions.
     """
-    player = _player_repo.get(req.session_id)
+    player = _player_repo.get(req.session_id, with_attempts=False)
     if not player:
         raise HTTPException(status_code=404, detail="Session not found")
     _assert_owner(player, current_user)
@@ -237,14 +444,15 @@ def api_region_enter(req: RegionEnterRequest, current_user: dict = Depends(get_c
 
 
 @router.post("/submit")
-def api_submit_answer(req: SubmitAnswerRequest, current_user: dict = Depends(get_current_user)):
+async def api_submit_answer(req: SubmitAnswerRequest, current_user: dict = Depends(get_current_user)):
     """Submit an answer to a challenge (owner only)."""
-    player = _player_repo.get(req.session_id)
+    players = _aio(_player_repo)
+    player = await players.get(req.session_id, with_attempts=False)
     if not player:
         raise HTTPException(status_code=404, detail="Session not found")
     _assert_owner(player, current_user)
 
-    challenge = _challenge_repo.get_by_id(req.challenge_id)
+    challenge = await _aio(_challenge_repo).get_by_id(req.challenge_id)
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
 
@@ -253,38 +461,41 @@ def api_submit_answer(req: SubmitAnswerRequest, current_user: dict = Depends(get
             player=player,
             challenge=challenge,
             selected_index=req.selected_index,
+            answer_ms=req.answer_ms,
         )
 
         # DEMO gate (region-based): challenges from regions NOT in DEMO_FREE_REGIONS
         # require an active subscription.  We check BEFORE persisting so that
         # unsubscribed players stay at their last saved free-tier position.
         if challenge.region.value not in DEMO_FREE_REGIONS:
-            if not _check_subscription(current_user):
+            if not await _check_subscription_async(current_user):
                 return _demo_paywall_response(challenge.region.value)
 
-        _player_repo.save(player)
+        await players.save(player)
 
         user_id = current_user["sub"]
-        is_correct = result.get("outcome") == "correct"
-        points = result.get("points_awarded", 0)
-
         if _metrics:
-            _metrics.on_answer_submitted(user_id, is_correct, points)
-            if result.get("outcome") == "game_over":
-                _metrics.on_game_over(user_id)
-            if result.get("promotion"):
-                _metrics.on_stage_promoted(
-                    user_id, result.get("new_stage", ""), player.score,
+            # One UPSERT for all of this answer's metric changes, in the
+            # request's transaction (atomic with the save above).
+            with _metrics.collect() as deltas:
+                _metrics.on_answer_submitted(
+                    user_id, result.get("outcome") == "correct", result.get("points_awarded", 0),
                 )
+                if result.get("outcome") == "game_over":
+                    _metrics.on_game_over(user_id)
+                if result.get("promotion"):
+                    _metrics.on_stage_promoted(user_id, result.get("new_stage", ""), player.score)
+            await _aio(_metrics).apply_all(deltas)
 
         if _events:
+            # Only queues the event; the background flusher writes it.
             _events.log(
                 "answer_submitted", user_id=user_id,
                 session_id=req.session_id,
                 payload={
                     "challenge_id": req.challenge_id,
                     "outcome": result.get("outcome"),
-                    "points": points,
+                    "points": result.get("points_awarded", 0),
                 },
             )
 
@@ -300,7 +511,7 @@ def api_submit_answer(req: SubmitAnswerRequest, current_user: dict = Depends(get
 @router.post("/recover")
 def api_recover(req: RecoverRequest, current_user: dict = Depends(get_current_user)):
     """Recover from Game Over state (owner only)."""
-    player = _player_repo.get(req.session_id)
+    player = _player_repo.get(req.session_id, with_attempts=False)
     if not player:
         raise HTTPException(status_code=404, detail="Session not found")
     _assert_owner(player, current_user)
@@ -316,25 +527,13 @@ def api_recover(req: RecoverRequest, current_user: dict = Depends(get_current_us
 
 
 @router.post("/save-world-state")
-def api_save_world_state(req: SaveWorldStateRequest, current_user: dict = Depends(get_current_user)):
+async def api_save_world_state(req: SaveWorldStateRequest, current_user: dict = Depends(get_current_user)):
     """
     Save the current world state: collected books, completed regions,
     current region, and player position. Called periodically by the frontend
     to persist game progress.
     """
-    player = _player_repo.get(req.session_id)
-    if not player:
-        raise HTTPException(status_code=404, detail="Session not found")
-    _assert_owner(player, current_user)
-
-    # Batch update world state
-    player.update_world_state(
-        collected_books=req.collected_books,
-        completed_regions=req.completed_regions,
-        current_region=req.current_region,
-        player_world_x=req.player_world_x,
-    )
-    _player_repo.save(player)
+    await _save_world_state(req, current_user)
 
     if _events:
         _events.log("world_state_saved", user_id=current_user["sub"],
@@ -350,7 +549,7 @@ def api_save_world_state(req: SaveWorldStateRequest, current_user: dict = Depend
 
 
 @router.post("/save-world-state-beacon")
-def api_save_world_state_beacon(req: SaveWorldStateRequest):
+async def api_save_world_state_beacon(req: SaveWorldStateRequest):
     """
     Endpoint for navigator.sendBeacon during page unload.
 
@@ -369,21 +568,8 @@ def api_save_world_state_beacon(req: SaveWorldStateRequest):
     if not payload or payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    player = _player_repo.get(req.session_id)
-    if not player:
-        raise HTTPException(status_code=404, detail="Session not found")
-
     # Ownership check: the token's subject must own the session
-    _assert_owner(player, payload)
-
-    # Batch update world state
-    player.update_world_state(
-        collected_books=req.collected_books,
-        completed_regions=req.completed_regions,
-        current_region=req.current_region,
-        player_world_x=req.player_world_x,
-    )
-    _player_repo.save(player)
+    await _save_world_state(req, payload)
 
     return {"status": "ok", "saved": True}
 
@@ -393,26 +579,28 @@ class HeartbeatRequest(BaseModel):
 
 
 @router.post("/heartbeat")
-def api_heartbeat(req: HeartbeatRequest, current_user: dict = Depends(get_current_user)):
+async def api_heartbeat(req: HeartbeatRequest, current_user: dict = Depends(get_current_user)):
     """
     Heartbeat endpoint -- updates session timestamp to mark player as online.
     Called periodically by the frontend.
 
-    Performance: uses a single UPDATE updated_at = NOW() (no SELECT, minimal transfer).
+    Performance: PostgreSQL records the beat in the in-memory presence
+    registry; updated_at is bumped for all sessions in one batched UPDATE.
     """
-    # Lightweight touch: single UPDATE, no SELECT, no JSON round-trip
+    repo = _aio(_player_repo)
+    # Lightweight touch: no aggregate load, no JSON round-trip
     if hasattr(_player_repo, 'touch_timestamp'):
-        found = _player_repo.touch_timestamp(req.session_id)
+        found = await repo.touch_timestamp(req.session_id)
         if not found:
             raise HTTPException(status_code=404, detail="Session not found")
         return {"status": "ok", "heartbeat": True}
 
     # Fallback for non-PG repos (local JSON)
-    player = _player_repo.get(req.session_id)
+    player = await repo.get(req.session_id, with_attempts=False)
     if not player:
         raise HTTPException(status_code=404, detail="Session not found")
     _assert_owner(player, current_user)
-    _player_repo.save(player)
+    await repo.save(player)
     return {"status": "ok", "heartbeat": True}
 
 
@@ -423,7 +611,7 @@ def api_reset_game(req: ResetGameRequest, current_user: dict = Depends(get_curre
     create a brand new session so the player can replay from scratch.
     Returns the new session data.
     """
-    old_player = _player_repo.get(req.session_id)
+    old_player = _player_repo.get(req.session_id, with_attempts=False)
     if not old_player:
         raise HTTPException(status_code=404, detail="Session not found")
     _assert_owner(old_player, current_user)
@@ -436,6 +624,8 @@ def api_reset_game(req: ResetGameRequest, current_user: dict = Depends(get_curre
                 score=old_player.score,
                 stage=old_player.stage.value,
                 language=old_player.language.value,
+                user_id=current_user["sub"],
+                session_id=req.session_id,
             )
         except Exception:  # pragma: no cover
             pass
@@ -466,7 +656,7 @@ def api_reset_game(req: ResetGameRequest, current_user: dict = Depends(get_curre
 @router.get("/progress/{session_id}")
 def api_get_progress(session_id: str, current_user: dict = Depends(get_current_user)):
     """Get player progression details (owner only)."""
-    player = _player_repo.get(session_id)
+    player = _player_repo.get(session_id, with_attempts=False)
     if not player:
         raise HTTPException(status_code=404, detail="Session not found")
     _assert_owner(player, current_user)
@@ -474,9 +664,32 @@ def api_get_progress(session_id: str, current_user: dict = Depends(get_current_u
 
 
 @router.get("/leaderboard")
-def api_get_leaderboard(limit: int = Query(10, ge=1, le=100)):
-    """Get top scores. Public. Max 100 results to prevent full-table scans."""
-    return _leaderboard_repo.get_top(limit)
+async def api_get_leaderboard(
+    limit: int = Query(10, ge=1, le=100),
+    language: Optional[str] = Query(None, max_length=10),
+    stage: Optional[str] = Query(None, max_length=20),
+    window: Literal["all", "daily", "weekly", "monthly"] = "all",
+):
+    """Get top scores. Public. Max 100 results to prevent full-table scans.
+
+    Optional ?language= / ?stage= segment the board and ?window= limits it
+    to the current day, ISO week or month.
+    """
+    board = _aio(_leaderboard_repo)
+    if language or stage or window != "all":
+        return await board.get_top(limit, language=language, stage=stage, window=window)
+    return await board.get_top(limit)
+
+
+@router.get("/leaderboard/me")
+def api_get_my_leaderboard(
+    k: int = Query(5, ge=0, le=25),
+    current_user: dict = Depends(get_current_user),
+):
+    """Caller's best entry, global rank and the k entries above and below."""
+    if not hasattr(_leaderboard_repo, "around_user"):
+        raise HTTPException(status_code=501, detail="Leaderboard rank lookup not supported")
+    return _leaderboard_repo.around_user(current_user["sub"], k)
 
 
 # ---------------------------------------------------------------------------
@@ -519,7 +732,7 @@ def api_get_latest_session(current_user: dict = Depends(get_current_user)):
     best = next((s for s in sessions if s["status"] == "in_progress"), sessions[0])
     session_id = str(best["session_id"])
 
-    player = _player_repo.get(session_id)
+    player = _player_repo.get(session_id, with_attempts=False)
     if not player:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -527,11 +740,9 @@ def api_get_latest_session(current_user: dict = Depends(get_current_user)):
 
 
 @router.get("/map")
-def api_get_map():
-    """Get Silicon Valley map regions and their metadata."""
-    from app.domain.scoring import MapConfig
-    return {
-        "regions": MapConfig.REGION_STAGE_MAP,
-        "bosses": MapConfig.BOSS_ARCHETYPES,
-        "mentors": MapConfig.MENTOR_ARCHETYPES,
-    }
+def api_get_map(request: Request):
+    """Get Silicon Valley map regions and their metadata.
+
+    Static: served from bytes prepared at import, never touches the database.
+    """
+    return _prepared_response(request, MAP_BODY)
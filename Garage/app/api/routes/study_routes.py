@@ -1175,7 +1175,7 @@ def _call_with_fallback(system_prompt: str, user_prompt: str) -> tuple[str, str,
 @router.post("/chat")
 def api_study_chat(req: StudyChatRequest, current_user: dict = Depends(get_current_user)):
     """Generate an authenticated study answer grounded in game context."""
-    player = _player_repo.get(req.session_id)
+    player = _player_repo.get(req.session_id, with_attempts=False)
     if not player:
         raise HTTPException(status_code=404, detail="Session not found")
     _assert_owner(player, current_user)
@@ -1262,7 +1262,7 @@ def api_study_chat(req: StudyChatRequest, current_user: dict = Depends(get_curre
 @router.post("/chat/stream")
 async def api_study_chat_stream(req: StudyChatRequest, current_user: dict = Depends(get_current_user)):  # pragma: no cover
     """Streaming SSE version of study chat — sends tokens as they arrive."""
-    player = _player_repo.get(req.session_id)
+    player = _player_repo.get(req.session_id, with_attempts=False)
     if not player:
         raise HTTPException(status_code=404, detail="Session not found")
     _assert_owner(player, current_user)
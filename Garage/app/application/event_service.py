@@ -1,12 +1,53 @@
-"""Game event audit trail -- immutable event log for traceability."""
+"""Game event audit trail -- immutable event log for traceability.
+
+``log()`` only appends to a bounded in-memory queue; a background flusher
+(``start()`` / ``stop()``, one per worker) writes the queue to
+``game_events`` with multi-row INSERTs every ``flush_interval`` seconds, or
+as soon as ``batch_size`` events are waiting.  When the queue is full new
+events are dropped and counted rather than slowing the request down; a
+failed write puts the batch back and is retried on the next tick, and a
+batch that keeps failing for a non-connection reason is bisected so the
+events the database rejects on their own are dropped instead of blocking
+the queue (see ``database.batch_writes``).
+``stop()`` drains whatever is left on shutdown.  ``stats()`` reports the
+queue depth, drop / failure counters and the latency of the last flush.
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from app.infrastructure.database.batch_writes import (
+    MAX_BATCH_ATTEMPTS, is_transient, write_isolating,
+)
 from app.infrastructure.database.models import GameEventModel
+from app.infrastructure.periodic import PeriodicTask
 
 
 class EventService:
     """Append-only event logger. Must never break game flow on failure."""
 
-    def __init__(self, session_factory):
+    def __init__(self, session_factory, flush_interval: float = 0.5,
+                 batch_size: int = 200, max_queue: int = 10_000):
         self._sf = session_factory
+        self._batch_size = max(1, batch_size)
+        self._max_queue = max(1, max_queue)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._queue: deque = deque()  # (row, monotonic time queued)
+        self._flusher = PeriodicTask("event-flush", flush_interval, self.flush)
+        self._failing = False
+        self._failed_attempts = 0
+        self._counters = {
+            "logged": 0, "written": 0, "dropped": 0, "rejected": 0, "failed_flushes": 0,
+            "last_batch_size": 0, "last_flush_ms": 0.0, "last_lag_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
 
     def log(
         self,
@@ -15,20 +56,117 @@ class EventService:
         session_id: str | None = None,
         payload: dict | None = None,
     ) -> None:
-        """Record a game event. Silently swallows exceptions."""
-        try:
-            with self._sf() as session:
-                event = GameEventModel(
-                    user_id=user_id,
-                    session_id=session_id,
-                    event_type=event_type,
-                    payload=payload,
-                )
-                session.add(event)
-                session.commit()
-        except Exception:
-            # Audit logging must NEVER disrupt gameplay.
-            pass
+        """Queue a game event for the background flusher. Never raises."""
+        row = {
+            "user_id": user_id,
+            "session_id": session_id,
+            "event_type": event_type,
+            "payload": payload,
+            "timestamp": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            if len(self._queue) >= self._max_queue:
+                self._counters["dropped"] += 1
+                return
+            self._queue.append((row, time.monotonic()))
+            self._counters["logged"] += 1
+            full = len(self._queue) >= self._batch_size
+        if full:
+            self._flusher.wake()
+
+    # ------------------------------------------------------------------
+    # Background flusher
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        self._flusher.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and drain the queue (graceful shutdown)."""
+        self._flusher.stop()
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def flush(self) -> int:
+        """Write every queued event in batches. Returns the number written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._queue.popleft()
+                             for _ in range(min(self._batch_size, len(self._queue)))]
+                if not batch:
+                    return written
+                started = time.monotonic()
+                try:
+                    self._write(batch)
+                except Exception as exc:
+                    if not is_transient(exc):
+                        self._failed_attempts += 1
+                    if self._failed_attempts < MAX_BATCH_ATTEMPTS:
+                        self._requeue(batch, exc)
+                        return written
+                    isolated, stalled = self._isolate(batch, exc)
+                    written += isolated
+                    if stalled:
+                        return written
+                    continue
+                self._failed_attempts = 0
+                done = time.monotonic()
+                written += len(batch)
+                with self._lock:
+                    self._counters["written"] += len(batch)
+                    self._counters["last_batch_size"] = len(batch)
+                    self._counters["last_flush_ms"] = round((done - started) * 1000, 2)
+                    self._counters["last_lag_ms"] = round((done - batch[0][1]) * 1000, 2)
+                if self._failing:
+                    self._failing = False
+                    print("[GARAGE] Event log writes recovered.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "queued": len(self._queue)}
+
+    def _write(self, batch: list) -> None:
+        with self._sf() as session:
+            session.execute(insert(GameEventModel), [row for row, _ in batch])
+            session.commit()
+
+    def _isolate(self, batch: list, exc: Exception) -> tuple[int, bool]:
+        """Write a repeatedly failing batch around the events that fail alone.
+
+        Returns the number written and whether a connection error cut the
+        pass short (the remainder is back in the queue).
+        """
+        self._failed_attempts = 0
+        written, rejected, unwritten = write_isolating(self._write, batch)
+        with self._lock:
+            self._counters["written"] += written
+            self._counters["rejected"] += len(rejected)
+        if rejected:
+            print(f"[GARAGE][WARN] Event log rejected {len(rejected)} event(s): "
+                  f"{type(exc).__name__}: {exc}")
+        if unwritten:
+            self._requeue(unwritten, exc)
+        return written, bool(unwritten)
+
+    def _requeue(self, batch: list, exc: Exception) -> None:
+        """Put a failed batch back at the head of the queue (oldest first)."""
+        with self._lock:
+            self._counters["failed_flushes"] += 1
+            room = self._max_queue - len(self._queue)
+            keep = batch[:max(room, 0)]
+            self._counters["dropped"] += len(batch) - len(keep)
+            self._queue.extendleft(reversed(keep))
+        if not self._failing:
+            # Warn once per outage, not on every retry.
+            self._failing = True
+            print(f"[GARAGE][WARN] Event log flush failed: {type(exc).__name__}: {exc}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
 
     def get_user_events(self, user_id: str, limit: int = 50) -> list:
         """Retrieve recent events for a given user."""
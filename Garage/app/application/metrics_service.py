@@ -1,61 +1,163 @@
-"""User metrics tracking service -- aggregate gameplay statistics."""
+"""User metrics tracking service -- aggregate gameplay statistics.
+
+Every event is applied as a single ``INSERT ... ON CONFLICT (user_id) DO
+UPDATE`` that increments the counters in the database, so concurrent
+requests (and the two workers) never lose updates to a read-modify-write.
+Events raised inside ``with metrics.batch():`` are folded into one
+``MetricsDelta`` and written with one statement when the block exits
+(``collect()`` + ``apply_all()`` split that for async callers).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
 
+from sqlalchemy import Float, case, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
 from app.infrastructure.database.models import UserMetricsModel
 from app.domain.enums import CareerStage
 
+_STAGE_RANK = {s.value: i for i, s in enumerate(CareerStage.progression_order())}
+
+# user_id -> MetricsDelta collected by the innermost ``batch`` block.
+_pending: ContextVar[dict | None] = ContextVar("metrics_pending", default=None)
+
+
+class MetricsDelta:
+    """Changes to one user's metrics row, accumulated from one or more events."""
+
+    COUNTERS = (
+        "total_games_started", "total_games_completed", "total_game_overs",
+        "total_attempts", "total_correct", "total_wrong", "total_score_earned",
+    )
+
+    def __init__(self):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.highest_score: int | None = None
+        self.highest_stage: str | None = None
+        self.favorite_language: str | None = None
+        self.last_played_at: datetime | None = None
+
+    def raise_stage(self, stage: str) -> None:
+        if self.highest_stage is None or _STAGE_RANK.get(stage, 0) > _STAGE_RANK.get(self.highest_stage, 0):
+            self.highest_stage = stage
+
+    def raise_score(self, score: int) -> None:
+        if self.highest_score is None or score > self.highest_score:
+            self.highest_score = score
+
+    def statement(self, user_id: str):
+        """The UPSERT applying this delta to ``user_id``'s row."""
+        values = {name: getattr(self, name) for name in self.COUNTERS}
+        attempts, correct = values["total_attempts"], values["total_correct"]
+        values.update(
+            user_id=user_id,
+            highest_score=self.highest_score or 0,
+            highest_stage=self.highest_stage or CareerStage.INTERN.value,
+            accuracy_rate=correct / attempts if attempts else 0.0,
+            favorite_language=self.favorite_language,
+            last_played_at=self.last_played_at,
+        )
+        stmt = pg_insert(UserMetricsModel).values(**values)
+        row, new = UserMetricsModel.__table__.c, stmt.excluded
+
+        set_ = {name: row[name] + new[name] for name in self.COUNTERS}
+        set_["updated_at"] = func.now()
+        if attempts:
+            set_["accuracy_rate"] = func.coalesce(
+                (row.total_correct + new.total_correct).cast(Float)
+                / func.nullif(row.total_attempts + new.total_attempts, 0, type_=Float),
+                0.0,
+            )
+        if self.highest_score is not None:
+            set_["highest_score"] = func.greatest(row.highest_score, new.highest_score)
+        if self.highest_stage is not None:
+            set_["highest_stage"] = case(
+                (case(_STAGE_RANK, value=new.highest_stage, else_=0)
+                 > case(_STAGE_RANK, value=row.highest_stage, else_=0), new.highest_stage),
+                else_=row.highest_stage,
+            )
+        if self.favorite_language is not None:
+            set_["favorite_language"] = new.favorite_language
+        if self.last_played_at is not None:
+            set_["last_played_at"] = new.last_played_at
+        return stmt.on_conflict_do_update(index_elements=[UserMetricsModel.user_id], set_=set_)
+
 
 class MetricsService:
     """Updates per-user aggregate statistics after game events."""
 
-    def __init__(self, session_factory):
+    def __init__(self, session_factory, read_session_factory=None):
         self._sf = session_factory
+        # Profile reads may be served by a read replica.
+        self._read_sf = read_session_factory or session_factory
 
-    def on_game_started(self, user_id: str, language: str) -> None:
+    @contextmanager
+    def batch(self):
+        """Fold the events raised inside the block into one UPSERT per user."""
+        with self.collect() as pending:
+            yield
+        self.apply_all(pending)
+
+    @contextmanager
+    def collect(self):
+        """Fold the events raised inside the block; yields ``{user_id: MetricsDelta}``.
+
+        Nothing is written: pass the dict to ``apply_all``.  Nested inside
+        another block the dict stays empty (the outer block gets the events).
+        """
+        pending: dict = {}
+        if _pending.get() is not None:
+            yield pending
+            return
+        token = _pending.set(pending)
+        try:
+            yield pending
+        finally:
+            _pending.reset(token)
+
+    def apply(self, user_id: str, delta: MetricsDelta) -> None:
+        self.apply_all({user_id: delta})
+
+    def apply_all(self, pending: dict) -> None:
+        """Write collected deltas, one UPSERT per user, in one transaction."""
+        if not pending:
+            return
         with self._sf() as session:
-            m = self._get_or_create(session, user_id)
-            m.total_games_started += 1
-            m.favorite_language = language
-            m.last_played_at = datetime.now(timezone.utc)
+            for uid, delta in pending.items():
+                session.execute(delta.statement(uid))
             session.commit()
 
+    def on_game_started(self, user_id: str, language: str) -> None:
+        with self._delta(user_id) as d:
+            d.total_games_started += 1
+            d.favorite_language = language
+            d.last_played_at = datetime.now(timezone.utc)
+
     def on_answer_submitted(self, user_id: str, is_correct: bool, points: int) -> None:
-        with self._sf() as session:
-            m = self._get_or_create(session, user_id)
-            m.total_attempts += 1
+        with self._delta(user_id) as d:
+            d.total_attempts += 1
             if is_correct:
-                m.total_correct += 1
-                m.total_score_earned += points
+                d.total_correct += 1
+                d.total_score_earned += points
             else:
-                m.total_wrong += 1
-            m.accuracy_rate = (
-                m.total_correct / m.total_attempts if m.total_attempts > 0 else 0.0
-            )
-            m.last_played_at = datetime.now(timezone.utc)
-            session.commit()
+                d.total_wrong += 1
+            d.last_played_at = datetime.now(timezone.utc)
 
     def on_game_over(self, user_id: str) -> None:
-        with self._sf() as session:
-            m = self._get_or_create(session, user_id)
-            m.total_game_overs += 1
-            session.commit()
+        with self._delta(user_id) as d:
+            d.total_game_overs += 1
 
     def on_stage_promoted(self, user_id: str, new_stage: str, current_score: int) -> None:
-        with self._sf() as session:
-            m = self._get_or_create(session, user_id)
-            stage_order = [s.value for s in CareerStage.progression_order()]
-            new_idx = stage_order.index(new_stage) if new_stage in stage_order else 0
-            cur_idx = stage_order.index(m.highest_stage) if m.highest_stage in stage_order else 0
-            if new_idx > cur_idx:
-                m.highest_stage = new_stage
-            if current_score > m.highest_score:
-                m.highest_score = current_score
+        with self._delta(user_id) as d:
+            d.raise_stage(new_stage)
+            d.raise_score(current_score)
             if new_stage == "Distinguished":
-                m.total_games_completed += 1
-            session.commit()
+                d.total_games_completed += 1
 
     def get_metrics(self, user_id: str) -> dict | None:
-        with self._sf() as session:
+        with self._read_sf() as session:
             m = (
                 session.query(UserMetricsModel)
                 .filter(UserMetricsModel.user_id == user_id)
@@ -78,15 +180,13 @@ class MetricsService:
                 "last_played_at": m.last_played_at.isoformat() if m.last_played_at else None,
             }
 
-    @staticmethod
-    def _get_or_create(session, user_id: str) -> UserMetricsModel:
-        m = (
-            session.query(UserMetricsModel)
-            .filter(UserMetricsModel.user_id == user_id)
-            .first()
-        )
-        if not m:
-            m = UserMetricsModel(user_id=user_id)
-            session.add(m)
-            session.flush()
-        return m
+    @contextmanager
+    def _delta(self, user_id: str):
+        """Yield the delta to mutate: the batch's if one is open, else a fresh one applied now."""
+        pending = _pending.get()
+        if pending is not None:
+            yield pending.setdefault(user_id, MetricsDelta())
+            return
+        delta = MetricsDelta()
+        yield delta
+        self.apply(user_id, delta)
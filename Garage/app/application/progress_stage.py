@@ -24,7 +24,7 @@ def get_progress(player: Player) -> dict:
         "total_stages": 7,
         "score": player.score,
         "completed_challenges": len(player.completed_challenges),
-        "total_attempts": len(player.attempts),
+        "total_attempts": player.total_attempts,
         "current_errors": player.current_errors,
         "max_errors": Player.MAX_ERRORS_PER_STAGE,
         "game_over_count": player.game_over_count,
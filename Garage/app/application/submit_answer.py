@@ -13,10 +13,12 @@ def submit_answer(
     player: Player,
     challenge: Challenge,
     selected_index: int,
+    answer_ms: int | None = None,
 ) -> dict:
     """
     Process a player's answer submission.
     All validation happens in the domain.
+    ``answer_ms`` is the client-measured time to answer (stats only).
     Returns outcome dict with result details.
     """
     # Domain invariant checks
@@ -45,6 +47,7 @@ def submit_answer(
         selected_index=selected_index,
         is_correct=is_correct,
         points=points if points > 0 else 0,
+        answer_ms=answer_ms,
     )
 
     # Add explanation to result
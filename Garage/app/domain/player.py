@@ -14,6 +14,9 @@ _UNSET: object = object()
 class Attempt:
     """Record of a single challenge attempt. Immutable."""
 
+    # Client-reported answer times outside [0, 30 min] are discarded.
+    MAX_ANSWER_MS = 30 * 60 * 1000
+
     def __init__(
         self,
         challenge_id: str,
@@ -21,12 +24,16 @@ class Attempt:
         is_correct: bool,
         points_awarded: int,
         timestamp: str | None = None,
+        answer_ms: int | None = None,
     ):
         self._challenge_id = challenge_id
         self._selected_index = selected_index
         self._is_correct = is_correct
         self._points_awarded = points_awarded
         self._timestamp = timestamp or datetime.now(timezone.utc).isoformat()
+        if answer_ms is not None and not 0 <= answer_ms <= self.MAX_ANSWER_MS:
+            answer_ms = None
+        self._answer_ms = answer_ms
 
     @property
     def challenge_id(self) -> str:
@@ -40,14 +47,21 @@ class Attempt:
     def points_awarded(self) -> int:
         return self._points_awarded
 
+    @property
+    def answer_ms(self) -> int | None:
+        return self._answer_ms
+
     def to_dict(self) -> dict:
-        return {
+        d = {
             "challenge_id": self._challenge_id,
             "selected_index": self._selected_index,
             "is_correct": self._is_correct,
             "points_awarded": self._points_awarded,
             "timestamp": self._timestamp,
         }
+        if self._answer_ms is not None:
+            d["answer_ms"] = self._answer_ms
+        return d
 
 
 class Player:
@@ -79,6 +93,8 @@ class Player:
         completed_regions: list | None = None,
         current_region: str | None = None,
         player_world_x: int = 100,
+        # Attempts already stored but not loaded (summary loads skip history)
+        unloaded_attempts: int = 0,
     ):
         if not name or not name.strip():
             raise ValueError("Player name cannot be empty")
@@ -93,6 +109,7 @@ class Player:
         self._current_errors = current_errors
         self._completed_challenges: List[str] = completed_challenges or []
         self._attempts: List[Attempt] = attempts or []
+        self._unloaded_attempts = unloaded_attempts
         self._game_over_count = game_over_count
         self._status = status
         self._created_at = created_at or datetime.now(timezone.utc).isoformat()
@@ -101,6 +118,10 @@ class Player:
         self._completed_regions: List[str] = completed_regions or []
         self._current_region = current_region
         self._player_world_x = player_world_x
+        # Unit-of-work state: fields changed since the last save and how many
+        # attempts storage already holds (None = never persisted).
+        self._dirty: set = set()
+        self._persisted_attempts: int | None = None
 
     # --- Properties (Read-Only) ---
 
@@ -142,8 +163,14 @@ class Player:
 
     @property
     def attempts(self) -> List[Attempt]:
+        """Loaded attempts (empty history when loaded in summary mode)."""
         return list(self._attempts)
 
+    @property
+    def total_attempts(self) -> int:
+        """All attempts ever recorded, whether or not their history is loaded."""
+        return self._unloaded_attempts + len(self._attempts)
+
     @property
     def game_over_count(self) -> int:
         return self._game_over_count
@@ -168,6 +195,34 @@ class Player:
     def player_world_x(self) -> int:
         return self._player_world_x
 
+    # --- Change Tracking ---
+
+    @property
+    def is_new(self) -> bool:
+        """True until a repository has stored (or loaded) this aggregate."""
+        return self._persisted_attempts is None
+
+    @property
+    def dirty_fields(self) -> frozenset:
+        """Names of the properties changed since the last ``mark_persisted``."""
+        return frozenset(self._dirty)
+
+    @property
+    def new_attempts(self) -> List[Attempt]:
+        """Attempts appended since the last ``mark_persisted`` (append-only)."""
+        return self._attempts[self._persisted_attempts or 0:]
+
+    def mark_persisted(self) -> None:
+        """Called by repositories once the aggregate matches storage."""
+        self._dirty.clear()
+        self._persisted_attempts = len(self._attempts)
+
+    def _set(self, field: str, value) -> None:
+        """Assign ``self._<field>`` and mark it dirty only if the value changed."""
+        if getattr(self, "_" + field) != value:
+            setattr(self, "_" + field, value)
+            self._dirty.add(field)
+
     # --- Domain Logic ---
 
     def has_completed(self, challenge_id: str) -> bool:
@@ -183,7 +238,8 @@ class Player:
             return False
         return True
 
-    def record_attempt(self, challenge_id: str, selected_index: int, is_correct: bool, points: int) -> dict:
+    def record_attempt(self, challenge_id: str, selected_index: int, is_correct: bool, points: int,
+                       answer_ms: int | None = None) -> dict:
         """
         Record a challenge attempt. Returns result dict with outcome.
         Enforces 2-error-per-stage game over rule.
@@ -199,13 +255,15 @@ class Player:
             selected_index=selected_index,
             is_correct=is_correct,
             points_awarded=awarded,
+            answer_ms=answer_ms,
         )
         self._attempts.append(attempt)
 
         if is_correct:
-            self._score += awarded
+            self._set("score", self._score + awarded)
             if challenge_id not in self._completed_challenges:
                 self._completed_challenges.append(challenge_id)
+                self._dirty.add("completed_challenges")
             # Errors are NOT reset on correct answer -- they persist for the whole stage.
             return {
                 "outcome": "correct",
@@ -217,7 +275,7 @@ class Player:
                 "promotion": False,
             }
         else:
-            self._current_errors += 1
+            self._set("current_errors", self._current_errors + 1)
             if self._current_errors >= self.MAX_ERRORS_PER_STAGE:
                 return self._trigger_game_over()
             return {
@@ -235,35 +293,35 @@ class Player:
         Resets error counter and removes completed challenges for this stage.
         History is NEVER erased. Learning persists.
         """
-        self._game_over_count += 1
-        self._current_errors = 0
+        self._set("game_over_count", self._game_over_count + 1)
+        self._set("current_errors", 0)
         # Remove completed challenges for the current stage only.
         # Use "<stage>_" prefix (with underscore) to prevent partial matches
         # between stages with similar prefixes (e.g. "mid" vs "mid_level").
         _stage_prefix = self._stage.value.lower() + "_"
-        self._completed_challenges = [
+        self._set("completed_challenges", [
             c for c in self._completed_challenges
             if not c.startswith(_stage_prefix)
-        ]
-        self._status = GameEnding.GAME_OVER
+        ])
+        self._set("status", GameEnding.GAME_OVER)
         return {
             "outcome": "game_over",
             "message": "2 errors in this stage. Returning to start of current stage.",
             "stage": self._stage.value,
             "game_over_count": self._game_over_count,
-            "total_attempts": len(self._attempts),
+            "total_attempts": self.total_attempts,
             "promotion": False,
         }
 
     def recover_from_game_over(self) -> None:
         """Allow player to restart from current stage after game over."""
         if self._status == GameEnding.GAME_OVER:
-            self._status = GameEnding.IN_PROGRESS
-            self._current_errors = 0
+            self._set("status", GameEnding.IN_PROGRESS)
+            self._set("current_errors", 0)
 
     def mark_completed(self) -> None:
         """Mark this session as completed (player reached Distinguished)."""
-        self._status = GameEnding.COMPLETED
+        self._set("status", GameEnding.COMPLETED)
 
     def check_promotion(self) -> dict | None:
         """
@@ -287,8 +345,8 @@ class Player:
         if len(stage_challenges) >= self.CHALLENGES_TO_PROMOTE:
             next_stage = self._stage.next_stage()
             if next_stage:
-                self._stage = next_stage
-                self._current_errors = 0
+                self._set("stage", next_stage)
+                self._set("current_errors", 0)
                 stage_pt = STAGE_PT.get(self._stage.value, self._stage.value)
                 return {
                     "promoted": True,
@@ -303,19 +361,21 @@ class Player:
         """Record that a book was collected."""
         if book_id not in self._collected_books:
             self._collected_books.append(book_id)
+            self._dirty.add("collected_books")
 
     def complete_region(self, region_name: str) -> None:
         """Record that a region/company was fully completed."""
         if region_name not in self._completed_regions:
             self._completed_regions.append(region_name)
+            self._dirty.add("completed_regions")
 
     def set_current_region(self, region_name: str | None) -> None:
         """Set the current region the player is in (for persistence)."""
-        self._current_region = region_name
+        self._set("current_region", region_name)
 
     def set_world_position(self, x: int) -> None:
         """Set the player's world X position (for persistence)."""
-        self._player_world_x = x
+        self._set("player_world_x", x)
 
     def update_world_state(
         self,
@@ -332,20 +392,20 @@ class Player:
         ambiguity with "not provided".
         """
         if collected_books is not None:
-            self._collected_books = list(collected_books)
+            self._set("collected_books", list(collected_books))
         if completed_regions is not None:
-            self._completed_regions = list(completed_regions)
+            self._set("completed_regions", list(completed_regions))
         if current_region is not _UNSET:        # explicit value — even None
-            self._current_region = current_region  # type: ignore[assignment]
+            self._set("current_region", current_region)
         if player_world_x is not None:
-            self._player_world_x = player_world_x
+            self._set("player_world_x", player_world_x)
 
     def reset_world_state(self) -> None:
         """Reset world state when starting a new game."""
-        self._collected_books = []
-        self._completed_regions = []
-        self._current_region = None
-        self._player_world_x = 100
+        self._set("collected_books", [])
+        self._set("completed_regions", [])
+        self._set("current_region", None)
+        self._set("player_world_x", 100)
 
     # --- Serialization ---
 
@@ -363,7 +423,7 @@ class Player:
             "completed_challenges": self._completed_challenges,
             "game_over_count": self._game_over_count,
             "status": self._status.value,
-            "total_attempts": len(self._attempts),
+            "total_attempts": self.total_attempts,
             "created_at": self._created_at,
             # World state persistence
             "collected_books": self._collected_books,
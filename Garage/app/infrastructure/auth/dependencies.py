@@ -7,7 +7,7 @@ from app.infrastructure.auth.jwt_handler import verify_token
 _security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(_security),
 ) -> dict:
     """Extract and validate the JWT from the Authorization header.
@@ -39,7 +39,7 @@ def get_current_user(
     return payload
 
 
-def get_optional_user(
+async def get_optional_user(
     credentials: HTTPAuthorizationCredentials = Depends(_security),
 ) -> dict | None:
     """Same as get_current_user but returns None instead of raising."""
@@ -0,0 +1,153 @@
+"""Async (asyncpg) engines for the hot request paths.
+
+The sync engines in ``connection`` remain the source of truth for the
+circuit breaker.  ``init_async_engines()`` builds async twins of the primary
+and fallback engines from the same URLs; ``async_session_factory`` picks the
+one the breaker currently routes to and feeds it on failures, so sync and
+async traffic fail over together.  The read replica stays sync-only.
+
+Optional: needs ``sqlalchemy[asyncio]`` (greenlet) and ``asyncpg``.  Without
+them -- or with ``DB_ASYNC=0`` -- async stays disabled and the routes run
+the sync repositories in the threadpool, exactly as before.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+from app.infrastructure.database import connection as db
+from app.infrastructure.database import instrumentation
+from app.infrastructure.database.unit_of_work import current_unit_of_work
+
+ASYNC_POOL_SIZE = int(os.environ.get("ASYNC_POOL_SIZE", "10"))
+
+_primary_engine = None
+_fallback_engine = None
+_primary_sf = None    # async_sessionmaker for primary
+_fallback_sf = None   # async_sessionmaker for fallback
+
+# libpq-only query parameters asyncpg does not understand.
+_LIBPQ_ONLY = ("sslmode", "channel_binding", "options", "connect_timeout")
+
+
+def async_url(url: str):
+    """``postgresql://`` (psycopg2) URL -> ``postgresql+asyncpg://`` URL.
+
+    ``sslmode`` becomes asyncpg's ``ssl``; other libpq-only parameters are
+    dropped.  Behind a transaction-mode pooler (Neon ``-pooler`` hosts)
+    prepared statements cannot be cached across transactions, so the
+    statement caches are turned off.
+    """
+    parsed = make_url(url)
+    query = {k: v for k, v in parsed.query.items() if k not in _LIBPQ_ONLY}
+    if "sslmode" in parsed.query:
+        query["ssl"] = parsed.query["sslmode"]
+    if "-pooler" in (parsed.host or ""):
+        query["prepared_statement_cache_size"] = "0"
+    return parsed.set(drivername="postgresql+asyncpg", query=query)
+
+
+def _connect_args(url) -> dict:
+    args = {"timeout": 10}
+    if "prepared_statement_cache_size" in url.query:
+        args["statement_cache_size"] = 0
+    return args
+
+
+def init_async_engines() -> bool:
+    """Build the async primary/fallback engines. True if async is enabled."""
+    global _primary_engine, _fallback_engine, _primary_sf, _fallback_sf
+
+    if os.environ.get("DB_ASYNC", "1") == "0":
+        print("[GARAGE] DB_ASYNC=0 -- hot routes use the sync repositories.")
+        return False
+    primary_url = db._resolve_database_url("DATABASE_URL")
+    if not primary_url:
+        return False
+    try:
+        import asyncpg  # noqa: F401
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    except ImportError as exc:
+        print(f"[GARAGE][WARN] Async DB disabled ({exc}); hot routes use the threadpool.")
+        return False
+
+    def build(url: str, label: str):
+        target = async_url(url)
+        print(f"[GARAGE] Initialising async {label} engine -> {target.host}")
+        engine = create_async_engine(
+            target,
+            poolclass=instrumentation.TimedAsyncQueuePool,
+            pool_size=ASYNC_POOL_SIZE,
+            max_overflow=10,
+            pool_timeout=30,
+            pool_recycle=900,
+            pool_pre_ping=True,
+            connect_args=_connect_args(target),
+        )
+        instrumentation.instrument(engine, f"async_{label.lower()}")
+        return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+    try:
+        _primary_engine, _primary_sf = build(primary_url, "PRIMARY")
+        fallback_url = db._resolve_database_url("FALLBACK_DATABASE_URL")
+        if fallback_url and db._fallback_sf is not None:
+            _fallback_engine, _fallback_sf = build(fallback_url, "FALLBACK")
+    except Exception as exc:
+        print(f"[GARAGE][WARN] Could not create async engines: {exc}")
+        _primary_engine = _fallback_engine = _primary_sf = _fallback_sf = None
+        return False
+    return True
+
+
+async def dispose_async_engines() -> None:
+    for engine in (_primary_engine, _fallback_engine):
+        if engine is not None:
+            await engine.dispose()
+
+
+def async_enabled() -> bool:
+    return _primary_sf is not None
+
+
+class AsyncSessionFactory:
+    """Async counterpart of ``connection.DynamicSessionFactory`` (joins the
+    request unit of work the same way).
+
+    Usage:
+        async with async_sf() as session:
+            ...
+    """
+
+    def __call__(self):
+        return self._managed_session()
+
+    @asynccontextmanager
+    async def _managed_session(self):
+        sf = _fallback_sf if db._circuit_open and _fallback_sf is not None else _primary_sf
+        uow = current_unit_of_work()
+        session = uow.async_session_from(sf) if uow else sf()
+        try:
+            yield session
+            db._record_db_success()
+        except (OperationalError, OSError, asyncio.TimeoutError) as exc:
+            # asyncpg surfaces refused/timed-out connects as OSError / TimeoutError.
+            await self._rollback(session, uow, exc)
+            db._record_db_failure(exc)
+            raise
+        except Exception as exc:
+            await self._rollback(session, uow, exc)
+            raise
+        finally:
+            await session.close()
+
+    @staticmethod
+    async def _rollback(session, uow, exc: Exception) -> None:
+        if uow is not None:
+            await uow.abort_async(exc)
+        else:
+            await session.rollback()
+
+
+async_session_factory = AsyncSessionFactory()
@@ -0,0 +1,49 @@
+"""Failure handling shared by the write-behind batch flushers.
+
+A flusher that cannot write a batch puts it back and retries on the next
+tick -- right for an outage, wrong for a batch holding a row the database
+will never accept (an oversized value, a malformed uuid, a timestamp with
+no partition): it would be retried forever and everything queued behind it
+would wait.  ``is_transient`` tells the two apart; once a batch has failed
+``MAX_BATCH_ATTEMPTS`` times with a non-transient error the flusher hands it
+to ``write_isolating``, which bisects it so the good rows are written and
+only the rows that fail on their own are rejected.
+"""
+from typing import Callable, List, Tuple
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+MAX_BATCH_ATTEMPTS = 3
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for connection / server-availability errors worth retrying as is."""
+    if isinstance(exc, (OperationalError, InterfaceError, ConnectionError, TimeoutError)):
+        return True
+    return isinstance(exc, DBAPIError) and bool(exc.connection_invalidated)
+
+
+def write_isolating(write: Callable[[list], None], rows: list) -> Tuple[int, list, list]:
+    """Write ``rows`` with ``write``, bisecting around rows that fail alone.
+
+    Returns ``(written, rejected, unwritten)``: the number of rows written,
+    the rows rejected on their own, and -- when a transient error cuts the
+    pass short -- the rows not attempted yet, for the caller to requeue.
+    """
+    written, rejected = 0, []
+    pending: List[list] = [rows]
+    while pending:
+        chunk = pending.pop(0)
+        try:
+            write(chunk)
+        except Exception as exc:
+            if is_transient(exc):
+                return written, rejected, chunk + [row for rest in pending for row in rest]
+            if len(chunk) == 1:
+                rejected.extend(chunk)
+            else:
+                mid = len(chunk) // 2
+                pending[:0] = [chunk[:mid], chunk[mid:]]
+            continue
+        written += len(chunk)
+    return written, rejected, []
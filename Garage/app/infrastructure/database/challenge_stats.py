@@ -0,0 +1,188 @@
+"""Per-challenge difficulty statistics, maintained as attempts are inserted.
+
+``challenge_stats`` keeps one row of counters per challenge (attempts,
+correct, first tries and first-try correct, summed time-to-answer) and
+``challenge_option_stats`` one row per (challenge, selected option).  A
+statement-level ``AFTER INSERT`` trigger on ``attempts`` aggregates the
+inserted rows (its transition table) and adds them with UPSERTs, so every
+writer -- the batched save in ``PgPlayerRepository`` or anything else --
+keeps the counters exact, and reading them is O(challenges).
+
+An attempt is a *first try* when its session has no earlier attempt at the
+same challenge.  That check is one probe of ``attempts(session_id)``.
+
+``ensure()`` installs the tables and trigger and, the first time, backfills
+the counters from the attempts already stored.
+"""
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+
+DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS challenge_stats (
+        challenge_id     VARCHAR(50) PRIMARY KEY,
+        attempts         BIGINT      NOT NULL DEFAULT 0,
+        correct          BIGINT      NOT NULL DEFAULT 0,
+        first_attempts   BIGINT      NOT NULL DEFAULT 0,
+        first_correct    BIGINT      NOT NULL DEFAULT 0,
+        answer_ms_sum    BIGINT      NOT NULL DEFAULT 0,
+        answer_ms_count  BIGINT      NOT NULL DEFAULT 0,
+        updated_at       TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS challenge_option_stats (
+        challenge_id    VARCHAR(50) NOT NULL,
+        selected_index  SMALLINT    NOT NULL,
+        picks           BIGINT      NOT NULL DEFAULT 0,
+        PRIMARY KEY (challenge_id, selected_index)
+    )
+    """,
+]
+
+# Aggregate ``{source}`` (attempt rows) into both tables, adding to what is there.
+_ACCUMULATE = """
+    INSERT INTO challenge_stats
+        (challenge_id, attempts, correct, first_attempts, first_correct,
+         answer_ms_sum, answer_ms_count, updated_at)
+    SELECT n.challenge_id,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE n.is_correct),
+           COUNT(*) FILTER (WHERE f.first_try),
+           COUNT(*) FILTER (WHERE f.first_try AND n.is_correct),
+           COALESCE(SUM(n.answer_ms), 0),
+           COUNT(n.answer_ms),
+           NOW()
+    FROM {source} n
+    CROSS JOIN LATERAL (
+        SELECT NOT EXISTS (
+            SELECT 1 FROM attempts prev
+            WHERE prev.session_id = n.session_id
+              AND prev.challenge_id = n.challenge_id
+              AND (prev."timestamp", prev.id) < (n."timestamp", n.id)
+        ) AS first_try
+    ) f
+    GROUP BY n.challenge_id
+    ON CONFLICT (challenge_id) DO UPDATE
+    SET attempts        = challenge_stats.attempts + excluded.attempts,
+        correct         = challenge_stats.correct + excluded.correct,
+        first_attempts  = challenge_stats.first_attempts + excluded.first_attempts,
+        first_correct   = challenge_stats.first_correct + excluded.first_correct,
+        answer_ms_sum   = challenge_stats.answer_ms_sum + excluded.answer_ms_sum,
+        answer_ms_count = challenge_stats.answer_ms_count + excluded.answer_ms_count,
+        updated_at      = excluded.updated_at;
+
+    INSERT INTO challenge_option_stats (challenge_id, selected_index, picks)
+    SELECT n.challenge_id, n.selected_index, COUNT(*)
+    FROM {source} n
+    GROUP BY n.challenge_id, n.selected_index
+    ON CONFLICT (challenge_id, selected_index) DO UPDATE
+    SET picks = challenge_option_stats.picks + excluded.picks;
+"""
+
+TRIGGER_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION garage_challenge_stats_on_attempts() RETURNS trigger
+    LANGUAGE plpgsql AS $fn$
+    BEGIN
+        {_ACCUMULATE.format(source="new_attempts")}
+        RETURN NULL;
+    END
+    $fn$
+    """,
+    "DROP TRIGGER IF EXISTS trg_challenge_stats ON attempts",
+    """
+    CREATE TRIGGER trg_challenge_stats
+    AFTER INSERT ON attempts
+    REFERENCING NEW TABLE AS new_attempts
+    FOR EACH STATEMENT EXECUTE FUNCTION garage_challenge_stats_on_attempts()
+    """,
+]
+
+BACKFILL = [s for s in _ACCUMULATE.format(source="attempts").split(";") if s.strip()]
+
+STATS_SQL = text("""
+    SELECT challenge_id, attempts, correct, first_attempts, first_correct,
+           answer_ms_sum, answer_ms_count
+    FROM challenge_stats
+""")
+
+OPTIONS_SQL = text("SELECT challenge_id, selected_index, picks FROM challenge_option_stats")
+
+
+def ensure(engine) -> bool:
+    """Create tables + trigger; backfill the counters when first created. True if backfilled."""
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('garage.challenge_stats'))"))
+        fresh = conn.execute(text("SELECT to_regclass('challenge_stats') IS NULL")).scalar()
+        for ddl in DDL + TRIGGER_DDL:
+            conn.execute(text(ddl))
+        if not fresh:
+            return False
+        for stmt in BACKFILL:
+            conn.execute(text(stmt))
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Response shape (shared by the SQL and the JSON-mode paths)
+# ---------------------------------------------------------------------------
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 4) if whole else None
+
+
+def stats_entry(challenge_id: str, attempts: int, correct: int, first_attempts: int,
+                first_correct: int, answer_ms_sum: int, answer_ms_count: int,
+                options: Optional[dict] = None) -> dict:
+    """One challenge's counters as the API returns them."""
+    return {
+        "challenge_id": challenge_id,
+        "attempts": attempts,
+        "correct": correct,
+        "correct_rate": _rate(correct, attempts),
+        "first_attempts": first_attempts,
+        "first_try_correct": first_correct,
+        "first_try_rate": _rate(first_correct, first_attempts),
+        "avg_answer_ms": round(answer_ms_sum / answer_ms_count) if answer_ms_count else None,
+        "option_picks": {str(k): v for k, v in sorted((options or {}).items())},
+    }
+
+
+def compute(attempts: Iterable[dict]) -> List[dict]:
+    """The same statistics from attempt dicts (JSON mode; O(attempts)).
+
+    ``attempts`` must be grouped by session, in the order they happened.
+    """
+    counters: dict = {}
+    options: dict = {}
+    seen = set()
+    for a in attempts:
+        cid = a["challenge_id"]
+        c = counters.setdefault(cid, [0, 0, 0, 0, 0, 0])
+        first = (a.get("session_id"), cid) not in seen
+        seen.add((a.get("session_id"), cid))
+        c[0] += 1
+        c[1] += bool(a["is_correct"])
+        c[2] += first
+        c[3] += first and bool(a["is_correct"])
+        if a.get("answer_ms") is not None:
+            c[4] += a["answer_ms"]
+            c[5] += 1
+        picks = options.setdefault(cid, {})
+        picks[a["selected_index"]] = picks.get(a["selected_index"], 0) + 1
+    return [stats_entry(cid, *c, options=options.get(cid)) for cid, c in counters.items()]
+
+
+def collect(challenge_repo, player_repo) -> List[dict]:
+    """Stats from the trigger-maintained tables, or computed in JSON mode."""
+    if hasattr(challenge_repo, "stats"):
+        return challenge_repo.stats()
+    if hasattr(player_repo, "get_all_dict"):
+        return compute(
+            {**a, "session_id": s.get("id")}
+            for s in player_repo.get_all_dict()
+            for a in s.get("attempts", [])
+        )
+    return []
@@ -4,33 +4,79 @@ Circuit-breaker strategy:
   - Primary engine used by default.
   - After PRIMARY_FAILURE_THRESHOLD consecutive failures it is marked DOWN and
     the fallback engine (FALLBACK_DATABASE_URL) takes over transparently.
-  - Every PRIMARY_RETRY_INTERVAL seconds the primary is probed; if healthy it is
-    restored automatically.
+  - While it is open, a background task (``probe_primary``, run by a
+    PeriodicTask in main.py) probes the primary every PRIMARY_RETRY_INTERVAL
+    seconds over a dedicated unpooled connection with its own short timeout;
+    if healthy the primary is restored automatically.  Requests only read the
+    circuit flag and never wait on a probe.
   - All repository code is unaffected: call get_session_factory() as before.
 """
 import os
 import re
 import threading
 import time
+from collections import deque
+from datetime import datetime, timezone
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.infrastructure.database import instrumentation
+from app.infrastructure.database.challenge_stats import ensure as ensure_challenge_stats
+from app.infrastructure.database.landing_rollups import ensure as ensure_landing_rollups
+from app.infrastructure.database.partitions import (
+    MONTHS_AHEAD, RETENTION_MONTHS, ROLLUP_DDL, maintain as maintain_partitions,
+)
 
 # ── circuit-breaker tunables ────────────────────────────────────────────────
 PRIMARY_FAILURE_THRESHOLD = 3     # consecutive errors before opening circuit
 PRIMARY_RETRY_INTERVAL    = 120   # seconds between primary health checks
+PROBE_TIMEOUT             = int(os.environ.get("DB_PROBE_TIMEOUT_SECONDS", "3"))
+REPLICA_MAX_LAG_SECONDS   = float(os.environ.get("REPLICA_MAX_LAG_SECONDS", "2"))
+REPLICA_CHECK_INTERVAL    = float(os.environ.get("REPLICA_CHECK_SECONDS", "10"))
 # ────────────────────────────────────────────────────────────────────────────
 
 _primary_engine   = None
+_primary_probe_engine = None   # unpooled, PROBE_TIMEOUT connect timeout
 _fallback_engine  = None
 _primary_sf       = None   # sessionmaker for primary
 _fallback_sf      = None   # sessionmaker for fallback
+_replica_engine   = None
+_replica_sf       = None   # sessionmaker for the read replica
 
 _circuit_open         = False   # True  => routing to fallback
 _consecutive_failures = 0
 _last_primary_check   = 0.0
 _cb_lock              = threading.Lock()
 
+# Prober / transition metrics (exported by get_db_circuit_state).
+_probe_stats = {
+    "probes": 0, "failures": 0, "last_ms": None, "max_ms": 0.0, "total_ms": 0.0,
+    "last_ok": None, "last_at": None,
+}
+_transitions = deque(maxlen=20)
+_transition_counts = {"opened": 0, "closed": 0}
+
+# Read-replica routing state.  Reads go to the replica only after a lag
+# check passed; ``_replica_demand`` counts read sessions since the last check.
+_replica_ok         = False
+_replica_lag        = None
+_replica_checked_at = 0.0
+_replica_demand     = 0
+_replica_failures   = 0
+
+# Replay lag in seconds; 0 when everything received has been replayed (an
+# idle primary would otherwise look like growing lag) or when not a standby.
+_REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() IS NOT NULL
+             AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
 # ── legacy single-engine aliases (unchanged public API) ────────────────────
 _engine       = None   # always points to the currently active engine
 _SessionLocal = None   # always points to the currently active sessionmaker
@@ -78,8 +124,9 @@ def _build_engine(url: str, label: str):
     except Exception:
         masked = "<parse-error>"
     print(f"[GARAGE] Initialising {label} engine -> {masked}")
-    return create_engine(
+    engine = create_engine(
         url,
+        poolclass=instrumentation.TimedQueuePool,
         pool_size=10,
         max_overflow=15,
         pool_timeout=30,
@@ -94,20 +141,38 @@ def _build_engine(url: str, label: str):
         connect_args={"connect_timeout": 10},
         echo=False,
     )
+    return instrumentation.instrument(engine, label.lower())
+
+
+def _build_probe_engine(url: str):
+    """Engine used only for recovery probes: a fresh connection per probe
+    (no pool, no pre-ping) that gives up after PROBE_TIMEOUT seconds."""
+    return create_engine(
+        url,
+        poolclass=NullPool,
+        connect_args={
+            "connect_timeout": PROBE_TIMEOUT,
+            "options": f"-c statement_timeout={PROBE_TIMEOUT * 1000}",
+        },
+        echo=False,
+    )
 
 
 def init_engine() -> None:
     """Initialize primary (Neon) and optional fallback (Supabase) engines.
 
     Environment variables:
-      DATABASE_URL          — required, Neon connection string
-      FALLBACK_DATABASE_URL — optional, Supabase (or any PostgreSQL) fallback
+      DATABASE_URL              — required, Neon connection string
+      FALLBACK_DATABASE_URL     — optional, Supabase (or any PostgreSQL) fallback
+      READ_REPLICA_DATABASE_URL — optional, read replica of the primary
     """
-    global _primary_engine, _fallback_engine, _primary_sf, _fallback_sf
+    global _primary_engine, _primary_probe_engine, _fallback_engine, _primary_sf, _fallback_sf
+    global _replica_engine, _replica_sf
     global _engine, _SessionLocal
 
     primary_url  = _resolve_database_url("DATABASE_URL")
     fallback_url = _resolve_database_url("FALLBACK_DATABASE_URL")
+    replica_url  = _resolve_database_url("READ_REPLICA_DATABASE_URL")
 
     if not primary_url:
         print("[GARAGE] DATABASE_URL is empty -- skipping PostgreSQL init.")
@@ -124,6 +189,7 @@ def init_engine() -> None:
         try:
             _fallback_engine = _build_engine(fallback_url, "FALLBACK")
             _fallback_sf     = sessionmaker(bind=_fallback_engine, expire_on_commit=False)
+            _primary_probe_engine = _build_probe_engine(primary_url)
             print("[GARAGE] Fallback DB registered (circuit-breaker active).")
         except Exception as exc:
             print(f"[GARAGE] WARNING: Could not create fallback engine: {exc}")
@@ -132,6 +198,16 @@ def init_engine() -> None:
     else:
         print("[GARAGE] FALLBACK_DATABASE_URL not set -- single-engine mode.")
 
+    if replica_url:
+        try:
+            _replica_engine = _build_engine(replica_url, "REPLICA")
+            _replica_sf     = sessionmaker(bind=_replica_engine, expire_on_commit=False)
+            print("[GARAGE] Read replica registered (used once its lag is measured).")
+        except Exception as exc:
+            print(f"[GARAGE] WARNING: Could not create replica engine: {exc}")
+            _replica_engine = None
+            _replica_sf     = None
+
     # Legacy aliases point to primary initially
     _engine       = _primary_engine
     _SessionLocal = _primary_sf
@@ -148,30 +224,127 @@ def _get_active_sf():
     """Return the sessionmaker for the currently active engine.
 
     Implements the circuit-breaker: if the primary has failed
-    PRIMARY_FAILURE_THRESHOLD times in a row it is bypassed until
-    PRIMARY_RETRY_INTERVAL seconds have elapsed and a health probe succeeds.
+    PRIMARY_FAILURE_THRESHOLD times in a row it is bypassed until the
+    background prober (``probe_primary``) sees it healthy again.  Only reads
+    the circuit flag -- never takes the lock or touches the network.
+    """
+    if _primary_sf is None:
+        raise RuntimeError("Database not initialised. Call init_engine() first.")
+    if _circuit_open and _fallback_sf is not None:
+        return _fallback_sf
+    return _primary_sf
+
+
+def _get_read_sf():
+    """Sessionmaker for read-only work: the replica when it is fresh enough."""
+    global _replica_demand
+    if _replica_sf is None:
+        return _get_active_sf()
+    _replica_demand += 1  # unsynchronised: only a "reads happened" hint
+    if _replica_ok and not _circuit_open:
+        return _replica_sf
+    return _get_active_sf()
+
+
+def _record_replica_failure(exc: Exception) -> None:
+    """Stop reading from the replica until the next lag check passes."""
+    global _replica_ok, _replica_failures
+    with _cb_lock:
+        _replica_failures += 1
+        if _replica_ok:
+            _replica_ok = False
+            print(f"[GARAGE][WARN] Read replica failed ({type(exc).__name__}) — reads on PRIMARY.")
+
+
+def probe_replica(now: float | None = None) -> float | None:
+    """Measure replica lag (background task); route reads to it if fresh.
+
+    Only runs when reads were requested since the last check, at most every
+    REPLICA_CHECK_INTERVAL seconds.  Returns the lag, or None if not checked
+    or unreachable.
+    """
+    global _replica_ok, _replica_lag, _replica_checked_at, _replica_demand
+
+    if _replica_engine is None:
+        return None
+    now = time.monotonic() if now is None else now
+    with _cb_lock:
+        if not _replica_demand or now - _replica_checked_at < REPLICA_CHECK_INTERVAL:
+            return None
+        _replica_demand = 0
+        _replica_checked_at = now
+
+    try:
+        with _replica_engine.connect() as conn:
+            lag = float(conn.execute(text(_REPLICA_LAG_SQL)).scalar() or 0)
+    except Exception as exc:
+        lag = None
+        print(f"[GARAGE][WARN] Read replica lag check failed: {type(exc).__name__}: {exc}")
+
+    fresh = lag is not None and lag <= REPLICA_MAX_LAG_SECONDS
+    with _cb_lock:
+        _replica_lag = lag
+        if fresh != _replica_ok:
+            print(f"[GARAGE] Read replica {'in use' if fresh else 'bypassed'} (lag {lag} s).")
+        _replica_ok = fresh
+    return lag
+
+
+def probe_databases() -> None:
+    """Background-task entry point: primary recovery + replica lag."""
+    probe_primary()
+    probe_replica()
+
+
+def _record_transition(state: str, reason: str) -> None:
+    """Count and remember a circuit state change (caller holds _cb_lock)."""
+    _transition_counts["opened" if state == "open" else "closed"] += 1
+    _transitions.append({
+        "at": datetime.now(timezone.utc).isoformat(),
+        "state": state,
+        "reason": reason,
+    })
+
+
+def probe_primary(now: float | None = None) -> bool | None:
+    """Probe the primary while the circuit is open; close it when healthy.
+
+    Background-task entry point.  Returns None when no probe was due,
+    otherwise the probe result.  The probe runs outside ``_cb_lock``.
     """
     global _circuit_open, _consecutive_failures, _last_primary_check
     global _engine, _SessionLocal
 
-    if _primary_sf is None:
-        raise RuntimeError("Database not initialised. Call init_engine() first.")
+    now = time.monotonic() if now is None else now
+    with _cb_lock:
+        if not _circuit_open or _fallback_sf is None:
+            return None
+        if now - _last_primary_check < PRIMARY_RETRY_INTERVAL:
+            return None
+        _last_primary_check = now
+
+    started = time.perf_counter()
+    healthy = _check_engine_health(_primary_probe_engine or _primary_engine)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
 
     with _cb_lock:
-        # Primary is marked DOWN → try to heal
-        if _circuit_open and _fallback_sf is not None:
-            now = time.monotonic()
-            if now - _last_primary_check >= PRIMARY_RETRY_INTERVAL:
-                _last_primary_check = now
-                if _check_engine_health(_primary_engine):
-                    _circuit_open         = False
-                    _consecutive_failures = 0
-                    _engine               = _primary_engine
-                    _SessionLocal         = _primary_sf
-                    print("[GARAGE] Primary DB recovered — circuit CLOSED.")
-            return _fallback_sf
-
-        return _primary_sf
+        _probe_stats["probes"] += 1
+        _probe_stats["failures"] += not healthy
+        _probe_stats["last_ms"] = elapsed_ms
+        _probe_stats["max_ms"] = max(_probe_stats["max_ms"], elapsed_ms)
+        _probe_stats["total_ms"] += elapsed_ms
+        _probe_stats["last_ok"] = healthy
+        _probe_stats["last_at"] = datetime.now(timezone.utc).isoformat()
+        if healthy and _circuit_open:
+            _circuit_open         = False
+            _consecutive_failures = 0
+            _engine               = _primary_engine
+            _SessionLocal         = _primary_sf
+            _record_transition("closed", f"probe ok in {elapsed_ms} ms")
+            print(f"[GARAGE] Primary DB recovered — circuit CLOSED (probe {elapsed_ms} ms).")
+        elif not healthy:
+            print(f"[GARAGE][WARN] Primary DB probe failed after {elapsed_ms} ms — staying on FALLBACK.")
+    return healthy
 
 
 def _record_db_failure(exc: Exception) -> None:
@@ -191,6 +364,7 @@ def _record_db_failure(exc: Exception) -> None:
             _last_primary_check   = time.monotonic()
             _engine               = _fallback_engine
             _SessionLocal         = _fallback_sf
+            _record_transition("open", f"{type(exc).__name__} x{_consecutive_failures}")
             print(
                 f"[GARAGE] Primary DB failed {_consecutive_failures}x — "
                 "circuit OPEN, routing to FALLBACK."
@@ -246,6 +420,9 @@ def create_tables() -> None:
         try:
             Base.metadata.create_all(bind=engine)
             _ensure_indexes(engine)
+            _ensure_partitions(engine)
+            _ensure_landing_rollups(engine)
+            _ensure_challenge_stats(engine)
             print(f"[GARAGE] Tables verified on {label} DB.")
         except Exception as exc:
             print(f"[GARAGE] WARNING: Could not create tables on {label} DB: {exc}")
@@ -266,6 +443,13 @@ def _ensure_indexes(engine) -> None:
         "ALTER TABLE users ADD COLUMN IF NOT EXISTS subscription_plan VARCHAR(20)",
         "ALTER TABLE users ADD COLUMN IF NOT EXISTS subscription_expires_at TIMESTAMPTZ",
         "ALTER TABLE users ADD COLUMN IF NOT EXISTS asaas_customer_id VARCHAR(50)",
+        # ── Incremental challenge seeding (content hash + JSON order) ────────
+        "ALTER TABLE challenges ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+        "ALTER TABLE challenges ADD COLUMN IF NOT EXISTS sort_order INTEGER",
+        # ── Write-behind world-state saves ────────────────────────────────────
+        "ALTER TABLE game_sessions ADD COLUMN IF NOT EXISTS world_state_at TIMESTAMPTZ",
+        # ── Time-to-answer for challenge difficulty stats ─────────────────────
+        "ALTER TABLE attempts ADD COLUMN IF NOT EXISTS answer_ms INTEGER",
         # ── Landing analytics table (idempotent CREATE) ──────────────────────
         # Added in v3.2 — landing page event tracking
         """
@@ -283,9 +467,7 @@ def _ensure_indexes(engine) -> None:
             created_at  TIMESTAMPTZ  NOT NULL DEFAULT NOW()
         )
         """,
-        "CREATE INDEX IF NOT EXISTS idx_landing_events_visitor ON landing_events(visitor_id)",
-        "CREATE INDEX IF NOT EXISTS idx_landing_events_type    ON landing_events(event_type)",
-        "CREATE INDEX IF NOT EXISTS idx_landing_events_created ON landing_events(created_at DESC)",
+        # Its indexes live on the partitioned table (see partitions.py).
         # ── Idempotency table (deduplication cache for mutating requests) ────
         """
         CREATE TABLE IF NOT EXISTS idempotency_keys (
@@ -299,6 +481,8 @@ def _ensure_indexes(engine) -> None:
         )
         """,
         "CREATE INDEX IF NOT EXISTS idx_idempotency_created ON idempotency_keys(created_at DESC)",
+        # ── Daily rollups of dropped event partitions ────────────────────────
+        *ROLLUP_DDL,
     ]
     try:
         with engine.begin() as conn:
@@ -308,6 +492,46 @@ def _ensure_indexes(engine) -> None:
         print(f"[GARAGE] WARNING: Could not ensure indexes/migrations: {exc}")
 
 
+def _ensure_partitions(engine) -> bool:
+    """Monthly partitions for the event tables (conversion, pre-creation, retention).
+
+    Returns False (after logging) when maintenance could not run.
+    """
+    try:
+        maintain_partitions(
+            engine,
+            months_ahead=int(os.environ.get("EVENT_PARTITIONS_AHEAD", MONTHS_AHEAD)),
+            retention_months=int(os.environ.get("EVENT_RETENTION_MONTHS", RETENTION_MONTHS)),
+        )
+    except Exception as exc:
+        print(f"[GARAGE] WARNING: Could not maintain event partitions: {exc}")
+        return False
+    return True
+
+
+def _ensure_landing_rollups(engine) -> None:
+    """Hourly landing analytics rollups (backfilled from raw events on first run)."""
+    try:
+        if ensure_landing_rollups(engine):
+            print("[GARAGE] Landing analytics rollups backfilled.")
+    except Exception as exc:
+        print(f"[GARAGE] WARNING: Could not ensure landing rollups: {exc}")
+
+
+def _ensure_challenge_stats(engine) -> None:
+    """Per-challenge difficulty counters (trigger on attempts; backfilled on first run)."""
+    try:
+        if ensure_challenge_stats(engine):
+            print("[GARAGE] Challenge stats backfilled from attempts.")
+    except Exception as exc:
+        print(f"[GARAGE] WARNING: Could not ensure challenge stats: {exc}")
+
+
+def maintain_active_partitions() -> bool:
+    """Partition maintenance on the active engine (periodic task entry point)."""
+    return _ensure_partitions(_engine)
+
+
 def check_health() -> bool:
     """Verify connectivity on the currently active database."""
     return _check_engine_health(_engine)
@@ -319,10 +543,28 @@ def get_db_circuit_state() -> dict:
     Use this in health-check endpoints so they respond instantly even when
     Neon is in hibernation (avoids health-check timeout on Render free tier).
     """
+    probes = _probe_stats["probes"]
     return {
         "circuit_open":         _circuit_open,
         "active":               "fallback" if _circuit_open else "primary",
         "consecutive_failures": _consecutive_failures,
+        "transitions":          dict(_transition_counts),
+        "last_transition":      _transitions[-1] if _transitions else None,
+        "prober": {
+            "probes":   probes,
+            "failures": _probe_stats["failures"],
+            "last_ms":  _probe_stats["last_ms"],
+            "avg_ms":   round(_probe_stats["total_ms"] / probes, 1) if probes else None,
+            "max_ms":   _probe_stats["max_ms"],
+            "last_ok":  _probe_stats["last_ok"],
+            "last_at":  _probe_stats["last_at"],
+        },
+        "replica": {
+            "configured":  _replica_sf is not None,
+            "in_use":      _replica_ok and not _circuit_open,
+            "lag_seconds": _replica_lag,
+            "failures":    _replica_failures,
+        } if _replica_sf is not None else None,
     }
 
 
@@ -334,11 +576,12 @@ def get_db_status() -> dict:
     seconds per engine when Neon is in hibernation.
     """
     return {
-        "primary_healthy":  _check_engine_health(_primary_engine),
+        "primary_healthy":  _check_engine_health(_primary_probe_engine or _primary_engine),
         "fallback_healthy": _check_engine_health(_fallback_engine),
         "circuit_open":     _circuit_open,
         "active":           "fallback" if _circuit_open else "primary",
         "consecutive_failures": _consecutive_failures,
+        "recent_transitions": list(_transitions),
     }
 
 
@@ -347,6 +590,8 @@ def get_db_status() -> dict:
 from contextlib import contextmanager
 from sqlalchemy.exc import OperationalError
 
+from app.infrastructure.database.unit_of_work import current_unit_of_work
+
 
 class DynamicSessionFactory:
     """Callable proxy passed to repositories.
@@ -354,32 +599,55 @@ class DynamicSessionFactory:
     Behaves exactly like a sessionmaker but always resolves to the *currently
     active* engine.  When a database OperationalError occurs it feeds the
     circuit-breaker so the next call is automatically routed to the fallback.
+    With ``read_only=True`` it may resolve to the read replica instead;
+    replica errors only take the replica out of rotation.  Inside a request
+    unit of work (see ``unit_of_work``) it yields the request's shared session.
 
     Usage (identical to bare sessionmaker):
         with dynamic_sf() as session:
             ...
     """
 
+    def __init__(self, read_only: bool = False):
+        self._read_only = read_only
+
     def __call__(self):
         return self._managed_session()
 
     @contextmanager
     def _managed_session(self):
-        sf = _get_active_sf()
-        session = sf()
+        sf = _get_read_sf() if self._read_only else _get_active_sf()
+        on_replica = sf is _replica_sf
+        # Inside a request unit of work every block shares one session
+        # (replica reads excepted: they are on another server).
+        uow = None if on_replica else current_unit_of_work()
+        session = uow.session_from(sf) if uow else sf()
         try:
             yield session
-            _record_db_success()
+            if not on_replica:
+                _record_db_success()
         except OperationalError as exc:
-            session.rollback()
-            _record_db_failure(exc)
+            self._rollback(session, uow, exc)
+            if on_replica:
+                _record_replica_failure(exc)
+            else:
+                _record_db_failure(exc)
             raise
-        except Exception:
-            session.rollback()
+        except Exception as exc:
+            self._rollback(session, uow, exc)
             raise
         finally:
             session.close()
 
+    @staticmethod
+    def _rollback(session, uow, exc: Exception) -> None:
+        if uow is not None:
+            uow.abort(exc)
+        else:
+            session.rollback()
+
 
-# Singleton — import and pass to all PG repositories.
+# Singletons — import and pass to all PG repositories (reads that tolerate
+# a little replica lag may take ``read_session_factory``).
 dynamic_session_factory = DynamicSessionFactory()
+read_session_factory = DynamicSessionFactory(read_only=True)
@@ -0,0 +1,440 @@
+"""Connection-pool and query instrumentation (SQLAlchemy event hooks).
+
+``instrument(engine, label)`` attaches hooks to an engine (sync, or the
+``sync_engine`` of an async one) built with one of the ``Timed*Pool``
+classes.  Per engine it records:
+
+  - checkout latency (waiting for a pooled connection, opening a new one
+    and the pre-ping), pool timeouts, pre-ping failures, invalidations;
+  - the age of the connection handed out (how well ``pool_recycle`` and
+    the pool size fit the traffic);
+  - live pool occupancy (size / checked out / overflow), read on demand.
+
+Every statement is timed and attributed to the current HTTP route via
+``begin_request`` / ``end_request`` (see ``QueryStatsMiddleware``), which
+gives query count and DB time per request and per route.  Statements slower
+than ``DB_SLOW_QUERY_MS`` are kept (last 50) with their parameters redacted
+to type names.  Slow statements, slow checkouts, pool timeouts and requests
+issuing more than ``DB_REQUEST_QUERY_WARN`` queries are also printed as one
+JSON object per line (``[GARAGE][DB] {...}``).
+
+``snapshot()`` is served by ``GET /api/admin/db/metrics``.  Counters are
+per worker process.  ``DB_INSTRUMENTATION=0`` turns the hooks off.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+ENABLED = os.environ.get("DB_INSTRUMENTATION", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("DB_SLOW_QUERY_MS", "250"))
+SLOW_CHECKOUT_MS = float(os.environ.get("DB_SLOW_CHECKOUT_MS", "100"))
+REQUEST_QUERY_WARN = int(os.environ.get("DB_REQUEST_QUERY_WARN", "25"))
+
+BACKGROUND = "(background)"
+UNROUTED = "(unrouted)"
+_STATEMENT_MAX_CHARS = 500
+
+_MS_BOUNDS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+_AGE_BOUNDS = (1, 10, 60, 300, 600, 900, 1800, 3600)
+
+
+class Timer:
+    """Count / total / max plus a fixed-bucket histogram for percentiles."""
+
+    __slots__ = ("bounds", "count", "total", "max", "buckets")
+
+    def __init__(self, bounds=_MS_BOUNDS):
+        self.bounds = bounds
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(bounds) + 1)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile (capped at max)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 2) if self.count else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 2),
+        }
+
+
+class _PoolStats:
+    def __init__(self, engine):
+        self.engine = engine
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pre_ping_failures = 0
+        self.errors = 0
+        self.checkout_ms = Timer()
+        self.connection_age_s = Timer(_AGE_BOUNDS)
+
+
+class _RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.checkouts = 0
+        self.query_ms = Timer()       # per statement
+        self.request_db_ms = Timer()  # DB time per request
+
+
+class RequestStats:
+    """DB work done while serving one request (mutated from worker threads)."""
+
+    __slots__ = ("scope", "queries", "db_ms", "checkouts", "checkout_ms")
+
+    def __init__(self, scope=None):
+        self.scope = scope if scope is not None else {}
+        self.queries = 0
+        self.db_ms = 0.0
+        self.checkouts = 0
+        self.checkout_ms = 0.0
+
+
+_lock = threading.Lock()
+_pools: dict = {}       # label -> _PoolStats
+_routes: dict = {}      # route -> _RouteStats
+_slow = deque(maxlen=50)
+_since = datetime.now(timezone.utc)
+_request: ContextVar[Optional[RequestStats]] = ContextVar("db_request_stats", default=None)
+
+
+def log_event(kind: str, **fields) -> None:
+    """One structured (JSON) log line."""
+    record = {"event": kind, "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), **fields}
+    print(f"[GARAGE][DB] {json.dumps(record, default=str, separators=(',', ':'))}")
+
+
+# ---------------------------------------------------------------------------
+# Parameter redaction
+# ---------------------------------------------------------------------------
+
+def _kind(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set)):
+        return f"<{type(value).__name__}[{len(value)}]>"
+    return f"<{type(value).__name__}>"
+
+
+def redact(params):
+    """Parameters with every value replaced by its type (and length for sequences)."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {k: _kind(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        if params and isinstance(params[0], (dict, list, tuple)):  # executemany
+            return {"rows": len(params), "first": redact(params[0])}
+        return [_kind(v) for v in params]
+    return _kind(params)
+
+
+# ---------------------------------------------------------------------------
+# Pools
+# ---------------------------------------------------------------------------
+
+class _TimedCheckout:
+    """Pool mixin timing ``connect()``: queue wait + new connection + pre-ping."""
+
+    _garage_label = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except sa_exc.TimeoutError:
+            _record_checkout(self._garage_label, (time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+        _record_checkout(self._garage_label, (time.perf_counter() - started) * 1000)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool._garage_label = self._garage_label
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _record_checkout(label: Optional[str], ms: float, timed_out: bool = False) -> None:
+    stats = _pools.get(label)
+    if stats is None:
+        return
+    with _lock:
+        stats.checkout_ms.add(ms)
+        if timed_out:
+            stats.timeouts += 1
+    req = _request.get()
+    if req is not None:
+        req.checkout_ms += ms
+    if timed_out:
+        log_event("pool_timeout", engine=label, waited_ms=round(ms, 1), route=_route_of(req))
+    elif ms >= SLOW_CHECKOUT_MS:
+        log_event("slow_checkout", engine=label, ms=round(ms, 1), route=_route_of(req))
+
+
+def _route_of(req: Optional[RequestStats]) -> str:
+    """``"GET /api/session/{session_id}"`` once routed; the router sets ``scope["route"]``."""
+    if req is None:
+        return BACKGROUND
+    path = getattr(req.scope.get("route"), "path", None)
+    if path is None:
+        return UNROUTED
+    return f"{req.scope.get('method', '')} {path}".strip()
+
+
+# ---------------------------------------------------------------------------
+# Hooks
+# ---------------------------------------------------------------------------
+
+def instrument(engine, label: str):
+    """Attach the pool and statement hooks to ``engine``; returns it."""
+    if not ENABLED:
+        return engine
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pool = sync_engine.pool
+    if isinstance(pool, _TimedCheckout):
+        pool._garage_label = label
+    stats = _pools[label] = _PoolStats(sync_engine)
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, record):
+        record.info["connected_at"] = time.monotonic()
+        with _lock:
+            stats.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, record, proxy):
+        age = time.monotonic() - record.info.get("connected_at", time.monotonic())
+        with _lock:
+            stats.checkouts += 1
+            stats.connection_age_s.add(age)
+        req = _request.get()
+        if req is not None:
+            req.checkouts += 1
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, record, exception):
+        with _lock:
+            stats.invalidations += 1
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(context):
+        with _lock:
+            if getattr(context, "is_pre_ping", False):
+                stats.pre_ping_failures += 1
+            else:
+                stats.errors += 1
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._garage_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_garage_started", None)
+        if started is None:
+            return
+        _record_query(label, statement, parameters, (time.perf_counter() - started) * 1000)
+
+    return engine
+
+
+def _record_query(label: str, statement: str, parameters, ms: float) -> None:
+    req = _request.get()
+    route = _route_of(req)
+    if req is not None:
+        req.queries += 1
+        req.db_ms += ms
+    with _lock:
+        route_stats = _route_stats(route)
+        route_stats.query_ms.add(ms)
+        if req is None:
+            route_stats.queries += 1
+    if ms >= SLOW_QUERY_MS:
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "engine": label,
+            "route": route,
+            "ms": round(ms, 1),
+            "statement": " ".join(statement.split())[:_STATEMENT_MAX_CHARS],
+            "params": redact(parameters),
+        }
+        with _lock:
+            _slow.append(entry)
+        log_event("slow_query", **entry)
+
+
+# ---------------------------------------------------------------------------
+# Per-request attribution
+# ---------------------------------------------------------------------------
+
+def _route_stats(route: str) -> _RouteStats:
+    stats = _routes.get(route)
+    if stats is None:
+        stats = _routes[route] = _RouteStats()
+    return stats
+
+
+def begin_request(scope=None):
+    """Start attributing DB work to a new request (its ASGI ``scope``).
+
+    Returns a token for ``end_request``.
+    """
+    if not ENABLED:
+        return None
+    return _request.set(RequestStats(scope))
+
+
+def end_request(token) -> Optional[RequestStats]:
+    """Fold the request's DB work into its route's totals.
+
+    Every routed request counts towards ``requests`` (so the per-request
+    averages include requests served without the database); only requests
+    that did DB work feed the ``request_db_ms`` histogram.
+    """
+    if token is None:
+        return None
+    req = _request.get()
+    _request.reset(token)
+    if req is None:
+        return req
+    key = _route_of(req)
+    if key == UNROUTED and not (req.queries or req.checkouts):
+        return req
+    with _lock:
+        stats = _route_stats(key)
+        stats.requests += 1
+        stats.queries += req.queries
+        stats.max_queries = max(stats.max_queries, req.queries)
+        stats.checkouts += req.checkouts
+        if req.queries or req.checkouts:
+            stats.request_db_ms.add(req.db_ms)
+    if req.queries > REQUEST_QUERY_WARN:
+        log_event(
+            "query_heavy_request", route=key, queries=req.queries,
+            db_ms=round(req.db_ms, 1), checkouts=req.checkouts,
+            checkout_ms=round(req.checkout_ms, 1),
+        )
+    return req
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def _pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"class": type(pool).__name__}
+    for name in ("size", "checkedout", "overflow", "checkedin"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            status[name] = fn()
+    timeout = getattr(pool, "timeout", None)
+    if callable(timeout):
+        status["timeout_s"] = timeout()
+    return status
+
+
+def snapshot() -> dict:
+    """Pools, per-route query stats and recent slow statements (this worker)."""
+    with _lock:
+        pools = {
+            label: {
+                **_pool_status(s.engine),
+                "checkouts": s.checkouts,
+                "timeouts": s.timeouts,
+                "connects": s.connects,
+                "invalidations": s.invalidations,
+                "pre_ping_failures": s.pre_ping_failures,
+                "errors": s.errors,
+                "checkout_ms": s.checkout_ms.snapshot(),
+                "connection_age_s": s.connection_age_s.snapshot(),
+            }
+            for label, s in _pools.items()
+        }
+        routes = {
+            route: {
+                "requests": s.requests,
+                "queries": s.queries,
+                "queries_per_request": round(s.queries / s.requests, 2) if s.requests else None,
+                "max_queries_per_request": s.max_queries,
+                "checkouts_per_request": round(s.checkouts / s.requests, 2) if s.requests else None,
+                "query_ms": s.query_ms.snapshot(),
+                "request_db_ms": s.request_db_ms.snapshot(),
+            }
+            for route, s in sorted(_routes.items(), key=lambda kv: -kv[1].query_ms.total)
+        }
+        slow = list(_slow)[::-1]
+    return {
+        "enabled": ENABLED,
+        "since": _since.isoformat(timespec="seconds"),
+        "pid": os.getpid(),
+        "thresholds": {
+            "slow_query_ms": SLOW_QUERY_MS,
+            "slow_checkout_ms": SLOW_CHECKOUT_MS,
+            "request_query_warn": REQUEST_QUERY_WARN,
+        },
+        "pools": pools,
+        "routes": routes,
+        "slow_queries": slow,
+    }
+
+
+def reset() -> None:
+    """Zero the counters (pools stay instrumented)."""
+    global _since
+    with _lock:
+        for stats in _pools.values():
+            stats.reset()
+        _routes.clear()
+        _slow.clear()
+        _since = datetime.now(timezone.utc)
@@ -0,0 +1,197 @@
+"""Hourly landing analytics rollups, maintained at ingest.
+
+``landing_rollup_hourly`` holds event counters per hour and
+(event_type, element, section, plan); ``landing_uniques`` holds
+HyperLogLog sketches of page-view visitors per hour, per day and for all
+time (``period`` = ``hour`` / ``day`` / ``all``).  A flushed batch is
+aggregated in Python first: one counter UPSERT per distinct row and one
+sketch UPSERT per touched sketch row, merged register-wise in SQL
+(``landing_hll_merge``) so concurrent workers never lose updates.  Rows
+are written in key order so two workers flushing at once cannot deadlock.
+The admin summary reads only these tables.
+
+``ensure()`` creates the tables and, the first time, backfills them from
+the raw events still in ``landing_events`` (plus day-level counters from
+``landing_events_daily``), so the summary keeps its history.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.infrastructure.repositories.hyperloglog import HyperLogLog
+
+ALL_TIME = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS landing_rollup_hourly (
+        hour        TIMESTAMPTZ  NOT NULL,
+        event_type  VARCHAR(30)  NOT NULL,
+        element     VARCHAR(100) NOT NULL DEFAULT '',
+        section     VARCHAR(50)  NOT NULL DEFAULT '',
+        plan        VARCHAR(20)  NOT NULL DEFAULT '',
+        events      BIGINT       NOT NULL DEFAULT 0,
+        scroll_25   BIGINT       NOT NULL DEFAULT 0,
+        scroll_50   BIGINT       NOT NULL DEFAULT 0,
+        scroll_75   BIGINT       NOT NULL DEFAULT 0,
+        scroll_100  BIGINT       NOT NULL DEFAULT 0,
+        PRIMARY KEY (hour, event_type, element, section, plan)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_landing_rollup_type_hour ON landing_rollup_hourly (event_type, hour)",
+    """
+    CREATE TABLE IF NOT EXISTS landing_uniques (
+        period        VARCHAR(4)  NOT NULL,
+        bucket_start  TIMESTAMPTZ NOT NULL,
+        sketch        BYTEA       NOT NULL,
+        PRIMARY KEY (period, bucket_start)
+    )
+    """,
+    # Register-wise max of two sketches (HyperLogLog union).
+    """
+    CREATE OR REPLACE FUNCTION landing_hll_merge(a BYTEA, b BYTEA) RETURNS BYTEA
+    LANGUAGE sql IMMUTABLE STRICT AS $$
+        SELECT string_agg(
+            set_byte('\\x00'::bytea, 0, GREATEST(get_byte(a, i), get_byte(b, i))),
+            ''::bytea ORDER BY i
+        )
+        FROM generate_series(0, length(a) - 1) AS i
+    $$
+    """,
+]
+
+# One counter row per event; ``events`` / scroll buckets add the excluded values
+# so the same statement also applies pre-aggregated batches.
+COUNT_SQL = text("""
+    INSERT INTO landing_rollup_hourly
+        (hour, event_type, element, section, plan, events,
+         scroll_25, scroll_50, scroll_75, scroll_100)
+    VALUES (:hour, :event_type, :element, :section, :plan, :events,
+            :scroll_25, :scroll_50, :scroll_75, :scroll_100)
+    ON CONFLICT (hour, event_type, element, section, plan) DO UPDATE
+    SET events     = landing_rollup_hourly.events + excluded.events,
+        scroll_25  = landing_rollup_hourly.scroll_25 + excluded.scroll_25,
+        scroll_50  = landing_rollup_hourly.scroll_50 + excluded.scroll_50,
+        scroll_75  = landing_rollup_hourly.scroll_75 + excluded.scroll_75,
+        scroll_100 = landing_rollup_hourly.scroll_100 + excluded.scroll_100
+""")
+
+# Merge a batch's sketch into one stored sketch row.
+UNIQUE_SQL = text("""
+    INSERT INTO landing_uniques (period, bucket_start, sketch)
+    VALUES (:period, :bucket_start, :sketch)
+    ON CONFLICT (period, bucket_start) DO UPDATE
+    SET sketch = landing_hll_merge(landing_uniques.sketch, excluded.sketch)
+""")
+
+
+def hour_of(at: datetime) -> datetime:
+    at = at.astimezone(timezone.utc) if at.tzinfo else at.replace(tzinfo=timezone.utc)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def day_of(at: datetime) -> datetime:
+    return hour_of(at).replace(hour=0)
+
+
+def sketch_keys(at: datetime) -> tuple:
+    """``(period, bucket_start)`` of the sketches a page view at ``at`` counts in."""
+    return ("hour", hour_of(at)), ("day", day_of(at)), ("all", ALL_TIME)
+
+
+def counter_params(event_type: str, at: datetime, element: str | None = None,
+                   section: str | None = None, plan: str | None = None,
+                   scroll_pct: int | None = None, events: int = 1) -> dict:
+    """``COUNT_SQL`` parameters for ``events`` events of one kind in one hour."""
+    scroll = scroll_pct if event_type == "scroll_depth" and scroll_pct is not None else -1
+    return {
+        "hour": hour_of(at),
+        "event_type": event_type,
+        "element": element or "",
+        "section": section or "",
+        "plan": plan or "",
+        "events": events,
+        **{f"scroll_{b}": events if scroll >= b else 0 for b in (25, 50, 75, 100)},
+    }
+
+
+# ---------------------------------------------------------------------------
+# Migration + one-off backfill
+# ---------------------------------------------------------------------------
+
+_BACKFILL_COUNTS = """
+    INSERT INTO landing_rollup_hourly
+        (hour, event_type, element, section, plan, events,
+         scroll_25, scroll_50, scroll_75, scroll_100)
+    SELECT {hour}, event_type, {element}, {section}, {plan}, {events},
+           {s25}, {s50}, {s75}, {s100}
+    FROM {source}
+    GROUP BY 1, 2, 3, 4, 5
+    ON CONFLICT (hour, event_type, element, section, plan) DO UPDATE
+    SET events     = landing_rollup_hourly.events + excluded.events,
+        scroll_25  = landing_rollup_hourly.scroll_25 + excluded.scroll_25,
+        scroll_50  = landing_rollup_hourly.scroll_50 + excluded.scroll_50,
+        scroll_75  = landing_rollup_hourly.scroll_75 + excluded.scroll_75,
+        scroll_100 = landing_rollup_hourly.scroll_100 + excluded.scroll_100
+"""
+
+BACKFILL_FROM_EVENTS = _BACKFILL_COUNTS.format(
+    hour="(date_trunc('hour', created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC')",
+    element="COALESCE(element, '')", section="COALESCE(section, '')", plan="COALESCE(plan, '')",
+    events="COUNT(*)",
+    s25="COUNT(*) FILTER (WHERE event_type = 'scroll_depth' AND scroll_pct >= 25)",
+    s50="COUNT(*) FILTER (WHERE event_type = 'scroll_depth' AND scroll_pct >= 50)",
+    s75="COUNT(*) FILTER (WHERE event_type = 'scroll_depth' AND scroll_pct >= 75)",
+    s100="COUNT(*) FILTER (WHERE event_type = 'scroll_depth' AND scroll_pct >= 100)",
+    source="landing_events",
+)
+
+# Months already rolled up by partition retention: day-level counts only.
+BACKFILL_FROM_DAILY = _BACKFILL_COUNTS.format(
+    hour="(day::timestamp AT TIME ZONE 'UTC')",
+    element="element", section="section", plan="plan", events="SUM(events)",
+    s25="SUM(scroll_25)", s50="SUM(scroll_50)", s75="SUM(scroll_75)", s100="SUM(scroll_100)",
+    source="landing_events_daily",
+)
+
+
+def ensure(engine) -> bool:
+    """Create the rollup tables; backfill them when first created. True if backfilled."""
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('garage.landing_rollups'))"))
+        fresh = conn.execute(text("SELECT to_regclass('landing_rollup_hourly') IS NULL")).scalar()
+        for ddl in DDL:
+            conn.execute(text(ddl))
+        if not fresh:
+            return False
+        backfill(conn)
+        return True
+
+
+def backfill(conn) -> None:
+    conn.execute(text(BACKFILL_FROM_EVENTS))
+    if conn.execute(text("SELECT to_regclass('landing_events_daily') IS NOT NULL")).scalar():
+        conn.execute(text(BACKFILL_FROM_DAILY))
+
+    sketches = defaultdict(HyperLogLog)
+    rows = conn.execute(
+        text("SELECT created_at, visitor_id FROM landing_events WHERE event_type = 'page_view'"),
+        execution_options={"stream_results": True},
+    )
+    for created_at, visitor_id in rows:
+        for key in sketch_keys(created_at):
+            sketches[key].add(visitor_id)
+    if sketches:
+        conn.execute(
+            text("INSERT INTO landing_uniques (period, bucket_start, sketch) "
+                 "VALUES (:period, :bucket_start, :sketch)"),
+            [{"period": period, "bucket_start": start, "sketch": hll.to_bytes()}
+             for (period, start), hll in sketches.items()],
+        )
+
+
+def summary_bounds(now: datetime) -> dict:
+    """Time bounds used by the admin summary (UTC hour / day aligned)."""
+    today = day_of(now)
+    return {"today": today, "week": hour_of(now - timedelta(days=7)), "all_time": ALL_TIME}
@@ -143,6 +143,8 @@ class GameSessionModel(Base):
     completed_regions = Column(ARRAY(String), nullable=False, default=list)
     current_region = Column(String(50), nullable=True)
     player_world_x = Column(Integer, nullable=False, default=100)
+    # Time of the buffered world-state save last written (orders cross-worker flushes)
+    world_state_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
     updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
 
@@ -170,6 +172,7 @@ class AttemptModel(Base):
     is_correct = Column(Boolean, nullable=False)
     points_awarded = Column(Integer, nullable=False, default=0)
     timestamp = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+    answer_ms = Column(Integer, nullable=True)  # client-measured time to answer
 
     session = relationship("GameSessionModel", back_populates="attempts")
 
@@ -208,6 +211,22 @@ class ChallengeModel(Base):
     options = Column(JSONB, nullable=False)
     mentor = Column(String(50), nullable=True)
     points_on_correct = Column(Integer, nullable=False, default=100)
+    # SHA-256 of the JSON source item -- lets seed_challenges diff instead of rewrite
+    content_hash = Column(String(64), nullable=True)
+    # Position in challenges.json (upserts must not reshuffle the catalog order)
+    sort_order = Column(Integer, nullable=True)
+
+
+# ---------------------------------------------------------------------------
+# Catalog versions (bumped by the seeder, used for cache invalidation)
+# ---------------------------------------------------------------------------
+
+class CatalogMetaModel(Base):
+    __tablename__ = "catalog_meta"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(String(64), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
 
 
 # ---------------------------------------------------------------------------
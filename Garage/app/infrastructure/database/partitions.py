@@ -0,0 +1,266 @@
+"""Monthly range partitions and daily rollups for the append-only event tables.
+
+``game_events`` and ``landing_events`` are partitioned by month on their
+timestamp column, so index maintenance only touches the current month and
+old history can be dropped a partition at a time instead of DELETEd.
+
+``maintain()`` is the migration step (run from ``create_tables`` and once
+per calendar month by a periodic task in main.py):
+
+  1. A plain table from an older deploy is converted once: it is renamed to
+     ``<table>_legacy``, a partitioned table with the same columns takes its
+     name, and the old table is attached as the partition holding everything
+     before next month (or dropped if it is empty).  Attaching validates and
+     indexes the old rows once, under the advisory lock.
+  2. Partitions are created ``months_ahead`` months in advance.
+  3. Partitions that ended before the retention window are summarised into
+     ``<table>_daily`` and dropped, in the same transaction.
+
+All steps are idempotent and serialised across workers by an advisory lock.
+"""
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+MONTHS_AHEAD = 2
+RETENTION_MONTHS = 6
+
+# (name, lower bound, upper bound); None is MINVALUE / MAXVALUE.
+Bounds = Tuple[str, Optional[datetime], Optional[datetime]]
+
+
+class PartitionedTable:
+    """An event table range-partitioned by month on ``column``."""
+
+    def __init__(self, name: str, column: str, indexes: List[str], rollup_sql: str):
+        self.name = name
+        self.column = column
+        self.indexes = indexes
+        self.rollup_sql = rollup_sql
+
+    def partition_name(self, month: datetime) -> str:
+        return f"{self.name}_p{month:%Y_%m}"
+
+
+GAME_EVENTS = PartitionedTable(
+    "game_events", "timestamp",
+    indexes=["(user_id)", "(session_id)", "(event_type)", '("timestamp")'],
+    rollup_sql="""
+        INSERT INTO game_events_daily (day, event_type, events, users)
+        SELECT ("timestamp" AT TIME ZONE 'UTC')::date, event_type,
+               COUNT(*), COUNT(DISTINCT user_id)
+        FROM {partition}
+        GROUP BY 1, 2
+        ON CONFLICT (day, event_type) DO UPDATE
+        SET events = game_events_daily.events + excluded.events,
+            users  = game_events_daily.users + excluded.users
+    """,
+)
+
+LANDING_EVENTS = PartitionedTable(
+    "landing_events", "created_at",
+    indexes=["(visitor_id)", "(event_type)", "(created_at DESC)"],
+    rollup_sql="""
+        INSERT INTO landing_events_daily
+            (day, event_type, element, section, plan, events, visitors,
+             scroll_25, scroll_50, scroll_75, scroll_100)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, event_type,
+               COALESCE(element, ''), COALESCE(section, ''), COALESCE(plan, ''),
+               COUNT(*), COUNT(DISTINCT visitor_id),
+               COUNT(*) FILTER (WHERE scroll_pct >= 25),
+               COUNT(*) FILTER (WHERE scroll_pct >= 50),
+               COUNT(*) FILTER (WHERE scroll_pct >= 75),
+               COUNT(*) FILTER (WHERE scroll_pct >= 100)
+        FROM {partition}
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (day, event_type, element, section, plan) DO UPDATE
+        SET events     = landing_events_daily.events + excluded.events,
+            visitors   = landing_events_daily.visitors + excluded.visitors,
+            scroll_25  = landing_events_daily.scroll_25 + excluded.scroll_25,
+            scroll_50  = landing_events_daily.scroll_50 + excluded.scroll_50,
+            scroll_75  = landing_events_daily.scroll_75 + excluded.scroll_75,
+            scroll_100 = landing_events_daily.scroll_100 + excluded.scroll_100
+    """,
+)
+
+TABLES = (GAME_EVENTS, LANDING_EVENTS)
+
+# Rollup tables (created with the other idempotent DDL in connection.py).
+ROLLUP_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS game_events_daily (
+        day         DATE        NOT NULL,
+        event_type  VARCHAR(50) NOT NULL,
+        events      BIGINT      NOT NULL DEFAULT 0,
+        users       BIGINT      NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, event_type)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS landing_events_daily (
+        day         DATE         NOT NULL,
+        event_type  VARCHAR(30)  NOT NULL,
+        element     VARCHAR(100) NOT NULL DEFAULT '',
+        section     VARCHAR(50)  NOT NULL DEFAULT '',
+        plan        VARCHAR(20)  NOT NULL DEFAULT '',
+        events      BIGINT       NOT NULL DEFAULT 0,
+        visitors    BIGINT       NOT NULL DEFAULT 0,
+        scroll_25   BIGINT       NOT NULL DEFAULT 0,
+        scroll_50   BIGINT       NOT NULL DEFAULT 0,
+        scroll_75   BIGINT       NOT NULL DEFAULT 0,
+        scroll_100  BIGINT       NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, event_type, element, section, plan)
+    )
+    """,
+]
+
+_BOUND_RE = re.compile(r"FROM \((MINVALUE|'[^']*')\) TO \((MAXVALUE|'[^']*')\)")
+
+
+# ---------------------------------------------------------------------------
+# Month arithmetic / planning (pure)
+# ---------------------------------------------------------------------------
+
+def month_start(at: datetime) -> datetime:
+    at = at.astimezone(timezone.utc) if at.tzinfo else at.replace(tzinfo=timezone.utc)
+    return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, n: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + n
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def parse_bound(expr: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """``pg_get_expr(relpartbound)`` of a range partition -> (lower, upper)."""
+    match = _BOUND_RE.search(expr or "")
+    if not match:
+        return None, None  # DEFAULT partition: treat as unbounded
+
+    def value(token: str) -> Optional[datetime]:
+        if token in ("MINVALUE", "MAXVALUE"):
+            return None
+        return datetime.fromisoformat(token.strip("'")).astimezone(timezone.utc)
+
+    return value(match.group(1)), value(match.group(2))
+
+
+def missing_months(spec: PartitionedTable, existing: List[Bounds], now: datetime,
+                   ahead: int = MONTHS_AHEAD) -> List[Bounds]:
+    """Monthly partitions from this month to ``ahead`` months on not yet covered."""
+    first = month_start(now)
+    wanted = []
+    for n in range(ahead + 1):
+        lo, hi = add_months(first, n), add_months(first, n + 1)
+        overlaps = any(
+            (plo is None or plo < hi) and (phi is None or phi > lo)
+            for _, plo, phi in existing
+        )
+        if not overlaps:
+            wanted.append((spec.partition_name(lo), lo, hi))
+    return wanted
+
+
+def expired(existing: List[Bounds], now: datetime,
+            retention_months: int = RETENTION_MONTHS) -> List[Bounds]:
+    """Partitions entirely older than the retention window (oldest first)."""
+    cutoff = add_months(month_start(now), -max(1, retention_months))
+    old = [b for b in existing if b[2] is not None and b[2] <= cutoff]
+    return sorted(old, key=lambda b: b[2])
+
+
+# ---------------------------------------------------------------------------
+# DDL (connection inside a transaction)
+# ---------------------------------------------------------------------------
+
+def _literal(at: datetime) -> str:
+    return f"'{at:%Y-%m-%d %H:%M:%S}+00'"
+
+
+def _relkind(conn, table: str) -> Optional[str]:
+    return conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table},
+    ).scalar()
+
+
+def partitions(conn, spec: PartitionedTable) -> List[Bounds]:
+    rows = conn.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:t)
+    """), {"t": spec.name}).fetchall()
+    return [(name, *parse_bound(expr)) for name, expr in rows]
+
+
+def ensure_partitioned(conn, spec: PartitionedTable, now: datetime) -> bool:
+    """Convert a plain ``spec.name`` table into a partitioned one. True if converted."""
+    if _relkind(conn, spec.name) != "r":
+        return False
+    legacy = f"{spec.name}_legacy"
+    conn.execute(text(f"ALTER TABLE {spec.name} RENAME TO {legacy}"))
+    seq = conn.execute(
+        text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": legacy},
+    ).scalar()
+    if seq:
+        # The sequence must outlive the legacy table (it may be dropped later).
+        conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY NONE"))
+    conn.execute(text(
+        f"CREATE TABLE {spec.name} (LIKE {legacy} INCLUDING DEFAULTS, "
+        f'PRIMARY KEY (id, "{spec.column}")) PARTITION BY RANGE ("{spec.column}")'
+    ))
+    for columns in spec.indexes:
+        conn.execute(text(f"CREATE INDEX ON {spec.name} {columns}"))
+    if seq:
+        conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY {spec.name}.id"))
+    if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {legacy})")).scalar():
+        upper = add_months(month_start(now), 1)
+        conn.execute(text(
+            f"ALTER TABLE {spec.name} ATTACH PARTITION {legacy} "
+            f"FOR VALUES FROM (MINVALUE) TO ({_literal(upper)})"
+        ))
+    else:
+        conn.execute(text(f"DROP TABLE {legacy}"))
+    return True
+
+
+def create_partitions(conn, spec: PartitionedTable, now: datetime,
+                      ahead: int = MONTHS_AHEAD) -> List[str]:
+    created = []
+    for name, lo, hi in missing_months(spec, partitions(conn, spec), now, ahead):
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {spec.name} "
+            f"FOR VALUES FROM ({_literal(lo)}) TO ({_literal(hi)})"
+        ))
+        created.append(name)
+    return created
+
+
+def roll_up_expired(conn, spec: PartitionedTable, now: datetime,
+                    retention_months: int = RETENTION_MONTHS) -> List[str]:
+    """Summarise expired partitions into ``<table>_daily`` and drop them."""
+    dropped = []
+    for name, _, _ in expired(partitions(conn, spec), now, retention_months):
+        conn.execute(text(spec.rollup_sql.format(partition=name)))
+        conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+def maintain(engine, now: Optional[datetime] = None, months_ahead: int = MONTHS_AHEAD,
+             retention_months: int = RETENTION_MONTHS) -> None:
+    """Convert / create / roll up partitions for every event table (idempotent)."""
+    now = now or datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('garage.partitions'))"))
+        for spec in TABLES:
+            if ensure_partitioned(conn, spec, now):
+                print(f"[GARAGE] {spec.name} converted to monthly partitions.")
+            if _relkind(conn, spec.name) != "p":
+                continue
+            created = create_partitions(conn, spec, now, months_ahead)
+            dropped = roll_up_expired(conn, spec, now, retention_months)
+            if created or dropped:
+                print(f"[GARAGE] {spec.name} partitions: +{len(created)} created, "
+                      f"{len(dropped)} rolled up and dropped.")
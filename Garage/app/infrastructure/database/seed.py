@@ -1,17 +1,74 @@
-"""Seed challenge data from JSON into PostgreSQL."""
+"""Seed challenge data from JSON into PostgreSQL.
+
+Incremental: each challenge is hashed and compared with the hash stored on
+its row, so only new or edited challenges are written (one bulk upsert) and
+ids that disappeared from the JSON are deleted.  The resulting catalog
+version is recorded in ``catalog_meta`` for cache invalidation.
+"""
+import hashlib
 import json
 import os
 
-from app.infrastructure.database.models import ChallengeModel
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.infrastructure.database.models import ChallengeModel, CatalogMetaModel
+
+CHALLENGE_CATALOG = "challenges"
+
+
+def content_hash(item: dict) -> str:
+    """Stable SHA-256 of one challenge as it appears in the JSON file."""
+    canonical = json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def challenge_row(item: dict, position: int) -> dict:
+    """Map a JSON challenge to a ``challenges`` row (column -> value)."""
+    return {
+        "id": item["id"],
+        "title": item["title"],
+        "description": item["description"],
+        "context_code": item.get("context_code"),
+        "category": item["category"],
+        "required_stage": item["required_stage"],
+        "region": item["region"],
+        "options": item["options"],  # stored as JSONB
+        "mentor": item.get("mentor"),
+        "points_on_correct": item.get("points_on_correct", 100),
+        "content_hash": content_hash(item),
+        "sort_order": position,
+    }
+
+
+def catalog_version(rows: list) -> str:
+    """Version of the whole catalog: hash of the ordered (id, content_hash) list."""
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(f"{row['id']}:{row['content_hash']}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def plan_seed(rows: list, existing: dict) -> tuple:
+    """Diff JSON rows against ``{id: (content_hash, sort_order)}`` from the DB.
+
+    Returns ``(rows_to_upsert, ids_to_delete)``.
+    """
+    upserts = [
+        r for r in rows
+        if existing.get(r["id"]) != (r["content_hash"], r["sort_order"])
+    ]
+    wanted = {r["id"] for r in rows}
+    removed = sorted(cid for cid in existing if cid not in wanted)
+    return upserts, removed
 
 
 def seed_challenges(session_factory, json_path: str) -> int:
-    """Load challenges from a JSON file into the challenges table.
+    """Bring the challenges table in line with the JSON file.
 
-    Seeds when empty OR when DB count differs from JSON count (stale data
-    detection). Truncates and re-seeds on mismatch so enum schema changes
-    applied after initial deploy are always reflected.
-    Returns the number of rows seeded (0 if already up-to-date).
+    One SELECT of (id, hash) pairs, then at most one multi-row upsert, one
+    DELETE and one version write -- nothing at all when the table is current.
+    Returns the number of rows upserted (0 if already up-to-date).
     """
     if not os.path.exists(json_path):
         return 0
@@ -19,40 +76,40 @@ def seed_challenges(session_factory, json_path: str) -> int:
     with open(json_path, "r", encoding="utf-8") as f:
         raw = json.load(f)
 
-    json_count = len(raw)
+    rows = [challenge_row(item, i) for i, item in enumerate(raw)]
+    version = catalog_version(rows)
 
     with session_factory() as session:
-        existing = session.query(ChallengeModel).count()
+        existing = {
+            cid: (h, pos)
+            for cid, h, pos in session.execute(
+                select(ChallengeModel.id, ChallengeModel.content_hash, ChallengeModel.sort_order)
+            )
+        }
+        stored_version = session.execute(
+            select(CatalogMetaModel.version).where(CatalogMetaModel.name == CHALLENGE_CATALOG)
+        ).scalar()
 
-        if existing == json_count:
-            # Counts match: assume data is current, skip re-seed.
+        upserts, removed = plan_seed(rows, existing)
+        if not upserts and not removed and stored_version == version:
             return 0
 
-        # Count mismatch (includes empty table): truncate and re-seed.
-        if existing > 0:
-            print(
-                f"[GARAGE][SEED] DB has {existing} challenges, JSON has "
-                f"{json_count}. Truncating and re-seeding."
+        if upserts:
+            stmt = pg_insert(ChallengeModel).values(upserts)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ChallengeModel.id],
+                set_={col: stmt.excluded[col] for col in upserts[0] if col != "id"},
             )
-            session.query(ChallengeModel).delete()
-            session.commit()
-
-        count = 0
-        for item in raw:
-            model = ChallengeModel(
-                id=item["id"],
-                title=item["title"],
-                description=item["description"],
-                context_code=item.get("context_code"),
-                category=item["category"],
-                required_stage=item["required_stage"],
-                region=item["region"],
-                options=item["options"],  # stored as JSONB
-                mentor=item.get("mentor"),
-                points_on_correct=item.get("points_on_correct", 100),
-            )
-            session.add(model)
-            count += 1
+            session.execute(stmt)
+
+        if removed:
+            session.execute(delete(ChallengeModel).where(ChallengeModel.id.in_(removed)))
+            print(f"[GARAGE][SEED] Removed {len(removed)} challenges no longer in JSON.")
 
+        meta = pg_insert(CatalogMetaModel).values(name=CHALLENGE_CATALOG, version=version)
+        session.execute(meta.on_conflict_do_update(
+            index_elements=[CatalogMetaModel.name],
+            set_={"version": meta.excluded.version, "updated_at": meta.excluded.updated_at},
+        ))
         session.commit()
-        return count
+        return len(upserts)
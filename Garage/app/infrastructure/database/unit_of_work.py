@@ -0,0 +1,217 @@
+"""Request-scoped unit of work: one connection and one transaction per request.
+
+``request_unit_of_work`` (a FastAPI dependency) publishes a ``UnitOfWork``
+in a ContextVar for the duration of the endpoint.  While it is active the
+session factories (``DynamicSessionFactory`` and the async one) hand every
+repository block the same session, checked out on first use, wrapped so
+that the repositories' own ``commit()`` only flushes and ``close()`` does
+nothing.  The dependency commits once when the endpoint returns (before the
+response is sent) and rolls back if it raised, so a request touching
+several repositories costs one pool checkout and is atomic.
+
+Failures inside a block roll the transaction back.  If earlier blocks had
+already written, the unit of work is aborted: later blocks and the final
+commit re-raise the error instead of committing half a request.  A failed
+read with nothing written before it just starts a fresh transaction, so
+fail-open lookups keep working.
+
+Sync and async repositories use separate connections (psycopg2 vs
+asyncpg); each kind is shared and committed at the end, and a route is
+expected to use one kind.  Code outside a request (background flushers,
+startup) sees no unit of work and behaves as before.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+_current: ContextVar[Optional["UnitOfWork"]] = ContextVar("unit_of_work", default=None)
+
+
+def current_unit_of_work() -> Optional["UnitOfWork"]:
+    return _current.get()
+
+
+@contextmanager
+def detached():
+    """Run the block outside the request's unit of work (own session and commit).
+
+    For shared-state maintenance (cache refreshes) that happens to be
+    triggered by a request but must not see or join its transaction.
+    """
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def after_commit(fn: Callable[[], object]) -> None:
+    """Run ``fn`` once the request's transaction committed (now if there is none).
+
+    For in-memory side effects that must not outlive a rolled-back write.
+    """
+    uow = _current.get()
+    if uow is None:
+        fn()
+    else:
+        uow.after_commit.append(fn)
+
+
+def on_rollback(fn: Callable[[], object]) -> None:
+    """Run ``fn`` if the request's transaction is rolled back (never without one)."""
+    uow = _current.get()
+    if uow is not None:
+        uow.on_rollback.append(fn)
+
+
+class _SharedSession:
+    """A repository's view of the shared session: commit flushes, close is a no-op."""
+
+    def __init__(self, uow: "UnitOfWork", session):
+        self._uow = uow
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def commit(self) -> None:
+        self._session.flush()
+        self._uow.wrote = True
+
+    def rollback(self) -> None:
+        self._uow.abort()
+
+    def close(self) -> None:
+        pass
+
+
+class _AsyncSharedSession(_SharedSession):
+    async def commit(self) -> None:
+        await self._session.flush()
+        self._uow.wrote = True
+
+    async def rollback(self) -> None:
+        await self._uow.abort_async()
+
+    async def close(self) -> None:
+        pass
+
+
+class UnitOfWork:
+    """The shared sessions of one request and what to do when it ends."""
+
+    def __init__(self):
+        self.session = None         # sync Session, opened on first use
+        self.async_session = None   # AsyncSession, opened on first use
+        self.wrote = False          # a block committed (flushed) writes
+        self.error: Optional[BaseException] = None
+        self.checkouts = 0
+        self.after_commit: list = []
+        self.on_rollback: list = []
+
+    # -- joining ---------------------------------------------------------
+
+    def session_from(self, sessionmaker) -> _SharedSession:
+        """The shared sync session (opened from ``sessionmaker`` on first use)."""
+        if self.error is not None:
+            raise self.error
+        if self.session is None:
+            self.session = sessionmaker()
+            self.checkouts += 1
+        return _SharedSession(self, self.session)
+
+    def async_session_from(self, sessionmaker) -> _AsyncSharedSession:
+        if self.error is not None:
+            raise self.error
+        if self.async_session is None:
+            self.async_session = sessionmaker()
+            self.checkouts += 1
+        return _AsyncSharedSession(self, self.async_session)
+
+    # -- failures inside a block -----------------------------------------
+
+    def abort(self, exc: Optional[BaseException] = None) -> None:
+        """A sync block failed: roll back; poison the unit of work if writes are lost."""
+        session, self.session = self.session, None
+        self._discard(session)
+        self._poison(exc)
+
+    async def abort_async(self, exc: Optional[BaseException] = None) -> None:
+        session, self.async_session = self.async_session, None
+        if session is not None:
+            try:
+                await session.rollback()
+                await session.close()
+            except Exception:
+                pass
+        self._poison(exc)
+
+    def _poison(self, exc: Optional[BaseException]) -> None:
+        if self.wrote and self.error is None:
+            self.error = exc or RuntimeError("unit of work rolled back after a failed write")
+
+    @staticmethod
+    def _discard(session) -> None:
+        if session is None:
+            return
+        try:
+            session.rollback()
+            session.close()
+        except Exception:
+            pass
+
+    # -- end of request --------------------------------------------------
+
+    async def commit(self) -> None:
+        """Commit both sessions (raises the abort error instead, after rolling back)."""
+        if self.error is not None:
+            await self.rollback()
+            raise self.error
+        try:
+            if self.session is not None:
+                await run_in_threadpool(self.session.commit)
+            if self.async_session is not None:
+                await self.async_session.commit()
+        except BaseException:
+            await self.rollback()
+            raise
+        callbacks, self.after_commit = self.after_commit, []
+        for fn in callbacks:
+            fn()
+
+    async def rollback(self) -> None:
+        if self.session is not None:
+            await run_in_threadpool(self._discard, self.session)
+            self.session = None
+        if self.async_session is not None:
+            await self.abort_async()
+        self.after_commit = []
+        callbacks, self.on_rollback = self.on_rollback, []
+        for fn in callbacks:
+            fn()
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await run_in_threadpool(self.session.close)
+            self.session = None
+        if self.async_session is not None:
+            await self.async_session.close()
+            self.async_session = None
+
+
+async def request_unit_of_work():
+    """FastAPI dependency (use with ``scope="function"``): one unit of work per request."""
+    uow = UnitOfWork()
+    token = _current.set(uow)
+    try:
+        yield uow
+    except BaseException:
+        await uow.rollback()
+        raise
+    else:
+        await uow.commit()
+    finally:
+        _current.reset(token)
+        await uow.close()
@@ -0,0 +1,26 @@
+"""Attributes database work (query count, DB time, pool checkouts) to routes.
+
+A pure ASGI middleware: it opens a ``RequestStats`` in a ContextVar before
+the request runs, so the SQLAlchemy hooks in ``database.instrumentation``
+(including those firing in threadpool workers, which inherit the context)
+count into it.  Statements are keyed by the route's path template
+(``/api/session/{session_id}``, not the concrete URL), which the router
+leaves in ``scope["route"]``; once the response is sent the request's
+totals are folded into that route's aggregates.
+"""
+from app.infrastructure.database import instrumentation
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = instrumentation.begin_request(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            instrumentation.end_request(token)
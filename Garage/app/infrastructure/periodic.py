@@ -0,0 +1,63 @@
+"""Tiny periodic background runner (one daemon thread per task, per worker).
+
+Used for write-behind flushes: the callable runs every ``interval`` seconds,
+errors are logged and never kill the thread, and ``stop()`` runs it one last
+time so buffered writes survive a graceful shutdown.  ``wake()`` runs it
+early (e.g. when a buffer fills up before the next tick).
+"""
+import threading
+from typing import Callable
+
+
+class PeriodicTask:
+    """Run ``fn`` every ``interval`` seconds on a daemon thread."""
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], object]):
+        self._name = name
+        self._interval = interval
+        self._fn = fn
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the thread (idempotent)."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"garage-{self._name}", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the thread and run ``fn`` a final time (drains buffers)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.run_once()
+
+    def wake(self) -> None:
+        """Run ``fn`` now instead of at the next tick (no-op when stopped)."""
+        self._wake.set()
+
+    def run_once(self) -> None:
+        try:
+            self._fn()
+        except Exception as exc:
+            print(f"[GARAGE][WARN] {self._name} failed: {type(exc).__name__}: {exc}")
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            self.run_once()
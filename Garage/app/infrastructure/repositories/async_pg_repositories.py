@@ -0,0 +1,159 @@
+"""Awaitable views of the repositories, used by the ``async def`` hot routes.
+
+``ThreadedRepository`` wraps any repository: every method becomes a
+coroutine that runs the sync method in the threadpool.  The ``AsyncPg*``
+twins subclass it and override the hot-path methods with native asyncpg
+queries (via ``async_connection.async_session_factory``), built from the
+same SQLAlchemy statements as the sync repositories so both stay in step.
+They share the sync repository's in-memory state (owner cache, presence
+registry, world-state buffer, leaderboard index, challenge catalog); paths
+that never touch the database are answered without leaving the event loop.
+Everything not overridden falls back to the threadpool.
+"""
+import functools
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.domain.player import Player
+from app.domain.user import User
+from app.infrastructure.database.models import UserModel
+from app.infrastructure.database.unit_of_work import on_rollback
+from app.infrastructure.repositories.pg_player_repository import _OWNER_SQL
+
+
+class ThreadedRepository:
+    """Awaitable view of a sync repository: each method runs in the threadpool."""
+
+    def __init__(self, repo):
+        self.repo = repo
+
+    def __getattr__(self, name):
+        attr = getattr(self.repo, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await run_in_threadpool(attr, *args, **kwargs)
+
+        return call
+
+
+class AsyncPgPlayerRepository(ThreadedRepository):
+    """Native async load/save for ``PgPlayerRepository``."""
+
+    def __init__(self, repo, session_factory):
+        super().__init__(repo)
+        self._sf = session_factory
+
+    async def get(self, player_id: str, with_attempts: bool = True) -> Optional[Player]:
+        repo = self.repo
+        pending = repo._world_state.pop(player_id)
+        async with self._sf() as session:
+            if pending:
+                try:
+                    await session.execute(repo._world_state_statement({player_id: pending}))
+                    await session.commit()
+                except Exception:
+                    repo._world_state.restore({player_id: pending})
+                    raise
+                on_rollback(lambda: repo._world_state.restore({player_id: pending}))
+            result = await session.execute(repo._load_statement(player_id, with_attempts))
+            return repo._loaded(result, with_attempts)
+
+    async def save(self, player: Player) -> None:
+        statements = self.repo._save_statements(player)
+        if not statements:
+            return
+        async with self._sf() as session:
+            for stmt in statements:
+                await session.execute(stmt)
+            await session.commit()
+        player.mark_persisted()
+
+    async def get_owner(self, session_id: str) -> Optional[str]:
+        repo = self.repo
+        owner = repo._owners.get(session_id)
+        if owner is not None:
+            return owner
+        async with self._sf() as session:
+            row = (await session.execute(_OWNER_SQL, {"sid": session_id})).first()
+        return repo._remember_owner(session_id, row)
+
+    async def touch_timestamp(self, session_id: str) -> bool:
+        if await self.get_owner(session_id) is None:
+            return False
+        self.repo._presence.beat(session_id)
+        return True
+
+    async def buffer_world_state(self, session_id: str, patch: dict) -> None:
+        self.repo.buffer_world_state(session_id, patch)
+
+
+class AsyncPgUserRepository(ThreadedRepository):
+    """Native async primary-key reads for ``PgUserRepository``."""
+
+    def __init__(self, repo, session_factory):
+        super().__init__(repo)
+        self._sf = session_factory
+
+    async def find_by_id(self, user_id: str) -> Optional[User]:
+        async with self._sf() as session:
+            row = await session.get(UserModel, user_id)
+            return self.repo._to_domain(row) if row else None
+
+    async def get_subscription_status(self, user_id: str) -> dict:
+        async with self._sf() as session:
+            return self.repo._subscription_dict(await session.get(UserModel, user_id))
+
+
+class AsyncPgChallengeRepository(ThreadedRepository):
+    """Catalog reads straight from the in-process snapshot once it is loaded."""
+
+    def _loaded(self):
+        return self.repo._catalog is not None
+
+    async def get_by_id(self, challenge_id: str):
+        if self._loaded():
+            return self.repo.get_by_id(challenge_id)
+        return await run_in_threadpool(self.repo.get_by_id, challenge_id)
+
+    async def get_all(self) -> List:
+        if self._loaded():
+            return self.repo.get_all()
+        return await run_in_threadpool(self.repo.get_all)
+
+    async def get_by_stage(self, stage) -> List:
+        if self._loaded():
+            return self.repo.get_by_stage(stage)
+        return await run_in_threadpool(self.repo.get_by_stage, stage)
+
+
+class AsyncPgLeaderboardRepository(ThreadedRepository):
+    """Reads from the in-memory index while it needs no sync.
+
+    Submits only happen on the sync ``/reset`` path, so there is no async
+    insert here.
+    """
+
+    async def get_top(self, limit: int = 10, **kwargs) -> List[dict]:
+        if self.repo.is_fresh():
+            return self.repo.get_top(limit, **kwargs)
+        return await run_in_threadpool(self.repo.get_top, limit, **kwargs)
+
+
+class AsyncMetricsService(ThreadedRepository):
+    """Native async ``apply_all`` for ``MetricsService``."""
+
+    def __init__(self, service, session_factory):
+        super().__init__(service)
+        self._sf = session_factory
+
+    async def apply_all(self, pending: dict) -> None:
+        if not pending:
+            return
+        async with self._sf() as session:
+            for uid, delta in pending.items():
+                await session.execute(delta.statement(uid))
+            await session.commit()
@@ -0,0 +1,131 @@
+"""Immutable, indexed in-process snapshot of the challenge catalog.
+
+The 75 challenges only change when ``seed_challenges`` runs, so repositories
+load them once, index them by id / stage / region and answer every read from
+memory.  A new snapshot is built on explicit reload or version bump; readers
+always see either the old or the new snapshot, never a partial one.
+
+The snapshot also carries the player-facing JSON bodies (all, per stage,
+per id) already encoded and gzipped, each with a strong content-hash ETag,
+so the public endpoints never re-serialize or re-compress them.  The map
+body depends only on ``MapConfig`` and is prepared once at import
+(``MAP_BODY``), independent of any catalog load.
+"""
+import gzip
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Iterable, List, NamedTuple
+
+from app.domain.challenge import Challenge
+from app.domain.enums import CareerStage, MapRegion
+from app.domain.scoring import MapConfig
+
+
+class PreparedBody(NamedTuple):
+    """A JSON response body encoded once: identity + gzip bytes and their ETags."""
+    raw: bytes
+    gzipped: bytes
+    etag: str
+    gzip_etag: str
+
+
+def prepare_json(content) -> PreparedBody:
+    """Encode ``content`` exactly like FastAPI's JSONResponse and precompress it."""
+    raw = json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+    ).encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()[:32]
+    return PreparedBody(
+        raw=raw,
+        # mtime=0 keeps the gzip bytes deterministic across workers and restarts.
+        gzipped=gzip.compress(raw, compresslevel=9, mtime=0),
+        etag=f'"{digest}"',
+        # A strong validator must differ per content-coding (RFC 9110 8.8.3).
+        gzip_etag=f'"{digest}-gz"',
+    )
+
+
+MAP_BODY = prepare_json({
+    "regions": MapConfig.REGION_STAGE_MAP,
+    "bosses": MapConfig.BOSS_ARCHETYPES,
+    "mentors": MapConfig.MENTOR_ARCHETYPES,
+})
+
+
+def _fingerprint(challenges: Iterable[Challenge]) -> str:
+    """Content hash of the catalog -- used as version when none is supplied."""
+    digest = hashlib.sha256()
+    for c in challenges:
+        digest.update(json.dumps(
+            {
+                **c.to_dict_for_player(),
+                "required_stage": c.required_stage.value,
+                "correct_index": c.correct_index,
+                "points_on_correct": c.points_on_correct,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        ).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ChallengeCatalog:
+    """Read-only view over a fixed set of challenges. Never mutated after init."""
+
+    def __init__(self, challenges: Iterable[Challenge], version: str | None = None):
+        ordered = tuple(challenges)
+        by_stage: dict = {}
+        by_region: dict = {}
+        for c in ordered:
+            by_stage.setdefault(c.required_stage, []).append(c)
+            by_region.setdefault(c.region, []).append(c)
+
+        self._challenges = ordered
+        self._by_id = MappingProxyType({c.id: c for c in ordered})
+        self._by_stage = MappingProxyType({k: tuple(v) for k, v in by_stage.items()})
+        self._by_region = MappingProxyType({k: tuple(v) for k, v in by_region.items()})
+        self._version = version or _fingerprint(ordered)
+
+        # Pre-serialized player-facing bodies (never expose correct answers).
+        self._body_all = prepare_json([c.to_dict_for_player() for c in ordered])
+        self._body_by_stage = MappingProxyType({
+            stage: prepare_json([c.to_dict_for_player() for c in by_stage.get(stage, ())])
+            for stage in CareerStage
+        })
+        self._body_by_id = MappingProxyType({
+            c.id: prepare_json(c.to_dict_for_player()) for c in ordered
+        })
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._challenges)
+
+    def all(self) -> List[Challenge]:
+        return list(self._challenges)
+
+    def get(self, challenge_id: str) -> Challenge | None:
+        return self._by_id.get(challenge_id)
+
+    def by_stage(self, stage: CareerStage) -> List[Challenge]:
+        return list(self._by_stage.get(stage, ()))
+
+    def by_region(self, region: MapRegion) -> List[Challenge]:
+        return list(self._by_region.get(region, ()))
+
+    # --- Pre-serialized bodies ---
+
+    def body_all(self) -> PreparedBody:
+        return self._body_all
+
+    def body_for_stage(self, stage: CareerStage) -> PreparedBody:
+        return self._body_by_stage[stage]
+
+    def body_for_id(self, challenge_id: str) -> PreparedBody | None:
+        return self._body_by_id.get(challenge_id)
+
+    def body_map(self) -> PreparedBody:
+        return MAP_BODY
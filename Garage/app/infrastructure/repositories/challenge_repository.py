@@ -5,6 +5,7 @@ from typing import List
 
 from app.domain.challenge import Challenge, ChallengeOption
 from app.domain.enums import ChallengeCategory, CareerStage, MapRegion
+from app.infrastructure.repositories.challenge_catalog import ChallengeCatalog
 
 
 class ChallengeRepository:
@@ -12,18 +13,27 @@ class ChallengeRepository:
 
     def __init__(self, data_path: str):
         self._data_path = data_path
-        self._challenges: List[Challenge] = []
+        self._catalog = ChallengeCatalog([])
         self._load()
 
+    @property
+    def catalog(self) -> ChallengeCatalog:
+        return self._catalog
+
+    def reload(self) -> ChallengeCatalog:
+        """Re-read the JSON file and swap in a fresh catalog snapshot."""
+        self._load()
+        return self._catalog
+
     def _load(self) -> None:
         if not os.path.exists(self._data_path):
-            self._challenges = []
+            self._catalog = ChallengeCatalog([])
             return
 
         with open(self._data_path, "r", encoding="utf-8") as f:
             raw = json.load(f)
 
-        self._challenges = []
+        challenges: List[Challenge] = []
         for item in raw:
             options = [
                 ChallengeOption(
@@ -45,19 +55,17 @@ class ChallengeRepository:
                 mentor_name=item.get("mentor"),
                 points_on_correct=item.get("points_on_correct", 100),
             )
-            self._challenges.append(challenge)
+            challenges.append(challenge)
+        self._catalog = ChallengeCatalog(challenges)
 
     def get_all(self) -> List[Challenge]:
-        return list(self._challenges)
+        return self._catalog.all()
 
     def get_by_id(self, challenge_id: str) -> Challenge | None:
-        for c in self._challenges:
-            if c.id == challenge_id:
-                return c
-        return None
+        return self._catalog.get(challenge_id)
 
     def get_by_stage(self, stage: CareerStage) -> List[Challenge]:
-        return [c for c in self._challenges if c.required_stage == stage]
+        return self._catalog.by_stage(stage)
 
     def get_by_region(self, region: MapRegion) -> List[Challenge]:
-        return [c for c in self._challenges if c.region == region]
+        return self._catalog.by_region(region)
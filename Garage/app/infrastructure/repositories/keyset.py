@@ -0,0 +1,42 @@
+"""Opaque cursors for keyset-paginated listings.
+
+A cursor is the sort key of the last row of a page, JSON-encoded and
+base64url'd so clients treat it as an opaque token.  Repositories decode it
+back into the ``WHERE (sort key) < (cursor)`` bound of the next page, so
+every page costs the same no matter how deep the client has scrolled.
+"""
+import base64
+import binascii
+import json
+from typing import Callable, List, Optional
+
+
+def encode_cursor(key: dict) -> str:
+    raw = json.dumps(key, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[dict]:
+    """Decode a cursor; None passes through, garbage raises ValueError."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(key, dict):
+        raise ValueError("invalid cursor")
+    return key
+
+
+def make_page(rows: List[dict], limit: int, key: Callable[[dict], dict],
+              total_estimate: Optional[int] = None) -> dict:
+    """Build a page from ``limit + 1`` fetched rows (the extra row means "more")."""
+    items = rows[:limit]
+    has_more = len(rows) > limit and bool(items)
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(key(items[-1])) if has_more else None,
+        "total_estimate": total_estimate,
+    }
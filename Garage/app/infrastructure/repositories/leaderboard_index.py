@@ -0,0 +1,225 @@
+"""In-memory order-statistic index over leaderboard entries (per worker).
+
+Entries are bucketed by score and a Fenwick tree counts entries per score,
+so "how many entries beat this score" is O(log max_score) instead of a
+``COUNT(*)`` over the table, and the top N is read straight off the highest
+buckets.  Ties keep arrival order (earlier entry ranks first).  A Fenwick
+descent finds the entry at any rank, which serves "rank around me" windows
+and each user's best entry without touching the table.  Buckets are
+append-only, so each entry records its position in its bucket when added
+and a user's rank is O(log max_score) however large the bucket.  The owning
+repository warms the index from the table and resyncs it periodically so
+entries written by other workers show up.
+"""
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# Fields returned by the public leaderboard.
+PUBLIC_FIELDS = ("player_name", "score", "stage", "language", "timestamp")
+
+# Index bookkeeping stored on each entry: score bucket and position in it.
+_BOOKKEEPING = ("_key", "_pos")
+
+
+class _Fenwick:
+    """Binary indexed tree of counts over positions 0..size-1."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0] * (size + 1)
+
+    def add(self, pos: int, delta: int) -> None:
+        i = pos + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, pos: int) -> int:
+        """Sum of counts at positions 0..pos (inclusive)."""
+        total = 0
+        i = min(pos, self.size - 1) + 1
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def lower_bound(self, target: int) -> int:
+        """Smallest position whose prefix sum reaches ``target`` (>= 1)."""
+        pos = 0
+        step = 1 << (self.size.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self._tree[nxt] < target:
+                pos = nxt
+                target -= self._tree[nxt]
+            step >>= 1
+        return pos  # 0-based position == number of slots skipped
+
+
+class LeaderboardIndex:
+    """Score-ordered leaderboard entries with O(log n) rank lookups."""
+
+    def __init__(self, initial_max_score: int = 4096):
+        self._lock = threading.Lock()
+        self._initial = max(1, initial_max_score)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._tree = _Fenwick(self._initial)
+        self._buckets: Dict[int, List[dict]] = {}
+        self._scores: List[int] = []  # distinct scores, ascending
+        self._ids: set = set()
+        self._best_by_user: Dict[str, dict] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def load(self, entries: Iterable[dict]) -> None:
+        """Replace the whole index (``entries`` in any order)."""
+        with self._lock:
+            self._reset()
+            for entry in sorted(entries, key=lambda e: e.get("id") or 0):
+                self._add(entry)
+
+    def add(self, entry: dict) -> bool:
+        """Add one entry; entries already indexed (same id) are ignored."""
+        with self._lock:
+            return self._add(entry)
+
+    def rank_of(self, score: int) -> int:
+        """1-based rank a new entry with ``score`` would get (ties share it)."""
+        with self._lock:
+            return self._higher_than(score) + 1
+
+    def user_best(self, user_id: str) -> Optional[dict]:
+        """The user's best entry with its current ``rank`` (None if absent)."""
+        with self._lock:
+            entry = self._best_by_user.get(user_id)
+            if entry is None:
+                return None
+            score = entry["_key"]
+            rank = self._higher_than(score) + entry["_pos"] + 1
+            return {**_public(entry), "rank": rank}
+
+    def window(self, rank: int, above: int, below: int) -> List[dict]:
+        """Entries ranked ``rank - above`` .. ``rank + below``, each with ``rank``."""
+        with self._lock:
+            first = max(1, rank - above)
+            last = min(self._size, rank + below)
+            if first > last:
+                return []
+            # Locate the bucket holding rank ``first``; ranks count from the top
+            # while the tree is cumulative from the lowest score.
+            score = self._tree.lower_bound(self._size - first + 1)
+            offset = first - self._higher_than(score) - 1
+            i = bisect.bisect_left(self._scores, score)
+            result: List[dict] = []
+            current = first
+            while i >= 0 and current <= last:
+                bucket = self._buckets[self._scores[i]]
+                for entry in bucket[offset:]:
+                    if current > last:
+                        break
+                    result.append({**_public(entry), "rank": current})
+                    current += 1
+                offset = 0
+                i -= 1
+            return result
+
+    def top(self, limit: int) -> List[dict]:
+        """The best ``limit`` entries, public fields only."""
+        result: List[dict] = []
+        with self._lock:
+            for score in reversed(self._scores):
+                for entry in self._buckets[score]:
+                    if len(result) >= limit:
+                        return result
+                    result.append(_public(entry))
+        return result
+
+    def entries(self) -> List[dict]:
+        """Every entry in rank order (full records, without index bookkeeping)."""
+        with self._lock:
+            return [
+                {k: v for k, v in entry.items() if k not in _BOOKKEEPING}
+                for score in reversed(self._scores)
+                for entry in self._buckets[score]
+            ]
+
+    # -- internals (lock held) ---------------------------------------------
+
+    def _add(self, entry: dict) -> bool:
+        entry_id = entry.get("id")
+        if entry_id is not None:
+            if entry_id in self._ids:
+                return False
+            self._ids.add(entry_id)
+        # Scores are never negative in practice; clamp so every entry has a slot.
+        score = max(int(entry["score"]), 0)
+        entry["_key"] = score
+        self._grow(score)
+        bucket = self._buckets.get(score)
+        if bucket is None:
+            bucket = self._buckets[score] = []
+            bisect.insort(self._scores, score)
+        entry["_pos"] = len(bucket)
+        bucket.append(entry)
+        self._tree.add(score, 1)
+        self._size += 1
+        user_id = entry.get("user_id")
+        if user_id:
+            best = self._best_by_user.get(user_id)
+            if best is None or score > best["_key"]:
+                self._best_by_user[user_id] = entry
+        return True
+
+    def _grow(self, score: int) -> None:
+        """Double the tree until ``score`` fits, re-adding existing counts."""
+        if score < self._tree.size:
+            return
+        size = self._tree.size
+        while size <= score:
+            size *= 2
+        self._tree = _Fenwick(size)
+        for s, bucket in self._buckets.items():
+            self._tree.add(s, len(bucket))
+
+    def _higher_than(self, score: int) -> int:
+        return self._size - self._tree.prefix(max(score, 0))
+
+
+def _public(entry: dict) -> dict:
+    return {k: entry.get(k) for k in PUBLIC_FIELDS}
+
+
+def entry_dict(row) -> dict:
+    """Index entry from a ``leaderboard_entries`` row."""
+    ts = getattr(row, "timestamp", None)
+    return {
+        "id": row.id,
+        "user_id": str(row.user_id) if getattr(row, "user_id", None) else None,
+        "player_name": row.player_name,
+        "score": row.score,
+        "stage": row.stage,
+        "language": row.language,
+        "timestamp": ts.isoformat() if hasattr(ts, "isoformat") else ts,
+    }
+
+
+def around(index: LeaderboardIndex, user_id: str, k: int) -> dict:
+    """``/leaderboard/me`` payload: best entry, rank, ``k`` neighbours each side."""
+    best = index.user_best(user_id)
+    if best is None:
+        return {"entry": None, "rank": None, "total_entries": len(index),
+                "above": [], "below": []}
+    rank = best["rank"]
+    window = index.window(rank, k, k)
+    return {
+        "entry": best,
+        "rank": rank,
+        "total_entries": len(index),
+        "above": [e for e in window if e["rank"] < rank],
+        "below": [e for e in window if e["rank"] > rank],
+    }
@@ -1,49 +1,167 @@
-"""Leaderboard persistence (JSON file)."""
+"""Leaderboard persistence (JSON file).
+
+Submits are appended as one JSON line to an NDJSON log next to the
+snapshot (``leaderboard.json``) instead of rewriting the whole file, and
+reads are served from an in-memory ``LeaderboardIndex`` / ``SegmentedTopK``
+built once on first use.  Every ``compact_every`` submits the log is folded
+into a new snapshot (written to a temp file and swapped in with
+``os.replace``) and truncated.  On load the snapshot is read and the log
+replayed; a torn last line is cut off the log (so the next append starts
+on a fresh line), and log entries already in the snapshot are skipped (a
+crash between the swap and the truncate).  Appends are fsynced.
+"""
 import json
 import os
+import threading
 from datetime import datetime, timezone
 from typing import List
 
+from app.infrastructure.repositories.leaderboard_index import LeaderboardIndex, around
+from app.infrastructure.repositories.leaderboard_segments import SegmentedTopK
+
+COMPACT_EVERY = 500
+
 
 class LeaderboardRepository:
     """File-based leaderboard persistence."""
 
-    def __init__(self, data_path: str = "data/leaderboard.json"):
+    def __init__(self, data_path: str = "data/leaderboard.json",
+                 compact_every: int = COMPACT_EVERY):
         self._data_path = data_path
+        self._log_path = os.path.splitext(data_path)[0] + ".ndjson"
+        self._compact_every = max(1, compact_every)
+        self._lock = threading.Lock()
+        self._index = LeaderboardIndex()
+        self._segments = SegmentedTopK()
+        self._loaded = False
+        self._next_id = 1
+        self._log_lines = 0
 
-    def submit(self, player_name: str, score: int, stage: str, language: str) -> dict:
-        entries = self._load()
-        entry = {
-            "player_name": player_name,
-            "score": score,
-            "stage": stage,
-            "language": language,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        entries.append(entry)
-        entries.sort(key=lambda x: x["score"], reverse=True)
-        self._save(entries)
-        rank = next(
-            (i + 1 for i, e in enumerate(entries) if e["timestamp"] == entry["timestamp"]),
-            len(entries),
-        )
-        return {"rank": rank, "total_entries": len(entries)}
-
-    def get_top(self, limit: int = 10) -> List[dict]:
+    def submit(self, player_name: str, score: int, stage: str, language: str,
+               user_id: str | None = None, session_id: str | None = None) -> dict:
+        with self._lock:
+            self._ensure_loaded()
+            entry = {
+                "id": self._next_id,
+                "user_id": user_id,
+                "session_id": session_id,
+                "player_name": player_name,
+                "score": score,
+                "stage": stage,
+                "language": language,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+            self._next_id += 1
+            self._append(entry)
+            rank = self._index.rank_of(score)
+            self._add(entry)
+            if self._log_lines >= self._compact_every:
+                self._compact()
+            return {"rank": rank, "total_entries": len(self._index)}
+
+    def get_top(self, limit: int = 10, language: str | None = None,
+                stage: str | None = None, window: str = "all") -> List[dict]:
+        self._load_once()
+        if language or stage or window != "all":
+            return self._segments.top(window, language, stage, limit)
+        return self._index.top(limit)
+
+    def get_user_best(self, user_id: str) -> dict | None:
+        self._load_once()
+        return self._index.user_best(user_id)
+
+    def around_user(self, user_id: str, k: int = 5) -> dict:
+        self._load_once()
+        return around(self._index, user_id, k)
+
+    def compact(self) -> None:
+        """Fold the log into the snapshot now (also done every ``compact_every``)."""
+        with self._lock:
+            self._ensure_loaded()
+            self._compact()
+
+    # ------------------------------------------------------------------
+    # Storage (lock held)
+    # ------------------------------------------------------------------
+
+    def _load_once(self) -> None:
+        if not self._loaded:
+            with self._lock:
+                self._ensure_loaded()
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
         entries = self._load()
-        entries.sort(key=lambda x: x["score"], reverse=True)
-        return entries[:limit]
+        for i, entry in enumerate(entries):
+            entry.setdefault("id", i + 1)  # snapshots written before the log had no ids
+        snapshot_max = max((e["id"] for e in entries), default=0)
+        replayed = [e for e in self._replay() if e["id"] > snapshot_max]
+        entries.extend(replayed)
+        self._index.load(entries)
+        self._segments.clear()
+        for entry in sorted(entries, key=lambda e: e["id"]):
+            self._segments.add(entry)
+        self._next_id = max((e["id"] for e in entries), default=0) + 1
+        self._log_lines = len(replayed)
+        self._loaded = True
 
     def _load(self) -> List[dict]:
         if not os.path.exists(self._data_path):
             return []
         try:
             with open(self._data_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+                data = json.load(f)
         except (json.JSONDecodeError, IOError):
             return []
+        return [e for e in data if isinstance(e, dict)] if isinstance(data, list) else []
+
+    def _replay(self) -> List[dict]:
+        if not os.path.exists(self._log_path):
+            return []
+        with open(self._log_path, "rb") as f:
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            # Torn write from a crash mid-append: drop it so the next append
+            # does not continue the unterminated line.
+            with open(self._log_path, "r+b") as f:
+                f.truncate(complete)
+                f.flush()
+                os.fsync(f.fileno())
+        entries = []
+        for line in data[:complete].decode("utf-8", errors="replace").splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and isinstance(entry.get("id"), int):
+                entries.append(entry)
+        return entries
+
+    def _append(self, entry: dict) -> None:
+        os.makedirs(os.path.dirname(self._log_path) or ".", exist_ok=True)
+        with open(self._log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_lines += 1
+
+    def _add(self, entry: dict) -> None:
+        if self._index.add(entry):
+            self._segments.add(entry)
 
-    def _save(self, entries: List[dict]) -> None:
-        os.makedirs(os.path.dirname(self._data_path), exist_ok=True)
-        with open(self._data_path, "w", encoding="utf-8") as f:
-            json.dump(entries, f, indent=2, ensure_ascii=False)
+    def _compact(self) -> None:
+        entries = sorted(self._index.entries(), key=lambda e: e["id"])
+        os.makedirs(os.path.dirname(self._data_path) or ".", exist_ok=True)
+        tmp_path = self._data_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._data_path)
+        # A crash here leaves a log whose entries are all in the snapshot;
+        # replay skips them by id.
+        with open(self._log_path, "w", encoding="utf-8"):
+            pass
+        self._log_lines = 0
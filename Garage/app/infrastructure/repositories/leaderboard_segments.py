@@ -0,0 +1,114 @@
+"""Segmented / time-windowed leaderboards kept as small per-segment top-K heaps.
+
+A segment is ``(window, period, language, stage)``: window is ``all``,
+``daily``, ``weekly`` or ``monthly``; period is the current day / ISO week /
+month; language and stage are a value or ``*``.  Each submit is pushed into
+the 16 segments it belongs to (4 windows x language-or-any x stage-or-any),
+each a min-heap capped at K, so reads never aggregate at request time.
+Sorted results are cached per segment and dropped only when a submit
+actually enters that segment's top K.  Segments of past periods are pruned
+when the day / week / month rolls over.
+"""
+import heapq
+import itertools
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.infrastructure.repositories.leaderboard_index import PUBLIC_FIELDS
+
+WINDOWS = ("all", "daily", "weekly", "monthly")
+ANY = "*"
+
+SegmentKey = Tuple[str, str, str, str]
+
+
+def periods(at: datetime) -> Dict[str, str]:
+    """Period label of ``at`` (UTC) for every window."""
+    at = at.astimezone(timezone.utc) if at.tzinfo else at.replace(tzinfo=timezone.utc)
+    year, week, _ = at.isocalendar()
+    return {
+        "all": "all",
+        "daily": at.strftime("%Y-%m-%d"),
+        "weekly": f"{year}-W{week:02d}",
+        "monthly": at.strftime("%Y-%m"),
+    }
+
+
+class SegmentedTopK:
+    """Top-K entries per (window, period, language, stage) segment."""
+
+    def __init__(self, k: int = 100):
+        self._k = k
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._heaps: Dict[SegmentKey, list] = {}
+        self._cache: Dict[SegmentKey, List[dict]] = {}
+        self._current: Dict[str, str] = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heaps.clear()
+            self._cache.clear()
+
+    def add(self, entry: dict, at: Optional[datetime] = None, now: Optional[datetime] = None) -> None:
+        """Push ``entry`` (timestamped ``at``) into every segment it belongs to."""
+        at = at or _parse(entry.get("timestamp")) or datetime.now(timezone.utc)
+        with self._lock:
+            current = self._roll(now or datetime.now(timezone.utc))
+            entry_periods = periods(at)
+            item = (entry["score"], -next(self._seq), entry)
+            for window in WINDOWS:
+                if entry_periods[window] != current[window]:
+                    continue  # a past day/week/month: nobody reads it any more
+                for language in (entry.get("language"), ANY):
+                    for stage in (entry.get("stage"), ANY):
+                        self._push((window, current[window], language, stage), item)
+
+    def top(self, window: str = "all", language: Optional[str] = None,
+            stage: Optional[str] = None, limit: int = 10,
+            now: Optional[datetime] = None) -> List[dict]:
+        """Best ``limit`` entries of one segment (at most K)."""
+        with self._lock:
+            current = self._roll(now or datetime.now(timezone.utc))
+            key = (window, current[window], language or ANY, stage or ANY)
+            ranked = self._cache.get(key)
+            if ranked is None:
+                heap = self._heaps.get(key, [])
+                ranked = [
+                    {f: item[2].get(f) for f in PUBLIC_FIELDS}
+                    for item in sorted(heap, key=lambda i: (-i[0], -i[1]))
+                ]
+                self._cache[key] = ranked
+            return ranked[:limit]
+
+    # -- internals (lock held) ---------------------------------------------
+
+    def _push(self, key: SegmentKey, item: tuple) -> None:
+        heap = self._heaps.setdefault(key, [])
+        if len(heap) < self._k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+        else:
+            return  # did not make this segment's top K: its cache stays valid
+        self._cache.pop(key, None)
+
+    def _roll(self, now: datetime) -> Dict[str, str]:
+        current = periods(now)
+        if current != self._current:
+            stale = [key for key in self._heaps if key[1] != current[key[0]]]
+            for key in stale:
+                self._heaps.pop(key, None)
+                self._cache.pop(key, None)
+            self._current = current
+        return current
+
+
+def _parse(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,553 @@
+"""PostgreSQL aggregation queries backing the admin panel.
+
+The admin views used to load every session (and every attempt) into Python
+and join them to users in nested loops.  Each view here is a single SQL
+statement -- GROUP BY / ``COUNT(*) FILTER`` / window functions over
+``game_sessions`` + an attempts aggregate -- and Python only maps rows to
+the response dicts the admin routes already returned.
+
+The ranking is the exception to "one statement per request": it has to
+rank every user's best session, so it is computed in one pass and kept as
+an in-process snapshot for ``RANKING_TTL_SECONDS``; filters and pages are
+answered from the snapshot (a page is a bisect on its rank).
+"""
+import bisect
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.infrastructure.repositories.keyset import decode_cursor, make_page
+
+# Per-session attempt count and play time (first -> last attempt).
+_ATTEMPT_STATS = """
+    attempt_stats AS (
+        SELECT att.session_id,
+               count(*) AS attempts,
+               CASE WHEN count(*) >= 2
+                    THEN floor(extract(epoch FROM max(att.timestamp) - min(att.timestamp)))::int
+                    ELSE 0 END AS duration_seconds
+        FROM attempts att
+        {where}
+        GROUP BY att.session_id
+    )
+"""
+
+_COMPLETED = "(gs.status = 'completed' OR gs.stage = 'Distinguished')"
+
+_STAGE_INDEX = """
+    CASE gs.stage
+        WHEN 'Intern' THEN 0 WHEN 'Junior' THEN 1 WHEN 'Mid' THEN 2
+        WHEN 'Senior' THEN 3 WHEN 'Staff' THEN 4 WHEN 'Principal' THEN 5
+        WHEN 'Distinguished' THEN 6 ELSE 0
+    END
+"""
+
+_SUBSCRIPTION = """
+    CASE WHEN u.subscription_expires_at < now() THEN 'expired'
+         ELSE COALESCE(u.subscription_status, 'none') END
+"""
+
+# Durations of 0 (fewer than 2 attempts) sort after every real duration.
+_NO_DURATION = 999999999
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _where(conditions: List[str]) -> str:
+    return ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+
+def _created_bound(cursor: Optional[str], alias: str) -> Tuple[List[str], dict]:
+    """``(created_at, id) < cursor`` for the newest-first listings.
+
+    Raises ValueError for a cursor this listing did not produce.
+    """
+    after = decode_cursor(cursor)
+    if after is None:
+        return [], {}
+    try:
+        at = datetime.fromisoformat(after["created_at"])
+        row_id = str(uuid.UUID(after["id"]))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+    return (
+        [f"({alias}.created_at, {alias}.id) < (:after_at, CAST(:after_id AS uuid))"],
+        {"after_at": at, "after_id": row_id},
+    )
+
+
+def _created_key(row: dict) -> dict:
+    return {"created_at": row["created_at"], "id": row.get("id") or row.get("session_id")}
+
+
+class PgAdminRepository:
+    """Read-only admin aggregates computed in PostgreSQL."""
+
+    RANKING_TTL_SECONDS = 30.0
+
+    def __init__(self, session_factory):
+        self._sf = session_factory
+        self._ranking_lock = threading.Lock()
+        self._ranking_cache: tuple[float, List[dict]] | None = None
+
+    # ------------------------------------------------------------------
+    # Dashboard
+    # ------------------------------------------------------------------
+
+    def dashboard_counts(self) -> dict:
+        """User/session totals split by outcome, in one round-trip."""
+        with self._sf() as session:
+            row = session.execute(text(f"""
+                SELECT
+                    (SELECT count(*) FROM users) AS total_users,
+                    count(*) AS total_sessions,
+                    count(*) FILTER (WHERE {_COMPLETED}) AS completed_games,
+                    count(*) FILTER (
+                        WHERE NOT {_COMPLETED} AND gs.status = 'game_over'
+                    ) AS game_over_sessions,
+                    count(*) FILTER (
+                        WHERE NOT {_COMPLETED} AND gs.status <> 'game_over'
+                    ) AS active_games
+                FROM game_sessions gs
+            """)).one()
+        return {
+            "total_users": row.total_users,
+            "total_sessions": row.total_sessions,
+            "completed_games": row.completed_games,
+            "active_games": row.active_games,
+            "game_over_sessions": row.game_over_sessions,
+        }
+
+    # ------------------------------------------------------------------
+    # Users
+    # ------------------------------------------------------------------
+
+    def users_overview(self, search: str = "", subscription: Optional[str] = None) -> List[dict]:
+        """Every user with session totals, best session and subscription."""
+        conditions, params = self._user_filters(search, subscription)
+        with self._sf() as session:
+            return self._users(session, conditions, params)
+
+    def users_page(self, limit: int, cursor: Optional[str] = None, search: str = "",
+                   subscription: Optional[str] = None) -> dict:
+        """One page of ``users_overview``, newest first, keyset on (created_at, id)."""
+        conditions, params = self._user_filters(search, subscription)
+        bound, bound_params = _created_bound(cursor, "u")
+        with self._sf() as session:
+            rows = self._users(session, conditions + bound, {**params, **bound_params}, limit + 1)
+            total = None if cursor else self._estimate(session, "users", "users u", conditions, params)
+        return make_page(rows, limit, _created_key, total)
+
+    @staticmethod
+    def _user_filters(search: str, subscription: Optional[str]) -> Tuple[List[str], dict]:
+        conditions, params = [], {}
+        if search:
+            conditions.append(
+                "(u.full_name ILIKE :q OR u.username ILIKE :q"
+                " OR u.email ILIKE :q OR u.profession ILIKE :q)"
+            )
+            params["q"] = f"%{search}%"
+        if subscription:
+            conditions.append(f"{_SUBSCRIPTION} = :subscription")
+            params["subscription"] = subscription
+        return conditions, params
+
+    def _users(self, session, conditions: List[str], params: dict,
+               limit: Optional[int] = None) -> List[dict]:
+        # Pick the page of users first, then aggregate only their sessions.
+        rows = session.execute(text(f"""
+            WITH page AS (
+                SELECT u.*, {_SUBSCRIPTION} AS subscription_state
+                FROM users u
+                {_where(conditions)}
+                ORDER BY u.created_at DESC, u.id DESC
+                {"LIMIT :limit" if limit else ""}
+            ),
+            {_ATTEMPT_STATS.format(
+                where="WHERE att.session_id IN "
+                      "(SELECT gs.id FROM game_sessions gs JOIN page ON page.id = gs.user_id)"
+            )},
+            per_session AS (
+                SELECT gs.user_id, gs.score, gs.stage,
+                       {_COMPLETED} AS completed,
+                       COALESCE(cardinality(gs.completed_challenges), 0) AS challenges,
+                       COALESCE(a.attempts, 0) AS attempts,
+                       row_number() OVER (
+                           PARTITION BY gs.user_id ORDER BY gs.score DESC, gs.created_at DESC
+                       ) AS best
+                FROM game_sessions gs
+                LEFT JOIN attempt_stats a ON a.session_id = gs.id
+                WHERE gs.user_id IN (SELECT id FROM page)
+            ),
+            per_user AS (
+                SELECT user_id,
+                       count(*) AS total_sessions,
+                       sum(score) AS total_score,
+                       sum(attempts) AS total_attempts,
+                       sum(challenges) AS total_completed_challenges,
+                       count(*) FILTER (WHERE completed) AS completed_runs,
+                       max(stage) FILTER (WHERE best = 1) AS best_stage,
+                       max(score) AS best_score
+                FROM per_session
+                GROUP BY user_id
+            )
+            SELECT u.id, u.full_name, u.username, u.email, u.whatsapp,
+                   u.profession, u.email_verified, u.created_at,
+                   u.subscription_state AS subscription_status,
+                   u.subscription_plan, u.subscription_expires_at,
+                   COALESCE(p.total_sessions, 0) AS total_sessions,
+                   COALESCE(p.total_score, 0) AS total_score,
+                   COALESCE(p.total_attempts, 0) AS total_attempts,
+                   COALESCE(p.total_completed_challenges, 0) AS total_completed_challenges,
+                   COALESCE(p.best_stage, '---') AS best_stage,
+                   COALESCE(p.best_score, 0) AS best_score,
+                   COALESCE(p.completed_runs, 0) AS completed_runs
+            FROM page u
+            LEFT JOIN per_user p ON p.user_id = u.id
+            ORDER BY u.created_at DESC, u.id DESC
+        """), {**params, "limit": limit} if limit else params).all()
+        return [
+            {
+                "id": str(r.id),
+                "full_name": r.full_name,
+                "username": r.username,
+                "email": r.email,
+                "whatsapp": r.whatsapp,
+                "profession": r.profession,
+                "email_verified": bool(r.email_verified) if r.email_verified is not None else True,
+                "created_at": _iso(r.created_at) or "",
+                "total_sessions": r.total_sessions,
+                "total_score": int(r.total_score),
+                "total_attempts": int(r.total_attempts),
+                "total_completed_challenges": int(r.total_completed_challenges),
+                "best_stage": r.best_stage,
+                "best_score": r.best_score,
+                "completed_runs": r.completed_runs,
+                "subscription_status": r.subscription_status,
+                "subscription_plan": r.subscription_plan,
+                "subscription_expires_at": _iso(r.subscription_expires_at),
+            }
+            for r in rows
+        ]
+
+    def user_detail(self, user_id: str) -> Optional[dict]:
+        """Profile, every session (with attempts) and consolidated stats."""
+        try:
+            uuid.UUID(user_id)
+        except ValueError:
+            return None
+        with self._sf() as session:
+            user = session.execute(text("""
+                SELECT id, full_name, username, email, whatsapp, profession,
+                       created_at, email_verified
+                FROM users WHERE id = CAST(:uid AS uuid)
+            """), {"uid": user_id}).first()
+            if user is None:
+                return None
+            sessions = session.execute(text(f"""
+                WITH {_ATTEMPT_STATS.format(
+                    where="WHERE att.session_id IN (SELECT id FROM game_sessions WHERE user_id = CAST(:uid AS uuid))"
+                )}
+                SELECT gs.*, COALESCE(a.attempts, 0) AS total_attempts,
+                       COALESCE(a.duration_seconds, 0) AS duration_seconds
+                FROM game_sessions gs
+                LEFT JOIN attempt_stats a ON a.session_id = gs.id
+                WHERE gs.user_id = CAST(:uid AS uuid)
+                ORDER BY gs.created_at DESC
+            """), {"uid": user_id}).mappings().all()
+            attempts = session.execute(text("""
+                SELECT a.session_id, a.challenge_id, a.selected_index, a.is_correct,
+                       a.points_awarded, a.timestamp
+                FROM attempts a
+                JOIN game_sessions gs ON gs.id = a.session_id
+                WHERE gs.user_id = CAST(:uid AS uuid)
+                ORDER BY a.timestamp
+            """), {"uid": user_id}).all()
+
+        by_session: dict = {}
+        for a in attempts:
+            by_session.setdefault(str(a.session_id), []).append({
+                "challenge_id": a.challenge_id,
+                "selected_index": a.selected_index,
+                "is_correct": a.is_correct,
+                "points_awarded": a.points_awarded,
+                "timestamp": _iso(a.timestamp),
+            })
+
+        session_dicts = []
+        for s in sessions:
+            sid = str(s["id"])
+            completed = list(s["completed_challenges"] or [])
+            session_dicts.append({
+                "id": sid,
+                "user_id": str(s["user_id"]) if s["user_id"] else None,
+                "name": s["name"],
+                "language": s["language"],
+                "stage": s["stage"],
+                "score": s["score"],
+                "current_errors": s["current_errors"],
+                "max_errors": 2,
+                "completed_challenges": completed,
+                "game_over_count": s["game_over_count"],
+                "status": s["status"],
+                "total_attempts": s["total_attempts"],
+                "collected_books": list(s["collected_books"] or []),
+                "completed_regions": list(s["completed_regions"] or []),
+                "current_region": s["current_region"],
+                "player_world_x": s["player_world_x"],
+                "attempts": by_session.get(sid, []),
+                "created_at": _iso(s["created_at"]),
+                "updated_at": _iso(s["updated_at"]),
+                "duration_seconds": s["duration_seconds"],
+            })
+
+        return {
+            "user": {
+                "id": str(user.id),
+                "full_name": user.full_name,
+                "username": user.username,
+                "email": user.email,
+                "whatsapp": user.whatsapp,
+                "profession": user.profession,
+                "created_at": _iso(user.created_at),
+                "email_verified": bool(user.email_verified) if user.email_verified is not None else True,
+            },
+            "sessions": session_dicts,
+            "stats": {
+                "total_sessions": len(session_dicts),
+                "total_score": sum(s["score"] for s in session_dicts),
+                "total_attempts": sum(s["total_attempts"] for s in session_dicts),
+                "total_completed_challenges": sum(
+                    len(s["completed_challenges"]) for s in session_dicts
+                ),
+                "total_game_overs": sum(s["game_over_count"] for s in session_dicts),
+                "best_score": max((s["score"] for s in session_dicts), default=0),
+                "completed_runs": sum(
+                    1 for s in session_dicts
+                    if s["status"] == "completed" or s["stage"] == "Distinguished"
+                ),
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def sessions_overview(self, search: str = "", stage: Optional[str] = None,
+                          status: Optional[str] = None) -> List[dict]:
+        """Every session with its owner, attempt count and play time."""
+        conditions, params = self._session_filters(search, stage, status)
+        with self._sf() as session:
+            return self._sessions(session, conditions, params)
+
+    def sessions_page(self, limit: int, cursor: Optional[str] = None, search: str = "",
+                      stage: Optional[str] = None, status: Optional[str] = None) -> dict:
+        """One page of ``sessions_overview``, newest first, keyset on (created_at, id)."""
+        conditions, params = self._session_filters(search, stage, status)
+        bound, bound_params = _created_bound(cursor, "gs")
+        with self._sf() as session:
+            rows = self._sessions(session, conditions + bound, {**params, **bound_params}, limit + 1)
+            total = None if cursor else self._estimate(
+                session, "game_sessions",
+                "game_sessions gs LEFT JOIN users u ON u.id = gs.user_id", conditions, params,
+            )
+        return make_page(rows, limit, _created_key, total)
+
+    @staticmethod
+    def _session_filters(search: str, stage: Optional[str],
+                         status: Optional[str]) -> Tuple[List[str], dict]:
+        conditions, params = [], {}
+        if search:
+            conditions.append("(gs.name ILIKE :q OR u.full_name ILIKE :q OR u.email ILIKE :q)")
+            params["q"] = f"%{search}%"
+        if stage:
+            conditions.append("gs.stage = :stage")
+            params["stage"] = stage
+        if status:
+            conditions.append("gs.status = :status")
+            params["status"] = status
+        return conditions, params
+
+    def _sessions(self, session, conditions: List[str], params: dict,
+                  limit: Optional[int] = None) -> List[dict]:
+        rows = session.execute(text(f"""
+            WITH page AS (
+                SELECT gs.id, gs.name, gs.stage, gs.score, gs.status, gs.language,
+                       gs.game_over_count, gs.created_at,
+                       COALESCE(cardinality(gs.completed_challenges), 0) AS completed,
+                       u.full_name, u.email
+                FROM game_sessions gs
+                LEFT JOIN users u ON u.id = gs.user_id
+                {_where(conditions)}
+                ORDER BY gs.created_at DESC, gs.id DESC
+                {"LIMIT :limit" if limit else ""}
+            ),
+            {_ATTEMPT_STATS.format(where="WHERE att.session_id IN (SELECT id FROM page)")}
+            SELECT page.*,
+                   COALESCE(a.attempts, 0) AS attempts,
+                   COALESCE(a.duration_seconds, 0) AS duration_seconds
+            FROM page
+            LEFT JOIN attempt_stats a ON a.session_id = page.id
+            ORDER BY page.created_at DESC, page.id DESC
+        """), {**params, "limit": limit} if limit else params).all()
+        return [
+            {
+                "session_id": str(r.id),
+                "player_name": r.name,
+                "user_name": r.full_name or "---",
+                "user_email": r.email or "---",
+                "stage": r.stage,
+                "score": r.score,
+                "status": r.status,
+                "completed_challenges": r.completed,
+                "total_attempts": r.attempts,
+                "game_over_count": r.game_over_count,
+                "language": r.language or "---",
+                "created_at": _iso(r.created_at) or "",
+                "duration_seconds": r.duration_seconds,
+            }
+            for r in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # Ranking
+    # ------------------------------------------------------------------
+
+    def ranking(self, search: str = "", stage: Optional[str] = None) -> List[dict]:
+        """Best session per registered user, ranked.
+
+        Best: completed beats incomplete, then higher score, then faster.
+        Order: completed runs by duration, then the rest by stage and score.
+        Filters narrow the listing but never renumber it: ranks stay global.
+        Served from a snapshot at most ``RANKING_TTL_SECONDS`` old.
+        """
+        return [e for e in self._ranked() if self._ranking_match(e, search, stage)]
+
+    def ranking_page(self, limit: int, cursor: Optional[str] = None, search: str = "",
+                     stage: Optional[str] = None) -> dict:
+        """One page of ``ranking``, keyset on the rank itself.
+
+        The page starts at a bisect on the snapshot, so an unfiltered page
+        costs O(limit) however deep; only a snapshot rebuild (once per TTL)
+        scans the tables.  Filtered pages scan the in-memory snapshot.
+        """
+        after = decode_cursor(cursor)
+        after_rank = 0
+        if after is not None:
+            try:
+                after_rank = int(after["rank"])
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError("invalid cursor") from exc
+        entries = self._ranked()
+        start = bisect.bisect_right(entries, after_rank, key=lambda e: e["rank"])
+        if not (search or stage):
+            rows, total = entries[start:start + limit + 1], len(entries)
+        else:
+            rows = []
+            for entry in entries[start:]:
+                if self._ranking_match(entry, search, stage):
+                    rows.append(entry)
+                    if len(rows) > limit:
+                        break
+            total = None if cursor else sum(
+                1 for e in entries if self._ranking_match(e, search, stage)
+            )
+        return make_page(rows, limit, lambda r: {"rank": r["rank"]}, None if cursor else total)
+
+    @staticmethod
+    def _ranking_match(entry: dict, search: str, stage: Optional[str]) -> bool:
+        if stage and entry["stage"] != stage:
+            return False
+        if search:
+            q = search.lower()
+            return any(q in (entry[k] or "").lower()
+                       for k in ("player_name", "user_name", "user_email"))
+        return True
+
+    def _ranked(self) -> List[dict]:
+        """The full ranking snapshot, rebuilt when older than the TTL."""
+        with self._ranking_lock:
+            cached = self._ranking_cache
+            if cached is not None and time.monotonic() - cached[0] < self.RANKING_TTL_SECONDS:
+                return cached[1]
+            with self._sf() as session:
+                entries = self._ranking(session)
+            self._ranking_cache = (time.monotonic(), entries)
+            return entries
+
+    def _ranking(self, session) -> List[dict]:
+        rows = session.execute(text(f"""
+            WITH {_ATTEMPT_STATS.format(where="")},
+            scored AS (
+                SELECT gs.name, gs.stage, gs.score, gs.game_over_count, gs.created_at,
+                       u.id AS user_id, u.full_name, u.email,
+                       {_COMPLETED} AS completed,
+                       {_STAGE_INDEX} AS stage_index,
+                       COALESCE(a.attempts, 0) AS attempts,
+                       COALESCE(a.duration_seconds, 0) AS duration_seconds,
+                       COALESCE(NULLIF(a.duration_seconds, 0), {_NO_DURATION}) AS duration_key
+                FROM game_sessions gs
+                JOIN users u ON u.id = gs.user_id
+                LEFT JOIN attempt_stats a ON a.session_id = gs.id
+            ),
+            best AS (
+                SELECT *, row_number() OVER (
+                    PARTITION BY email
+                    ORDER BY completed DESC, score DESC, duration_key, created_at
+                ) AS pick
+                FROM scored
+            )
+            SELECT *,
+                   row_number() OVER (
+                       ORDER BY completed DESC,
+                                CASE WHEN completed THEN duration_key ELSE 0 END,
+                                stage_index DESC, score DESC
+                   ) AS rank
+            FROM best
+            WHERE pick = 1
+            ORDER BY rank
+        """)).all()
+        return [
+            {
+                "rank": r.rank,
+                "player_name": r.name,
+                "user_id": str(r.user_id),
+                "user_name": r.full_name,
+                "user_email": r.email,
+                "stage": r.stage,
+                "stage_index": r.stage_index,
+                "score": r.score,
+                "completed": r.completed,
+                "duration_seconds": r.duration_seconds,
+                "total_attempts": r.attempts,
+                "game_over_count": r.game_over_count,
+                "created_at": _iso(r.created_at) or "",
+            }
+            for r in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _estimate(session, table: str, from_sql: str, conditions: List[str],
+                  params: dict) -> int:
+        """Row count for a listing: planner statistics when unfiltered, COUNT(*) otherwise."""
+        if not conditions:
+            estimate = session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:t AS regclass)"),
+                {"t": table},
+            ).scalar()
+            # reltuples is -1 until the table is first vacuumed/analyzed.
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+        return int(session.execute(
+            text(f"SELECT count(*) FROM {from_sql} {_where(conditions)}"), params,
+        ).scalar() or 0)
@@ -1,56 +1,133 @@
 """PostgreSQL-backed challenge repository."""
+import threading
+import time
 from typing import List
 
 from app.domain.challenge import Challenge, ChallengeOption
 from app.domain.enums import ChallengeCategory, CareerStage, MapRegion
-from app.infrastructure.database.models import ChallengeModel
+from app.infrastructure.database.challenge_stats import OPTIONS_SQL, STATS_SQL, stats_entry
+from app.infrastructure.database.models import ChallengeModel, CatalogMetaModel
+from app.infrastructure.database.seed import CHALLENGE_CATALOG
+from app.infrastructure.repositories.challenge_catalog import ChallengeCatalog
 
 
 class PgChallengeRepository:
-    """Challenge persistence via PostgreSQL (Neon)."""
+    """Challenge persistence via PostgreSQL (Neon).
 
-    def __init__(self, session_factory):
+    Reads are served from an in-process ``ChallengeCatalog`` loaded once (on
+    the first call or via ``reload()``) -- no DB round-trip per request.  A
+    periodic task calls ``refresh_if_stale()`` so a re-seed done by another
+    worker is picked up.
+    """
+
+    STATS_TTL_SECONDS = 60.0
+
+    def __init__(self, session_factory, read_session_factory=None):
         self._sf = session_factory
+        # Difficulty stats may be read from a replica; the catalog is not.
+        self._read_sf = read_session_factory or session_factory
+        self._catalog: ChallengeCatalog | None = None
+        self._load_lock = threading.Lock()
+        self._stats: tuple[float, List[dict]] | None = None
 
-    def get_all(self) -> List[Challenge]:
+    # ------------------------------------------------------------------
+    # Catalog lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def catalog(self) -> ChallengeCatalog:
+        """Current snapshot; loads from the DB on first access."""
+        catalog = self._catalog
+        if catalog is None:
+            with self._load_lock:
+                if self._catalog is None:
+                    self._catalog = self._load()
+                catalog = self._catalog
+        return catalog
+
+    def reload(self) -> ChallengeCatalog:
+        """Rebuild the snapshot from the DB (call after seeding)."""
+        catalog = self._load()
+        with self._load_lock:
+            self._catalog = catalog
+        return catalog
+
+    def refresh_if_stale(self) -> bool:
+        """Reload only when the seeder recorded a different catalog version.
+
+        Costs one primary-key read of ``catalog_meta``; returns True on reload.
+        A catalog not loaded yet is left to the first read, and one that was
+        never seeded (no recorded version) is not reloaded.
+        """
+        current = self._catalog
+        if current is None:
+            return False
+        with self._sf() as session:
+            row = session.get(CatalogMetaModel, CHALLENGE_CATALOG)
+            version = row.version if row else None
+        if version is None or current.version == version:
+            return False
+        self.reload()
+        return True
+
+    def _load(self) -> ChallengeCatalog:
         try:
             with self._sf() as session:
-                rows = session.query(ChallengeModel).all()
-                return [self._to_domain(r) for r in rows]
+                rows = (
+                    session.query(ChallengeModel)
+                    .order_by(ChallengeModel.sort_order.asc().nullslast(), ChallengeModel.id)
+                    .all()
+                )
+                meta = session.get(CatalogMetaModel, CHALLENGE_CATALOG)
+                return ChallengeCatalog(
+                    (self._to_domain(r) for r in rows),
+                    version=meta.version if meta else None,
+                )
         except Exception as exc:
-            print(f"[GARAGE][ERROR] PgChallengeRepository.get_all() failed: {type(exc).__name__}: {exc}")
+            print(f"[GARAGE][ERROR] PgChallengeRepository catalog load failed: {type(exc).__name__}: {exc}")
             raise
 
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    def get_all(self) -> List[Challenge]:
+        return self.catalog.all()
+
     def get_by_id(self, challenge_id: str) -> Challenge | None:
-        try:
-            with self._sf() as session:
-                row = session.get(ChallengeModel, challenge_id)
-                return self._to_domain(row) if row else None
-        except Exception as exc:
-            print(f"[GARAGE][ERROR] PgChallengeRepository.get_by_id({challenge_id!r}) failed: {exc}")
-            raise
+        return self.catalog.get(challenge_id)
 
     def get_by_stage(self, stage: CareerStage) -> List[Challenge]:
-        with self._sf() as session:
-            rows = (
-                session.query(ChallengeModel)
-                .filter(ChallengeModel.required_stage == stage.value)
-                .all()
-            )
-            return [self._to_domain(r) for r in rows]
+        return self.catalog.by_stage(stage)
 
     def get_by_region(self, region: MapRegion) -> List[Challenge]:
-        with self._sf() as session:
-            rows = (
-                session.query(ChallengeModel)
-                .filter(ChallengeModel.region == region.value)
-                .all()
-            )
-            return [self._to_domain(r) for r in rows]
+        return self.catalog.by_region(region)
 
     def count(self) -> int:
-        with self._sf() as session:
-            return session.query(ChallengeModel).count()
+        return len(self.catalog)
+
+    # ------------------------------------------------------------------
+    # Difficulty statistics (maintained by a trigger on attempts)
+    # ------------------------------------------------------------------
+
+    def stats(self, max_age: float | None = None) -> List[dict]:
+        """Per-challenge attempt counters; two reads of O(challenges) rows.
+
+        Cached for ``STATS_TTL_SECONDS`` (or ``max_age``) so the public
+        catalog endpoint does not query the DB on every request.
+        """
+        max_age = self.STATS_TTL_SECONDS if max_age is None else max_age
+        cached = self._stats
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+        with self._read_sf() as session:
+            counters = session.execute(STATS_SQL).fetchall()
+            options: dict = {}
+            for challenge_id, selected_index, picks in session.execute(OPTIONS_SQL).fetchall():
+                options.setdefault(challenge_id, {})[selected_index] = picks
+        rows = [stats_entry(*row, options=options.get(row[0])) for row in counters]
+        self._stats = (time.monotonic(), rows)
+        return rows
 
     @staticmethod
     def _to_domain(row: ChallengeModel) -> Challenge:
@@ -1,20 +1,57 @@
-"""Repository for landing page analytics events."""
-from datetime import datetime, timezone, timedelta
-from sqlalchemy import text
+"""Repository for landing page analytics events.
 
+Events are written to ``landing_events`` and, in the same transaction,
+folded into the hourly rollups (counters + HyperLogLog sketches of
+page-view visitors, see ``database.landing_rollups``).  The public
+endpoints only ``enqueue`` events into a bounded in-memory buffer; a
+per-worker flusher calls ``flush`` to write them with one multi-row INSERT,
+one counter UPSERT per distinct (hour, kind) and one sketch UPSERT per
+touched sketch row (the batch's visitors merged in Python first) -- a
+single commit for the whole batch.  A batch
+that keeps failing for a non-connection reason is bisected so one bad
+event cannot block the buffer (see ``database.batch_writes``).
+``summary`` reads only the rollups -- a handful of indexed reads no matter
+how many raw events exist or how many months were already rolled up.
+"""
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Iterable, List
+
+from sqlalchemy import insert, text
+
+from app.infrastructure.database.batch_writes import (
+    MAX_BATCH_ATTEMPTS, is_transient, write_isolating,
+)
+from app.infrastructure.database.landing_rollups import (
+    COUNT_SQL, UNIQUE_SQL, counter_params, sketch_keys, summary_bounds,
+)
 from app.infrastructure.database.models import LandingEventModel
+from app.infrastructure.repositories import hyperloglog
+
+MAX_BUFFERED = 20_000
 
 
 class PgLandingAnalyticsRepository:
-    def __init__(self, session_factory):
+    def __init__(self, session_factory, max_buffered: int = MAX_BUFFERED,
+                 read_session_factory=None):
         self._sf = session_factory
+        # The admin summary may be served by a read replica.
+        self._read_sf = read_session_factory or session_factory
+        self._max_buffered = max_buffered
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer: deque = deque()
+        self._failed_attempts = 0
+        self.dropped = 0
+        self.rejected = 0
 
     # ------------------------------------------------------------------
     # Write
     # ------------------------------------------------------------------
 
-    def record(
-        self,
+    @staticmethod
+    def event(
         visitor_id: str,
         event_type: str,
         element: str | None = None,
@@ -24,20 +61,110 @@ class PgLandingAnalyticsRepository:
         referrer: str | None = None,
         user_agent: str | None = None,
         ip_address: str | None = None,
-    ) -> None:
-        with self._sf() as session:
-            row = LandingEventModel(
-                visitor_id=visitor_id,
-                event_type=event_type,
-                element=element,
-                section=section,
-                scroll_pct=scroll_pct,
-                plan=plan,
-                referrer=(referrer or "")[:500] if referrer else None,
-                user_agent=(user_agent or "")[:200] if user_agent else None,
-                ip_address=ip_address,
+        created_at: datetime | None = None,
+    ) -> dict:
+        """A ``landing_events`` row, timestamped now unless given."""
+        return {
+            "visitor_id": visitor_id,
+            "event_type": event_type,
+            "element": element,
+            "section": section,
+            "scroll_pct": scroll_pct,
+            "plan": plan,
+            "referrer": (referrer or "")[:500] if referrer else None,
+            "user_agent": (user_agent or "")[:200] if user_agent else None,
+            "ip_address": ip_address[:45] if ip_address else None,
+            "created_at": created_at or datetime.now(timezone.utc),
+        }
+
+    def record(self, visitor_id: str, event_type: str, **fields) -> None:
+        """Write one event immediately (bypasses the buffer)."""
+        self.write([self.event(visitor_id, event_type, **fields)])
+
+    def enqueue(self, events: Iterable[dict]) -> int:
+        """Buffer events for the next ``flush``; returns how many were accepted."""
+        accepted = 0
+        with self._lock:
+            for event in events:
+                if len(self._buffer) >= self._max_buffered:
+                    self.dropped += 1
+                    continue
+                self._buffer.append(event)
+                accepted += 1
+        return accepted
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def flush(self) -> int:
+        """Write everything buffered in one transaction. Returns events written.
+
+        A failed batch goes back to the head of the buffer.  After
+        ``MAX_BATCH_ATTEMPTS`` non-connection failures in a row it is
+        bisected instead: the events that fail on their own are rejected
+        (counted in ``rejected``) and the rest are written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = list(self._buffer), deque()
+            if not batch:
+                return 0
+            try:
+                self.write(batch)
+            except Exception as exc:
+                if not is_transient(exc):
+                    self._failed_attempts += 1
+                if self._failed_attempts < MAX_BATCH_ATTEMPTS:
+                    self._requeue(batch)
+                    raise
+                written, rejected, unwritten = write_isolating(self.write, batch)
+                self._failed_attempts = 0
+                self.rejected += len(rejected)
+                if rejected:
+                    print(f"[GARAGE][WARN] Landing analytics rejected {len(rejected)} event(s): "
+                          f"{type(exc).__name__}: {exc}")
+                if unwritten:
+                    self._requeue(unwritten)
+                return written
+            self._failed_attempts = 0
+            return len(batch)
+
+    def _requeue(self, batch: List[dict]) -> None:
+        """Put a failed batch back at the head of the buffer (oldest first)."""
+        with self._lock:
+            room = self._max_buffered - len(self._buffer)
+            keep = batch[:max(room, 0)]
+            self.dropped += len(batch) - len(keep)
+            self._buffer.extendleft(reversed(keep))
+
+    def write(self, events: List[dict]) -> None:
+        """Insert ``events`` and fold them into the rollups (one commit)."""
+        counters: dict = {}
+        sketches: dict = {}  # (period, bucket_start) -> HyperLogLog of this batch
+        for e in events:
+            params = counter_params(
+                e["event_type"], e["created_at"], element=e["element"],
+                section=e["section"], plan=e["plan"], scroll_pct=e["scroll_pct"],
             )
-            session.add(row)
+            key = (params["hour"], e["event_type"], params["element"], params["section"], params["plan"])
+            if key in counters:
+                for name in ("events", "scroll_25", "scroll_50", "scroll_75", "scroll_100"):
+                    counters[key][name] += params[name]
+            else:
+                counters[key] = params
+            if e["event_type"] == "page_view":
+                for sketch_key in sketch_keys(e["created_at"]):
+                    sketches.setdefault(sketch_key, hyperloglog.HyperLogLog()).add(e["visitor_id"])
+
+        # Key order on every UPSERT: concurrent flushes lock rows in the same order.
+        with self._sf() as session:
+            session.execute(insert(LandingEventModel), events)
+            session.execute(COUNT_SQL, [counters[k] for k in sorted(counters)])
+            if sketches:
+                session.execute(UNIQUE_SQL, [
+                    {"period": period, "bucket_start": start, "sketch": sketches[(period, start)].to_bytes()}
+                    for period, start in sorted(sketches)
+                ])
             session.commit()
 
     # ------------------------------------------------------------------
@@ -45,41 +172,45 @@ class PgLandingAnalyticsRepository:
     # ------------------------------------------------------------------
 
     def summary(self) -> dict:
-        with self._sf() as session:
-            now = datetime.now(timezone.utc)
-            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            week_start = now - timedelta(days=7)
+        with self._read_sf() as session:
+            bounds = summary_bounds(datetime.now(timezone.utc))
 
             def q(sql: str, params: dict | None = None):
                 return session.execute(text(sql), params or {}).fetchall()
 
-            # Total visits (page_view events)
-            total_visits = q(
-                "SELECT COUNT(*) FROM landing_events WHERE event_type='page_view'"
-            )[0][0]
-
-            # Unique visitors (distinct visitor_id on page_view)
-            unique_visitors = q(
-                "SELECT COUNT(DISTINCT visitor_id) FROM landing_events WHERE event_type='page_view'"
-            )[0][0]
-
-            # Today
-            today_visits = q(
-                "SELECT COUNT(*) FROM landing_events WHERE event_type='page_view' AND created_at >= :ts",
-                {"ts": today_start},
-            )[0][0]
+            # Visits (page_view events): all time and today
+            visits = q(
+                """
+                SELECT COALESCE(SUM(events), 0)::bigint,
+                       COALESCE(SUM(events) FILTER (WHERE hour >= :today), 0)::bigint
+                FROM landing_rollup_hourly
+                WHERE event_type='page_view'
+                """,
+                bounds,
+            )[0]
+            total_visits, today_visits = visits[0], visits[1]
 
-            today_unique = q(
-                "SELECT COUNT(DISTINCT visitor_id) FROM landing_events WHERE event_type='page_view' AND created_at >= :ts",
-                {"ts": today_start},
-            )[0][0]
+            # Unique visitors: merged HyperLogLog sketches (all time / today)
+            sketches = {
+                r[0]: bytes(r[1])
+                for r in q(
+                    """
+                    SELECT period, sketch FROM landing_uniques
+                    WHERE (period='all' AND bucket_start = :all_time)
+                       OR (period='day' AND bucket_start = :today)
+                    """,
+                    bounds,
+                )
+            }
+            unique_visitors = hyperloglog.HyperLogLog.merged([sketches.get("all")]).count()
+            today_unique = hyperloglog.HyperLogLog.merged([sketches.get("day")]).count()
 
             # Checkout clicks per plan
             checkout_rows = q(
                 """
-                SELECT plan, COUNT(*) as cnt
-                FROM landing_events
-                WHERE event_type='checkout_click' AND plan IS NOT NULL
+                SELECT plan, SUM(events)::bigint as cnt
+                FROM landing_rollup_hourly
+                WHERE event_type='checkout_click' AND plan <> ''
                 GROUP BY plan
                 """
             )
@@ -95,9 +226,9 @@ class PgLandingAnalyticsRepository:
             # Top clicked buttons
             top_buttons = q(
                 """
-                SELECT element, COUNT(*) as cnt
-                FROM landing_events
-                WHERE event_type IN ('click','checkout_click') AND element IS NOT NULL
+                SELECT element, SUM(events)::bigint as cnt
+                FROM landing_rollup_hourly
+                WHERE event_type IN ('click','checkout_click') AND element <> ''
                 GROUP BY element
                 ORDER BY cnt DESC
                 LIMIT 10
@@ -107,25 +238,22 @@ class PgLandingAnalyticsRepository:
             # Visits per day — last 7 days
             daily_rows = q(
                 """
-                SELECT DATE(created_at AT TIME ZONE 'UTC') as day, COUNT(*) as cnt
-                FROM landing_events
-                WHERE event_type='page_view' AND created_at >= :ts
+                SELECT DATE(hour AT TIME ZONE 'UTC') as day, SUM(events)::bigint as cnt
+                FROM landing_rollup_hourly
+                WHERE event_type='page_view' AND hour >= :week
                 GROUP BY day
                 ORDER BY day
                 """,
-                {"ts": week_start},
+                bounds,
             )
             visits_7d = [{"date": str(r[0]), "visits": r[1]} for r in daily_rows]
 
             # Scroll depth distribution
             scroll_rows = q(
                 """
-                SELECT
-                    COUNT(*) FILTER (WHERE scroll_pct >= 25) as p25,
-                    COUNT(*) FILTER (WHERE scroll_pct >= 50) as p50,
-                    COUNT(*) FILTER (WHERE scroll_pct >= 75) as p75,
-                    COUNT(*) FILTER (WHERE scroll_pct >= 100) as p100
-                FROM landing_events
+                SELECT COALESCE(SUM(scroll_25), 0)::bigint, COALESCE(SUM(scroll_50), 0)::bigint,
+                       COALESCE(SUM(scroll_75), 0)::bigint, COALESCE(SUM(scroll_100), 0)::bigint
+                FROM landing_rollup_hourly
                 WHERE event_type='scroll_depth'
                 """
             )
@@ -134,9 +262,9 @@ class PgLandingAnalyticsRepository:
             # Most viewed sections
             section_rows = q(
                 """
-                SELECT section, COUNT(*) as cnt
-                FROM landing_events
-                WHERE event_type='section_view' AND section IS NOT NULL
+                SELECT section, SUM(events)::bigint as cnt
+                FROM landing_rollup_hourly
+                WHERE event_type='section_view' AND section <> ''
                 GROUP BY section
                 ORDER BY cnt DESC
                 """
@@ -1,14 +1,49 @@
-"""PostgreSQL-backed leaderboard repository."""
+"""PostgreSQL-backed leaderboard repository.
+
+Reads are served from an in-memory ``LeaderboardIndex`` warmed from the
+table, so ranks, totals and the top N never scan ``leaderboard_entries``.
+Each worker keeps its own index: its own submits are added directly, and
+entries written by other workers are picked up by a cheap incremental
+resync (``id > watermark - RESYNC_ID_OVERLAP``) at most every
+``RESYNC_SECONDS``, plus a full
+reload every ``FULL_RELOAD_SECONDS`` to drop deleted entries.  Both run
+lazily on reads, so an idle worker never queries the database.
+Segmented (language / stage) and daily / weekly / monthly boards are small
+top-K heaps fed by the same adds (see ``leaderboard_segments``).
+"""
+import threading
+import time
+from types import SimpleNamespace
 from typing import List
 
+from sqlalchemy import insert
+
 from app.infrastructure.database.models import LeaderboardEntryModel
+from app.infrastructure.database.unit_of_work import after_commit, detached
+from app.infrastructure.repositories.leaderboard_index import LeaderboardIndex, around, entry_dict
+from app.infrastructure.repositories.leaderboard_segments import SegmentedTopK
+
+RESYNC_SECONDS = 10.0
+# Ids below the watermark re-read on each resync: an id allocated before the
+# watermark row but committed after it (another worker's slower insert) is
+# still picked up.  Already-indexed ids are skipped by the index.
+RESYNC_ID_OVERLAP = 100
+FULL_RELOAD_SECONDS = 600.0
 
 
 class PgLeaderboardRepository:
     """Leaderboard persistence via PostgreSQL (Neon)."""
 
-    def __init__(self, session_factory):
+    def __init__(self, session_factory, read_session_factory=None):
         self._sf = session_factory
+        # The in-memory index is (re)built from replica reads when available.
+        self._read_sf = read_session_factory or session_factory
+        self._index = LeaderboardIndex()
+        self._segments = SegmentedTopK()
+        self._sync_lock = threading.Lock()
+        self._loaded_at: float | None = None
+        self._synced_at: float | None = None
+        self._synced_id = 0  # highest id read from the table (resync watermark)
 
     def submit(
         self,
@@ -20,61 +55,133 @@ class PgLeaderboardRepository:
         session_id: str | None = None,
     ) -> dict:
         """Insert a new leaderboard entry and return rank info."""
+        entry = dict(user_id=user_id, session_id=session_id, player_name=player_name,
+                     score=score, stage=stage, language=language)
         with self._sf() as session:
-            entry = LeaderboardEntryModel(
-                user_id=user_id,
-                session_id=session_id,
-                player_name=player_name,
-                score=score,
-                stage=stage,
-                language=language,
-            )
-            session.add(entry)
+            row = session.execute(self._insert_statement(entry)).one()
             session.commit()
+        self._ensure_fresh()
+        return self._record_submitted(row, entry)
 
-            rank = (
-                session.query(LeaderboardEntryModel)
-                .filter(LeaderboardEntryModel.score > score)
-                .count()
-            ) + 1
-            total = session.query(LeaderboardEntryModel).count()
+    @staticmethod
+    def _insert_statement(entry: dict):
+        return (
+            insert(LeaderboardEntryModel)
+            .values(**entry)
+            .returning(LeaderboardEntryModel.id, LeaderboardEntryModel.timestamp)
+        )
 
-            return {"rank": rank, "total_entries": total}
+    def _record_submitted(self, row, entry: dict) -> dict:
+        """Rank info for a just-inserted entry; indexed once its transaction commits."""
+        rank = self._index.rank_of(entry["score"])
+        total = len(self._index) + 1
+        indexed = entry_dict(SimpleNamespace(id=row.id, timestamp=row.timestamp, **entry))
+        after_commit(lambda: self._add(indexed))
+        return {"rank": rank, "total_entries": total}
 
-    def get_top(self, limit: int = 10) -> List[dict]:
-        """Return the top N leaderboard entries by score descending."""
-        with self._sf() as session:
+    def get_top(self, limit: int = 10, language: str | None = None,
+                stage: str | None = None, window: str = "all") -> List[dict]:
+        """Return the top N entries by score, optionally for one segment/window."""
+        self._ensure_fresh()
+        if language or stage or window != "all":
+            return self._segments.top(window, language, stage, limit)
+        return self._index.top(limit)
+
+    def rank_of_score(self, score: int) -> dict:
+        """Rank a run with ``score`` would get now, and the board size."""
+        self._ensure_fresh()
+        return {"rank": self._index.rank_of(score), "total_entries": len(self._index)}
+
+    def total_entries(self) -> int:
+        self._ensure_fresh()
+        return len(self._index)
+
+    def get_user_best(self, user_id: str) -> dict | None:
+        """Return the best leaderboard entry for a given user (with its rank)."""
+        self._ensure_fresh()
+        return self._index.user_best(user_id)
+
+    def around_user(self, user_id: str, k: int = 5) -> dict:
+        """The user's best entry, its rank and the ``k`` entries above and below."""
+        self._ensure_fresh()
+        return around(self._index, user_id, k)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def warm(self) -> int:
+        """(Re)load the whole index from the table; returns the entry count."""
+        with self._read_sf() as session:
+            rows = session.query(LeaderboardEntryModel).all()
+            entries = [entry_dict(r) for r in rows]
+        self._index.load(entries)
+        self._segments.clear()
+        for entry in sorted(entries, key=lambda e: e["id"]):
+            self._segments.add(entry)
+        self._synced_id = max((e["id"] for e in entries), default=0)
+        self._loaded_at = self._synced_at = time.monotonic()
+        return len(entries)
+
+    def resync(self) -> int:
+        """Add entries written by other workers since the last sync.
+
+        The watermark only advances on table reads, never on this worker's own
+        submits.  Each resync re-reads the ``RESYNC_ID_OVERLAP`` ids below it,
+        so a lower id committed late by another worker is picked up unless
+        more than that many later ids were committed first; anything older
+        is caught by the full reload.
+        """
+        with self._read_sf() as session:
             rows = (
                 session.query(LeaderboardEntryModel)
-                .order_by(LeaderboardEntryModel.score.desc())
-                .limit(limit)
+                .filter(LeaderboardEntryModel.id > self._synced_id - RESYNC_ID_OVERLAP)
+                .order_by(LeaderboardEntryModel.id)
                 .all()
             )
-            return [
-                {
-                    "player_name": r.player_name,
-                    "score": r.score,
-                    "stage": r.stage,
-                    "language": r.language,
-                    "timestamp": r.timestamp.isoformat() if r.timestamp else None,
-                }
-                for r in rows
-            ]
+            added = sum(1 for r in rows if self._add(entry_dict(r)))
+        if rows:
+            self._synced_id = max(self._synced_id, rows[-1].id)
+        self._synced_at = time.monotonic()
+        return added
+
+    def _add(self, entry: dict) -> bool:
+        if not self._index.add(entry):
+            return False
+        self._segments.add(entry)
+        return True
+
+    def is_fresh(self) -> bool:
+        """True when reads can be served without touching the database."""
+        if self._loaded_at is None:
+            return False
+        now = time.monotonic()
+        return now - self._loaded_at <= FULL_RELOAD_SECONDS and now - self._synced_at <= RESYNC_SECONDS
+
+    def _ensure_fresh(self) -> None:
+        now = time.monotonic()
+        if self._loaded_at is None:
+            # First use blocks until loaded; there is nothing to serve yet.
+            with self._sync_lock, detached():
+                if self._loaded_at is None:
+                    self.warm()
+            return
+        due_full = now - self._loaded_at > FULL_RELOAD_SECONDS
+        if not due_full and now - self._synced_at <= RESYNC_SECONDS:
+            return
+        # Later syncs never block readers: one thread refreshes, the rest
+        # serve the current index (stale by at most a few seconds).
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            with detached():  # never inside a request's transaction
+                if due_full:
+                    self.warm()
+                else:
+                    self.resync()
+        except Exception as exc:
+            self._synced_at = now
+            print(f"[GARAGE][WARN] Leaderboard resync failed: {type(exc).__name__}: {exc}")
+        finally:
+            self._sync_lock.release()
 
-    def get_user_best(self, user_id: str) -> dict | None:
-        """Return the best leaderboard entry for a given user."""
-        with self._sf() as session:
-            row = (
-                session.query(LeaderboardEntryModel)
-                .filter(LeaderboardEntryModel.user_id == user_id)
-                .order_by(LeaderboardEntryModel.score.desc())
-                .first()
-            )
-            if not row:
-                return None
-            return {
-                "player_name": row.player_name,
-                "score": row.score,
-                "stage": row.stage,
-                "language": row.language,
-            }
@@ -15,10 +15,11 @@ import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import or_
+from sqlalchemy import or_, tuple_
 
 from app.domain.user import User
 from app.infrastructure.database.models import PendingRegistrationModel, UserModel, UserMetricsModel
+from app.infrastructure.repositories.keyset import decode_cursor, make_page
 
 
 _CODE_TTL_MINUTES = 30
@@ -248,33 +249,71 @@ class PgPendingRepository:
         """
         now = datetime.now(timezone.utc)
         with self._sf() as session:
-            query = session.query(PendingRegistrationModel)
-            if not include_expired:
-                query = query.filter(PendingRegistrationModel.expires_at > now)
-            if q:
-                like = f"%{q}%"
+            query = self._search_query(session, q, include_expired, now)
+            rows = query.order_by(PendingRegistrationModel.created_at.desc()).all()
+            return [self._search_row(row, now) for row in rows]
+
+    def search_page(self, limit: int, cursor: Optional[str] = None, q: str = "",
+                    include_expired: bool = True) -> dict:
+        """One page of ``search``, newest first, keyset on (created_at, id).
+
+        Raises ValueError for a malformed cursor.
+        """
+        after = decode_cursor(cursor)
+        now = datetime.now(timezone.utc)
+        with self._sf() as session:
+            query = self._search_query(session, q, include_expired, now)
+            total = None if after else query.count()
+            if after is not None:
+                try:
+                    bound = (datetime.fromisoformat(after["created_at"]), str(uuid.UUID(after["id"])))
+                except (KeyError, TypeError, ValueError) as exc:
+                    raise ValueError("invalid cursor") from exc
                 query = query.filter(
-                    or_(
-                        PendingRegistrationModel.username.ilike(like),
-                        PendingRegistrationModel.email.ilike(like),
-                        PendingRegistrationModel.full_name.ilike(like),
-                    )
+                    tuple_(PendingRegistrationModel.created_at, PendingRegistrationModel.id) < bound
                 )
-            rows = query.order_by(PendingRegistrationModel.created_at.desc()).all()
-            result = []
-            for row in rows:
-                result.append({
-                    "id": row.id,
-                    "full_name": row.full_name,
-                    "username": row.username,
-                    "email": row.email,
-                    "whatsapp": getattr(row, "whatsapp", "---"),
-                    "profession": getattr(row, "profession", "---"),
-                    "expires_at": row.expires_at.isoformat() if row.expires_at else None,
-                    "created_at": row.created_at.isoformat() if row.created_at else None,
-                    "is_expired": (row.expires_at < now) if row.expires_at else False,
-                })
-            return result
+            rows = (
+                query.order_by(
+                    PendingRegistrationModel.created_at.desc(),
+                    PendingRegistrationModel.id.desc(),
+                )
+                .limit(limit + 1)
+                .all()
+            )
+            items = [self._search_row(row, now) for row in rows]
+        return make_page(
+            items, limit, lambda r: {"created_at": r["created_at"], "id": r["id"]}, total,
+        )
+
+    @staticmethod
+    def _search_query(session, q: str, include_expired: bool, now: datetime):
+        query = session.query(PendingRegistrationModel)
+        if not include_expired:
+            query = query.filter(PendingRegistrationModel.expires_at > now)
+        if q:
+            like = f"%{q}%"
+            query = query.filter(
+                or_(
+                    PendingRegistrationModel.username.ilike(like),
+                    PendingRegistrationModel.email.ilike(like),
+                    PendingRegistrationModel.full_name.ilike(like),
+                )
+            )
+        return query
+
+    @staticmethod
+    def _search_row(row, now: datetime) -> dict:
+        return {
+            "id": row.id,
+            "full_name": row.full_name,
+            "username": row.username,
+            "email": row.email,
+            "whatsapp": getattr(row, "whatsapp", "---"),
+            "profession": getattr(row, "profession", "---"),
+            "expires_at": row.expires_at.isoformat() if row.expires_at else None,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "is_expired": (row.expires_at < now) if row.expires_at else False,
+        }
 
     def count_active(self) -> int:
         """Count non-expired pending registrations."""
@@ -3,7 +3,12 @@ from uuid import UUID
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List
 
-from sqlalchemy import text
+from sqlalchemy import (
+    text, func, select, update, values, column, case, cast, or_,
+    Boolean, DateTime, Integer, String,
+)
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
 
 from app.domain.player import Player, Attempt
 from app.domain.character import Character
@@ -13,109 +18,309 @@ from app.domain.enums import (
 from app.infrastructure.database.models import (
     GameSessionModel, CharacterModel, AttemptModel,
 )
+from app.infrastructure.database.unit_of_work import on_rollback
+from app.infrastructure.repositories.presence_registry import PresenceRegistry
+from app.infrastructure.repositories.world_state_buffer import Batch, WorldStateBuffer
+
+# Session ownership never changes; cap the cache so it cannot grow unbounded.
+_OWNER_CACHE_MAX = 10_000
+
+# "Online now" window used by the admin views, and how long a presence
+# snapshot taken during a heartbeat flush may be served instead of SQL.
+ONLINE_WINDOW_MINUTES = 5
+PRESENCE_SNAPSHOT_TTL = 30.0
+
+# Correlated COUNT used by summary loads instead of fetching attempt rows.
+_ATTEMPT_COUNT = (
+    select(func.count(AttemptModel.id))
+    .where(AttemptModel.session_id == GameSessionModel.id)
+    .correlate(GameSessionModel)
+    .scalar_subquery()
+    .label("attempt_count")
+)
+
+_OWNER_SQL = text("SELECT user_id FROM game_sessions WHERE id = :sid")
+
+_ACTIVE_COLUMNS = """
+    id, name, user_id, stage, score, language,
+    COALESCE(cardinality(completed_challenges), 0) AS completed,
+    current_errors, game_over_count
+"""
+
+
+# Mutable game_sessions columns, keyed by the Player property they mirror
+# (the names used in Player.dirty_fields).
+_SESSION_COLUMNS = {
+    "name": lambda p: p.name,
+    "stage": lambda p: p.stage.value,
+    "score": lambda p: p.score,
+    "current_errors": lambda p: p.current_errors,
+    "completed_challenges": lambda p: list(p.completed_challenges),
+    "game_over_count": lambda p: p.game_over_count,
+    "status": lambda p: p.status.value,
+    # World state persistence
+    "collected_books": lambda p: list(p.collected_books),
+    "completed_regions": lambda p: list(p.completed_regions),
+    "current_region": lambda p: p.current_region,
+    "player_world_x": lambda p: p.player_world_x,
+}
 
 
 class PgPlayerRepository:
     """Player session persistence via PostgreSQL (Neon)."""
 
-    def __init__(self, session_factory):
+    def __init__(self, session_factory, read_session_factory=None):
         self._sf = session_factory
+        # Lag-tolerant reads (listings, admin views) may use a read replica.
+        self._read_sf = read_session_factory or session_factory
+        self._world_state = WorldStateBuffer()
+        self._presence = PresenceRegistry()
+        self._owners: dict = {}
 
     # ------------------------------------------------------------------
     # Write
     # ------------------------------------------------------------------
 
     def save(self, player: Player) -> None:
-        """Persist the full Player aggregate (character + session + new attempts)."""
+        """Persist what changed in the Player aggregate since it was loaded.
+
+        New aggregates: character insert (ON CONFLICT DO NOTHING) plus one
+        session ``INSERT ... ON CONFLICT DO UPDATE``.  Loaded aggregates: one
+        UPDATE of the dirty columns only.  Either way, appended attempts go
+        in one multi-row INSERT, and a clean aggregate costs no SQL at all.
+        """
+        statements = self._save_statements(player)
+        if not statements:
+            return
         with self._sf() as session:
-            # 1) Upsert character
+            for stmt in statements:
+                session.execute(stmt)
+            session.commit()
+        player.mark_persisted()
+
+    @staticmethod
+    def _save_statements(player: Player) -> list:
+        """The statements ``save`` runs, in order, in one transaction."""
+        pid = str(player.id)
+        dirty = player.dirty_fields
+        new_attempts = player.new_attempts
+        if not player.is_new and not dirty and not new_attempts:
+            return []
+
+        statements = []
+        if player.is_new:
             char_id = str(player.character.id)
-            char = session.get(CharacterModel, char_id)
-            if not char:
-                char = CharacterModel(
+            # 1) Character: written once, never updated
+            statements.append(
+                pg_insert(CharacterModel)
+                .values(
                     id=char_id,
                     gender=player.character.gender.value,
                     ethnicity=player.character.ethnicity.value,
                     avatar_index=player.character.avatar_index,
                 )
-                session.add(char)
-                session.flush()
-
-            # 2) Upsert game session
-            pid = str(player.id)
-            gs = session.get(GameSessionModel, pid)
-            if gs:
-                gs.name = player.name
-                gs.stage = player.stage.value
-                gs.score = player.score
-                gs.current_errors = player.current_errors
-                gs.completed_challenges = list(player.completed_challenges)
-                gs.game_over_count = player.game_over_count
-                gs.status = player.status.value
-                # World state persistence
-                gs.collected_books = list(player.collected_books)
-                gs.completed_regions = list(player.completed_regions)
-                gs.current_region = player.current_region
-                gs.player_world_x = player.player_world_x
-            else:
-                gs = GameSessionModel(
-                    id=pid,
-                    user_id=player.user_id,
-                    name=player.name,
-                    character_id=char_id,
-                    language=player.language.value,
-                    stage=player.stage.value,
-                    score=player.score,
-                    current_errors=player.current_errors,
-                    completed_challenges=list(player.completed_challenges),
-                    game_over_count=player.game_over_count,
-                    status=player.status.value,
-                    # World state persistence
-                    collected_books=list(player.collected_books),
-                    completed_regions=list(player.completed_regions),
-                    current_region=player.current_region,
-                    player_world_x=player.player_world_x,
+                .on_conflict_do_nothing(index_elements=[CharacterModel.id])
+            )
+            # 2) Game session row (upsert keeps a retried first save idempotent)
+            stmt = pg_insert(GameSessionModel).values(
+                id=pid,
+                user_id=player.user_id,
+                character_id=char_id,
+                language=player.language.value,
+                **{col: get(player) for col, get in _SESSION_COLUMNS.items()},
+            )
+            statements.append(stmt.on_conflict_do_update(
+                index_elements=[GameSessionModel.id],
+                set_={
+                    **{col: stmt.excluded[col] for col in _SESSION_COLUMNS},
+                    "updated_at": func.now(),
+                },
+            ))
+        elif dirty:
+            # 2) Only the columns the domain actually changed
+            statements.append(
+                update(GameSessionModel)
+                .where(GameSessionModel.id == pid)
+                .values(
+                    **{col: _SESSION_COLUMNS[col](player) for col in sorted(dirty)},
+                    updated_at=func.now(),
                 )
-                session.add(gs)
+            )
+
+        # 3) Appended attempts (append-only), as one statement
+        if new_attempts:
+            statements.append(pg_insert(AttemptModel).values([
+                {
+                    "session_id": pid,
+                    "challenge_id": ad["challenge_id"],
+                    "selected_index": ad["selected_index"],
+                    "is_correct": ad["is_correct"],
+                    "points_awarded": ad["points_awarded"],
+                    # Domain event time -- attempts are read back ordered
+                    # by timestamp, so keep the order they happened in.
+                    "timestamp": ad["timestamp"],
+                    "answer_ms": ad.get("answer_ms"),
+                }
+                for ad in (a.to_dict() for a in new_attempts)
+            ]))
+        return statements
 
-            # 3) Insert only NEW attempts (append-only)
-            existing_count = (
-                session.query(AttemptModel)
-                .filter(AttemptModel.session_id == pid)
-                .count()
+    # ------------------------------------------------------------------
+    # World state (write-behind)
+    # ------------------------------------------------------------------
+
+    def buffer_world_state(self, session_id: str, patch: dict) -> None:
+        """Queue a world-state patch; written by ``flush_world_state``.
+
+        ``patch`` uses ``Player.update_world_state`` keywords.  Reads of the
+        same session through ``get()`` apply the pending patch first.
+        """
+        self._world_state.put(session_id, patch)
+
+    def pending_world_state(self) -> int:
+        return len(self._world_state)
+
+    def flush_world_state(self) -> int:
+        """Write every pending patch in one UPDATE. Returns rows updated."""
+        batch = self._world_state.drain()
+        if not batch:
+            return 0
+        try:
+            with self._sf() as session:
+                updated = self._write_world_state(session, batch)
+                session.commit()
+                return updated
+        except Exception:
+            self._world_state.restore(batch)
+            raise
+
+    @classmethod
+    def _write_world_state(cls, session, batch: Batch) -> int:
+        return session.execute(cls._world_state_statement(batch)).rowcount
+
+    @staticmethod
+    def _world_state_statement(batch: Batch):
+        """``UPDATE game_sessions ... FROM (VALUES ...)`` for a whole batch.
+
+        Each row carries "was this field sent" flags so an explicit
+        ``current_region=None`` clears the region while absent fields are
+        kept.  ``world_state_at`` rejects patches older than the one stored
+        (another worker may have flushed a newer save first).
+        """
+        ws = values(
+            column("id", PG_UUID(as_uuid=False)),
+            column("set_books", Boolean), column("books", ARRAY(String)),
+            column("set_regions", Boolean), column("regions", ARRAY(String)),
+            column("set_region", Boolean), column("region", String),
+            column("set_x", Boolean), column("x", Integer),
+            column("at", DateTime(timezone=True)),
+            name="ws",
+        ).data([
+            (
+                sid,
+                "collected_books" in patch, list(patch.get("collected_books") or []),
+                "completed_regions" in patch, list(patch.get("completed_regions") or []),
+                "current_region" in patch, patch.get("current_region"),
+                "player_world_x" in patch, int(patch.get("player_world_x") or 0),
+                at,
+            )
+            for sid, (patch, at) in batch.items()
+        ])
+        gs = GameSessionModel
+        return (
+            update(gs)
+            .where(gs.id == ws.c.id)
+            .where(or_(gs.world_state_at.is_(None), gs.world_state_at <= ws.c.at))
+            .values(
+                collected_books=case((ws.c.set_books, ws.c.books), else_=gs.collected_books),
+                completed_regions=case((ws.c.set_regions, ws.c.regions), else_=gs.completed_regions),
+                current_region=case(
+                    (ws.c.set_region, cast(ws.c.region, String)), else_=gs.current_region,
+                ),
+                player_world_x=case((ws.c.set_x, ws.c.x), else_=gs.player_world_x),
+                world_state_at=ws.c.at,
+                updated_at=func.now(),
             )
-            for attempt in player.attempts[existing_count:]:
-                ad = attempt.to_dict()
-                session.add(AttemptModel(
-                    session_id=pid,
-                    challenge_id=ad["challenge_id"],
-                    selected_index=ad["selected_index"],
-                    is_correct=ad["is_correct"],
-                    points_awarded=ad["points_awarded"],
-                ))
+        )
 
-            session.commit()
+    def get_owner(self, session_id: str) -> Optional[str]:
+        """Owner user_id of a session ("" if anonymous), None if it does not exist.
+
+        Cached: lets world-state saves authorize without loading the aggregate.
+        """
+        owner = self._owners.get(session_id)
+        if owner is not None:
+            return owner
+        with self._sf() as session:
+            row = session.execute(_OWNER_SQL, {"sid": session_id}).first()
+        return self._remember_owner(session_id, row)
+
+    def _remember_owner(self, session_id: str, row) -> Optional[str]:
+        if row is None:
+            return None
+        if len(self._owners) >= _OWNER_CACHE_MAX:
+            self._owners.clear()
+        owner = self._owners[session_id] = str(row[0]) if row[0] else ""
+        return owner
 
     # ------------------------------------------------------------------
     # Read
     # ------------------------------------------------------------------
 
     def touch_timestamp(self, session_id: str) -> bool:
-        """Update only updated_at for a session -- minimal 1-row write for heartbeat.
+        """Record a heartbeat in the presence registry (no SQL once the owner is cached).
 
-        Avoids loading the full player JSON just to bump a timestamp.
-        Returns True if the row was found and updated, False otherwise.
+        ``updated_at`` is bumped in batches by ``flush_presence``.
+        Returns True if the session exists, False otherwise.
         """
-        with self._sf() as session:
-            result = session.execute(
-                text("UPDATE game_sessions SET updated_at = NOW() WHERE id = :sid"),
-                {"sid": session_id},
-            )
-            session.commit()
-            return result.rowcount > 0
+        if self.get_owner(session_id) is None:
+            return False
+        self._presence.beat(session_id)
+        return True
+
+    def flush_presence(self) -> int:
+        """Bump ``updated_at`` for every session seen since the last flush.
+
+        One statement: ``UPDATE ... WHERE id = ANY(:ids)`` in a CTE, with the
+        online-now list (all workers' sessions) selected in the same round
+        trip to refresh the presence snapshot. No SQL when nothing is pending,
+        so an idle app lets Neon suspend. Returns the number of ids flushed.
+        """
+        ids = self._presence.drain()
+        if not ids:
+            return 0
+        try:
+            with self._sf() as session:
+                rows = session.execute(
+                    text(f"""
+                        WITH touched AS (
+                            UPDATE game_sessions SET updated_at = NOW()
+                            WHERE id = ANY(CAST(:ids AS uuid[]))
+                            RETURNING id
+                        )
+                        SELECT {_ACTIVE_COLUMNS},
+                               CASE WHEN id IN (SELECT id FROM touched)
+                                    THEN NOW() ELSE updated_at END AS last_active
+                        FROM game_sessions
+                        WHERE status = 'in_progress'
+                          AND (updated_at >= :cutoff OR id IN (SELECT id FROM touched))
+                        ORDER BY last_active DESC
+                        LIMIT 500
+                    """),
+                    {"ids": ids, "cutoff": self._online_cutoff(ONLINE_WINDOW_MINUTES)},
+                ).all()
+                session.commit()
+        except Exception:
+            self._presence.restore(ids)
+            raise
+        self._presence.set_online([self._active_row(r) for r in rows])
+        return len(ids)
 
     def delete_session(self, session_id: str) -> bool:
         """Permanently delete a game session and all its attempts (raw SQL for cascade)."""
+        self._world_state.pop(session_id)
+        self._presence.forget(session_id)
+        self._owners.pop(session_id, None)
         with self._sf() as session:
             session.execute(
                 text("DELETE FROM attempts WHERE session_id = :sid"),
@@ -128,17 +333,51 @@ class PgPlayerRepository:
             session.commit()
             return del_result.rowcount > 0
 
-    def get(self, player_id: str) -> Optional[Player]:
-        """Load a full Player aggregate by session id."""
+    def get(self, player_id: str, with_attempts: bool = True) -> Optional[Player]:
+        """Load a Player aggregate by session id, in a single SELECT.
+
+        ``with_attempts=True``: session + character + attempt history joined.
+        ``with_attempts=False`` (summary): session + character + attempt COUNT;
+        enough for every game route, since saves only append new attempts.
+
+        A buffered world-state patch for this session is written first (same
+        transaction), so submit/reset/read never see stale world state.
+        """
+        pending = self._world_state.pop(player_id)
         with self._sf() as session:
-            gs = session.get(GameSessionModel, player_id)
-            if not gs:
-                return None
-            return self._to_domain(gs)
+            if pending:
+                try:
+                    self._write_world_state(session, {player_id: pending})
+                    session.commit()
+                except Exception:
+                    self._world_state.restore({player_id: pending})
+                    raise
+                on_rollback(lambda: self._world_state.restore({player_id: pending}))
+            result = session.execute(self._load_statement(player_id, with_attempts))
+            return self._loaded(result, with_attempts)
+
+    @staticmethod
+    def _load_statement(player_id: str, with_attempts: bool):
+        if with_attempts:
+            return (
+                select(GameSessionModel)
+                .options(joinedload(GameSessionModel.attempts))
+                .where(GameSessionModel.id == player_id)
+            )
+        return select(GameSessionModel, _ATTEMPT_COUNT).where(GameSessionModel.id == player_id)
+
+    @classmethod
+    def _loaded(cls, result, with_attempts: bool) -> Optional[Player]:
+        """The aggregate from a ``_load_statement`` result (None if missing)."""
+        if with_attempts:
+            gs = result.unique().scalar_one_or_none()
+            return cls._to_domain(gs) if gs else None
+        row = result.first()
+        return cls._to_domain(row[0], attempt_count=row[1]) if row else None
 
     def find_by_user_id(self, user_id: str) -> List[dict]:
         """Return summary list of all sessions belonging to a user."""
-        with self._sf() as session:
+        with self._read_sf() as session:
             rows = (
                 session.query(GameSessionModel)
                 .filter(GameSessionModel.user_id == user_id)
@@ -159,20 +398,20 @@ class PgPlayerRepository:
             ]
 
     def get_all(self) -> List[Player]:
-        """Return all sessions as Player domain objects (used by admin dashboard)."""
-        with self._sf() as session:
-            rows = (
-                session.query(GameSessionModel)
+        """Return all sessions as summary Player objects (used by admin dashboard)."""
+        with self._read_sf() as session:
+            rows = session.execute(
+                select(GameSessionModel, _ATTEMPT_COUNT)
                 .order_by(GameSessionModel.created_at.desc())
-                .all()
-            )
-            return [self._to_domain(r) for r in rows]
+            ).all()
+            return [self._to_domain(gs, attempt_count=n) for gs, n in rows]
 
     def get_all_dict(self) -> List[dict]:
         """Return all sessions as dicts including attempts (used by admin ranking/sessions)."""
-        with self._sf() as session:
+        with self._read_sf() as session:
             rows = (
                 session.query(GameSessionModel)
+                .options(selectinload(GameSessionModel.attempts))  # 2 queries, not N+1
                 .order_by(GameSessionModel.created_at.desc())
                 .all()
             )
@@ -191,42 +430,56 @@ class PgPlayerRepository:
         """Return sessions with activity in the last N minutes (online now).
 
         Uses updated_at as the last-active signal -- it is bumped on every
-        save() call, which happens on every submit_answer or progress_stage.
+        save() and by the batched heartbeat flush.  For the standard window
+        the snapshot refreshed by ``flush_presence`` is served without SQL.
         """
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=minutes)
-        with self._sf() as session:
-            rows = (
-                session.query(GameSessionModel)
-                .filter(
-                    GameSessionModel.updated_at >= cutoff,
-                    GameSessionModel.status == "in_progress",
-                )
-                .order_by(GameSessionModel.updated_at.desc())
-                .limit(500)  # safety cap: 500 concurrent active users is ceiling for this app
-                .all()
-            )
-            return [
-                {
-                    "session_id": r.id,
-                    "player_name": r.name,
-                    "user_id": r.user_id,
-                    "stage": r.stage,
-                    "score": r.score,
-                    "language": r.language,
-                    "completed_challenges": len(r.completed_challenges or []),
-                    "current_errors": r.current_errors,
-                    "game_over_count": r.game_over_count,
-                    "last_active_at": r.updated_at.isoformat() if r.updated_at else None,
-                }
-                for r in rows
-            ]
+        if minutes == ONLINE_WINDOW_MINUTES:
+            snapshot = self._presence.online(max_age=PRESENCE_SNAPSHOT_TTL)
+            if snapshot is not None:
+                return snapshot
+        with self._read_sf() as session:
+            rows = session.execute(
+                text(f"""
+                    SELECT {_ACTIVE_COLUMNS}, updated_at AS last_active
+                    FROM game_sessions
+                    WHERE updated_at >= :cutoff AND status = 'in_progress'
+                    ORDER BY updated_at DESC
+                    LIMIT 500
+                """),  # safety cap: 500 concurrent active users is ceiling for this app
+                {"cutoff": self._online_cutoff(minutes)},
+            ).all()
+        return [self._active_row(r) for r in rows]
+
+    @staticmethod
+    def _online_cutoff(minutes: int) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(minutes=minutes)
+
+    @staticmethod
+    def _active_row(r) -> dict:
+        return {
+            "session_id": str(r.id),
+            "player_name": r.name,
+            "user_id": str(r.user_id) if r.user_id else None,
+            "stage": r.stage,
+            "score": r.score,
+            "language": r.language,
+            "completed_challenges": r.completed,
+            "current_errors": r.current_errors,
+            "game_over_count": r.game_over_count,
+            "last_active_at": r.last_active.isoformat() if r.last_active else None,
+        }
 
     # ------------------------------------------------------------------
     # Mapping
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _to_domain(gs: GameSessionModel) -> Player:
+    def _to_domain(gs: GameSessionModel, attempt_count: int | None = None) -> Player:
+        """Map a row to the aggregate.
+
+        With ``attempt_count`` the attempt history is not touched (no lazy
+        load); the aggregate only knows how many attempts exist.
+        """
         char = gs.character
         character = Character(
             gender=Gender(char.gender),
@@ -241,10 +494,11 @@ class PgPlayerRepository:
                 is_correct=a.is_correct,
                 points_awarded=a.points_awarded,
                 timestamp=a.timestamp.isoformat() if a.timestamp else None,
+                answer_ms=a.answer_ms,
             )
             for a in gs.attempts
-        ]
-        return Player(
+        ] if attempt_count is None else []
+        player = Player(
             name=gs.name,
             character=character,
             language=BackendLanguage(gs.language),
@@ -263,4 +517,7 @@ class PgPlayerRepository:
             completed_regions=list(gs.completed_regions or []),
             current_region=gs.current_region,
             player_world_x=gs.player_world_x or 100,
+            unloaded_attempts=attempt_count or 0,
         )
+        player.mark_persisted()
+        return player
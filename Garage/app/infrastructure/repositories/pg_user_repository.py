@@ -9,8 +9,10 @@ from app.infrastructure.database.models import UserModel, UserMetricsModel
 class PgUserRepository:
     """User persistence via PostgreSQL (Neon)."""
 
-    def __init__(self, session_factory):
+    def __init__(self, session_factory, read_session_factory=None):
         self._sf = session_factory
+        # Lag-tolerant reads may use a read replica.
+        self._read_sf = read_session_factory or session_factory
 
     # ------------------------------------------------------------------
     # Write
@@ -120,7 +122,7 @@ class PgUserRepository:
 
     def get_all(self) -> list:
         """Return all registered users."""
-        with self._sf() as session:
+        with self._read_sf() as session:
             rows = session.query(UserModel).order_by(UserModel.created_at.desc()).all()
             return [self._to_domain(r) for r in rows]
 
@@ -207,22 +209,24 @@ class PgUserRepository:
 
     def get_subscription_status(self, user_id: str) -> dict:
         """Return the subscription status dict for a user."""
-        from datetime import datetime, timezone
         with self._sf() as session:
-            row = session.get(UserModel, user_id)
-            if not row:
-                return {"status": "none", "plan": None, "expires_at": None}
-            expires = row.subscription_expires_at
-            # Auto-expire if past expiration date
-            if expires and expires < datetime.now(timezone.utc):
-                status = "expired"
-            else:
-                status = row.subscription_status or "none"
-            return {
-                "status": status,
-                "plan": row.subscription_plan,
-                "expires_at": expires.isoformat() if expires else None,
-            }
+            return self._subscription_dict(session.get(UserModel, user_id))
+
+    @staticmethod
+    def _subscription_dict(row: Optional[UserModel]) -> dict:
+        if not row:
+            return {"status": "none", "plan": None, "expires_at": None}
+        expires = row.subscription_expires_at
+        # Auto-expire if past expiration date
+        if expires and expires < datetime.now(timezone.utc):
+            status = "expired"
+        else:
+            status = row.subscription_status or "none"
+        return {
+            "status": status,
+            "plan": row.subscription_plan,
+            "expires_at": expires.isoformat() if expires else None,
+        }
 
     # ------------------------------------------------------------------
     # Mapping
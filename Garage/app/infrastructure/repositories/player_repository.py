@@ -23,12 +23,15 @@ class PlayerRepository:
         self._sessions: Dict[str, Player] = {}
 
     def save(self, player: Player) -> None:
-        """Persist player to file."""
+        """Persist player to file (skipped when the aggregate has no changes)."""
+        if not player.is_new and not player.dirty_fields and not player.new_attempts:
+            return
         self._sessions[str(player.id)] = player
         self._persist()
+        player.mark_persisted()
 
-    def get(self, player_id: str) -> Player | None:
-        """Retrieve player from cache or file."""
+    def get(self, player_id: str, with_attempts: bool = True) -> Player | None:
+        """Retrieve player from cache or file (always with full history)."""
         if player_id in self._sessions:
             return self._sessions[player_id]
         self._load()
@@ -106,6 +109,7 @@ class PlayerRepository:
                     is_correct=a["is_correct"],
                     points_awarded=a["points_awarded"],
                     timestamp=a["timestamp"],
+                    answer_ms=a.get("answer_ms"),
                 )
                 for a in pdata.get("attempts", [])
             ]
@@ -124,4 +128,5 @@ class PlayerRepository:
                 created_at=pdata.get("created_at"),
                 user_id=pdata.get("user_id"),
             )
+            player.mark_persisted()
             self._sessions[pid] = player
@@ -0,0 +1,56 @@
+"""In-memory presence registry for heartbeats (per worker).
+
+Heartbeats only mark a session as seen; the owning repository flushes the
+seen set as one batched ``updated_at`` UPDATE every few seconds and, in the
+same round-trip, refreshes a snapshot of who is online across all workers.
+The admin "online now" views read that snapshot while it is fresh and fall
+back to SQL when it is not (idle worker, just booted).
+"""
+import threading
+import time
+from typing import Iterable, List, Optional
+
+
+class PresenceRegistry:
+    """Pending heartbeat ids plus the last "online now" snapshot."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: set = set()
+        self._online: List[dict] = []
+        self._refreshed_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def beat(self, session_id: str) -> None:
+        with self._lock:
+            self._pending.add(session_id)
+
+    def drain(self) -> List[str]:
+        with self._lock:
+            ids, self._pending = self._pending, set()
+            return sorted(ids)
+
+    def restore(self, session_ids: Iterable[str]) -> None:
+        """Re-queue ids whose flush failed."""
+        with self._lock:
+            self._pending.update(session_ids)
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._pending.discard(session_id)
+            self._online = [r for r in self._online if r["session_id"] != session_id]
+
+    def set_online(self, rows: List[dict]) -> None:
+        """Replace the snapshot (rows shaped like ``get_active_sessions``)."""
+        with self._lock:
+            self._online = list(rows)
+            self._refreshed_at = time.monotonic()
+
+    def online(self, max_age: float) -> Optional[List[dict]]:
+        """The snapshot if refreshed within ``max_age`` seconds, else None."""
+        with self._lock:
+            if self._refreshed_at is None or time.monotonic() - self._refreshed_at > max_age:
+                return None
+            return list(self._online)
@@ -0,0 +1,54 @@
+"""Write-behind buffer for world-state saves (books, regions, position).
+
+The frontend saves world state every few seconds and on unload; almost every
+save is superseded by the next one.  Patches are merged per session in
+memory and written in batches by the owning repository.  Each patch keeps
+the time it was last updated so the writer can refuse to overwrite a newer
+patch already flushed by another worker.
+"""
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+# session_id -> (merged patch, time of the latest put)
+Batch = Dict[str, Tuple[dict, datetime]]
+
+
+class WorldStateBuffer:
+    """Thread-safe map of pending world-state patches, latest value wins."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Batch = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, session_id: str, patch: dict) -> None:
+        """Merge ``patch`` (``Player.update_world_state`` keyword names)."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            current = self._pending.get(session_id)
+            merged = {**current[0], **patch} if current else dict(patch)
+            self._pending[session_id] = (merged, now)
+
+    def pop(self, session_id: str) -> Optional[Tuple[dict, datetime]]:
+        """Remove and return the pending patch for one session, if any."""
+        with self._lock:
+            return self._pending.pop(session_id, None)
+
+    def drain(self) -> Batch:
+        """Remove and return every pending patch."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            return batch
+
+    def restore(self, batch: Batch) -> None:
+        """Put back a batch whose write failed, without clobbering newer puts."""
+        with self._lock:
+            for session_id, (patch, at) in batch.items():
+                newer = self._pending.get(session_id)
+                if newer:
+                    self._pending[session_id] = ({**patch, **newer[0]}, newer[1])
+                else:
+                    self._pending[session_id] = (patch, at)
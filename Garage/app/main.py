@@ -5,6 +5,7 @@ Persistence strategy:
   - Otherwise               -> JSON file fallback (development only).
 """
 import os
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -30,6 +31,7 @@ from app.api.routes.analytics_routes import router as analytics_router, init_ana
 from app.api.routes.account_routes import router as account_router, init_account_routes
 from app.api.routes.diagnostic_routes import router as diagnostic_router
 from app.infrastructure.middleware.idempotency import IdempotencyMiddleware
+from app.infrastructure.middleware.query_stats import QueryStatsMiddleware
 from app.infrastructure.middleware.rate_limit import IpRateLimitMiddleware
 
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -88,6 +90,10 @@ app.add_middleware(StaticCacheMiddleware)
 # `Idempotency-Key` header when provided by the client.
 app.add_middleware(IdempotencyMiddleware)
 
+# Per-route DB query/checkout accounting (see /api/admin/db/metrics); outside
+# the idempotency middleware so its lookups count towards the route too.
+app.add_middleware(QueryStatsMiddleware)
+
 # CORS (required for browser frontend)
 # CORS configuration: read allowed origins from env (comma-separated).
 # IMPORTANT: allow_credentials=True is INVALID with allow_origins=["*"] per the
@@ -130,11 +136,13 @@ metrics_service = None
 event_service = None
 verification_repo = None  # set only when PostgreSQL is available
 pending_repo = None       # PgPendingRepository -- pre-verification staging table
+admin_repo = None         # PgAdminRepository -- SQL aggregates for the admin panel
 
 if DATABASE_URL:
     # -- PostgreSQL (Neon primary + Supabase fallback) ----------------------
     from app.infrastructure.database.connection import (
-        init_engine, create_tables, dynamic_session_factory, check_health, get_db_status,
+        init_engine, create_tables, dynamic_session_factory, read_session_factory,
+        check_health, get_db_status,
     )
     from app.infrastructure.repositories.pg_user_repository import PgUserRepository
     from app.infrastructure.repositories.pg_player_repository import PgPlayerRepository
@@ -143,6 +151,7 @@ if DATABASE_URL:
     from app.infrastructure.repositories.pg_verification_repository import PgVerificationRepository
     from app.infrastructure.repositories.pg_pending_repository import PgPendingRepository
     from app.infrastructure.repositories.pg_landing_analytics_repository import PgLandingAnalyticsRepository
+    from app.infrastructure.repositories.pg_admin_repository import PgAdminRepository
     from app.infrastructure.database.seed import seed_challenges
     from app.application.metrics_service import MetricsService
     from app.application.event_service import EventService
@@ -150,16 +159,78 @@ if DATABASE_URL:
     init_engine()
     create_tables()
     _sf = dynamic_session_factory   # proxy — always routes to active engine
+    _read_sf = read_session_factory  # read replica when configured and fresh
 
-    challenge_repo = PgChallengeRepository(_sf)
-    player_repo = PgPlayerRepository(_sf)
-    leaderboard_repo = PgLeaderboardRepository(_sf)
-    user_repo = PgUserRepository(_sf)
+    challenge_repo = PgChallengeRepository(_sf, read_session_factory=_read_sf)
+    player_repo = PgPlayerRepository(_sf, read_session_factory=_read_sf)
+    leaderboard_repo = PgLeaderboardRepository(_sf, read_session_factory=_read_sf)
+    user_repo = PgUserRepository(_sf, read_session_factory=_read_sf)
     verification_repo = PgVerificationRepository(_sf)
     pending_repo = PgPendingRepository(_sf)
-    landing_analytics_repo = PgLandingAnalyticsRepository(_sf)
-    metrics_service = MetricsService(_sf)
-    event_service = EventService(_sf)
+    landing_analytics_repo = PgLandingAnalyticsRepository(_sf, read_session_factory=_read_sf)
+    admin_repo = PgAdminRepository(_read_sf)  # read-only aggregates
+    metrics_service = MetricsService(_sf, read_session_factory=_read_sf)
+    event_service = EventService(
+        _sf,
+        flush_interval=float(os.environ.get("EVENT_FLUSH_MS", "500")) / 1000,
+        batch_size=int(os.environ.get("EVENT_BATCH_SIZE", "200")),
+        max_queue=int(os.environ.get("EVENT_QUEUE_MAX", "10000")),
+    )
+
+    # -- Write-behind flushes: world-state saves, heartbeats, events, landing (per worker) --
+    from app.infrastructure.periodic import PeriodicTask
+    world_state_flusher = PeriodicTask(
+        "world-state-flush",
+        float(os.environ.get("WORLD_STATE_FLUSH_SECONDS", "5")),
+        player_repo.flush_world_state,
+    )
+    presence_flusher = PeriodicTask(
+        "presence-flush",
+        float(os.environ.get("HEARTBEAT_FLUSH_SECONDS", "5")),
+        player_repo.flush_presence,
+    )
+    landing_flusher = PeriodicTask(
+        "landing-flush",
+        float(os.environ.get("LANDING_FLUSH_SECONDS", "2")),
+        landing_analytics_repo.flush,
+    )
+    for _task in (world_state_flusher, presence_flusher, landing_flusher, event_service):
+        app.router.add_event_handler("startup", _task.start)
+        app.router.add_event_handler("shutdown", _task.stop)
+
+    # -- Event partitions: pre-create coming months, roll up expired ones ---
+    # Startup already ran this (create_tables).  Everything it does changes
+    # only when the UTC month does, so later passes run once per calendar
+    # month (retried every tick until one succeeds) -- independent of whether
+    # writes are succeeding, and an idle worker wakes the database monthly at
+    # most.  Not re-run on shutdown.
+    from app.infrastructure.database.connection import maintain_active_partitions
+    from app.infrastructure.database.partitions import month_start
+    _last_maintained_month = [None]
+
+    def _maintain_partitions_monthly() -> None:
+        month = month_start(datetime.now(timezone.utc))
+        if month != _last_maintained_month[0] and maintain_active_partitions():
+            _last_maintained_month[0] = month
+
+    partition_maintainer = PeriodicTask(
+        "partition-maintenance",
+        float(os.environ.get("PARTITION_MAINTENANCE_SECONDS", str(6 * 3600))),
+        _maintain_partitions_monthly,
+    )
+    app.router.add_event_handler("startup", partition_maintainer.start)
+
+    # -- Primary DB recovery probe + replica lag check -----------------------
+    # Requests never probe; this task restores the primary in the background
+    # (only while the circuit is open) and measures replica lag (only while
+    # reads are being served).
+    from app.infrastructure.database.connection import probe_databases
+    db_prober = PeriodicTask(
+        "db-prober",
+        float(os.environ.get("DB_PROBE_TICK_SECONDS", "5")),
+        probe_databases,
+    )
+    app.router.add_event_handler("startup", db_prober.start)
 
     # Seed challenges from JSON into DB (idempotent — non-fatal if DB is down)
     try:
@@ -169,9 +240,17 @@ if DATABASE_URL:
     except Exception as _seed_exc:
         print(f"[GARAGE][WARN] Seed skipped (DB unavailable): {type(_seed_exc).__name__}: {_seed_exc}")
 
-    # -- Validate challenges are accessible and enum-compatible via PostgreSQL ---
+    # -- Warm the in-memory leaderboard index (rank / top-N without COUNT scans) --
+    try:
+        print(f"[GARAGE] Leaderboard index warmed: {leaderboard_repo.warm()} entries")
+    except Exception as _lb_exc:
+        print(f"[GARAGE][WARN] Leaderboard warm-up deferred: {type(_lb_exc).__name__}: {_lb_exc}")
+
+    # -- Load the in-memory challenge catalog (validates rows and enums once) ---
+    # Every later challenge read is served from this snapshot, so a cold Neon
+    # instance never blocks /api/submit on a challenge lookup.
     try:
-        _challenges_sample = challenge_repo.get_all()
+        _challenges_sample = challenge_repo.reload().all()
         _challenge_count = len(_challenges_sample)
         print(f"[GARAGE] PostgreSQL challenges available and parsed: {_challenge_count}")
         if _challenge_count == 0:
@@ -191,6 +270,34 @@ if DATABASE_URL:
             data_path=os.path.join(DATA_DIR, "challenges.json")
         )
 
+    # -- Async twins for the hot routes (submit, session, heartbeat, world state) --
+    # Native asyncpg queries when sqlalchemy[asyncio] + asyncpg are installed;
+    # the routes fall back to running the sync repositories in the threadpool.
+    from app.infrastructure.database.async_connection import (
+        init_async_engines, dispose_async_engines, async_session_factory,
+    )
+    from app.infrastructure.repositories.async_pg_repositories import (
+        AsyncMetricsService, AsyncPgChallengeRepository, AsyncPgLeaderboardRepository,
+        AsyncPgPlayerRepository, AsyncPgUserRepository,
+    )
+    if isinstance(challenge_repo, PgChallengeRepository):
+        challenge_repo.aio = AsyncPgChallengeRepository(challenge_repo)  # in-memory catalog
+        # Another worker's re-seed bumps catalog_meta; reload when it changes
+        # (one primary-key read per tick).
+        catalog_refresher = PeriodicTask(
+            "catalog-refresh",
+            float(os.environ.get("CATALOG_REFRESH_SECONDS", "60")),
+            challenge_repo.refresh_if_stale,
+        )
+        app.router.add_event_handler("startup", catalog_refresher.start)
+    leaderboard_repo.aio = AsyncPgLeaderboardRepository(leaderboard_repo)  # in-memory index
+    if init_async_engines():
+        player_repo.aio = AsyncPgPlayerRepository(player_repo, async_session_factory)
+        user_repo.aio = AsyncPgUserRepository(user_repo, async_session_factory)
+        metrics_service.aio = AsyncMetricsService(metrics_service, async_session_factory)
+        app.router.add_event_handler("shutdown", dispose_async_engines)
+        print("[GARAGE] Async DB engine enabled for the hot routes.")
+
     _persistence = "postgresql"
 else:
     # -- JSON file fallback (dev) -------------------------------------------
@@ -225,7 +332,8 @@ init_auth_routes(
     pending_repo=pending_repo if DATABASE_URL else None,
 )
 init_admin_routes(user_repo, player_repo, leaderboard_repo, challenge_repo,
-                  pending_repo=pending_repo if DATABASE_URL else None)
+                  pending_repo=pending_repo if DATABASE_URL else None,
+                  admin_repo=admin_repo)
 init_study_routes(player_repo, challenge_repo)
 init_payment_routes(user_repo)
 init_analytics_routes(landing_analytics_repo if DATABASE_URL else None)
@@ -329,6 +437,8 @@ def health():
             result["db_circuit"] = get_db_circuit_state()
         except Exception as exc:
             result["db_circuit"] = f"ERROR: {type(exc).__name__}"
+    if event_service is not None:
+        result["events"] = event_service.stats()
     return result
 
 
@@ -1780,6 +1780,7 @@ const State = {
         livePrepSeen: [],
     },
     _actionCooldownUntil: 0,  // timestamp: ignore action keys until this time
+    challengeShownAt: 0,      // performance.now() when the MCQ opened (answer time)
 };
 
 // ---- NPC definitions ----
@@ -4716,6 +4717,7 @@ const UI = {
 
     showChallenge(challenge) {
         State.isInChallenge = true;
+        State.challengeShownAt = performance.now();
         State._actionCooldownUntil = performance.now() + 300;
         // Release any held movement keys and disable D-pad during MCQ
         if (typeof World !== 'undefined') World.keys = {};
@@ -6004,7 +6006,8 @@ const Game = {
         }
 
         try {
-            const r = await API.post('/api/submit', { session_id: State.sessionId, challenge_id: challengeId, selected_index: idx });
+            const answerMs = State.challengeShownAt ? Math.round(performance.now() - State.challengeShownAt) : null;
+            const r = await API.post('/api/submit', { session_id: State.sessionId, challenge_id: challengeId, selected_index: idx, answer_ms: answerMs });
             btns[idx].classList.add(r.outcome === 'correct' ? 'correct' : 'wrong');
 
             if (r.outcome === 'correct') SFX.correct(); else SFX.wrong();
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Benchmark PgPlayerRepository.save: statements and latency per save.
+
+Replays the same game (create session, answer N challenges, save after each
+answer -- exactly what /api/submit does) through the legacy ORM save path
+and the current upsert path, counting SQL statements with a
+``before_cursor_execute`` hook.  All rows created are deleted at the end.
+
+Usage:
+    python scripts/bench_player_save.py [--answers 20] [--games 5]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+env_file = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(env_file)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, text  # noqa: E402
+
+
+def legacy_save(session_factory, player):
+    """The pre-upsert save path: get/get/COUNT then ORM adds, one per row."""
+    from app.infrastructure.database.models import (
+        GameSessionModel, CharacterModel, AttemptModel,
+    )
+    with session_factory() as session:
+        char_id = str(player.character.id)
+        if not session.get(CharacterModel, char_id):
+            session.add(CharacterModel(
+                id=char_id,
+                gender=player.character.gender.value,
+                ethnicity=player.character.ethnicity.value,
+                avatar_index=player.character.avatar_index,
+            ))
+            session.flush()
+        pid = str(player.id)
+        gs = session.get(GameSessionModel, pid)
+        if gs:
+            gs.score = player.score
+            gs.stage = player.stage.value
+            gs.current_errors = player.current_errors
+            gs.completed_challenges = list(player.completed_challenges)
+            gs.status = player.status.value
+        else:
+            session.add(GameSessionModel(
+                id=pid, user_id=player.user_id, name=player.name,
+                character_id=char_id, language=player.language.value,
+                stage=player.stage.value, score=player.score,
+                current_errors=player.current_errors,
+                completed_challenges=list(player.completed_challenges),
+                game_over_count=player.game_over_count,
+                status=player.status.value,
+            ))
+        existing = session.query(AttemptModel).filter(AttemptModel.session_id == pid).count()
+        for attempt in player.attempts[existing:]:
+            ad = attempt.to_dict()
+            session.add(AttemptModel(
+                session_id=pid, challenge_id=ad["challenge_id"],
+                selected_index=ad["selected_index"], is_correct=ad["is_correct"],
+                points_awarded=ad["points_awarded"],
+            ))
+        session.commit()
+
+
+def play(save, answers):
+    """Create a player and save it after creation and after every answer."""
+    from app.domain.player import Player
+    from app.domain.character import Character
+    from app.domain.enums import Gender, Ethnicity, BackendLanguage
+
+    player = Player(
+        name="bench",
+        character=Character(gender=Gender.MALE, ethnicity=Ethnicity.BLACK, avatar_index=0),
+        language=BackendLanguage.PYTHON,
+    )
+    save(player)
+    for i in range(answers):
+        player.record_attempt(f"bench_{i:03d}", 0, True, 100)
+        save(player)
+    return player
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=20)
+    parser.add_argument("--games", type=int, default=5)
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL", "").strip():
+        print("[ERROR] DATABASE_URL not set. Set it in .env or environment.")
+        return 1
+
+    from app.infrastructure.database.connection import (
+        init_engine, create_tables, get_engine, get_session_factory,
+    )
+    from app.infrastructure.repositories.pg_player_repository import PgPlayerRepository
+
+    init_engine()
+    create_tables()
+    engine, sf = get_engine(), get_session_factory()
+
+    counter = {"n": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, params, context, executemany):
+        counter["n"] += 1
+
+    repo = PgPlayerRepository(sf)
+    variants = {
+        "legacy": lambda p: legacy_save(sf, p),
+        "upsert": repo.save,
+    }
+    created = []
+    saves = args.games * (args.answers + 1)
+    print(f"[BENCH] {args.games} games x {args.answers} answers = {saves} saves per variant")
+    results = {}
+    for label, save in variants.items():
+        counter["n"] = 0
+        start = time.perf_counter()
+        for _ in range(args.games):
+            created.append(play(save, args.answers))
+        elapsed = time.perf_counter() - start
+        results[label] = (counter["n"] / saves, elapsed * 1000 / saves)
+        print(f"[BENCH] {label:<7} {results[label][0]:5.2f} statements/save  "
+              f"{results[label][1]:7.2f} ms/save")
+
+    legacy, upsert = results["legacy"], results["upsert"]
+    print(f"[BENCH] round-trips reduced {legacy[0] / upsert[0]:.1f}x, "
+          f"latency {legacy[1] / upsert[1]:.1f}x")
+
+    with sf() as session:
+        ids = [str(p.id) for p in created]
+        chars = [str(p.character.id) for p in created]
+        session.execute(text("DELETE FROM attempts WHERE session_id = ANY(CAST(:ids AS uuid[]))"), {"ids": ids})
+        session.execute(text("DELETE FROM game_sessions WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": ids})
+        session.execute(text("DELETE FROM characters WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": chars})
+        session.commit()
+    print(f"[BENCH] cleaned up {len(created)} benchmark sessions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,12 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 import app.api.routes.admin_routes as admin_module
+from app.infrastructure.database import challenge_stats as cs
+from app.infrastructure.database import instrumentation
 from app.api.routes.admin_routes import router, init_admin_routes
 from app.infrastructure.auth.dependencies import get_current_user
 from app.domain.enums import GameEnding, CareerStage
+from tests.conftest import make_challenge
 
 
 def _make_mock_user(uid="uid1", email="admin@test.com", name="Admin User"):
@@ -280,3 +283,134 @@ class TestAdminNotAdmin:
         with pytest.raises(HTTPException) as exc:
             _assert_admin({})
         assert exc.value.status_code == 403
+
+
+class TestAdminSqlAggregates:
+    """With an admin repo wired in, the views come from SQL, not get_all()."""
+
+    @pytest.fixture
+    def admin_repo(self, monkeypatch):
+        repo = MagicMock()
+        repo.dashboard_counts.return_value = {
+            "total_users": 7, "total_sessions": 12, "completed_games": 3,
+            "active_games": 5, "game_over_sessions": 4,
+        }
+        repo.users_overview.return_value = [{"id": "u1", "total_sessions": 2}]
+        repo.sessions_overview.return_value = [{"session_id": "s1", "duration_seconds": 30}]
+        repo.ranking.return_value = [{"rank": 1, "user_id": "u1"}]
+        repo.user_detail.return_value = None
+        monkeypatch.setattr(admin_module, "_admin_repo", repo)
+        return repo
+
+    def test_dashboard_uses_sql_counts(self, admin_client, admin_repo):
+        admin_module._player_repo.get_all.reset_mock()
+        data = admin_client.get("/api/admin/dashboard").json()
+        assert data["total_users"] == 7
+        assert data["completed_games"] == 3
+        assert data["game_over_sessions"] == 4
+        assert data["total_challenges"] == 1
+        admin_module._player_repo.get_all.assert_not_called()
+
+    def test_list_views_delegate_to_admin_repo(self, admin_client, admin_repo):
+        admin_module._player_repo.get_all_dict.reset_mock()
+        assert admin_client.get("/api/admin/users").json() == [{"id": "u1", "total_sessions": 2}]
+        assert admin_client.get("/api/admin/sessions").json()[0]["duration_seconds"] == 30
+        assert admin_client.get("/api/admin/ranking").json()[0]["rank"] == 1
+        admin_module._player_repo.get_all_dict.assert_not_called()
+
+    def test_user_detail_not_found(self, admin_client, admin_repo):
+        resp = admin_client.get("/api/admin/users/missing")
+        assert resp.status_code == 404
+        admin_repo.user_detail.assert_called_once_with("missing")
+
+
+class TestAdminChallengeStats:
+    class _Repo:
+        def get_all(self):
+            return [make_challenge("easy_01"), make_challenge("hard_01"), make_challenge("new_01")]
+
+        def stats(self):
+            return [
+                cs.stats_entry("easy_01", 10, 9, 10, 9, 0, 0, options={0: 9, 1: 1}),
+                cs.stats_entry("hard_01", 10, 3, 8, 1, 40000, 4, options={0: 3, 2: 7}),
+            ]
+
+    def test_hardest_first_with_option_histogram(self, admin_client, monkeypatch):
+        monkeypatch.setattr(admin_module, "_challenge_repo", self._Repo())
+        data = admin_client.get("/api/admin/challenges/stats").json()
+        assert [e["challenge_id"] for e in data] == ["hard_01", "easy_01", "new_01"]
+        hard = data[0]
+        assert hard["first_try_rate"] == 0.125
+        assert hard["avg_answer_ms"] == 10000
+        assert [o["picks"] for o in hard["options"]] == [3, 0, 7, 0]
+        assert hard["options"][0]["is_correct"] is True
+        assert data[2]["attempts"] == 0 and data[2]["first_try_rate"] is None
+
+
+class TestAdminDbMetrics:
+    def test_snapshot_and_reset(self, admin_client, monkeypatch):
+        reset = MagicMock()
+        monkeypatch.setattr(instrumentation, "snapshot", lambda: {"pools": {}, "routes": {}})
+        monkeypatch.setattr(instrumentation, "reset", reset)
+        assert admin_client.get("/api/admin/db/metrics").json() == {"pools": {}, "routes": {}}
+        reset.assert_not_called()
+        admin_client.get("/api/admin/db/metrics?reset=true")
+        reset.assert_called_once()
+
+    def test_real_snapshot_is_serialisable(self, admin_client):
+        data = admin_client.get("/api/admin/db/metrics").json()
+        assert {"pools", "routes", "slow_queries", "thresholds"} <= set(data)
+
+
+class TestAdminPagination:
+    def test_without_limit_returns_plain_list(self, admin_client):
+        assert isinstance(admin_client.get("/api/admin/sessions").json(), list)
+
+    def test_in_memory_pages(self, admin_client, monkeypatch):
+        rows = [dict(_make_session_dict(), id=f"s{i}", name=f"P{i}") for i in range(5)]
+        monkeypatch.setattr(admin_module._player_repo, "get_all_dict", MagicMock(return_value=rows))
+        first = admin_client.get("/api/admin/sessions?limit=2").json()
+        assert [s["session_id"] for s in first["items"]] == ["s0", "s1"]
+        assert first["total_estimate"] == 5
+        second = admin_client.get(
+            "/api/admin/sessions", params={"limit": 2, "cursor": first["next_cursor"]}
+        ).json()
+        assert [s["session_id"] for s in second["items"]] == ["s2", "s3"]
+        assert second["total_estimate"] is None
+
+    def test_in_memory_filters(self, admin_client, monkeypatch):
+        rows = [dict(_make_session_dict(), id="a", name="Alice", stage="Mid"),
+                dict(_make_session_dict(), id="b", name="Bob", stage="Intern")]
+        monkeypatch.setattr(admin_module._player_repo, "get_all_dict", MagicMock(return_value=rows))
+        assert [s["session_id"] for s in admin_client.get("/api/admin/sessions?stage=Mid").json()] == ["a"]
+        assert [s["session_id"] for s in admin_client.get("/api/admin/sessions?q=bob").json()] == ["b"]
+
+    def test_bad_cursor_is_400(self, admin_client):
+        resp = admin_client.get("/api/admin/users?limit=5&cursor=not-a-cursor")
+        assert resp.status_code == 400
+
+    def test_limit_is_bounded(self, admin_client):
+        assert admin_client.get("/api/admin/users?limit=0").status_code == 422
+        assert admin_client.get("/api/admin/users?limit=1000").status_code == 422
+
+    def test_pg_pages_delegate_with_filters(self, admin_client, monkeypatch):
+        repo = MagicMock()
+        repo.users_page.return_value = {"items": [], "next_cursor": None, "total_estimate": 0}
+        monkeypatch.setattr(admin_module, "_admin_repo", repo)
+        admin_client.get("/api/admin/users?limit=25&q=ana&subscription=active")
+        repo.users_page.assert_called_once_with(25, None, search="ana", subscription="active")
+
+    def test_pg_bad_cursor_is_400(self, admin_client, monkeypatch):
+        repo = MagicMock()
+        repo.ranking_page.side_effect = ValueError("invalid cursor")
+        monkeypatch.setattr(admin_module, "_admin_repo", repo)
+        assert admin_client.get("/api/admin/ranking?limit=5&cursor=abc").status_code == 400
+
+    def test_pending_pages(self, admin_client, monkeypatch):
+        pending = MagicMock()
+        pending.search_page.return_value = {"items": [{"id": "p1"}], "next_cursor": None,
+                                            "total_estimate": 1}
+        monkeypatch.setattr(admin_module, "_pending_repo", pending)
+        data = admin_client.get("/api/admin/pending?limit=10&q=x").json()
+        assert data["items"] == [{"id": "p1"}]
+        pending.search_page.assert_called_once_with(10, None, q="x", include_expired=True)
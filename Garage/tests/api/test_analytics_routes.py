@@ -0,0 +1,65 @@
+"""Tests for the public landing analytics endpoints (single + batch)."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import analytics_routes
+from app.infrastructure.repositories.pg_landing_analytics_repository import (
+    PgLandingAnalyticsRepository,
+)
+
+
+def _client(repo):
+    app = FastAPI()
+    app.include_router(analytics_routes.router)
+    analytics_routes.init_analytics_routes(repo)
+    return TestClient(app)
+
+
+def _event(**kw):
+    return {"visitor_id": "v-12345678", "event_type": "page_view", **kw}
+
+
+class TestLandingIngest:
+    def setup_method(self):
+        self.repo = PgLandingAnalyticsRepository(session_factory=None)
+
+    def teardown_method(self):
+        analytics_routes.init_analytics_routes(None)
+
+    def test_single_event_is_buffered(self):
+        resp = _client(self.repo).post(
+            "/api/analytics/landing", json=_event(),
+            headers={"x-forwarded-for": "203.0.113.9, 10.0.0.1"},
+        )
+        assert resp.status_code == 201
+        assert self.repo.pending() == 1
+        assert self.repo._buffer[0]["ip_address"] == "203.0.113.9"
+
+    def test_forwarded_for_that_is_not_an_ip_is_ignored(self):
+        resp = _client(self.repo).post(
+            "/api/analytics/landing", json=_event(),
+            headers={"x-forwarded-for": "x" * 500},
+        )
+        assert resp.status_code == 201
+        assert self.repo._buffer[0]["ip_address"] == "testclient"
+
+    def test_batch_is_buffered(self):
+        body = {"events": [_event(), _event(event_type="click", element="btn-hero"),
+                           _event(event_type="scroll_depth", scroll_pct=50)]}
+        resp = _client(self.repo).post("/api/analytics/landing/batch", json=body)
+        assert resp.status_code == 201
+        assert resp.json() == {"ok": True, "accepted": 3}
+        assert [e["event_type"] for e in self.repo._buffer] == ["page_view", "click", "scroll_depth"]
+
+    def test_batch_limits(self):
+        client = _client(self.repo)
+        assert client.post("/api/analytics/landing/batch", json={"events": []}).status_code == 422
+        too_many = {"events": [_event()] * 51}
+        assert client.post("/api/analytics/landing/batch", json=too_many).status_code == 422
+        bad = {"events": [_event(event_type="nope")]}
+        assert client.post("/api/analytics/landing/batch", json=bad).status_code == 422
+        assert self.repo.pending() == 0
+
+    def test_disabled_without_repo(self):
+        resp = _client(None).post("/api/analytics/landing/batch", json={"events": [_event()]})
+        assert resp.json()["note"] == "analytics_disabled"
@@ -6,7 +6,7 @@ Covers:
 - /api/session/{id}
 - /api/challenges (list + filter)
 - /api/submit (correct / wrong / game-over)
-- /api/save-world-state (authenticated)
+- /api/save-world-state (authenticated, direct and write-behind buffered)
 - /api/save-world-state-beacon (token in body + missing token = 401)
 - /api/heartbeat
 - /api/leaderboard (limit validation)
@@ -108,6 +108,60 @@ class TestChallenges:
         resp = client.get("/api/challenges?stage=Galactic")
         assert resp.status_code == 400
 
+    def test_challenges_carry_strong_etag(self, client):
+        resp = client.get("/api/challenges")
+        etag = resp.headers["etag"]
+        assert etag.startswith('"') and etag.endswith('"')
+        assert resp.headers["cache-control"] == "no-cache"
+
+    def test_if_none_match_returns_304(self, client):
+        etag = client.get("/api/challenges").headers["etag"]
+        resp = client.get("/api/challenges", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+
+    def test_stale_etag_returns_full_body(self, client):
+        resp = client.get("/api/challenges", headers={"If-None-Match": '"stale"'})
+        assert resp.status_code == 200
+        assert isinstance(resp.json(), list)
+
+    def test_gzip_served_only_when_accepted(self, client):
+        gz = client.get("/api/challenges", headers={"Accept-Encoding": "gzip"})
+        plain = client.get("/api/challenges", headers={"Accept-Encoding": "identity"})
+        assert gz.headers.get("content-encoding") == "gzip"
+        assert "content-encoding" not in plain.headers
+        assert gz.json() == plain.json()
+        assert gz.headers["etag"] != plain.headers["etag"]
+
+    def test_single_challenge_etag_and_404(self, client):
+        resp = client.get("/api/challenges/intern_01_test")
+        assert resp.status_code == 200
+        assert resp.json()["id"] == "intern_01_test"
+        again = client.get("/api/challenges/intern_01_test",
+                           headers={"If-None-Match": resp.headers["etag"]})
+        assert again.status_code == 304
+        assert client.get("/api/challenges/nope").status_code == 404
+
+
+    def test_difficulty_is_public_and_hides_option_picks(self, client, auth_headers):
+        own_session = client.post("/api/start", json={
+            "player_name": "StatsDev", "gender": "male", "ethnicity": "white",
+            "avatar_index": 0, "language": "Java",
+        }, headers=auth_headers).json()["session_id"]
+        client.post("/api/submit", json={
+            "session_id": own_session,
+            "challenge_id": "intern_01_test",
+            "selected_index": 0,
+            "answer_ms": 2500,
+        }, headers=auth_headers)
+        resp = client.get("/api/challenges/difficulty")
+        assert resp.status_code == 200
+        entry = next(e for e in resp.json() if e["challenge_id"] == "intern_01_test")
+        assert entry["attempts"] >= 1
+        assert entry["avg_answer_ms"] is not None
+        assert "option_picks" not in entry
+
 
 # ---------------------------------------------------------------------------
 # /api/submit
@@ -181,6 +235,76 @@ class TestSaveWorldState:
         assert resp.status_code == 401
 
 
+class BufferingPlayerRepo:
+    """Wraps the JSON repo with the write-behind API of PgPlayerRepository."""
+
+    def __init__(self, inner):
+        self._inner = inner
+        self.buffered = []
+        self.owner_lookups = 0
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def get_owner(self, session_id):
+        self.owner_lookups += 1
+        player = self._inner.get(session_id)
+        return None if player is None else (player.user_id or "")
+
+    def buffer_world_state(self, session_id, patch):
+        self.buffered.append((session_id, patch))
+
+    def save(self, player):  # pragma: no cover - must not be reached
+        raise AssertionError("world-state saves must be buffered")
+
+
+class TestSaveWorldStateBuffered:
+    @pytest.fixture
+    def buffering_repo(self, monkeypatch):
+        import app.api.routes.game_routes as game_module
+        repo = BufferingPlayerRepo(game_module._player_repo)
+        monkeypatch.setattr(game_module, "_player_repo", repo)
+        return repo
+
+    def test_patch_is_buffered_not_saved(self, client, auth_headers, session_id, buffering_repo):
+        resp = client.post("/api/save-world-state", json={
+            "session_id": session_id,
+            "collected_books": ["book_alan"],
+            "player_world_x": 300,
+        }, headers=auth_headers)
+        assert resp.status_code == 200
+        assert buffering_repo.buffered == [(session_id, {
+            "current_region": None,
+            "collected_books": ["book_alan"],
+            "player_world_x": 300,
+        })]
+
+    def test_beacon_is_buffered(self, client, auth_headers, session_id, buffering_repo):
+        token = auth_headers["Authorization"].replace("Bearer ", "")
+        resp = client.post("/api/save-world-state-beacon", json={
+            "session_id": session_id,
+            "current_region": "Apple Garage",
+            "access_token": token,
+        })
+        assert resp.status_code == 200
+        assert buffering_repo.buffered[0][1] == {"current_region": "Apple Garage"}
+
+    def test_unknown_session_is_404(self, client, auth_headers, buffering_repo):
+        resp = client.post("/api/save-world-state", json={
+            "session_id": "00000000-0000-0000-0000-000000000000",
+        }, headers=auth_headers)
+        assert resp.status_code == 404
+        assert buffering_repo.buffered == []
+
+    def test_other_owner_is_403(self, client, auth_headers, session_id, buffering_repo, monkeypatch):
+        monkeypatch.setattr(buffering_repo, "get_owner", lambda sid: "someone-else")
+        resp = client.post("/api/save-world-state", json={
+            "session_id": session_id,
+        }, headers=auth_headers)
+        assert resp.status_code == 403
+        assert buffering_repo.buffered == []
+
+
 # ---------------------------------------------------------------------------
 # /api/save-world-state-beacon — SECURITY: requires token in body
 # ---------------------------------------------------------------------------
@@ -258,6 +382,45 @@ class TestLeaderboard:
         resp = client.get("/api/leaderboard?limit=100")
         assert resp.status_code == 200
 
+
+class TestLeaderboardSegments:
+    def test_language_segment(self, client):
+        from app.api.routes import game_routes
+        game_routes._leaderboard_repo.submit("seg-go", 4200, "Staff", "Go")
+        data = client.get("/api/leaderboard?language=Go&window=daily").json()
+        assert [e["player_name"] for e in data] == ["seg-go"]
+
+    def test_unknown_window_rejected(self, client):
+        assert client.get("/api/leaderboard?window=yearly").status_code == 422
+
+
+class TestLeaderboardMe:
+    def test_requires_auth(self, client):
+        assert client.get("/api/leaderboard/me").status_code == 401
+
+    def test_no_entry_yet(self, client, auth_headers):
+        data = client.get("/api/leaderboard/me", headers=auth_headers).json()
+        assert data["entry"] is None
+        assert data["above"] == [] and data["below"] == []
+
+    def test_rank_and_neighbours(self, client, auth_headers):
+        from app.api.routes import game_routes
+        from app.infrastructure.auth.jwt_handler import verify_token
+        uid = verify_token(auth_headers["Authorization"].split()[1])["sub"]
+        repo = game_routes._leaderboard_repo
+        for i, score in enumerate((900, 800, 700, 600, 500)):
+            repo.submit(f"other{i}", score, "Mid", "Python")
+        repo.submit("me", 650, "Senior", "Python", user_id=uid)
+        data = client.get("/api/leaderboard/me?k=2", headers=auth_headers).json()
+        assert data["entry"]["player_name"] == "me"
+        assert data["rank"] == data["entry"]["rank"]
+        assert [e["score"] for e in data["above"]] == [800, 700]
+        assert [e["score"] for e in data["below"]] == [600, 500]
+        assert "user_id" not in data["entry"]
+
+    def test_k_is_bounded(self, client, auth_headers):
+        assert client.get("/api/leaderboard/me?k=100", headers=auth_headers).status_code == 422
+
     def test_leaderboard_limit_1_accepted(self, client):
         resp = client.get("/api/leaderboard?limit=1")
         assert resp.status_code == 200
@@ -305,3 +468,32 @@ class TestMap:
         data = resp.json()
         assert "regions" in data
         assert "bosses" in data
+
+    def test_map_if_none_match_returns_304(self, client):
+        etag = client.get("/api/map").headers["etag"]
+        assert client.get("/api/map", headers={"If-None-Match": etag}).status_code == 304
+
+
+class TestCatalogUnavailable:
+    class _DownRepo:
+        @property
+        def catalog(self):
+            raise ConnectionError("database is down")
+
+        def get_by_id(self, challenge_id):
+            raise ConnectionError("database is down")
+
+    @pytest.fixture
+    def down(self, client, monkeypatch):
+        from app.api.routes import game_routes
+        monkeypatch.setattr(game_routes, "_challenge_repo", self._DownRepo())
+        return client
+
+    def test_map_does_not_need_the_catalog(self, down):
+        resp = down.get("/api/map")
+        assert resp.status_code == 200
+        assert "regions" in resp.json()
+
+    def test_challenge_returns_503(self, down):
+        assert down.get("/api/challenges/intern_01_test").status_code == 503
+        assert down.get("/api/challenges").status_code == 503
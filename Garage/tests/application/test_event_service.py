@@ -56,7 +56,7 @@ class MockQuery:
 # Patch GameEventModel at import time to avoid needing a real DB
 # ---------------------------------------------------------------------------
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
 def patch_models():
     with patch("app.application.event_service.GameEventModel") as mock_model:
         mock_model.return_value = MagicMock()
@@ -67,35 +67,171 @@ def patch_models():
 # Tests
 # ---------------------------------------------------------------------------
 
+class RecordingSession:
+    """Records executemany-style inserts; optionally fails."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.commits = 0
+        self.fail = fail
+
+    def execute(self, stmt, rows=None):
+        if self.fail:
+            raise RuntimeError("DB connection failed")
+        self.batches.append((str(stmt), list(rows or [])))
+
+    def commit(self):
+        self.commits += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
 class TestEventServiceLog:
-    def test_log_success(self, patch_models):
+    def test_log_only_queues(self):
+        from app.application.event_service import EventService
+
+        session = RecordingSession()
+        service = EventService(session_factory=lambda: session)
+        service.log("game_started", user_id="u1", session_id="s1", payload={"x": 1})
+
+        assert session.batches == []
+        assert service.pending() == 1
+
+    def test_flush_writes_one_multirow_insert(self):
         from app.application.event_service import EventService
 
-        session = MockSession()
+        session = RecordingSession()
         service = EventService(session_factory=lambda: session)
         service.log("game_started", user_id="u1", session_id="s1", payload={"x": 1})
+        service.log("test_event")
+
+        assert service.flush() == 2
+        assert session.commits == 1
+        sql, rows = session.batches[0]
+        assert sql.startswith("INSERT INTO game_events")
+        assert [r["event_type"] for r in rows] == ["game_started", "test_event"]
+        assert rows[0]["payload"] == {"x": 1}
+        assert rows[1]["payload"] is None
+        assert rows[0]["timestamp"] is not None
+        assert service.pending() == 0
+
+    def test_flush_splits_into_batches(self):
+        from app.application.event_service import EventService
+
+        session = RecordingSession()
+        service = EventService(session_factory=lambda: session, batch_size=2)
+        for i in range(5):
+            service.log(f"e{i}")
+        assert service.flush() == 5
+        assert [len(rows) for _, rows in session.batches] == [2, 2, 1]
+        assert service.stats()["last_batch_size"] == 1
+
+    def test_full_queue_drops_and_counts(self):
+        from app.application.event_service import EventService
 
-        assert session.committed
-        assert len(session.added) == 1
+        service = EventService(session_factory=RecordingSession, max_queue=2)
+        for i in range(3):
+            service.log(f"e{i}")
+        stats = service.stats()
+        assert stats["queued"] == 2
+        assert stats["dropped"] == 1
 
-    def test_log_swallows_exception(self):
-        """log() must never raise — it swallows errors silently."""
+    def test_log_swallows_exception(self, capsys):
+        """A failing write never raises; the batch is kept for a retry."""
         from app.application.event_service import EventService
 
         def bad_factory():
             raise RuntimeError("DB connection failed")
 
         service = EventService(session_factory=bad_factory)
-        # Should not raise
         service.log("some_event")
+        assert service.flush() == 0
+        assert service.flush() == 0
+        assert service.pending() == 1
+        assert service.stats()["failed_flushes"] == 2
+        # Warned once per outage, not on every retry.
+        assert capsys.readouterr().out.count("Event log flush failed") == 1
+
+    def test_failed_batch_is_retried_in_order(self):
+        from app.application.event_service import EventService
 
-    def test_log_none_payload(self, patch_models):
+        session = RecordingSession(fail=True)
+        service = EventService(session_factory=lambda: session)
+        service.log("first")
+        service.flush()
+        service.log("second")
+        session.fail = False
+        assert service.flush() == 2
+        assert [r["event_type"] for r in session.batches[0][1]] == ["first", "second"]
+
+    def test_bad_event_is_dropped_after_repeated_failures(self):
+        from sqlalchemy.exc import DataError
         from app.application.event_service import EventService
 
-        session = MockSession()
+        class RejectsBadUuid(RecordingSession):
+            def execute(self, stmt, rows=None):
+                if any(r["session_id"] == "not-a-uuid" for r in rows or []):
+                    raise DataError("INSERT", {}, Exception("invalid input syntax for type uuid"))
+                super().execute(stmt, rows)
+
+        session = RejectsBadUuid()
         service = EventService(session_factory=lambda: session)
-        service.log("test_event")
-        assert len(session.added) == 1
+        for sid in ("s1", "not-a-uuid", "s2"):
+            service.log("answer", session_id=sid)
+        assert service.flush() == 0
+        assert service.flush() == 0
+        assert service.flush() == 2
+        assert service.pending() == 0
+        assert service.stats()["rejected"] == 1
+        assert sorted(r["session_id"] for _, rows in session.batches for r in rows) == ["s1", "s2"]
+
+    def test_connection_errors_are_retried_without_isolation(self):
+        from sqlalchemy.exc import OperationalError
+        from app.application.event_service import EventService
+
+        def down():
+            raise OperationalError("connect", {}, Exception("server closed the connection"))
+
+        service = EventService(session_factory=down)
+        service.log("e0")
+        for _ in range(5):
+            assert service.flush() == 0
+        assert service.pending() == 1
+        assert service.stats()["rejected"] == 0
+
+    def test_stop_drains_queue(self):
+        from app.application.event_service import EventService
+
+        session = RecordingSession()
+        service = EventService(session_factory=lambda: session, flush_interval=60)
+        service.start()
+        service.log("late_event")
+        service.stop()
+        assert service.pending() == 0
+        assert session.batches[0][1][0]["event_type"] == "late_event"
+
+    def test_full_batch_wakes_flusher(self):
+        import time
+        from app.application.event_service import EventService
+
+        session = RecordingSession()
+        service = EventService(session_factory=lambda: session,
+                               flush_interval=60, batch_size=3)
+        service.start()
+        try:
+            for i in range(3):
+                service.log(f"e{i}")
+            deadline = time.monotonic() + 2
+            while service.pending() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert service.pending() == 0
+            assert service.stats()["written"] == 3
+        finally:
+            service.stop()
 
     def test_get_user_events(self, patch_models):
         from app.application.event_service import EventService
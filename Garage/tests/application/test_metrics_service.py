@@ -3,6 +3,8 @@ import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone
 
+from sqlalchemy.dialects import postgresql
+
 
 # ---------------------------------------------------------------------------
 # Mock helpers
@@ -72,146 +74,159 @@ def mock_model_cls():
 # Tests
 # ---------------------------------------------------------------------------
 
-class TestMetricsOnGameStarted:
-    def test_new_user_creates_record(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
-
-        session = MockSession(existing_record=None)
-        service = MetricsService(session_factory=lambda: session)
-        service.on_game_started("u1", "Java")
+class RecordingSession:
+    """Session that records executed statements (compiled for PostgreSQL)."""
 
-        # A new model was created via the constructor
-        mock_model_cls.assert_called_once_with(user_id="u1")
-
-    def test_existing_user_increments(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
-
-        existing = _make_metrics_model("u1")
-        existing.total_games_started = 3
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
-        service.on_game_started("u1", "Python")
-
-        assert existing.total_games_started == 4
-        assert existing.favorite_language == "Python"
-
-    def test_sets_last_played_at(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
-
-        existing = _make_metrics_model("u1")
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
-        service.on_game_started("u1", "Java")
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
 
-        assert existing.last_played_at is not None
+    def execute(self, stmt):
+        self.statements.append(stmt.compile(dialect=postgresql.dialect()))
 
+    def commit(self):
+        self.commits += 1
 
-class TestMetricsOnAnswerSubmitted:
-    def test_correct_answer_updates_metrics(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
-
-        existing = _make_metrics_model("u1")
-        existing.total_attempts = 2
-        existing.total_correct = 1
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
-        service.on_answer_submitted("u1", is_correct=True, points=100)
+    def __enter__(self):
+        return self
 
-        assert existing.total_attempts == 3
-        assert existing.total_correct == 2
-        assert existing.total_score_earned == 100
+    def __exit__(self, *args):
+        pass
 
-    def test_wrong_answer_increments_wrong(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
 
-        existing = _make_metrics_model("u1")
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
-        service.on_answer_submitted("u1", is_correct=False, points=0)
+@pytest.fixture
+def recorder():
+    return RecordingSession()
 
-        assert existing.total_wrong == 1
 
-    def test_accuracy_rate_calculated(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
+@pytest.fixture
+def service(recorder):
+    from app.application.metrics_service import MetricsService
+    return MetricsService(session_factory=lambda: recorder)
 
-        existing = _make_metrics_model("u1")
-        existing.total_attempts = 3
-        existing.total_correct = 3
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
-        service.on_answer_submitted("u1", is_correct=True, points=50)
-        # after: 4 attempts, 4 correct → 100%
-        assert existing.accuracy_rate == 1.0
 
-    def test_zero_attempts_accuracy_is_zero(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
+def _only(recorder):
+    assert len(recorder.statements) == 1
+    compiled = recorder.statements[0]
+    return str(compiled), compiled.params
 
-        existing = _make_metrics_model("u1")
-        existing.total_attempts = 0
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
-        # After this call: 1 attempt, 0 correct
-        service.on_answer_submitted("u1", is_correct=False, points=0)
-        assert existing.accuracy_rate == 0.0
 
+class TestMetricsUpsert:
+    def test_single_upsert_statement(self, service, recorder):
+        service.on_game_started("u1", "Java")
+        sql, params = _only(recorder)
+        assert sql.startswith("INSERT INTO user_metrics")
+        assert "ON CONFLICT (user_id) DO UPDATE" in sql
+        assert "SELECT" not in sql
+        assert recorder.commits == 1
 
-class TestMetricsOnGameOver:
-    def test_increments_game_overs(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
+    def test_counters_increment_in_database(self, service, recorder):
+        service.on_game_started("u1", "Java")
+        sql, params = _only(recorder)
+        assert "total_games_started = (user_metrics.total_games_started + excluded.total_games_started)" in sql
+        assert params["total_games_started"] == 1
+        assert params["user_id"] == "u1"
 
-        existing = _make_metrics_model("u1")
-        existing.total_game_overs = 2
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
+    def test_game_started_sets_language_and_last_played(self, service, recorder):
+        service.on_game_started("u1", "Python")
+        sql, params = _only(recorder)
+        assert params["favorite_language"] == "Python"
+        assert params["last_played_at"] is not None
+        assert "favorite_language = excluded.favorite_language" in sql
+        assert "last_played_at = excluded.last_played_at" in sql
+        assert "highest_stage =" not in sql  # untouched by this event
+
+    def test_correct_answer(self, service, recorder):
+        service.on_answer_submitted("u1", is_correct=True, points=100)
+        sql, params = _only(recorder)
+        assert params["total_attempts"] == 1
+        assert params["total_correct"] == 1
+        assert params["total_wrong"] == 0
+        assert params["total_score_earned"] == 100
+        assert params["accuracy_rate"] == 1.0
+        assert "accuracy_rate = coalesce(" in sql
+
+    def test_wrong_answer(self, service, recorder):
+        service.on_answer_submitted("u1", is_correct=False, points=50)
+        _, params = _only(recorder)
+        assert params["total_wrong"] == 1
+        assert params["total_score_earned"] == 0
+        assert params["accuracy_rate"] == 0.0
+
+    def test_game_over_does_not_touch_accuracy(self, service, recorder):
         service.on_game_over("u1")
+        sql, params = _only(recorder)
+        assert params["total_game_overs"] == 1
+        assert "accuracy_rate =" not in sql
+        assert "favorite_language =" not in sql
 
-        assert existing.total_game_overs == 3
-
-
-class TestMetricsOnStagePromoted:
-    def test_updates_highest_stage(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
-
-        existing = _make_metrics_model("u1")
-        existing.highest_stage = "Intern"
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
-        service.on_stage_promoted("u1", "Junior", 500)
-
-        assert existing.highest_stage == "Junior"
-
-    def test_does_not_downgrade_stage(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
-
-        existing = _make_metrics_model("u1")
-        existing.highest_stage = "Senior"
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
-        service.on_stage_promoted("u1", "Junior", 100)  # trying to go back
-
-        assert existing.highest_stage == "Senior"
-
-    def test_updates_highest_score(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
-
-        existing = _make_metrics_model("u1")
-        existing.highest_score = 200
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
+    def test_stage_promotion_keeps_the_highest(self, service, recorder):
         service.on_stage_promoted("u1", "Mid", 999)
+        sql, params = _only(recorder)
+        assert params["highest_stage"] == "Mid"
+        assert params["highest_score"] == 999
+        assert "greatest(user_metrics.highest_score, excluded.highest_score)" in sql
+        assert "THEN excluded.highest_stage ELSE user_metrics.highest_stage END" in sql
 
-        assert existing.highest_score == 999
-
-    def test_distinguished_increments_completed(self, mock_model_cls):
-        from app.application.metrics_service import MetricsService
-
-        existing = _make_metrics_model("u1")
-        existing.total_games_completed = 0
-        session = MockSession(existing_record=existing)
-        service = MetricsService(session_factory=lambda: session)
+    def test_distinguished_increments_completed(self, service, recorder):
         service.on_stage_promoted("u1", "Distinguished", 5000)
-
-        assert existing.total_games_completed == 1
+        _, params = _only(recorder)
+        assert params["total_games_completed"] == 1
+
+
+class TestMetricsBatch:
+    def test_events_fold_into_one_statement(self, service, recorder):
+        with service.batch():
+            service.on_answer_submitted("u1", is_correct=True, points=40)
+            service.on_game_over("u1")
+            service.on_stage_promoted("u1", "Junior", 300)
+            assert recorder.statements == []
+        _, params = _only(recorder)
+        assert params["total_attempts"] == 1
+        assert params["total_game_overs"] == 1
+        assert params["highest_stage"] == "Junior"
+        assert params["highest_score"] == 300
+        assert recorder.commits == 1
+
+    def test_batch_keeps_highest_stage_and_score(self):
+        from app.application.metrics_service import MetricsDelta
+
+        delta = MetricsDelta()
+        delta.raise_stage("Senior")
+        delta.raise_stage("Junior")
+        delta.raise_score(500)
+        delta.raise_score(100)
+        assert delta.highest_stage == "Senior"
+        assert delta.highest_score == 500
+
+    def test_one_statement_per_user(self, service, recorder):
+        with service.batch():
+            service.on_game_over("u1")
+            service.on_game_over("u2")
+            service.on_game_over("u1")
+        assert len(recorder.statements) == 2
+        assert [c.params["total_game_overs"] for c in recorder.statements] == [2, 1]
+
+    def test_nested_batch_writes_once(self, service, recorder):
+        with service.batch():
+            with service.batch():
+                service.on_game_over("u1")
+            assert recorder.statements == []
+        assert len(recorder.statements) == 1
+
+    def test_nothing_written_for_empty_batch(self, service, recorder):
+        with service.batch():
+            pass
+        assert recorder.statements == []
+
+    def test_collect_defers_the_write_to_apply_all(self, service, recorder):
+        with service.collect() as deltas:
+            service.on_game_over("u1")
+            service.on_game_over("u2")
+        assert recorder.statements == []
+        service.apply_all(deltas)
+        assert len(recorder.statements) == 2
+        assert recorder.commits == 1
 
 
 class TestGetMetrics:
@@ -10,11 +10,12 @@ Covers:
 - recover_from_game_over
 - mark_completed
 - World state: update_world_state (sentinel), collect_book, complete_region
+- Change tracking: dirty fields and the persisted-attempts watermark
 - to_dict serialization
 """
 import pytest
 from app.domain.enums import CareerStage, BackendLanguage, GameEnding
-from app.domain.player import Player, _UNSET
+from app.domain.player import Attempt, Player, _UNSET
 from tests.conftest import make_character, make_player, make_challenge
 
 
@@ -129,6 +130,20 @@ class TestRecordAttempt:
         assert p.status == GameEnding.GAME_OVER
         assert p.game_over_count == 1
 
+    def test_answer_time_is_kept_on_the_attempt(self):
+        p = make_player()
+        p.record_attempt("intern_01", 0, True, 100, answer_ms=4200)
+        p.record_attempt("intern_02", 0, True, 100)
+        timed, untimed = p.attempts
+        assert timed.answer_ms == 4200 and timed.to_dict()["answer_ms"] == 4200
+        assert "answer_ms" not in untimed.to_dict()
+
+    def test_implausible_answer_time_is_dropped(self):
+        p = make_player()
+        p.record_attempt("intern_01", 0, True, 100, answer_ms=-5)
+        p.record_attempt("intern_02", 0, True, 100, answer_ms=Attempt.MAX_ANSWER_MS + 1)
+        assert [a.answer_ms for a in p.attempts] == [None, None]
+
     def test_errors_remaining_decrements(self):
         p = make_player()
         result = p.record_attempt("intern_01", 1, False, 0)
@@ -365,6 +380,88 @@ class TestWorldState:
         assert "injected" not in p.collected_books
 
 
+# ---------------------------------------------------------------------------
+# Change tracking (unit of work)
+# ---------------------------------------------------------------------------
+def _persisted_player(**kwargs):
+    p = make_player(**kwargs)
+    p.mark_persisted()
+    return p
+
+
+class TestChangeTracking:
+    def test_new_player_is_new(self):
+        p = make_player()
+        assert p.is_new
+        p.mark_persisted()
+        assert not p.is_new
+
+    def test_mark_persisted_clears_dirty_and_attempts(self):
+        p = make_player()
+        p.record_attempt("intern_01", 0, True, 100)
+        assert p.dirty_fields == {"score", "completed_challenges"}
+        assert len(p.new_attempts) == 1
+        p.mark_persisted()
+        assert p.dirty_fields == frozenset()
+        assert p.new_attempts == []
+
+    def test_only_appended_attempts_are_new(self):
+        p = _persisted_player()
+        p.record_attempt("intern_01", 0, True, 100)
+        p.mark_persisted()
+        p.record_attempt("intern_02", 1, False, 100)
+        assert [a.challenge_id for a in p.new_attempts] == ["intern_02"]
+        assert p.dirty_fields == {"current_errors"}
+
+    def test_game_over_dirties_reset_fields(self):
+        p = _persisted_player(completed_challenges=["intern_03"])
+        p.record_attempt("intern_01", 0, False, 100)
+        p.mark_persisted()
+        p.record_attempt("intern_02", 0, False, 100)
+        assert p.dirty_fields == {
+            "current_errors", "game_over_count", "completed_challenges", "status",
+        }
+
+    def test_recover_dirties_status_only_when_in_game_over(self):
+        p = _persisted_player()
+        p.recover_from_game_over()
+        assert p.dirty_fields == frozenset()
+
+    def test_promotion_dirties_stage(self):
+        p = _persisted_player(completed_challenges=["intern_01", "intern_02", "intern_03"])
+        p.check_promotion()
+        assert "stage" in p.dirty_fields
+
+    def test_unchanged_world_state_stays_clean(self):
+        p = _persisted_player(collected_books=["b1"], current_region="Xerox PARC")
+        p.update_world_state(
+            collected_books=["b1"], current_region="Xerox PARC", player_world_x=100,
+        )
+        assert p.dirty_fields == frozenset()
+
+    def test_world_state_dirties_changed_fields_only(self):
+        p = _persisted_player()
+        p.update_world_state(collected_books=["b1"], player_world_x=250)
+        assert p.dirty_fields == {"collected_books", "player_world_x"}
+
+    def test_summary_aggregate_counts_unloaded_attempts(self):
+        p = make_player(unloaded_attempts=5)
+        p.mark_persisted()
+        assert p.attempts == []
+        assert p.total_attempts == 5
+        p.record_attempt("intern_01", 0, True, 100)
+        assert p.total_attempts == 6
+        assert p.to_dict()["total_attempts"] == 6
+        assert len(p.new_attempts) == 1
+
+    def test_collect_book_duplicate_stays_clean(self):
+        p = _persisted_player(collected_books=["b1"])
+        p.collect_book("b1")
+        assert p.dirty_fields == frozenset()
+        p.collect_book("b2")
+        assert p.dirty_fields == {"collected_books"}
+
+
 # ---------------------------------------------------------------------------
 # to_dict
 # ---------------------------------------------------------------------------
@@ -0,0 +1,222 @@
+"""Tests for the async repository views and the asyncpg session factory."""
+import asyncio
+from collections import deque
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+from app.api.routes import game_routes
+from app.infrastructure.database import async_connection as adb
+from app.infrastructure.database import connection as db
+from app.infrastructure.repositories.async_pg_repositories import (
+    AsyncPgLeaderboardRepository, AsyncPgPlayerRepository, ThreadedRepository,
+)
+from app.infrastructure.repositories.pg_leaderboard_repository import PgLeaderboardRepository
+from app.infrastructure.repositories.pg_player_repository import PgPlayerRepository
+from tests.conftest import make_player
+from tests.infrastructure.test_pg_player_repository import RecordingFactory
+
+
+class _Row:
+    id = 7
+    timestamp = None
+
+
+class _Result:
+    rowcount = 1
+
+    def __init__(self, first_row):
+        self._first = first_row
+
+    def first(self):
+        return self._first
+
+    def one(self):
+        return _Row()
+
+
+class AsyncRecordingSession:
+    """Async fake session compiling every statement to PostgreSQL SQL."""
+
+    def __init__(self, factory):
+        self.factory = factory
+
+    async def execute(self, stmt, params=None):
+        if self.factory.fail:
+            raise self.factory.fail
+        self.factory.log.append(" ".join(str(stmt.compile(dialect=postgresql.dialect())).split()))
+        return _Result(self.factory.first_row)
+
+    async def commit(self):
+        self.factory.commits += 1
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        self.factory.closed += 1
+
+
+class AsyncRecordingFactory:
+    def __init__(self):
+        self.log = []
+        self.fail = None
+        self.first_row = ("owner-1",)
+        self.commits = 0
+        self.closed = 0
+
+    def __call__(self):
+        factory = self
+
+        class _Ctx:
+            async def __aenter__(self):
+                return AsyncRecordingSession(factory)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Ctx()
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestAsyncUrl:
+    def test_libpq_parameters_are_translated(self):
+        url = adb.async_url(
+            "postgresql://u:p@ep-1.aws.neon.tech/app?sslmode=require&channel_binding=require"
+        )
+        assert url.drivername == "postgresql+asyncpg"
+        assert dict(url.query) == {"ssl": "require"}
+
+    def test_pooler_host_disables_statement_cache(self):
+        url = adb.async_url("postgresql://u:p@ep-1-pooler.aws.neon.tech/app")
+        assert url.query["prepared_statement_cache_size"] == "0"
+        assert adb._connect_args(url)["statement_cache_size"] == 0
+
+
+class TestAsyncPlayerRepository:
+    def _repos(self):
+        sync_sf, async_sf = RecordingFactory(), AsyncRecordingFactory()
+        repo = PgPlayerRepository(sync_sf)
+        return repo, AsyncPgPlayerRepository(repo, async_sf), sync_sf, async_sf
+
+    def test_save_runs_the_sync_statements_in_one_transaction(self):
+        repo, aio, sync_sf, async_sf = self._repos()
+        repo.save(make_player())
+        player = make_player()
+        _run(aio.save(player))
+        assert async_sf.log == sync_sf.log
+        assert async_sf.log[0].startswith("INSERT INTO characters")
+        assert async_sf.commits == 1
+        assert not player.is_new
+
+    def test_clean_aggregate_costs_no_sql(self):
+        _, aio, _, async_sf = self._repos()
+        player = make_player()
+        player.mark_persisted()
+        _run(aio.save(player))
+        assert async_sf.log == []
+
+    def test_get_writes_pending_patch_first(self):
+        repo, aio, _, async_sf = self._repos()
+        repo.buffer_world_state("s1", {"player_world_x": 5})
+        async_sf.first_row = None
+        assert _run(aio.get("s1", with_attempts=False)) is None
+        assert async_sf.log[0].startswith("UPDATE game_sessions")
+        assert "FROM game_sessions" in async_sf.log[1]
+        assert repo.pending_world_state() == 0
+
+    def test_failed_patch_write_is_restored(self):
+        repo, aio, _, async_sf = self._repos()
+        repo.buffer_world_state("s1", {"player_world_x": 5})
+        async_sf.fail = RuntimeError("db down")
+        with pytest.raises(RuntimeError):
+            _run(aio.get("s1"))
+        assert repo.pending_world_state() == 1
+
+    def test_owner_is_cached_and_shared_with_sync_repo(self):
+        repo, aio, sync_sf, async_sf = self._repos()
+        assert _run(aio.touch_timestamp("s1")) is True
+        assert _run(aio.get_owner("s1")) == "owner-1"
+        assert len(async_sf.log) == 1
+        assert repo.get_owner("s1") == "owner-1" and sync_sf.log == []
+        assert repo._presence.drain() == ["s1"]
+
+    def test_unknown_session(self):
+        _, aio, _, async_sf = self._repos()
+        async_sf.first_row = None
+        assert _run(aio.touch_timestamp("missing")) is False
+
+
+class TestAsyncLeaderboard:
+    def test_fresh_index_is_read_without_the_threadpool(self):
+        repo = PgLeaderboardRepository(RecordingFactory())
+        repo._loaded_at = repo._synced_at = float("inf")  # fresh: no resync
+        repo._add({"id": 1, "user_id": None, "player_name": "Ada", "score": 500,
+                   "stage": "Intern", "language": "python", "timestamp": None})
+        top = _run(AsyncPgLeaderboardRepository(repo).get_top(5))
+        assert [e["player_name"] for e in top] == ["Ada"]
+
+
+class TestThreadedRepository:
+    def test_methods_become_awaitable(self):
+        view = ThreadedRepository(MagicMock(get=lambda sid: f"player-{sid}"))
+        assert _run(view.get("s1")) == "player-s1"
+
+    def test_routes_wrap_repos_without_a_twin(self):
+        assert isinstance(game_routes._aio(MagicMock()), ThreadedRepository)
+        repo = MagicMock()
+        repo.aio = ThreadedRepository(repo)
+        assert game_routes._aio(repo) is repo.aio
+
+
+class TestAsyncSessionFactory:
+    @pytest.fixture
+    def engines(self, monkeypatch):
+        """Fake async primary/fallback sessionmakers; circuit closed."""
+        class _Session:
+            def __init__(self, label):
+                self.label = label
+
+            async def rollback(self):
+                pass
+
+            async def close(self):
+                pass
+
+        monkeypatch.setattr(adb, "_primary_sf", lambda: _Session("primary"))
+        monkeypatch.setattr(adb, "_fallback_sf", lambda: _Session("fallback"))
+        monkeypatch.setattr(db, "_fallback_sf", "fallback-sf")
+        monkeypatch.setattr(db, "_fallback_engine", "fallback-engine")
+        monkeypatch.setattr(db, "_circuit_open", False)
+        monkeypatch.setattr(db, "_consecutive_failures", 0)
+        monkeypatch.setattr(db, "_last_primary_check", 0.0)
+        monkeypatch.setattr(db, "_engine", None)
+        monkeypatch.setattr(db, "_SessionLocal", None)
+
+    @staticmethod
+    async def _use(fail=None):
+        async with adb.async_session_factory() as session:
+            if fail:
+                raise fail
+            return session.label
+
+    def test_failures_feed_the_shared_breaker(self, engines, monkeypatch):
+        monkeypatch.setattr(db, "_transitions", deque(maxlen=20))
+        monkeypatch.setattr(db, "_transition_counts", {"opened": 0, "closed": 0})
+        for _ in range(db.PRIMARY_FAILURE_THRESHOLD):
+            with pytest.raises(OperationalError):
+                _run(self._use(OperationalError("SELECT 1", {}, Exception("down"))))
+        assert db._circuit_open is True
+        assert _run(self._use()) == "fallback"
+
+    def test_success_resets_the_failure_count(self, engines):
+        with pytest.raises(ConnectionRefusedError):
+            _run(self._use(ConnectionRefusedError()))
+        assert db._consecutive_failures == 1
+        assert _run(self._use()) == "primary"
+        assert db._consecutive_failures == 0
@@ -0,0 +1,47 @@
+"""Tests for batch_writes — transient-error detection and bad-row isolation."""
+from sqlalchemy.exc import DataError, IntegrityError, OperationalError
+
+from app.infrastructure.database.batch_writes import is_transient, write_isolating
+
+
+def _err(cls):
+    return cls("INSERT", {}, Exception("boom"))
+
+
+class TestIsTransient:
+    def test_connection_errors_are_transient(self):
+        assert is_transient(_err(OperationalError))
+        assert is_transient(ConnectionError())
+
+    def test_data_errors_are_not(self):
+        assert not is_transient(_err(DataError))
+        assert not is_transient(_err(IntegrityError))
+        assert not is_transient(ValueError())
+
+
+class TestWriteIsolating:
+    def test_only_failing_rows_are_rejected(self):
+        written = []
+
+        def write(rows):
+            if "bad" in rows:
+                raise _err(DataError)
+            written.extend(rows)
+
+        rows = ["a", "bad", "b", "c", "bad", "d"]
+        assert write_isolating(write, rows) == (4, ["bad", "bad"], [])
+        assert sorted(written) == ["a", "b", "c", "d"]
+
+    def test_transient_error_returns_the_rest(self):
+        calls = []
+
+        def write(rows):
+            calls.append(list(rows))
+            if len(calls) == 1:
+                raise _err(DataError)
+            if len(calls) == 3:
+                raise _err(OperationalError)
+
+        written, rejected, unwritten = write_isolating(write, ["a", "b", "c", "d"])
+        assert (written, rejected) == (2, [])
+        assert unwritten == ["c", "d"]
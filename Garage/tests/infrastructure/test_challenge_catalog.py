@@ -0,0 +1,165 @@
+"""Tests for ChallengeCatalog and the catalog-backed challenge repositories."""
+import pytest
+from unittest.mock import MagicMock
+
+from app.domain.enums import CareerStage, MapRegion
+from app.infrastructure.repositories.challenge_catalog import ChallengeCatalog
+from app.infrastructure.repositories.pg_challenge_repository import PgChallengeRepository
+from tests.conftest import make_challenge
+
+
+def _row(challenge_id, stage="Intern", region="Xerox PARC"):
+    row = MagicMock()
+    row.id = challenge_id
+    row.title = "T"
+    row.description = "D"
+    row.context_code = None
+    row.category = "logic"
+    row.required_stage = stage
+    row.region = region
+    row.mentor = None
+    row.points_on_correct = 100
+    row.options = [
+        {"text": "A", "is_correct": True, "explanation": "yes"},
+        {"text": "B", "is_correct": False, "explanation": "no"},
+    ]
+    return row
+
+
+class CountingSessionFactory:
+    """Fake session factory that counts how many sessions were opened."""
+
+    def __init__(self, rows, version=None):
+        self.rows = rows
+        self.version = version
+        self.opened = 0
+
+    def __call__(self):
+        self.opened += 1
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.__exit__.return_value = False
+        session.query.return_value.order_by.return_value.all.return_value = list(self.rows)
+        meta = MagicMock(version=self.version) if self.version else None
+        session.get.return_value = meta
+        return session
+
+
+class TestChallengeCatalog:
+    def test_indexes_by_id_stage_and_region(self):
+        a = make_challenge("intern_01_a")
+        b = make_challenge("senior_01_b", required_stage=CareerStage.SENIOR, region=MapRegion.AMAZON)
+        catalog = ChallengeCatalog([a, b])
+        assert len(catalog) == 2
+        assert catalog.get("senior_01_b") is b
+        assert catalog.get("missing") is None
+        assert catalog.by_stage(CareerStage.INTERN) == [a]
+        assert catalog.by_region(MapRegion.AMAZON) == [b]
+        assert catalog.by_stage(CareerStage.STAFF) == []
+
+    def test_all_preserves_order_and_returns_copy(self):
+        items = [make_challenge(f"intern_0{i}_x") for i in range(3)]
+        catalog = ChallengeCatalog(items)
+        result = catalog.all()
+        result.clear()
+        assert [c.id for c in catalog.all()] == [c.id for c in items]
+
+    def test_version_is_content_hash(self):
+        v1 = ChallengeCatalog([make_challenge("intern_01_a")]).version
+        v2 = ChallengeCatalog([make_challenge("intern_01_a")]).version
+        v3 = ChallengeCatalog([make_challenge("intern_01_a", correct_index=1)]).version
+        assert v1 == v2
+        assert v1 != v3
+
+    def test_explicit_version_wins(self):
+        assert ChallengeCatalog([], version="seed-42").version == "seed-42"
+
+
+class TestPgChallengeRepositoryCatalog:
+    def test_loads_once_then_serves_from_memory(self):
+        sf = CountingSessionFactory([_row("intern_01_a"), _row("junior_01_b", stage="Junior")])
+        repo = PgChallengeRepository(sf)
+        assert sf.opened == 0  # lazy: no DB work at construction
+
+        for _ in range(10):
+            assert repo.get_by_id("intern_01_a").id == "intern_01_a"
+            assert len(repo.get_all()) == 2
+            assert [c.id for c in repo.get_by_stage(CareerStage.JUNIOR)] == ["junior_01_b"]
+            assert repo.count() == 2
+        assert sf.opened == 1
+
+    def test_reload_swaps_snapshot(self):
+        sf = CountingSessionFactory([_row("intern_01_a")])
+        repo = PgChallengeRepository(sf)
+        old = repo.catalog
+        sf.rows = [_row("intern_01_a"), _row("intern_02_b")]
+        new = repo.reload()
+        assert new is repo.catalog
+        assert new.version != old.version
+        assert repo.get_by_id("intern_02_b") is not None
+        assert len(old) == 1  # previous snapshot untouched
+
+    def test_uses_seeded_catalog_version(self):
+        sf = CountingSessionFactory([_row("intern_01_a")], version="abc123")
+        repo = PgChallengeRepository(sf)
+        assert repo.catalog.version == "abc123"
+
+    def test_refresh_if_stale_skips_when_version_unchanged(self):
+        sf = CountingSessionFactory([_row("intern_01_a")], version="v1")
+        repo = PgChallengeRepository(sf)
+        first = repo.catalog
+        assert repo.refresh_if_stale() is False
+        assert repo.catalog is first
+        sf.version = "v2"
+        sf.rows = [_row("intern_01_a"), _row("intern_02_b")]
+        assert repo.refresh_if_stale() is True
+        assert repo.catalog.version == "v2"
+        assert len(repo.catalog) == 2
+
+    def test_refresh_if_stale_leaves_unloaded_and_unseeded_catalogs(self):
+        sf = CountingSessionFactory([_row("intern_01_a")], version=None)
+        repo = PgChallengeRepository(sf)
+        assert repo.refresh_if_stale() is False
+        assert repo._catalog is None
+        first = repo.catalog
+        assert repo.refresh_if_stale() is False
+        assert repo.catalog is first
+
+    def test_load_failure_propagates(self):
+        def broken():
+            raise RuntimeError("db down")
+
+        repo = PgChallengeRepository(broken)
+        with pytest.raises(RuntimeError):
+            repo.get_all()
+
+
+class TestPreparedBodies:
+    def test_bodies_match_player_serialization(self):
+        import gzip
+        import json
+
+        a = make_challenge("intern_01_a")
+        b = make_challenge("senior_01_b", required_stage=CareerStage.SENIOR)
+        catalog = ChallengeCatalog([a, b])
+
+        assert json.loads(catalog.body_all().raw) == [a.to_dict_for_player(), b.to_dict_for_player()]
+        assert json.loads(catalog.body_for_stage(CareerStage.SENIOR).raw) == [b.to_dict_for_player()]
+        assert json.loads(catalog.body_for_stage(CareerStage.STAFF).raw) == []
+        assert json.loads(catalog.body_for_id("intern_01_a").raw) == a.to_dict_for_player()
+        assert catalog.body_for_id("missing") is None
+        body = catalog.body_all()
+        assert gzip.decompress(body.gzipped) == body.raw
+
+    def test_bodies_never_expose_answers(self):
+        catalog = ChallengeCatalog([make_challenge("intern_01_a")])
+        assert b"is_correct" not in catalog.body_all().raw
+
+    def test_etag_is_strong_content_hash(self):
+        one = ChallengeCatalog([make_challenge("intern_01_a")]).body_all()
+        same = ChallengeCatalog([make_challenge("intern_01_a")]).body_all()
+        other = ChallengeCatalog([make_challenge("intern_02_b")]).body_all()
+        assert one.etag == same.etag
+        assert one.etag != other.etag
+        assert one.etag.startswith('"') and not one.etag.startswith("W/")
+        assert one.gzip_etag != one.etag
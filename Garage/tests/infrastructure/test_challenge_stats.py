@@ -0,0 +1,110 @@
+"""Tests for per-challenge difficulty stats — trigger DDL, backfill and reads."""
+from app.infrastructure.database import challenge_stats as cs
+from app.infrastructure.repositories.pg_challenge_repository import PgChallengeRepository
+
+
+class _Result:
+    def __init__(self, value=None, rows=None):
+        self._value = value
+        self._rows = rows or []
+
+    def scalar(self):
+        return self._value
+
+    def fetchall(self):
+        return self._rows
+
+
+class RecordingEngine:
+    """``engine.begin()`` yielding a connection that records every statement."""
+
+    def __init__(self, fresh):
+        self.fresh = fresh
+        self.sql = []
+
+    def begin(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, stmt, params=None):
+        sql = " ".join(str(stmt).split())
+        self.sql.append(sql)
+        return _Result(self.fresh if "to_regclass" in sql else None)
+
+
+class ScriptedSession:
+    def __init__(self, stats, options):
+        self.executed = []
+        self._answers = {"FROM challenge_stats": stats, "FROM challenge_option_stats": options}
+
+    def execute(self, stmt, params=None):
+        sql = " ".join(str(stmt).split())
+        self.executed.append(sql)
+        return _Result(rows=next(rows for k, rows in self._answers.items() if k in sql))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class TestEnsure:
+    def test_first_run_installs_trigger_and_backfills(self):
+        engine = RecordingEngine(fresh=True)
+        assert cs.ensure(engine)
+        joined = "\n".join(engine.sql)
+        assert "pg_advisory_xact_lock(hashtext('garage.challenge_stats'))" in joined
+        assert "REFERENCING NEW TABLE AS new_attempts FOR EACH STATEMENT" in joined
+        assert "FROM new_attempts n" in joined
+        backfill = engine.sql[-2:]
+        assert backfill[0].startswith("INSERT INTO challenge_stats")
+        assert "FROM attempts n" in backfill[0]
+        assert backfill[1].startswith("INSERT INTO challenge_option_stats")
+
+    def test_later_runs_only_refresh_ddl(self):
+        engine = RecordingEngine(fresh=False)
+        assert not cs.ensure(engine)
+        assert not any("FROM attempts n" in s for s in engine.sql)
+
+
+class TestCompute:
+    def test_first_try_and_histogram(self):
+        attempts = [
+            {"session_id": "s1", "challenge_id": "c1", "selected_index": 2, "is_correct": False, "answer_ms": 3000},
+            {"session_id": "s1", "challenge_id": "c1", "selected_index": 0, "is_correct": True, "answer_ms": 1000},
+            {"session_id": "s2", "challenge_id": "c1", "selected_index": 0, "is_correct": True},
+        ]
+        (entry,) = cs.compute(attempts)
+        assert entry["attempts"] == 3 and entry["correct"] == 2
+        assert entry["first_attempts"] == 2 and entry["first_try_correct"] == 1
+        assert entry["first_try_rate"] == 0.5
+        assert entry["avg_answer_ms"] == 2000
+        assert entry["option_picks"] == {"0": 2, "2": 1}
+
+    def test_entry_without_attempts_has_no_rates(self):
+        entry = cs.stats_entry("c1", 0, 0, 0, 0, 0, 0)
+        assert entry["correct_rate"] is None and entry["avg_answer_ms"] is None
+
+
+class TestRepositoryStats:
+    def test_reads_counters_and_caches(self):
+        session = ScriptedSession(
+            stats=[("c1", 10, 4, 8, 2, 50000, 5)],
+            options=[("c1", 0, 4), ("c1", 3, 6)],
+        )
+        repo = PgChallengeRepository(lambda: session)
+        (entry,) = repo.stats()
+        assert entry["correct_rate"] == 0.4
+        assert entry["first_try_rate"] == 0.25
+        assert entry["avg_answer_ms"] == 10000
+        assert entry["option_picks"] == {"0": 4, "3": 6}
+        repo.stats()
+        assert len(session.executed) == 2  # second call served from cache
+        repo.stats(max_age=0)
+        assert len(session.executed) == 4
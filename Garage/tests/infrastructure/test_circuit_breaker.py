@@ -0,0 +1,182 @@
+"""Tests for the DB circuit breaker — lock-free routing, the background prober
+and read-replica routing."""
+from collections import deque
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.infrastructure.database import connection as db
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    """Primary + fallback sessionmakers (sentinels), circuit closed, fresh metrics."""
+    monkeypatch.setattr(db, "_primary_sf", "primary-sf")
+    monkeypatch.setattr(db, "_fallback_sf", "fallback-sf")
+    monkeypatch.setattr(db, "_primary_engine", "primary-engine")
+    monkeypatch.setattr(db, "_primary_probe_engine", "probe-engine")
+    monkeypatch.setattr(db, "_fallback_engine", "fallback-engine")
+    monkeypatch.setattr(db, "_circuit_open", False)
+    monkeypatch.setattr(db, "_consecutive_failures", 0)
+    monkeypatch.setattr(db, "_last_primary_check", 0.0)
+    monkeypatch.setattr(db, "_probe_stats", {
+        "probes": 0, "failures": 0, "last_ms": None, "max_ms": 0.0, "total_ms": 0.0,
+        "last_ok": None, "last_at": None,
+    })
+    monkeypatch.setattr(db, "_transitions", deque(maxlen=20))
+    monkeypatch.setattr(db, "_transition_counts", {"opened": 0, "closed": 0})
+    monkeypatch.setattr(db, "_replica_engine", None)
+    monkeypatch.setattr(db, "_replica_sf", None)
+    monkeypatch.setattr(db, "_replica_ok", False)
+    monkeypatch.setattr(db, "_replica_lag", None)
+    monkeypatch.setattr(db, "_replica_checked_at", 0.0)
+    monkeypatch.setattr(db, "_replica_demand", 0)
+    monkeypatch.setattr(db, "_replica_failures", 0)
+    probed = []
+
+    def fake_health(engine):
+        probed.append(engine)
+        return breaker.healthy
+
+    breaker = type("Breaker", (), {"healthy": True, "probed": probed})()
+    monkeypatch.setattr(db, "_check_engine_health", fake_health)
+    return breaker
+
+
+def _open_circuit():
+    for _ in range(db.PRIMARY_FAILURE_THRESHOLD):
+        db._record_db_failure(ConnectionError("down"))
+
+
+class TestRouting:
+    def test_failures_open_the_circuit(self, breaker):
+        _open_circuit()
+        assert db._get_active_sf() == "fallback-sf"
+        state = db.get_db_circuit_state()
+        assert state["circuit_open"] and state["transitions"]["opened"] == 1
+        assert state["last_transition"]["reason"] == "ConnectionError x3"
+
+    def test_request_path_never_probes_or_waits_for_the_lock(self, breaker):
+        _open_circuit()
+        with db._cb_lock:  # a probe in progress elsewhere
+            assert db._get_active_sf() == "fallback-sf"
+        assert breaker.probed == []
+
+
+class TestProber:
+    def test_idle_when_circuit_closed(self, breaker):
+        assert db.probe_primary(now=10_000.0) is None
+        assert breaker.probed == []
+
+    def test_waits_for_retry_interval(self, breaker):
+        _open_circuit()
+        opened_at = db._last_primary_check
+        assert db.probe_primary(now=opened_at + db.PRIMARY_RETRY_INTERVAL - 1) is None
+        assert breaker.probed == []
+
+    def test_healthy_probe_closes_circuit(self, breaker):
+        _open_circuit()
+        assert db.probe_primary(now=db._last_primary_check + db.PRIMARY_RETRY_INTERVAL + 1) is True
+        assert breaker.probed == ["probe-engine"]
+        assert db._get_active_sf() == "primary-sf"
+        state = db.get_db_circuit_state()
+        assert state["transitions"] == {"opened": 1, "closed": 1}
+        assert state["last_transition"]["state"] == "closed"
+        assert state["prober"]["probes"] == 1 and state["prober"]["last_ok"] is True
+
+    def test_failed_probe_keeps_fallback_and_counts(self, breaker):
+        breaker.healthy = False
+        _open_circuit()
+        at = db._last_primary_check + db.PRIMARY_RETRY_INTERVAL + 1
+        assert db.probe_primary(now=at) is False
+        assert db.probe_primary(now=at + 1) is None  # next probe not due yet
+        assert db._get_active_sf() == "fallback-sf"
+        prober = db.get_db_circuit_state()["prober"]
+        assert prober["probes"] == 1 and prober["failures"] == 1
+        assert prober["avg_ms"] is not None
+
+
+class _LagEngine:
+    """Replica engine whose lag query answers ``lag`` (or raises)."""
+
+    def __init__(self, lag):
+        self.lag = lag
+        self.checks = 0
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, stmt):
+        self.checks += 1
+        if isinstance(self.lag, Exception):
+            raise self.lag
+        return self
+
+    def scalar(self):
+        return self.lag
+
+
+class _Session:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def replica(breaker, monkeypatch):
+    engine = _LagEngine(0.2)
+
+    def replica_sf():
+        return _Session()
+
+    monkeypatch.setattr(db, "_replica_engine", engine)
+    monkeypatch.setattr(db, "_replica_sf", replica_sf)
+    return engine
+
+
+class TestReadReplica:
+    def test_without_replica_reads_use_active_engine(self, breaker):
+        assert db._get_read_sf() == "primary-sf"
+
+    def test_unmeasured_replica_is_not_used(self, replica):
+        assert db._get_read_sf() == "primary-sf"
+
+    def test_fresh_replica_takes_reads(self, replica):
+        db._get_read_sf()  # demand
+        assert db.probe_replica(now=1_000.0) == 0.2
+        assert db._get_read_sf() is db._replica_sf
+        assert db.get_db_circuit_state()["replica"]["in_use"] is True
+
+    def test_lagging_replica_is_bypassed(self, replica):
+        replica.lag = db.REPLICA_MAX_LAG_SECONDS + 1
+        db._get_read_sf()
+        db.probe_replica(now=1_000.0)
+        assert db._get_read_sf() == "primary-sf"
+
+    def test_no_lag_check_without_reads(self, replica):
+        assert db.probe_replica(now=1_000.0) is None
+        assert replica.checks == 0
+
+    def test_open_circuit_reads_from_fallback(self, replica):
+        db._get_read_sf()
+        db.probe_replica(now=1_000.0)
+        _open_circuit()
+        assert db._get_read_sf() == "fallback-sf"
+
+    def test_replica_error_drops_it_without_tripping_the_circuit(self, replica):
+        db._get_read_sf()
+        db.probe_replica(now=1_000.0)
+        with pytest.raises(OperationalError):
+            with db.DynamicSessionFactory(read_only=True)():
+                raise OperationalError("SELECT 1", {}, Exception("replica gone"))
+        assert db._get_read_sf() == "primary-sf"
+        assert db._consecutive_failures == 0
+        assert db.get_db_circuit_state()["replica"]["failures"] == 1
@@ -0,0 +1,43 @@
+"""Tests for the HyperLogLog sketch used for landing unique visitors."""
+import pytest
+
+from app.infrastructure.repositories.hyperloglog import HyperLogLog
+
+
+class TestHyperLogLog:
+    def test_empty_counts_zero(self):
+        assert HyperLogLog().count() == 0
+
+    def test_small_sets_are_near_exact(self):
+        hll = HyperLogLog()
+        for i in range(100):
+            hll.add(f"visitor-{i}")
+        assert 97 <= hll.count() <= 103
+
+    @pytest.mark.parametrize("n", [5_000, 50_000])
+    def test_large_sets_within_error(self, n):
+        hll = HyperLogLog()
+        for i in range(n):
+            hll.add(f"v{i}")
+        assert abs(hll.count() - n) / n < 0.05
+
+    def test_duplicates_do_not_count(self):
+        hll = HyperLogLog()
+        assert hll.add("same")
+        assert not hll.add("same")
+        assert hll.count() == 1
+
+    def test_merge_is_union(self):
+        a, b, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        for i in range(3000):
+            a.add(f"v{i}")
+            both.add(f"v{i}")
+        for i in range(2000, 6000):
+            b.add(f"v{i}")
+            both.add(f"v{i}")
+        merged = HyperLogLog.merged([a.to_bytes(), None, b.to_bytes()])
+        assert merged.to_bytes() == both.to_bytes()
+
+    def test_rejects_wrong_size(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(b"\x00" * 10)
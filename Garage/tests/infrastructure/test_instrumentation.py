@@ -0,0 +1,164 @@
+"""Tests for the pool/query instrumentation hooks and per-route attribution."""
+import json
+from collections import deque
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from app.infrastructure.database import instrumentation as inst
+from app.infrastructure.middleware.query_stats import QueryStatsMiddleware
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(inst, "ENABLED", True)
+    monkeypatch.setattr(inst, "_pools", {})
+    monkeypatch.setattr(inst, "_routes", {})
+    monkeypatch.setattr(inst, "_slow", deque(maxlen=50))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'db.sqlite'}",
+        poolclass=inst.TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    inst.instrument(engine, "primary")
+    yield engine
+    engine.dispose()
+
+
+def _db_lines(out):
+    return [json.loads(line.split(" ", 1)[1]) for line in out.splitlines() if line.startswith("[GARAGE][DB]")]
+
+
+class TestTimer:
+    def test_percentiles_use_bucket_bounds(self):
+        timer = inst.Timer()
+        for ms in [1] * 90 + [40] * 9 + [700]:
+            timer.add(ms)
+        snap = timer.snapshot()
+        assert snap["count"] == 100 and snap["max"] == 700
+        assert snap["p50"] == 1 and snap["p95"] == 50 and snap["p99"] == 50
+
+    def test_empty(self):
+        assert inst.Timer().snapshot()["p95"] is None
+
+
+class TestRedact:
+    def test_values_become_types(self):
+        assert inst.redact({"email": "a@b.c", "n": 3, "ids": [1, 2], "x": None}) == {
+            "email": "<str>", "n": "<int>", "ids": "<list[2]>", "x": None,
+        }
+
+    def test_executemany_is_summarised(self):
+        assert inst.redact([{"a": 1}, {"a": 2}]) == {"rows": 2, "first": {"a": "<int>"}}
+
+    def test_positional(self):
+        assert inst.redact(("secret", 1.5)) == ["<str>", "<float>"]
+
+
+class TestPoolHooks:
+    def test_checkouts_connects_and_queries_are_counted(self, engine):
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        pool = inst.snapshot()["pools"]["primary"]
+        assert pool["class"] == "TimedQueuePool" and pool["size"] == 1
+        assert pool["checkouts"] == 3 and pool["connects"] == 1
+        assert pool["checkout_ms"]["count"] == 3
+        assert pool["connection_age_s"]["count"] == 3
+        assert inst.snapshot()["routes"][inst.BACKGROUND]["queries"] == 3
+
+    def test_exhausted_pool_counts_a_timeout(self, engine, capsys):
+        with engine.connect():
+            with pytest.raises(PoolTimeout):
+                engine.connect()
+        assert inst.snapshot()["pools"]["primary"]["timeouts"] == 1
+        assert _db_lines(capsys.readouterr().out)[-1]["event"] == "pool_timeout"
+
+    def test_label_survives_pool_recreate(self, engine):
+        engine.dispose()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert inst.snapshot()["pools"]["primary"]["checkout_ms"]["count"] == 1
+
+    def test_disabled_attaches_nothing(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(inst, "ENABLED", False)
+        other = create_engine(f"sqlite:///{tmp_path / 'other.sqlite'}", poolclass=inst.TimedQueuePool)
+        inst.instrument(other, "off")
+        assert "off" not in inst.snapshot()["pools"]
+
+
+class TestSlowQueries:
+    def test_slow_statement_is_kept_with_redacted_params(self, engine, monkeypatch, capsys):
+        monkeypatch.setattr(inst, "SLOW_QUERY_MS", 0)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT   :email\n  AS e"), {"email": "ada@example.com"})
+        slow = inst.snapshot()["slow_queries"][0]
+        assert slow["statement"] == "SELECT ? AS e"
+        assert "ada@example.com" not in json.dumps(slow)
+        assert slow["engine"] == "primary" and slow["route"] == inst.BACKGROUND
+        line = _db_lines(capsys.readouterr().out)[-1]
+        assert line["event"] == "slow_query" and line["statement"] == "SELECT ? AS e"
+
+
+class TestRouteAttribution:
+    def _client(self, engine, queries):
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        def item(item_id: str):
+            with engine.connect() as conn:
+                for _ in range(queries):
+                    conn.execute(text("SELECT 1"))
+            return {"id": item_id}
+
+        @app.get("/static")
+        def static():
+            return {}
+
+        app.add_middleware(QueryStatsMiddleware)
+        return TestClient(app)
+
+    def test_queries_are_grouped_by_route_template(self, engine):
+        client = self._client(engine, queries=2)
+        client.get("/items/a")
+        client.get("/items/b")
+        client.get("/static")
+        client.get("/nowhere")
+        routes = inst.snapshot()["routes"]
+        stats = routes["GET /items/{item_id}"]
+        assert stats["requests"] == 2 and stats["queries"] == 4
+        assert stats["queries_per_request"] == 2 and stats["checkouts_per_request"] == 1
+        assert stats["query_ms"]["count"] == 4 and stats["request_db_ms"]["count"] == 2
+        assert inst.BACKGROUND not in routes and inst.UNROUTED not in routes
+
+    def test_requests_without_db_work_still_count(self, engine):
+        client = self._client(engine, queries=2)
+        client.get("/items/a")
+        client.get("/static")
+        client.get("/static")
+        routes = inst.snapshot()["routes"]
+        static = routes["GET /static"]
+        assert static["requests"] == 2 and static["queries"] == 0
+        assert static["queries_per_request"] == 0
+        assert static["request_db_ms"]["count"] == 0
+
+    def test_query_heavy_request_is_logged(self, engine, monkeypatch, capsys):
+        monkeypatch.setattr(inst, "REQUEST_QUERY_WARN", 2)
+        self._client(engine, queries=3).get("/items/a")
+        line = _db_lines(capsys.readouterr().out)[-1]
+        assert line["event"] == "query_heavy_request"
+        assert line["route"] == "GET /items/{item_id}" and line["queries"] == 3
+
+    def test_reset_keeps_pools_instrumented(self, engine):
+        self._client(engine, queries=1).get("/items/a")
+        inst.reset()
+        snap = inst.snapshot()
+        assert snap["routes"] == {} and snap["pools"]["primary"]["checkouts"] == 0
+        self._client(engine, queries=1).get("/items/a")
+        assert inst.snapshot()["pools"]["primary"]["checkouts"] == 1
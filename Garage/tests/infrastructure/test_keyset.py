@@ -0,0 +1,42 @@
+"""Tests for keyset pagination cursors."""
+import pytest
+
+from app.infrastructure.repositories.keyset import decode_cursor, encode_cursor, make_page
+
+
+class TestCursor:
+    def test_round_trip(self):
+        key = {"created_at": "2025-01-01T12:00:00+00:00", "id": "abc"}
+        assert decode_cursor(encode_cursor(key)) == key
+
+    def test_cursor_is_url_safe(self):
+        token = encode_cursor({"q": "???>>>"})
+        assert "=" not in token and "+" not in token and "/" not in token
+
+    def test_empty_cursor_is_first_page(self):
+        assert decode_cursor(None) is None
+        assert decode_cursor("") is None
+
+    @pytest.mark.parametrize("token", ["%%%", "bm90LWpzb24", encode_cursor({}).replace("e", "!")])
+    def test_garbage_raises_value_error(self, token):
+        with pytest.raises(ValueError):
+            decode_cursor(token)
+
+    def test_non_object_rejected(self):
+        import base64
+        token = base64.urlsafe_b64encode(b"[1,2]").decode()
+        with pytest.raises(ValueError):
+            decode_cursor(token)
+
+
+class TestMakePage:
+    def test_extra_row_means_more(self):
+        page = make_page([{"n": 1}, {"n": 2}, {"n": 3}], 2, lambda r: {"n": r["n"]}, 10)
+        assert page["items"] == [{"n": 1}, {"n": 2}]
+        assert decode_cursor(page["next_cursor"]) == {"n": 2}
+        assert page["total_estimate"] == 10
+
+    def test_last_page_has_no_cursor(self):
+        page = make_page([{"n": 1}], 2, lambda r: r)
+        assert page["next_cursor"] is None
+        assert page["total_estimate"] is None
@@ -0,0 +1,107 @@
+"""Tests for the in-memory leaderboard order-statistic index."""
+import random
+
+from app.infrastructure.repositories.leaderboard_index import LeaderboardIndex
+
+
+def _entry(i, score, name=None):
+    return {"id": i, "player_name": name or f"p{i}", "score": score, "stage": "Mid",
+            "language": "python", "timestamp": f"2025-01-01T00:00:{i % 60:02d}"}
+
+
+class TestLeaderboardIndex:
+    def test_empty(self):
+        idx = LeaderboardIndex()
+        assert len(idx) == 0
+        assert idx.rank_of(500) == 1
+        assert idx.top(10) == []
+
+    def test_rank_counts_strictly_higher_scores(self):
+        idx = LeaderboardIndex()
+        idx.load([_entry(1, 300), _entry(2, 500), _entry(3, 500), _entry(4, 100)])
+        assert idx.rank_of(600) == 1
+        assert idx.rank_of(500) == 1
+        assert idx.rank_of(400) == 3
+        assert idx.rank_of(0) == 5
+
+    def test_top_orders_by_score_then_arrival(self):
+        idx = LeaderboardIndex()
+        idx.load([_entry(3, 500, "late"), _entry(1, 500, "early"), _entry(2, 900, "best")])
+        assert [e["player_name"] for e in idx.top(10)] == ["best", "early", "late"]
+        assert [e["player_name"] for e in idx.top(2)] == ["best", "early"]
+
+    def test_top_exposes_public_fields_only(self):
+        idx = LeaderboardIndex()
+        idx.add(dict(_entry(1, 10), user_id="u1"))
+        assert set(idx.top(1)[0]) == {"player_name", "score", "stage", "language", "timestamp"}
+
+    def test_duplicate_ids_ignored(self):
+        idx = LeaderboardIndex()
+        assert idx.add(_entry(1, 10))
+        assert not idx.add(_entry(1, 10))
+        assert len(idx) == 1
+
+    def test_grows_past_initial_capacity(self):
+        idx = LeaderboardIndex(initial_max_score=8)
+        idx.load([_entry(1, 5), _entry(2, 7)])
+        idx.add(_entry(3, 1000))
+        assert idx.rank_of(6) == 3
+        assert idx.rank_of(1001) == 1
+        assert idx.top(1)[0]["score"] == 1000
+
+    def test_load_replaces_contents(self):
+        idx = LeaderboardIndex()
+        idx.load([_entry(1, 10)])
+        idx.load([_entry(2, 20), _entry(3, 30)])
+        assert len(idx) == 2
+        assert [e["score"] for e in idx.top(5)] == [30, 20]
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        idx = LeaderboardIndex(initial_max_score=16)
+        scores = []
+        for i in range(500):
+            s = rng.randrange(0, 5000, 100)
+            idx.add(_entry(i + 1, s))
+            scores.append(s)
+        for probe in range(0, 5100, 50):
+            assert idx.rank_of(probe) == sum(1 for s in scores if s > probe) + 1
+        assert [e["score"] for e in idx.top(20)] == sorted(scores, reverse=True)[:20]
+
+
+class TestRankWindows:
+    def _index(self):
+        idx = LeaderboardIndex(initial_max_score=8)
+        rows = [(1, 500, "a"), (2, 900, "b"), (3, 500, "c"), (4, 700, "a"), (5, 100, "d")]
+        idx.load([dict(_entry(i, s), user_id=u) for i, s, u in rows])
+        return idx
+
+    def test_user_best_and_rank(self):
+        idx = self._index()
+        best = idx.user_best("a")
+        assert best["score"] == 700 and best["rank"] == 2
+        assert idx.user_best("c")["rank"] == 4   # tie with "a"'s 500, arrived later
+        assert idx.user_best("nobody") is None
+
+    def test_window_spans_buckets_and_ties(self):
+        idx = self._index()
+        assert [(e["rank"], e["player_name"]) for e in idx.window(3, 1, 1)] == [
+            (2, "p4"), (3, "p1"), (4, "p3"),
+        ]
+
+    def test_window_clamped_at_edges(self):
+        idx = self._index()
+        assert [e["rank"] for e in idx.window(1, 3, 1)] == [1, 2]
+        assert [e["rank"] for e in idx.window(5, 1, 3)] == [4, 5]
+
+    def test_window_matches_top(self):
+        rng = random.Random(3)
+        idx = LeaderboardIndex(initial_max_score=16)
+        for i in range(300):
+            idx.add(_entry(i + 1, rng.randrange(0, 3000, 100)))
+        top = idx.top(300)
+        for rank in (1, 17, 150, 300):
+            got = idx.window(rank, 4, 4)
+            lo = max(1, rank - 4)
+            assert [e["score"] for e in got] == [e["score"] for e in top[lo - 1:rank + 4]]
+            assert [e["player_name"] for e in got] == [e["player_name"] for e in top[lo - 1:rank + 4]]
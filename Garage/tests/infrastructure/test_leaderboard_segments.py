@@ -0,0 +1,65 @@
+"""Tests for segmented / windowed top-K leaderboards."""
+from datetime import datetime, timedelta, timezone
+
+from app.infrastructure.repositories.leaderboard_segments import SegmentedTopK, periods
+
+NOW = datetime(2025, 3, 12, 15, 0, tzinfo=timezone.utc)  # Wednesday, ISO week 11
+
+
+def _entry(name, score, language="Python", stage="Mid", at=NOW):
+    return {"player_name": name, "score": score, "language": language, "stage": stage,
+            "timestamp": at.isoformat()}
+
+
+class TestPeriods:
+    def test_labels(self):
+        assert periods(NOW) == {"all": "all", "daily": "2025-03-12",
+                                "weekly": "2025-W11", "monthly": "2025-03"}
+
+
+class TestSegmentedTopK:
+    def test_segments_by_language_and_stage(self):
+        seg = SegmentedTopK()
+        seg.add(_entry("py", 500), now=NOW)
+        seg.add(_entry("java", 900, language="Java"), now=NOW)
+        seg.add(_entry("py-senior", 700, stage="Senior"), now=NOW)
+        assert [e["player_name"] for e in seg.top(language="Python", now=NOW)] == ["py-senior", "py"]
+        assert [e["player_name"] for e in seg.top(stage="Mid", now=NOW)] == ["java", "py"]
+        assert [e["player_name"] for e in seg.top(language="Python", stage="Mid", now=NOW)] == ["py"]
+        assert [e["player_name"] for e in seg.top(now=NOW)] == ["java", "py-senior", "py"]
+
+    def test_windows_only_hold_current_period(self):
+        seg = SegmentedTopK()
+        seg.add(_entry("today", 100), now=NOW)
+        seg.add(_entry("monday", 300, at=NOW - timedelta(days=2)), now=NOW)
+        seg.add(_entry("last-month", 900, at=NOW - timedelta(days=40)), now=NOW)
+        assert [e["player_name"] for e in seg.top("daily", now=NOW)] == ["today"]
+        assert [e["player_name"] for e in seg.top("weekly", now=NOW)] == ["monday", "today"]
+        assert [e["player_name"] for e in seg.top("monthly", now=NOW)] == ["monday", "today"]
+        assert seg.top("all", now=NOW)[0]["player_name"] == "last-month"
+
+    def test_rollover_prunes_past_periods(self):
+        seg = SegmentedTopK()
+        seg.add(_entry("today", 100), now=NOW)
+        tomorrow = NOW + timedelta(days=1)
+        assert seg.top("daily", now=tomorrow) == []
+        assert [e["player_name"] for e in seg.top("weekly", now=tomorrow)] == ["today"]
+
+    def test_capped_at_k_and_ties_keep_arrival_order(self):
+        seg = SegmentedTopK(k=3)
+        for i, score in enumerate((100, 500, 500, 300, 50)):
+            seg.add(_entry(f"p{i}", score), now=NOW)
+        assert [e["player_name"] for e in seg.top(limit=10, now=NOW)] == ["p1", "p2", "p3"]
+
+    def test_cache_survives_submits_outside_the_segment(self):
+        seg = SegmentedTopK(k=2)
+        seg.add(_entry("a", 500), now=NOW)
+        seg.add(_entry("b", 400), now=NOW)
+        first = seg.top(language="Python", now=NOW)
+        seg.add(_entry("java", 900, language="Java"), now=NOW)   # other segment
+        seg.add(_entry("low", 10), now=NOW)                       # misses the top K
+        assert seg.top(language="Python", now=NOW) == first
+        assert seg._cache[("all", "all", "Python", "*")] is not None
+        seg.add(_entry("c", 450), now=NOW)
+        assert ("all", "all", "Python", "*") not in seg._cache
+        assert [e["player_name"] for e in seg.top(language="Python", now=NOW)] == ["a", "c"]
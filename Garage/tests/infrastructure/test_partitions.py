@@ -0,0 +1,143 @@
+"""Tests for monthly event partitions — planning helpers and migration DDL."""
+from datetime import datetime, timezone
+
+from app.infrastructure.database import partitions as p
+from app.infrastructure.database.partitions import GAME_EVENTS, LANDING_EVENTS
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class _Result:
+    def __init__(self, value=None, rows=None):
+        self._value = value
+        self._rows = rows or []
+
+    def scalar(self):
+        return self._value
+
+    def fetchall(self):
+        return self._rows
+
+
+class RecordingConn:
+    """Answers catalog queries from a script and records every statement."""
+
+    def __init__(self, relkind="r", legacy_rows=True, bounds=None, seq="public.game_events_id_seq"):
+        self.sql = []
+        self.relkind = relkind
+        self.legacy_rows = legacy_rows
+        self.bounds = bounds or []
+        self.seq = seq
+
+    def execute(self, stmt, params=None):
+        sql = " ".join(str(stmt).split())
+        self.sql.append(sql)
+        if "FROM pg_class WHERE oid" in sql:
+            return _Result(self.relkind)
+        if "pg_get_serial_sequence" in sql:
+            return _Result(self.seq)
+        if sql.startswith("SELECT EXISTS"):
+            return _Result(self.legacy_rows)
+        if "FROM pg_inherits" in sql:
+            return _Result(rows=self.bounds)
+        return _Result()
+
+
+class TestMonthMath:
+    def test_month_start_and_add(self):
+        m = p.month_start(datetime(2026, 12, 15, 13, 5, tzinfo=timezone.utc))
+        assert m == _utc(2026, 12, 1)
+        assert p.add_months(m, 1) == _utc(2027, 1, 1)
+        assert p.add_months(m, -12) == _utc(2025, 12, 1)
+
+    def test_parse_bound(self):
+        lo, hi = p.parse_bound(
+            "FOR VALUES FROM ('2026-10-01 00:00:00+00') TO ('2026-10-31 21:00:00-03')"
+        )
+        assert lo == _utc(2026, 10, 1)
+        assert hi == _utc(2026, 11, 1)
+        assert p.parse_bound("FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')") == (
+            None, _utc(2026, 11, 1),
+        )
+
+
+class TestPlanning:
+    def test_missing_months_skips_covered_ranges(self):
+        existing = [("game_events_legacy", None, _utc(2026, 11, 1))]
+        wanted = p.missing_months(GAME_EVENTS, existing, _utc(2026, 10, 16), ahead=2)
+        assert [w[0] for w in wanted] == ["game_events_p2026_11", "game_events_p2026_12"]
+        assert wanted[0][1:] == (_utc(2026, 11, 1), _utc(2026, 12, 1))
+
+    def test_missing_months_nothing_when_all_exist(self):
+        existing = [
+            (GAME_EVENTS.partition_name(_utc(2026, m, 1)), _utc(2026, m, 1), _utc(2026, m + 1, 1))
+            for m in (10, 11)
+        ]
+        assert p.missing_months(GAME_EVENTS, existing, _utc(2026, 10, 2), ahead=1) == []
+
+    def test_expired_respects_retention(self):
+        existing = [
+            ("game_events_legacy", None, _utc(2026, 2, 1)),
+            ("game_events_p2026_02", _utc(2026, 2, 1), _utc(2026, 3, 1)),
+            ("game_events_p2026_04", _utc(2026, 4, 1), _utc(2026, 5, 1)),
+            ("game_events_p2026_05", _utc(2026, 5, 1), _utc(2026, 6, 1)),
+        ]
+        old = p.expired(existing, _utc(2026, 10, 16), retention_months=5)
+        # Cutoff is 2026-05-01: May is still retained.
+        assert [b[0] for b in old] == [
+            "game_events_legacy", "game_events_p2026_02", "game_events_p2026_04",
+        ]
+
+
+class TestMigration:
+    def test_plain_table_converted_and_attached(self):
+        conn = RecordingConn(relkind="r", legacy_rows=True)
+        assert p.ensure_partitioned(conn, GAME_EVENTS, _utc(2026, 10, 16))
+        joined = "\n".join(conn.sql)
+        assert "ALTER TABLE game_events RENAME TO game_events_legacy" in joined
+        assert "ALTER SEQUENCE public.game_events_id_seq OWNED BY NONE" in joined
+        assert ('CREATE TABLE game_events (LIKE game_events_legacy INCLUDING DEFAULTS, '
+                'PRIMARY KEY (id, "timestamp")) PARTITION BY RANGE ("timestamp")') in joined
+        assert "ALTER SEQUENCE public.game_events_id_seq OWNED BY game_events.id" in joined
+        assert ("ATTACH PARTITION game_events_legacy FOR VALUES FROM (MINVALUE) "
+                "TO ('2026-11-01 00:00:00+00')") in joined
+        assert "DROP TABLE" not in joined
+
+    def test_empty_plain_table_is_dropped(self):
+        conn = RecordingConn(relkind="r", legacy_rows=False)
+        p.ensure_partitioned(conn, LANDING_EVENTS, _utc(2026, 10, 16))
+        assert conn.sql[-1] == "DROP TABLE landing_events_legacy"
+        assert sum(s.startswith("CREATE INDEX ON landing_events") for s in conn.sql) == 3
+
+    def test_already_partitioned_is_left_alone(self):
+        conn = RecordingConn(relkind="p")
+        assert not p.ensure_partitioned(conn, GAME_EVENTS, _utc(2026, 10, 16))
+        assert len(conn.sql) == 1
+
+    def test_create_partitions_ahead(self):
+        conn = RecordingConn(bounds=[
+            ("game_events_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')"),
+        ])
+        created = p.create_partitions(conn, GAME_EVENTS, _utc(2026, 10, 16), ahead=1)
+        assert created == ["game_events_p2026_11"]
+        assert conn.sql[-1] == (
+            "CREATE TABLE IF NOT EXISTS game_events_p2026_11 PARTITION OF game_events "
+            "FOR VALUES FROM ('2026-11-01 00:00:00+00') TO ('2026-12-01 00:00:00+00')"
+        )
+
+    def test_roll_up_then_drop(self):
+        conn = RecordingConn(bounds=[
+            ("landing_events_p2026_01",
+             "FOR VALUES FROM ('2026-01-01 00:00:00+00') TO ('2026-02-01 00:00:00+00')"),
+            ("landing_events_p2026_10",
+             "FOR VALUES FROM ('2026-10-01 00:00:00+00') TO ('2026-11-01 00:00:00+00')"),
+        ])
+        dropped = p.roll_up_expired(conn, LANDING_EVENTS, _utc(2026, 10, 16), retention_months=6)
+        assert dropped == ["landing_events_p2026_01"]
+        rollup, drop = conn.sql[-2:]
+        assert rollup.startswith("INSERT INTO landing_events_daily")
+        assert "FROM landing_events_p2026_01" in rollup
+        assert "ON CONFLICT (day, event_type, element, section, plan) DO UPDATE" in rollup
+        assert drop == "DROP TABLE landing_events_p2026_01"
@@ -0,0 +1,221 @@
+"""Tests for PgAdminRepository -- one statement per view, rows shaped for the routes."""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.infrastructure.repositories.pg_admin_repository import PgAdminRepository
+
+T0 = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def one(self):
+        return self._rows[0]
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def all(self):
+        return list(self._rows)
+
+    def mappings(self):
+        return _Result([vars(r) for r in self._rows])
+
+    def scalar(self):
+        return self._rows[0].n if self._rows else None
+
+
+class ScriptedFactory:
+    """Returns canned rows for each execute() in order and records the SQL."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.sql = []
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, stmt, params=None):
+        self.sql.append(" ".join(str(stmt).split()))
+        return _Result(self.results.pop(0))
+
+
+def _row(**kw):
+    return SimpleNamespace(**kw)
+
+
+class TestDashboardCounts:
+    def test_single_filtered_count_query(self):
+        sf = ScriptedFactory([_row(total_users=2, total_sessions=5, completed_games=1,
+                                   game_over_sessions=1, active_games=3)])
+        counts = PgAdminRepository(sf).dashboard_counts()
+        assert counts == {"total_users": 2, "total_sessions": 5, "completed_games": 1,
+                          "active_games": 3, "game_over_sessions": 1}
+        assert len(sf.sql) == 1
+        assert "count(*) FILTER" in sf.sql[0]
+
+
+class TestUsersOverview:
+    def test_maps_rows_and_formats_dates(self):
+        sf = ScriptedFactory([_row(
+            id="u1", full_name="Ana", username="ana", email="a@x.com", whatsapp="1",
+            profession="dev", email_verified=True, created_at=T0,
+            subscription_status="active", subscription_plan="monthly",
+            subscription_expires_at=T0 + timedelta(days=30),
+            total_sessions=2, total_score=300, total_attempts=9,
+            total_completed_challenges=4, best_stage="Mid", best_score=200, completed_runs=0,
+        )])
+        users = PgAdminRepository(sf).users_overview()
+        assert users[0]["created_at"] == T0.isoformat()
+        assert users[0]["best_stage"] == "Mid"
+        assert users[0]["subscription_expires_at"] == (T0 + timedelta(days=30)).isoformat()
+        assert len(sf.sql) == 1
+        assert "GROUP BY user_id" in sf.sql[0]
+        assert "LEFT JOIN per_user" in sf.sql[0]
+
+
+class TestSessionsOverview:
+    def test_orphan_sessions_get_placeholders(self):
+        sf = ScriptedFactory([_row(
+            id="s1", name="Dev", stage="Intern", score=0, status="in_progress",
+            language="python", game_over_count=0, created_at=T0, completed=0,
+            attempts=1, duration_seconds=0, full_name=None, email=None,
+        )])
+        entry = PgAdminRepository(sf).sessions_overview()[0]
+        assert entry["session_id"] == "s1"
+        assert entry["user_name"] == "---"
+        assert entry["user_email"] == "---"
+        assert "min(att.timestamp)" in sf.sql[0]
+
+
+class TestRanking:
+    def test_dedupe_and_rank_in_sql(self):
+        sf = ScriptedFactory([_row(
+            rank=1, name="Dev", user_id="u1", full_name="Ana", email="a@x.com",
+            stage="Distinguished", stage_index=6, score=900, completed=True,
+            duration_seconds=600, attempts=30, game_over_count=1, created_at=T0, total=1,
+        )])
+        ranked = PgAdminRepository(sf).ranking()
+        assert ranked[0]["rank"] == 1
+        assert ranked[0]["total_attempts"] == 30
+        assert "PARTITION BY email" in sf.sql[0]
+        assert "WHERE pick = 1" in sf.sql[0]
+
+
+def _ranked_row(rank, name, stage="Mid"):
+    return _row(
+        rank=rank, name=name, user_id=name, full_name=name, email=f"{name}@x.com",
+        stage=stage, stage_index=2, score=100, completed=False, duration_seconds=0,
+        attempts=1, game_over_count=0, created_at=T0,
+    )
+
+
+class TestUserDetail:
+    def test_invalid_id_skips_the_database(self):
+        sf = ScriptedFactory()
+        assert PgAdminRepository(sf).user_detail("not-a-uuid") is None
+        assert sf.sql == []
+
+    def test_unknown_user(self):
+        sf = ScriptedFactory([])
+        assert PgAdminRepository(sf).user_detail("00000000-0000-0000-0000-000000000001") is None
+
+    def test_sessions_attempts_and_stats(self):
+        uid = "00000000-0000-0000-0000-000000000001"
+        user = _row(id=uid, full_name="Ana", username="ana", email="a@x.com", whatsapp="1",
+                    profession="dev", created_at=T0, email_verified=True)
+        sess = _row(id="s1", user_id=uid, name="Dev", language="python", stage="Distinguished",
+                    score=500, current_errors=0, completed_challenges=["a", "b"],
+                    game_over_count=2, status="completed", collected_books=[],
+                    completed_regions=["r1"], current_region=None, player_world_x=100,
+                    created_at=T0, updated_at=T0, total_attempts=2, duration_seconds=60)
+        attempt = _row(session_id="s1", challenge_id="a", selected_index=0, is_correct=True,
+                       points_awarded=100, timestamp=T0)
+        sf = ScriptedFactory([user], [sess], [attempt])
+        detail = PgAdminRepository(sf).user_detail(uid)
+        assert "password_hash" not in detail["user"]
+        assert detail["sessions"][0]["attempts"][0]["challenge_id"] == "a"
+        assert detail["sessions"][0]["duration_seconds"] == 60
+        assert detail["stats"] == {
+            "total_sessions": 1, "total_score": 500, "total_attempts": 2,
+            "total_completed_challenges": 2, "total_game_overs": 2,
+            "best_score": 500, "completed_runs": 1,
+        }
+        assert len(sf.sql) == 3
+
+
+class TestPages:
+    def _user(self, n):
+        return _row(
+            id=f"00000000-0000-0000-0000-00000000000{n}", full_name="Ana", username=f"u{n}",
+            email="a@x.com", whatsapp="1", profession="dev", email_verified=True,
+            created_at=T0 - timedelta(minutes=n), subscription_status="none",
+            subscription_plan=None, subscription_expires_at=None, total_sessions=0,
+            total_score=0, total_attempts=0, total_completed_challenges=0,
+            best_stage="---", best_score=0, completed_runs=0,
+        )
+
+    def test_first_page_fetches_limit_plus_one_and_estimates(self):
+        sf = ScriptedFactory([self._user(1), self._user(2), self._user(3)], [_row(n=40)])
+        page = PgAdminRepository(sf).users_page(2)
+        assert [u["username"] for u in page["items"]] == ["u1", "u2"]
+        assert page["next_cursor"]
+        assert page["total_estimate"] == 40
+        assert "LIMIT :limit" in sf.sql[0]
+        assert "reltuples" in sf.sql[1]
+
+    def test_next_page_uses_keyset_bound_and_skips_estimate(self):
+        first = PgAdminRepository(ScriptedFactory([self._user(1), self._user(2)], [_row(n=2)]))
+        cursor = first.users_page(1)["next_cursor"]
+        sf = ScriptedFactory([self._user(2)])
+        page = PgAdminRepository(sf).users_page(1, cursor)
+        assert "(u.created_at, u.id) < (:after_at, CAST(:after_id AS uuid))" in sf.sql[0]
+        assert page["next_cursor"] is None
+        assert page["total_estimate"] is None
+        assert len(sf.sql) == 1
+
+    def test_filtered_estimate_counts_matching_rows(self):
+        sf = ScriptedFactory([], [_row(n=3)])
+        page = PgAdminRepository(sf).sessions_page(10, search="ana", stage="Mid")
+        assert page["total_estimate"] == 3
+        assert "gs.stage = :stage" in sf.sql[0]
+        assert sf.sql[1].startswith("SELECT count(*) FROM game_sessions gs LEFT JOIN users u")
+
+    def test_ranking_pages_come_from_one_snapshot(self):
+        from app.infrastructure.repositories.keyset import decode_cursor
+        sf = ScriptedFactory([_ranked_row(rank, f"u{rank}") for rank in range(1, 26)])
+        repo = PgAdminRepository(sf)
+        first = repo.ranking_page(10)
+        assert [e["rank"] for e in first["items"]] == list(range(1, 11))
+        assert first["total_estimate"] == 25
+        second = repo.ranking_page(10, first["next_cursor"])
+        assert [e["rank"] for e in second["items"]] == list(range(11, 21))
+        assert decode_cursor(second["next_cursor"]) == {"rank": 20}
+        last = repo.ranking_page(10, second["next_cursor"])
+        assert [e["rank"] for e in last["items"]] == list(range(21, 26))
+        assert last["next_cursor"] is None
+        assert len(sf.sql) == 1  # one ranking pass for all three pages
+
+    def test_filtered_ranking_page_keeps_global_ranks(self):
+        rows = [_ranked_row(rank, f"u{rank}", stage="Mid" if rank % 2 else "Senior")
+                for rank in range(1, 8)]
+        page = PgAdminRepository(ScriptedFactory(rows)).ranking_page(2, stage="Mid")
+        assert [e["rank"] for e in page["items"]] == [1, 3]
+        assert page["total_estimate"] == 4
+
+    def test_foreign_cursor_rejected(self):
+        import pytest
+        from app.infrastructure.repositories.keyset import encode_cursor
+        repo = PgAdminRepository(ScriptedFactory())
+        with pytest.raises(ValueError):
+            repo.users_page(10, encode_cursor({"rank": 3}))
+        with pytest.raises(ValueError):
+            repo.ranking_page(10, encode_cursor({"created_at": "x"}))
@@ -0,0 +1,217 @@
+"""Tests for PgLandingAnalyticsRepository — ingest-time rollups and summary reads."""
+from datetime import datetime, timezone
+
+from app.infrastructure.database.landing_rollups import counter_params, hour_of
+from app.infrastructure.repositories.hyperloglog import HyperLogLog
+from app.infrastructure.repositories.pg_landing_analytics_repository import (
+    PgLandingAnalyticsRepository,
+)
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class ScriptedSession:
+    """Records statements; answers reads by matching a substring of the SQL."""
+
+    def __init__(self, answers=None):
+        self.added = []
+        self.executed = []
+        self.commits = 0
+        self._answers = answers or []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def execute(self, stmt, params=None):
+        sql = " ".join(str(stmt).split())
+        self.executed.append((sql, params))
+        for needle, rows in self._answers:
+            if needle in sql:
+                return _Result(rows)
+        return _Result([])
+
+    def commit(self):
+        self.commits += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class TestRecord:
+    def test_page_view_updates_counter_and_sketches(self):
+        session = ScriptedSession()
+        PgLandingAnalyticsRepository(lambda: session).record("visitor-1", "page_view")
+        insert, counter, unique = session.executed
+        assert insert[0].startswith("INSERT INTO landing_events")
+        assert insert[1][0]["visitor_id"] == "visitor-1"
+        assert counter[0].startswith("INSERT INTO landing_rollup_hourly")
+        assert counter[1][0]["events"] == 1 and counter[1][0]["event_type"] == "page_view"
+        assert unique[0].startswith("INSERT INTO landing_uniques")
+        assert "landing_hll_merge(landing_uniques.sketch, excluded.sketch)" in unique[0]
+        rows = {r["period"]: r for r in unique[1]}
+        assert set(rows) == {"hour", "day", "all"}
+        assert rows["hour"]["bucket_start"] == hour_of(insert[1][0]["created_at"])
+        assert rows["day"]["bucket_start"].hour == 0
+        assert HyperLogLog(rows["day"]["sketch"]).count() == 1
+        assert session.commits == 1
+
+    def test_click_has_no_sketch_update(self):
+        session = ScriptedSession()
+        PgLandingAnalyticsRepository(lambda: session).record(
+            "visitor-1", "checkout_click", element="btn-plan", plan="monthly",
+        )
+        assert len(session.executed) == 2
+        params = session.executed[1][1][0]
+        assert params["plan"] == "monthly" and params["element"] == "btn-plan"
+        assert params["section"] == ""
+
+    def test_scroll_buckets(self):
+        at = datetime(2026, 10, 16, 12, 34, tzinfo=timezone.utc)
+        params = counter_params("scroll_depth", at, scroll_pct=60)
+        assert params["hour"] == datetime(2026, 10, 16, 12, tzinfo=timezone.utc)
+        assert (params["scroll_25"], params["scroll_50"], params["scroll_75"], params["scroll_100"]) == (1, 1, 0, 0)
+        # Only scroll_depth events count towards the buckets.
+        assert counter_params("click", at, scroll_pct=100)["scroll_100"] == 0
+
+
+class TestBufferedWrites:
+    def _repo(self, session, **kw):
+        return PgLandingAnalyticsRepository(lambda: session, **kw)
+
+    def test_enqueue_does_not_touch_the_database(self):
+        session = ScriptedSession()
+        repo = self._repo(session)
+        repo.enqueue([repo.event("visitor-1", "page_view")])
+        assert session.executed == []
+        assert repo.pending() == 1
+
+    def test_flush_writes_one_transaction_with_aggregated_counters(self):
+        session = ScriptedSession()
+        repo = self._repo(session)
+        at = datetime(2026, 10, 16, 12, 5, tzinfo=timezone.utc)
+        repo.enqueue([
+            repo.event("visitor-1", "page_view", created_at=at),
+            repo.event("visitor-1", "page_view", created_at=at),
+            repo.event("visitor-2", "page_view", created_at=at),
+            repo.event("visitor-1", "click", element="btn-hero", created_at=at),
+            repo.event("visitor-1", "click", element="btn-hero", created_at=at),
+            repo.event("visitor-1", "scroll_depth", scroll_pct=75, created_at=at),
+        ])
+        assert repo.flush() == 6
+        assert repo.pending() == 0
+        assert session.commits == 1
+        insert, counter, unique = session.executed
+        assert len(insert[1]) == 6
+        rows = {(r["event_type"], r["element"]): r for r in counter[1]}
+        assert len(counter[1]) == 3
+        assert rows[("page_view", "")]["events"] == 3
+        assert rows[("click", "btn-hero")]["events"] == 2
+        assert rows[("scroll_depth", "")]["scroll_75"] == 1
+        # One merged sketch per touched row (hour, day, all), whatever the visitors.
+        assert [(r["period"], r["bucket_start"]) for r in unique[1]] == sorted(
+            (r["period"], r["bucket_start"]) for r in unique[1]
+        )
+        assert len(unique[1]) == 3
+        assert all(HyperLogLog(r["sketch"]).count() == 2 for r in unique[1])
+        # Counter rows are written in key order too (no deadlocks between workers).
+        keys = [(r["hour"], r["event_type"], r["element"]) for r in counter[1]]
+        assert keys == sorted(keys)
+
+    def test_empty_flush_is_free(self):
+        session = ScriptedSession()
+        assert self._repo(session).flush() == 0
+        assert session.executed == []
+
+    def test_failed_flush_keeps_events(self):
+        class Failing(ScriptedSession):
+            def execute(self, stmt, params=None):
+                raise RuntimeError("db down")
+
+        repo = self._repo(Failing())
+        repo.enqueue([repo.event("visitor-1", "page_view")])
+        try:
+            repo.flush()
+        except RuntimeError:
+            pass
+        assert repo.pending() == 1
+
+    def test_bad_event_is_isolated_after_repeated_failures(self):
+        from sqlalchemy.exc import DataError
+
+        class RejectsLongIp(ScriptedSession):
+            def execute(self, stmt, params=None):
+                if isinstance(params, list) and any(len(r.get("ip_address") or "") > 9 for r in params):
+                    raise DataError("INSERT", {}, Exception("value too long"))
+                return super().execute(stmt, params)
+
+        session = RejectsLongIp()
+        repo = self._repo(session)
+        repo.enqueue([repo.event(f"visitor-{i}", "click", ip_address="10.0.0.1") for i in range(3)])
+        repo._buffer[1]["ip_address"] = "1" * 45
+        for _ in range(2):
+            try:
+                repo.flush()
+            except DataError:
+                pass
+        assert repo.pending() == 3
+        assert repo.flush() == 2
+        assert repo.pending() == 0
+        assert repo.rejected == 1
+
+    def test_ip_address_is_capped(self):
+        repo = self._repo(ScriptedSession())
+        assert len(repo.event("visitor-1", "click", ip_address="1" * 500)["ip_address"]) == 45
+
+    def test_full_buffer_drops(self):
+        repo = self._repo(ScriptedSession(), max_buffered=2)
+        accepted = repo.enqueue(repo.event(f"visitor-{i}", "click") for i in range(3))
+        assert accepted == 2
+        assert repo.dropped == 1
+
+
+class TestSummary:
+    def test_summary_reads_rollups_only(self):
+        all_time, today = HyperLogLog(), HyperLogLog()
+        for i in range(40):
+            all_time.add(f"v{i}")
+        for i in range(10):
+            today.add(f"v{i}")
+        session = ScriptedSession(answers=[
+            ("SUM(events) FILTER (WHERE hour >= :today)", [(120, 15)]),
+            ("FROM landing_uniques", [("all", all_time.to_bytes()), ("day", memoryview(today.to_bytes()))]),
+            ("event_type='checkout_click' AND plan", [("monthly", 3), ("annual", 1)]),
+            ("event_type IN ('click','checkout_click')", [("btn-hero", 7)]),
+            ("DATE(hour AT TIME ZONE 'UTC')", [("2026-10-16", 15)]),
+            ("SUM(scroll_25)", [(9, 6, 3, 1)]),
+            ("event_type='section_view'", [("pricing", 5)]),
+        ])
+        result = PgLandingAnalyticsRepository(lambda: session).summary()
+        assert all("landing_events " not in sql for sql, _ in session.executed)
+        assert result["total_visits"] == 120
+        assert result["today_visits"] == 15
+        assert result["unique_visitors"] == 40
+        assert result["today_unique"] == 10
+        assert result["checkout_clicks"] == {"monthly": 3, "annual": 1}
+        assert result["conversion_rate"] == "10.0%"
+        assert result["top_buttons"] == [{"element": "btn-hero", "count": 7}]
+        assert result["visits_7d"] == [{"date": "2026-10-16", "visits": 15}]
+        assert result["scroll_depth"] == {"p25": 9, "p50": 6, "p75": 3, "p100": 1}
+        assert result["top_sections"] == [{"section": "pricing", "count": 5}]
+
+    def test_summary_without_sketches(self):
+        session = ScriptedSession(answers=[
+            ("SUM(events) FILTER (WHERE hour >= :today)", [(0, 0)]),
+            ("SUM(scroll_25)", [(0, 0, 0, 0)]),
+        ])
+        result = PgLandingAnalyticsRepository(lambda: session).summary()
+        assert result["unique_visitors"] == 0
+        assert result["conversion_rate"] == "0%"
@@ -0,0 +1,237 @@
+"""Tests for PgPlayerRepository write paths -- statement shape and round-trip count."""
+from sqlalchemy.dialects import postgresql
+
+from app.infrastructure.repositories.pg_player_repository import PgPlayerRepository
+from tests.conftest import make_player
+
+
+class RecordingSession:
+    """Fake session that compiles every executed statement to PostgreSQL SQL."""
+
+    def __init__(self, log, fail=False, first_row=("owner-1",)):
+        self.log = log
+        self.fail = fail
+        self.first_row = first_row
+        self.committed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, stmt, params=None):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.log.append(" ".join(str(stmt.compile(dialect=postgresql.dialect())).split()))
+        return _Result(self.first_row)
+
+    def commit(self):
+        self.committed = True
+
+
+class _Result:
+    rowcount = 1
+
+    def __init__(self, first_row):
+        self._first = first_row
+
+    def first(self):
+        return self._first
+
+    def all(self):
+        return []
+
+    def unique(self):
+        return self
+
+    def scalar_one_or_none(self):
+        return None
+
+
+class RecordingFactory:
+    def __init__(self):
+        self.log = []
+        self.fail = False
+        self.first_row = ("owner-1",)
+
+    def __call__(self):
+        return RecordingSession(self.log, self.fail, self.first_row)
+
+
+def _answer(player, n):
+    for i in range(n):
+        player.record_attempt(f"intern_0{i}", 0, True, 100)
+
+
+class TestPgPlayerSave:
+    def test_new_player_writes_character_and_session_only(self):
+        sf = RecordingFactory()
+        repo = PgPlayerRepository(sf)
+        repo.save(make_player())
+        assert len(sf.log) == 2
+        assert sf.log[0].startswith("INSERT INTO characters")
+        assert "ON CONFLICT (id) DO NOTHING" in sf.log[0]
+        assert sf.log[1].startswith("INSERT INTO game_sessions")
+        assert "ON CONFLICT (id) DO UPDATE" in sf.log[1]
+
+    def test_session_upsert_never_rewrites_identity_columns(self):
+        sf = RecordingFactory()
+        PgPlayerRepository(sf).save(make_player())
+        update_clause = sf.log[1].split("DO UPDATE SET", 1)[1]
+        assert "score = excluded.score" in update_clause
+        assert "updated_at = now()" in update_clause
+        for col in ("user_id", "character_id", "language", "created_at"):
+            assert f"{col} =" not in update_clause
+
+    def test_clean_aggregate_costs_no_sql(self):
+        sf = RecordingFactory()
+        repo = PgPlayerRepository(sf)
+        player = make_player()
+        repo.save(player)
+        sf.log.clear()
+        repo.save(player)
+        assert sf.log == []
+
+    def test_loaded_aggregate_updates_only_dirty_columns(self):
+        sf = RecordingFactory()
+        repo = PgPlayerRepository(sf)
+        player = make_player()
+        repo.save(player)
+        sf.log.clear()
+
+        player.update_world_state(player_world_x=420)
+        repo.save(player)
+        assert len(sf.log) == 1
+        assert sf.log[0].startswith("UPDATE game_sessions SET player_world_x=")
+        assert "updated_at=now()" in sf.log[0]
+        assert "score" not in sf.log[0]
+
+    def test_appended_attempts_are_one_multi_row_insert_without_count(self):
+        sf = RecordingFactory()
+        repo = PgPlayerRepository(sf)
+        player = make_player()
+        repo.save(player)
+        sf.log.clear()
+
+        _answer(player, 2)
+        repo.save(player)
+        assert len(sf.log) == 2
+        assert sf.log[0].startswith("UPDATE game_sessions SET score=")
+        assert "completed_challenges=" in sf.log[0]
+        assert "player_world_x" not in sf.log[0]
+        assert sf.log[1].startswith("INSERT INTO attempts")
+        assert "_m1" in sf.log[1]  # both attempts in one multi-row VALUES
+        assert "answer_ms" in sf.log[1]
+        assert not any("count(*)" in s for s in sf.log)
+
+    def test_save_marks_aggregate_persisted(self):
+        sf = RecordingFactory()
+        player = make_player()
+        _answer(player, 1)
+        PgPlayerRepository(sf).save(player)
+        assert not player.is_new
+        assert player.dirty_fields == frozenset()
+        assert player.new_attempts == []
+
+
+class TestPgWorldStateBuffer:
+    def test_flush_writes_all_sessions_in_one_update(self):
+        sf = RecordingFactory()
+        repo = PgPlayerRepository(sf)
+        repo.buffer_world_state("s1", {"player_world_x": 10})
+        repo.buffer_world_state("s1", {"player_world_x": 20})
+        repo.buffer_world_state("s2", {"current_region": None})
+        repo.flush_world_state()
+        assert len(sf.log) == 1
+        sql = sf.log[0]
+        assert sql.startswith("UPDATE game_sessions SET")
+        assert "FROM (VALUES" in sql
+        assert "world_state_at <=" in sql
+        assert repo.pending_world_state() == 0
+
+    def test_flush_with_nothing_pending_is_free(self):
+        sf = RecordingFactory()
+        assert PgPlayerRepository(sf).flush_world_state() == 0
+        assert sf.log == []
+
+    def test_failed_flush_keeps_patches(self):
+        sf = RecordingFactory()
+        repo = PgPlayerRepository(sf)
+        repo.buffer_world_state("s1", {"player_world_x": 10})
+        sf.fail = True
+        try:
+            repo.flush_world_state()
+        except RuntimeError:
+            pass
+        assert repo.pending_world_state() == 1
+
+    def test_get_writes_pending_patch_before_reading(self):
+        sf = RecordingFactory()
+        repo = PgPlayerRepository(sf)
+        repo.buffer_world_state("s1", {"player_world_x": 10})
+        repo.buffer_world_state("s2", {"player_world_x": 20})
+        assert repo.get("s1") is None
+        assert sf.log[0].startswith("UPDATE game_sessions")
+        assert sf.log[1].startswith("SELECT game_sessions.id")
+        assert repo.pending_world_state() == 1  # s2 still buffered
+
+
+class TestPgPresence:
+    def test_heartbeats_are_batched_into_one_update(self):
+        sf = RecordingFactory()
+        repo = PgPlayerRepository(sf)
+        for _ in range(3):
+            assert repo.touch_timestamp("s1") is True
+        assert repo.touch_timestamp("s2") is True
+        owner_lookups = len(sf.log)
+        assert owner_lookups == 2  # one cached owner lookup per session, no UPDATEs
+
+        assert repo.flush_presence() == 2
+        assert len(sf.log) == owner_lookups + 1
+        flush_sql = sf.log[-1]
+        assert "UPDATE game_sessions SET updated_at = NOW() WHERE id = ANY(" in flush_sql
+        assert repo.flush_presence() == 0
+        assert len(sf.log) == owner_lookups + 1
+
+    def test_active_sessions_served_from_fresh_snapshot(self):
+        sf = RecordingFactory()
+        repo = PgPlayerRepository(sf)
+        repo.touch_timestamp("s1")
+        repo.flush_presence()
+        sf.log.clear()
+        assert repo.get_active_sessions(minutes=5) == []
+        assert sf.log == []
+        repo.get_active_sessions(minutes=60)  # non-standard window -> SQL
+        assert len(sf.log) == 1
+
+    def test_active_sessions_without_snapshot_use_sql(self):
+        sf = RecordingFactory()
+        PgPlayerRepository(sf).get_active_sessions(minutes=5)
+        assert len(sf.log) == 1
+
+    def test_listings_use_read_factory_and_loads_do_not(self):
+        sf, read_sf = RecordingFactory(), RecordingFactory()
+        repo = PgPlayerRepository(sf, read_session_factory=read_sf)
+        repo.get_active_sessions(minutes=60)
+        repo.get_all()
+        assert len(read_sf.log) == 2
+        repo.get("s1")
+        assert len(sf.log) == 1 and len(read_sf.log) == 2
+
+
+class TestPgPlayerLoad:
+    def test_full_load_is_one_joined_query(self):
+        sf = RecordingFactory()
+        PgPlayerRepository(sf).get("s1")
+        assert len(sf.log) == 1
+        assert "JOIN characters" in sf.log[0]
+        assert "JOIN attempts" in sf.log[0]
+
+    def test_summary_load_counts_attempts_without_fetching_them(self):
+        sf = RecordingFactory()
+        sf.first_row = None
+        assert PgPlayerRepository(sf).get("s1", with_attempts=False) is None
+        assert len(sf.log) == 1
+        assert "(SELECT count(attempts.id)" in sf.log[0]
+        assert "JOIN attempts" not in sf.log[0]
@@ -0,0 +1,34 @@
+"""Tests for the heartbeat presence registry."""
+from app.infrastructure.repositories.presence_registry import PresenceRegistry
+
+
+class TestPresenceRegistry:
+    def test_beats_are_deduplicated(self):
+        reg = PresenceRegistry()
+        for sid in ("b", "a", "b", "b"):
+            reg.beat(sid)
+        assert reg.drain() == ["a", "b"]
+        assert reg.drain() == []
+
+    def test_restore_requeues_failed_ids(self):
+        reg = PresenceRegistry()
+        reg.beat("a")
+        ids = reg.drain()
+        reg.beat("b")
+        reg.restore(ids)
+        assert reg.drain() == ["a", "b"]
+
+    def test_snapshot_only_served_while_fresh(self):
+        reg = PresenceRegistry()
+        assert reg.online(max_age=30) is None
+        reg.set_online([{"session_id": "a"}])
+        assert reg.online(max_age=30) == [{"session_id": "a"}]
+        assert reg.online(max_age=-1) is None
+
+    def test_forget_drops_session_everywhere(self):
+        reg = PresenceRegistry()
+        reg.beat("a")
+        reg.set_online([{"session_id": "a"}, {"session_id": "b"}])
+        reg.forget("a")
+        assert reg.drain() == []
+        assert reg.online(max_age=30) == [{"session_id": "b"}]
@@ -0,0 +1,91 @@
+"""Tests for the incremental challenge seeder (pure diff helpers)."""
+from app.infrastructure.database.seed import (
+    catalog_version,
+    challenge_row,
+    content_hash,
+    plan_seed,
+)
+
+
+def _item(cid, title="T"):
+    return {
+        "id": cid,
+        "title": title,
+        "description": "D",
+        "category": "logic",
+        "required_stage": "Intern",
+        "region": "Xerox PARC",
+        "options": [{"text": "A", "is_correct": True, "explanation": "yes"}],
+    }
+
+
+def _existing(rows):
+    return {r["id"]: (r["content_hash"], r["sort_order"]) for r in rows}
+
+
+class TestContentHash:
+    def test_key_order_does_not_matter(self):
+        a = {"id": "x", "title": "T", "options": []}
+        b = {"options": [], "title": "T", "id": "x"}
+        assert content_hash(a) == content_hash(b)
+
+    def test_any_edit_changes_hash(self):
+        assert content_hash(_item("x")) != content_hash(_item("x", title="T2"))
+
+
+class TestChallengeRow:
+    def test_defaults_and_metadata(self):
+        row = challenge_row(_item("intern_01"), 3)
+        assert row["points_on_correct"] == 100
+        assert row["context_code"] is None
+        assert row["mentor"] is None
+        assert row["sort_order"] == 3
+        assert row["content_hash"] == content_hash(_item("intern_01"))
+
+
+class TestPlanSeed:
+    def test_empty_table_upserts_everything(self):
+        rows = [challenge_row(_item(f"c{i}"), i) for i in range(3)]
+        upserts, removed = plan_seed(rows, {})
+        assert [r["id"] for r in upserts] == ["c0", "c1", "c2"]
+        assert removed == []
+
+    def test_unchanged_catalog_is_a_no_op(self):
+        rows = [challenge_row(_item(f"c{i}"), i) for i in range(3)]
+        assert plan_seed(rows, _existing(rows)) == ([], [])
+
+    def test_only_edited_rows_are_upserted(self):
+        rows = [challenge_row(_item(f"c{i}"), i) for i in range(3)]
+        stored = _existing(rows)
+        rows[1] = challenge_row(_item("c1", title="edited"), 1)
+        upserts, removed = plan_seed(rows, stored)
+        assert [r["id"] for r in upserts] == ["c1"]
+        assert removed == []
+
+    def test_reordering_rewrites_sort_order(self):
+        rows = [challenge_row(_item(f"c{i}"), i) for i in range(2)]
+        stored = _existing(rows)
+        swapped = [challenge_row(_item("c1"), 0), challenge_row(_item("c0"), 1)]
+        upserts, _ = plan_seed(swapped, stored)
+        assert {r["id"] for r in upserts} == {"c0", "c1"}
+
+    def test_missing_ids_are_removed(self):
+        rows = [challenge_row(_item(f"c{i}"), i) for i in range(3)]
+        stored = _existing(rows)
+        upserts, removed = plan_seed(rows[:1], stored)
+        assert upserts == []
+        assert removed == ["c1", "c2"]
+
+
+class TestCatalogVersion:
+    def test_stable_for_same_content(self):
+        rows = [challenge_row(_item(f"c{i}"), i) for i in range(3)]
+        again = [challenge_row(_item(f"c{i}"), i) for i in range(3)]
+        assert catalog_version(rows) == catalog_version(again)
+
+    def test_changes_with_content_and_order(self):
+        rows = [challenge_row(_item(f"c{i}"), i) for i in range(2)]
+        edited = [rows[0], challenge_row(_item("c1", title="x"), 1)]
+        reordered = list(reversed(rows))
+        assert catalog_version(rows) != catalog_version(edited)
+        assert catalog_version(rows) != catalog_version(reordered)
@@ -0,0 +1,165 @@
+"""Tests for the request-scoped unit of work (one session and one commit per request)."""
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+import pytest
+
+from app.infrastructure.database import connection as db
+from app.infrastructure.database.unit_of_work import (
+    after_commit, detached, on_rollback, request_unit_of_work,
+)
+
+
+class FakeSession:
+    def __init__(self, log):
+        self.log = log
+
+    def execute(self, stmt, params=None):
+        if stmt == "fail":
+            raise RuntimeError("statement failed")
+        self.log.append(("execute", stmt))
+
+    def flush(self):
+        self.log.append(("flush",))
+
+    def commit(self):
+        self.log.append(("commit",))
+
+    def rollback(self):
+        self.log.append(("rollback",))
+
+    def close(self):
+        self.log.append(("close",))
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Primary sessionmaker recording every session it opens; circuit closed."""
+    log, opened = [], []
+
+    def sessionmaker():
+        opened.append(FakeSession(log))
+        return opened[-1]
+
+    monkeypatch.setattr(db, "_primary_sf", sessionmaker)
+    monkeypatch.setattr(db, "_fallback_sf", None)
+    monkeypatch.setattr(db, "_replica_sf", None)
+    monkeypatch.setattr(db, "_circuit_open", False)
+    return type("Sessions", (), {"log": log, "opened": opened})()
+
+
+def _write(stmt):
+    with db.dynamic_session_factory() as session:
+        session.execute(stmt)
+        session.commit()
+
+
+def _read(stmt):
+    with db.read_session_factory() as session:
+        session.execute(stmt)
+
+
+def _client(endpoint, method="post"):
+    app = FastAPI()
+    getattr(app, method)("/op", dependencies=[Depends(request_unit_of_work, scope="function")])(endpoint)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestOutsideARequest:
+    def test_each_block_has_its_own_session_and_commit(self, sessions):
+        _write("a")
+        _write("b")
+        assert len(sessions.opened) == 2
+        assert sessions.log.count(("commit",)) == 2
+
+    def test_after_commit_runs_immediately(self):
+        ran = []
+        after_commit(lambda: ran.append(1))
+        assert ran == [1]
+
+
+class TestRequestUnitOfWork:
+    def test_blocks_share_one_session_and_commit_once(self, sessions):
+        def endpoint():
+            _read("select")
+            _write("insert")
+            _write("update")
+            return {"ok": True}
+
+        assert _client(endpoint).post("/op").status_code == 200
+        assert len(sessions.opened) == 1
+        assert sessions.log == [
+            ("execute", "select"), ("execute", "insert"), ("flush",),
+            ("execute", "update"), ("flush",), ("commit",), ("close",),
+        ]
+
+    def test_async_endpoint_shares_the_session_too(self, sessions):
+        async def endpoint():
+            _write("insert")
+            _write("update")
+            return {"ok": True}
+
+        assert _client(endpoint).post("/op").status_code == 200
+        assert len(sessions.opened) == 1 and sessions.log.count(("commit",)) == 1
+
+    def test_endpoint_error_rolls_everything_back(self, sessions):
+        undone = []
+
+        def endpoint():
+            _write("insert")
+            on_rollback(lambda: undone.append("insert"))
+            raise HTTPException(status_code=400, detail="bad answer")
+
+        assert _client(endpoint).post("/op").status_code == 400
+        assert ("commit",) not in sessions.log
+        assert ("rollback",) in sessions.log
+        assert undone == ["insert"]
+
+    def test_failure_after_a_write_aborts_the_request(self, sessions):
+        def endpoint():
+            _write("insert")
+            try:
+                _write("fail")
+            except RuntimeError:
+                pass  # a fail-open caller must not commit half a request
+            _write("update")
+            return {"ok": True}
+
+        assert _client(endpoint).post("/op").status_code == 500
+        assert ("commit",) not in sessions.log
+        assert ("execute", "update") not in sessions.log
+
+    def test_failed_read_before_any_write_is_recoverable(self, sessions):
+        def endpoint():
+            try:
+                _read("fail")
+            except RuntimeError:
+                pass
+            _write("insert")
+            return {"ok": True}
+
+        assert _client(endpoint).post("/op").status_code == 200
+        assert len(sessions.opened) == 2  # fresh transaction after the rollback
+        assert sessions.log[-2:] == [("commit",), ("close",)]
+
+    def test_after_commit_waits_for_the_commit(self, sessions):
+        seen = []
+
+        def endpoint():
+            _write("insert")
+            after_commit(lambda: seen.append(("commit",) in sessions.log))
+            assert seen == []
+            return {"ok": True}
+
+        _client(endpoint).post("/op")
+        assert seen == [True]
+
+    def test_detached_blocks_use_their_own_session(self, sessions):
+        def endpoint():
+            _write("insert")
+            with detached():
+                _read("refresh")
+            return {"ok": True}
+
+        _client(endpoint).post("/op")
+        assert len(sessions.opened) == 2
+        assert sessions.log.count(("commit",)) == 1
@@ -0,0 +1,73 @@
+"""Tests for the world-state write-behind buffer and the periodic flusher."""
+import threading
+
+from app.infrastructure.periodic import PeriodicTask
+from app.infrastructure.repositories.world_state_buffer import WorldStateBuffer
+
+
+class TestWorldStateBuffer:
+    def test_patches_merge_latest_wins(self):
+        buf = WorldStateBuffer()
+        buf.put("s1", {"collected_books": ["a"], "player_world_x": 10})
+        buf.put("s1", {"player_world_x": 20, "current_region": None})
+        patch, _ = buf.pop("s1")
+        assert patch == {"collected_books": ["a"], "player_world_x": 20, "current_region": None}
+        assert buf.pop("s1") is None
+
+    def test_drain_empties_buffer(self):
+        buf = WorldStateBuffer()
+        buf.put("s1", {"player_world_x": 1})
+        buf.put("s2", {"player_world_x": 2})
+        batch = buf.drain()
+        assert set(batch) == {"s1", "s2"}
+        assert len(buf) == 0
+
+    def test_restore_keeps_newer_values(self):
+        buf = WorldStateBuffer()
+        buf.put("s1", {"collected_books": ["a"], "player_world_x": 10})
+        failed = buf.drain()
+        buf.put("s1", {"player_world_x": 99})
+        buf.restore(failed)
+        patch, _ = buf.pop("s1")
+        assert patch == {"collected_books": ["a"], "player_world_x": 99}
+
+
+class TestPeriodicTask:
+    def test_runs_periodically_and_once_more_on_stop(self):
+        calls = []
+        ran = threading.Event()
+
+        def tick():
+            calls.append(1)
+            ran.set()
+
+        task = PeriodicTask("test", 0.01, tick)
+        task.start()
+        assert ran.wait(2)
+        task.stop()
+        assert not task.running
+        assert len(calls) >= 2  # at least one tick + the final flush
+
+    def test_errors_do_not_kill_the_thread(self, capsys):
+        calls = []
+
+        def boom():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+
+        task = PeriodicTask("flaky", 0.01, boom)
+        task.run_once()
+        task.run_once()
+        assert len(calls) == 2
+        assert "flaky failed: RuntimeError" in capsys.readouterr().out
+
+    def test_wake_runs_before_the_interval(self):
+        ran = threading.Event()
+        task = PeriodicTask("woken", 60, ran.set)
+        task.start()
+        try:
+            task.wake()
+            assert ran.wait(2)
+        finally:
+            task.stop()
@@ -37,7 +37,7 @@ document.addEventListener('DOMContentLoaded', _fixGameLinks);
 
 // ── ANALYTICS TRACKER ──────────────────────────────────────────
 // Relative URL — works both on Live Server (dev) and when served by FastAPI (prod)
-const ANALYTICS_API = API_BASE + '/api/analytics/landing';
+const ANALYTICS_API = API_BASE + '/api/analytics/landing/batch';
 
 (function initTracker() {
     // Persistent anonymous visitor ID per browser
@@ -47,18 +47,34 @@ const ANALYTICS_API = API_BASE + '/api/analytics/landing';
         localStorage.setItem('_g404_vid', vid);
     }
 
-    function send(payload) {
-        const body = Object.assign({ visitor_id: vid, referrer: document.referrer.slice(0, 500), user_agent: navigator.userAgent.slice(0, 200) }, payload);
-        // Use sendBeacon when available (non-blocking, survives page close)
-        const data = JSON.stringify(body);
-        if (navigator.sendBeacon) {
-            const blob = new Blob([data], { type: 'application/json' });
-            navigator.sendBeacon(ANALYTICS_API, blob);
-        } else {
+    // Events are buffered and sent in batches: every FLUSH_MS, as soon as
+    // MAX_BATCH are waiting, and when the page is hidden or closed.
+    const FLUSH_MS = 5000, MAX_BATCH = 20, MAX_PER_REQUEST = 50;
+    const _queue = [];
+    let _timer = null;
+
+    function flush() {
+        if (_timer) { clearTimeout(_timer); _timer = null; }
+        while (_queue.length) {
+            const data = JSON.stringify({ events: _queue.splice(0, MAX_PER_REQUEST) });
+            // Use sendBeacon when available (non-blocking, survives page close)
+            if (navigator.sendBeacon && navigator.sendBeacon(ANALYTICS_API, new Blob([data], { type: 'application/json' }))) continue;
             fetch(ANALYTICS_API, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: data, keepalive: true }).catch(() => { });
         }
     }
 
+    function send(payload) {
+        _queue.push(Object.assign({ visitor_id: vid, referrer: document.referrer.slice(0, 500), user_agent: navigator.userAgent.slice(0, 200) }, payload));
+        if (_queue.length >= MAX_BATCH) flush();
+        else if (!_timer) _timer = setTimeout(flush, FLUSH_MS);
+    }
+
+    document.addEventListener('visibilitychange', function () {
+        if (document.visibilityState === 'hidden') flush();
+    });
+    window.addEventListener('pagehide', flush);
+    window._g404Tracker = { send: send, flush: flush };
+
     // 1. Page view — fired on load
     send({ event_type: 'page_view' });
 
@@ -99,20 +115,15 @@ const ANALYTICS_API = API_BASE + '/api/analytics/landing';
 
 // Expose helper for checkout click tracking
 function trackCheckout(plan) {
-    const vid = localStorage.getItem('_g404_vid') || 'unknown';
-    const body = JSON.stringify({
-        visitor_id: vid,
+    const tracker = window._g404Tracker;
+    if (!tracker) return;
+    tracker.send({
         event_type: 'checkout_click',
         element: 'btn-plan-' + plan,
         plan: plan === 'mensal' ? 'monthly' : 'annual',
-        referrer: document.referrer.slice(0, 200),
-        user_agent: navigator.userAgent.slice(0, 200),
     });
-    if (navigator.sendBeacon) {
-        navigator.sendBeacon(ANALYTICS_API, new Blob([body], { type: 'application/json' }));
-    } else {
-        fetch(ANALYTICS_API, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body, keepalive: true }).catch(() => { });
-    }
+    // The checkout redirect follows: send now, with everything still queued.
+    tracker.flush();
 }
 
 // ── TERMINAL TYPEWRITER ──────────────────────────────────────